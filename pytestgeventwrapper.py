@@ -5,5 +5,7 @@ import sys
 
 import pytest
 
-exit_code = pytest.main()
-sys.exit(exit_code)
+# Guarded since worker processes started with the spawn method import the main module
+if __name__ == '__main__':
+    exit_code = pytest.main()
+    sys.exit(exit_code)
@@ -84,6 +84,8 @@ for exchange_name in SUPPORTED_EXCHANGES:
     hiddenimports.append(f'rotkehlchen.exchanges.{exchange_name}')
 dynamic_modules = collect_submodules('rotkehlchen.chain.ethereum.modules')
 hiddenimports.extend(dynamic_modules)
+# Only imported by name inside the transaction decoding worker processes
+hiddenimports.append('rotkehlchen.chain.ethereum.decoding.worker')
 
 a = Entrypoint(
     'rotkehlchen',
@@ -1,6 +1,7 @@
 from gevent import monkey  # isort:skip # noqa
 monkey.patch_all()  # isort:skip # noqa
 import logging
+import multiprocessing
 import sys
 import traceback
 
@@ -16,6 +17,8 @@ log = RotkehlchenLogsAdapter(logger)
 
 
 def main() -> None:
+    # needed by the worker processes when running as a bundled executable
+    multiprocessing.freeze_support()
     try:
         rotkehlchen_server = RotkehlchenServer()
     except SystemPermissionError as e:
@@ -1,20 +1,31 @@
 import logging
+from collections import defaultdict
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
 
 import gevent
 
+from rotkehlchen.accounting.checkpoints import (
+    CountingEventsIterator,
+    EventsHasher,
+    PnlCheckpoint,
+    settings_fingerprint,
+    should_checkpoint,
+)
 from rotkehlchen.accounting.constants import FREE_PNL_EVENTS_LIMIT
 from rotkehlchen.accounting.export.csv import CSVExporter
 from rotkehlchen.accounting.mixins.event import AccountingEventMixin
 from rotkehlchen.accounting.pot import AccountingPot
 from rotkehlchen.accounting.structures.types import ActionType
 from rotkehlchen.accounting.types import MissingPrice
+from rotkehlchen.assets.asset import Asset
 from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair, UnsupportedAsset
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.history.price import PriceHistorian
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import Premium
 from rotkehlchen.types import Timestamp
@@ -104,7 +115,10 @@ class Accountant():
 
         start_ts here is the timestamp at which to start taking trades and other
         taxable events into account. Not where processing starts from. Processing
-        always starts from the very first event we find in the history.
+        starts from the very first event we find in the history, unless a checkpoint
+        of the accounting state saved before start_ts by a previous run is still valid
+        for the given events and settings. Then processing resumes from it and the
+        report events generated before it are copied from the report that made it.
 
         Returns the id of the generated report
         """
@@ -141,64 +155,120 @@ class Accountant():
             actions_length = len(events)
             prev_time = last_event_ts = Timestamp(0)
             ignored_ids_mapping = self.db.get_ignored_action_ids(cursor=cursor, action_type=None)
+            ignored_assets = self.db.get_ignored_assets(cursor)
 
-        events_iter = iter(events)
-        while True:
-            try:
-                (
-                    processed_events_num,
-                    prev_time,
-                ) = self._process_event(
-                    events_iterator=events_iter,
-                    start_ts=start_ts,
-                    end_ts=end_ts,
-                    prev_time=prev_time,
-                    db_settings=db_settings,
-                    ignored_ids_mapping=ignored_ids_mapping,
-                )
-            except PriceQueryUnsupportedAsset as e:
-                count = self._process_skipping_exception(
-                    exception=e,
-                    events=events,
-                    count=count,
-                    reason='not being able to find price for an unsupported asset',
-                )
-                continue
-            except NoPriceForGivenTimestamp as e:
-                self.pots[0].cost_basis.missing_prices.add(
-                    MissingPrice(
-                        from_asset=e.from_asset,
-                        to_asset=e.to_asset,
-                        time=e.time,
-                    ),
-                )
-                continue
-            except RemoteError as e:
-                count = self._process_skipping_exception(
-                    exception=e,
-                    events=events,
-                    count=count,
-                    reason='inability to reach an external service at that point in time',
-                )
-                continue
+        events_iter = CountingEventsIterator(events)
+        # Checkpoints can't be used if events before start_ts are not processed since
+        # then the accounting state depends on the report's range
+        use_checkpoints = db_settings.calculate_past_cost_basis
+        settings_hash = settings_fingerprint(
+            settings=db_settings,
+            ignored_assets=ignored_assets,
+            ignored_ids_mapping=ignored_ids_mapping,
+        )
+        hasher = EventsHasher(events)
+        last_checkpoint_ts = Timestamp(0)
+        if use_checkpoints:
+            restored, hasher = self._maybe_restore_checkpoint(
+                dbpnl=dbpnl,
+                start_ts=start_ts,
+                settings_hash=settings_hash,
+                hasher=hasher,
+            )
+            if restored is not None:
+                events_iter.consumed = count = restored.events_processed
+                last_event_ts = last_checkpoint_ts = restored.timestamp
 
-            if processed_events_num == 0:
-                break  # we reached the period end
-
-            last_event_ts = prev_time
-            if count % 500 == 0:
-                # This loop can take a very long time depending on the amount of events
-                # to process. We need to yield to other greenlets or else calls to the
-                # API may time out
-                gevent.sleep(0.5)
-            count += processed_events_num
-            if not active_premium and count >= FREE_PNL_EVENTS_LIMIT:
-                log.debug(
-                    f'PnL reports event processing has hit the event limit of {events_limit}. '
-                    f'Processing stopped and the results will not '
-                    f'take into account subsequent events. Total events were {len(events)}',
-                )
-                break
+        self._prefetch_prices(
+            events=events[events_iter.consumed:],
+            start_ts=start_ts,
+            end_ts=end_ts,
+            db_settings=db_settings,
+            ignored_assets=ignored_assets,
+            ignored_ids_mapping=ignored_ids_mapping,
+        )
+        try:
+            while True:
+                try:
+                    (
+                        processed_events_num,
+                        prev_time,
+                    ) = self._process_event(
+                        events_iterator=events_iter,
+                        start_ts=start_ts,
+                        end_ts=end_ts,
+                        prev_time=prev_time,
+                        db_settings=db_settings,
+                        ignored_ids_mapping=ignored_ids_mapping,
+                    )
+                except PriceQueryUnsupportedAsset as e:
+                    count = self._process_skipping_exception(
+                        exception=e,
+                        events=events,
+                        count=count,
+                        reason='not being able to find price for an unsupported asset',
+                    )
+                    continue
+                except NoPriceForGivenTimestamp as e:
+                    self.pots[0].cost_basis.missing_prices.add(
+                        MissingPrice(
+                            from_asset=e.from_asset,
+                            to_asset=e.to_asset,
+                            time=e.time,
+                        ),
+                    )
+                    continue
+                except RemoteError as e:
+                    count = self._process_skipping_exception(
+                        exception=e,
+                        events=events,
+                        count=count,
+                        reason='inability to reach an external service at that point in time',
+                    )
+                    continue
+
+                if processed_events_num == 0:
+                    break  # we reached the period end
+
+                last_event_ts = prev_time
+                checkpoint_ts = events[events_iter.consumed - 1].get_timestamp()
+                # Only checkpoint before the report range. The report events generated
+                # there don't depend on the range so other reports can reuse them.
+                if (
+                    use_checkpoints and
+                    checkpoint_ts < start_ts and
+                    should_checkpoint(last_checkpoint_ts, checkpoint_ts)
+                ):
+                    events_hash = hasher.digest_at(events_iter.consumed)
+                    if events_hash is not None:
+                        dbpnl.add_checkpoint(
+                            timestamp=checkpoint_ts,
+                            events_processed=events_iter.consumed,
+                            events_hash=events_hash,
+                            settings_hash=settings_hash,
+                            report_id=report_id,
+                            report_events=len(self.pots[0].processed_events),
+                            state=self.pots[0].serialize_state(),
+                        )
+                        last_checkpoint_ts = checkpoint_ts
+
+                if count % 500 == 0:
+                    # This loop can take a very long time depending on the amount of events
+                    # to process. We need to yield to other greenlets or else calls to the
+                    # API may time out. Also write the events processed so far so that they
+                    # can be seen before the report is finished.
+                    self.pots[0].flush_report_events()
+                    gevent.sleep(0.5)
+                count += processed_events_num
+                if not active_premium and count >= FREE_PNL_EVENTS_LIMIT:
+                    log.debug(
+                        f'PnL reports event processing has hit the event limit of {events_limit}. '
+                        f'Processing stopped and the results will not '
+                        f'take into account subsequent events. Total events were {len(events)}',
+                    )
+                    break
+        finally:  # also on error, not to lose the buffered events
+            self.pots[0].flush_report_events()
 
         dbpnl.add_report_overview(
             report_id=report_id,
@@ -209,6 +279,106 @@ class Accountant():
         )
         return report_id
 
+    def _maybe_restore_checkpoint(
+            self,
+            dbpnl: DBAccountingReports,
+            start_ts: Timestamp,
+            settings_hash: str,
+            hasher: EventsHasher,
+    ) -> Tuple[Optional[PnlCheckpoint], EventsHasher]:
+        """Restores the accounting pot state from the latest valid checkpoint before start_ts
+
+        A checkpoint is valid if it was made with the same settings and the events it
+        covers are identical to the given ones. Invalid checkpoints are deleted.
+
+        Returns the restored checkpoint, if any, and the hasher positioned after the
+        events covered by it so that it can be used to create new checkpoints.
+        """
+        restored = None
+        verified_hasher = hasher.copy()
+        for checkpoint in dbpnl.get_checkpoints(settings_hash):
+            if checkpoint.timestamp >= start_ts:
+                break
+
+            if hasher.digest_at(checkpoint.events_processed) != checkpoint.events_hash:
+                # Events up to this point changed so all subsequent checkpoints are invalid
+                dbpnl.delete_checkpoints(from_events_processed=checkpoint.events_processed)
+                break
+
+            restored = checkpoint
+            verified_hasher = hasher.copy()
+
+        if restored is None:
+            return None, verified_hasher
+
+        state = dbpnl.get_checkpoint_state(restored.identifier)
+        report_events = dbpnl.get_checkpoint_report_events(restored)
+        if state is not None and report_events is not None:
+            try:
+                self.pots[0].restore_state(state)
+            except (DeserializationError, UnknownAsset) as e:
+                log.error(f'Could not restore PnL checkpoint {restored.identifier} due to {str(e)}')  # noqa: E501
+                state = None
+
+        if state is None or report_events is None:
+            # start from scratch. The pot needs to be reset since restoring may have failed midway
+            self.pots[0].reset(
+                settings=self.pots[0].settings,
+                start_ts=self.pots[0].query_start_ts,
+                end_ts=self.pots[0].query_end_ts,
+                report_id=self.pots[0].report_id,  # type: ignore # report id is initialized by now
+            )
+            dbpnl.delete_checkpoints()
+            return None, EventsHasher(hasher.events)
+
+        self.pots[0].restore_report_events(report_events)
+        log.info(
+            f'Resuming history processing from checkpoint at {restored.timestamp} '
+            f'after {restored.events_processed} events',
+        )
+        return restored, verified_hasher
+
+    def _prefetch_prices(
+            self,
+            events: List[AccountingEventMixin],
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            db_settings: DBSettings,
+            ignored_assets: List[Asset],
+            ignored_ids_mapping: Dict[ActionType, List[str]],
+    ) -> None:
+        """Collects the prices in the profit currency that the events to be processed
+        will need and fetches them in bulk per asset before processing starts.
+
+        Uses the same criteria as _process_event to decide which events will be processed.
+        """
+        profit_currency = self.pots[0].profit_currency
+        queries: Dict[Asset, List[Timestamp]] = defaultdict(list)
+        for event in events:
+            timestamp = event.get_timestamp()
+            if timestamp > end_ts:
+                break
+            if not db_settings.calculate_past_cost_basis and timestamp < start_ts:
+                continue
+            if event.should_ignore(ignored_ids_mapping):
+                continue
+            try:
+                event_assets = event.get_assets()
+            except (UnknownAsset, UnsupportedAsset, UnprocessableTradePair):
+                continue  # will be reported when processing the event
+            if any(x in ignored_assets for x in event_assets):
+                continue
+
+            for asset in event_assets:
+                if asset != profit_currency:
+                    queries[asset].append(timestamp)
+
+        if len(queries) == 0:
+            return
+
+        log.debug(f'Prefetching historical prices of {len(queries)} assets for PnL report')
+        PriceHistorian().prefetch_historical_prices(to_asset=profit_currency, queries=queries)
+
     def _process_event(
             self,
             events_iterator: Iterator[AccountingEventMixin],
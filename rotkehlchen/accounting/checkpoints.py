@@ -0,0 +1,119 @@
+import hashlib
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional
+
+from rotkehlchen.constants.timing import MONTH_IN_SECONDS
+from rotkehlchen.types import Timestamp
+
+if TYPE_CHECKING:
+    from rotkehlchen.accounting.mixins.event import AccountingEventMixin
+    from rotkehlchen.accounting.structures.types import ActionType
+    from rotkehlchen.assets.asset import Asset
+    from rotkehlchen.db.settings import DBSettings
+
+# Minimum time distance between two consecutive checkpoints of the accounting state
+PNL_CHECKPOINT_PERIOD = MONTH_IN_SECONDS
+
+# Settings that affect the state of an accounting pot. A checkpoint is only valid
+# for a run with the same values for all of them.
+CHECKPOINT_SETTINGS = (
+    'main_currency',
+    'include_crypto2crypto',
+    'taxfree_after_period',
+    'include_gas_costs',
+    'account_for_assets_movements',
+    'calculate_past_cost_basis',
+    'historical_price_oracles',
+    'taxable_ledger_actions',
+    'cost_basis_method',
+    'treat_eth2_as_eth',
+    'eth_staking_taxable_after_withdrawal_enabled',
+)
+
+
+class PnlCheckpoint(NamedTuple):
+    """Metadata of a saved accounting pot state
+
+    The state is the result of processing the first `events_processed` events of the
+    history, the last of which happened at `timestamp`. `events_hash` is the digest of
+    all these events so that any change in them invalidates the checkpoint. The first
+    `report_events` events of the report `report_id` are the report events generated
+    by processing them.
+    """
+    identifier: int
+    timestamp: Timestamp
+    events_processed: int
+    events_hash: str
+    report_id: int
+    report_events: int
+
+
+def settings_fingerprint(
+        settings: 'DBSettings',
+        ignored_assets: List['Asset'],
+        ignored_ids_mapping: Dict['ActionType', List[str]],
+) -> str:
+    """Digest of all user settings that affect the accounting pot state"""
+    serialized_settings = settings.serialize()
+    data = {x: serialized_settings.get(x) for x in CHECKPOINT_SETTINGS}
+    data['ignored_assets'] = sorted(x.identifier for x in ignored_assets)
+    data['ignored_ids'] = {
+        str(action_type): sorted(ids) for action_type, ids in ignored_ids_mapping.items()
+    }
+    return hashlib.sha256(repr(sorted(data.items())).encode()).hexdigest()
+
+
+class EventsHasher():
+    """Keeps a rolling digest over a sorted list of accounting events
+
+    The digest can only move forward. That way verifying saved checkpoints and
+    creating new ones during a run costs a single pass over the events.
+    """
+
+    def __init__(self, events: List['AccountingEventMixin']) -> None:
+        self.events = events
+        self.position = 0
+        self._hash = hashlib.sha256()
+
+    def digest_at(self, position: int) -> Optional[str]:
+        """Returns the digest of the first `position` events or None if the
+        position is before the current one or beyond the available events"""
+        if position < self.position or position > len(self.events):
+            return None
+
+        for idx in range(self.position, position):
+            self._hash.update(repr(self.events[idx].serialize()).encode())
+        self.position = position
+        return self._hash.hexdigest()
+
+    def copy(self) -> 'EventsHasher':
+        new_hasher = EventsHasher(self.events)
+        new_hasher.position = self.position
+        new_hasher._hash = self._hash.copy()
+        return new_hasher
+
+
+class CountingEventsIterator(Iterator['AccountingEventMixin']):
+    """Iterator over the events that remembers how many have been consumed so far
+
+    Events may be consumed both by the accountant and by the events themselves during
+    processing so this is the only reliable way to know the processing cursor.
+    """
+
+    def __init__(self, events: List['AccountingEventMixin'], start: int = 0) -> None:
+        self.events = events
+        self.consumed = start
+
+    def __iter__(self) -> 'CountingEventsIterator':
+        return self
+
+    def __next__(self) -> 'AccountingEventMixin':
+        if self.consumed >= len(self.events):
+            raise StopIteration
+
+        event = self.events[self.consumed]
+        self.consumed += 1
+        return event
+
+
+def should_checkpoint(last_checkpoint_ts: Timestamp, timestamp: Timestamp) -> bool:
+    return timestamp >= last_checkpoint_ts + PNL_CHECKPOINT_PERIOD
@@ -25,8 +25,10 @@ from rotkehlchen.constants.assets import A_ETH, A_WETH
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.serialization import DeserializationError
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FVal, fval_sum
+from rotkehlchen.history.deserialization import deserialize_price
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.serialization.deserialize import deserialize_fval
 from rotkehlchen.types import CostBasisMethod, Location, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.mixins.customizable_date import CustomizableDateMixin
@@ -126,6 +128,13 @@ class BaseAcquisitionsOrder(metaclass=ABCMeta):
         """Returns read-only _acquisitions"""
         return tuple(self._acquisitions)
 
+    def restore_acquisitions(self, acquisitions: List[AssetAcquisitionEvent]) -> None:
+        """Replaces the acquisitions with the given ones, keeping their order as is.
+
+        Used to restore the state saved at an accounting checkpoint. The given list
+        should be in the same order as returned by get_acquisitions()"""
+        self._acquisitions = deque(acquisitions)
+
     def consume_result(self, used_amount: FVal) -> None:
         """This function should be used to consume results of the
         currently processed event (received from __next__)
@@ -303,6 +312,71 @@ class CostBasisCalculator(CustomizableDateMixin):
         self.missing_acquisitions: List[MissingAcquisition] = []
         self.missing_prices: Set[MissingPrice] = set()
 
+    def serialize_state(self) -> Dict[str, Any]:
+        """Serializes the state needed to resume cost basis calculation from this point
+
+        Only the remaining acquisitions are needed since used acquisitions and spends
+        do not affect any subsequent calculation.
+        """
+        acquisitions = {}
+        for asset, asset_events in self._events.items():
+            entries = []
+            for acquisition in asset_events.acquisitions_manager.get_acquisitions():
+                entry = acquisition.serialize()
+                entry['remaining_amount'] = str(acquisition.remaining_amount)
+                entries.append(entry)
+            if len(entries) != 0:
+                acquisitions[asset.identifier] = entries
+
+        return {
+            'acquisitions': acquisitions,
+            'missing_acquisitions': [x.serialize() for x in self.missing_acquisitions],
+            'missing_prices': [x.serialize() for x in self.missing_prices],
+        }
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        """Restores the state given by serialize_state(). Should be called after reset()
+
+        May raise:
+        - DeserializationError if the data is malformed
+        - UnknownAsset if an asset of the saved state is no longer known
+        """
+        try:
+            for identifier, entries in data['acquisitions'].items():
+                restored = []
+                for entry in entries:
+                    acquisition = AssetAcquisitionEvent(
+                        amount=deserialize_fval(entry['full_amount'], 'full_amount', 'checkpoint'),  # noqa: E501
+                        timestamp=Timestamp(entry['timestamp']),
+                        rate=deserialize_price(entry['rate']),
+                        index=entry['index'],
+                    )
+                    acquisition.remaining_amount = deserialize_fval(
+                        value=entry['remaining_amount'],
+                        name='remaining_amount',
+                        location='checkpoint',
+                    )
+                    restored.append(acquisition)
+                self._events[Asset(identifier)].acquisitions_manager.restore_acquisitions(restored)  # noqa: E501
+
+            for entry in data['missing_acquisitions']:
+                self.missing_acquisitions.append(MissingAcquisition(
+                    asset=Asset(entry['asset']),
+                    time=Timestamp(entry['time']),
+                    found_amount=deserialize_fval(entry['found_amount'], 'found_amount', 'checkpoint'),  # noqa: E501
+                    missing_amount=deserialize_fval(entry['missing_amount'], 'missing_amount', 'checkpoint'),  # noqa: E501
+                ))
+            for entry in data['missing_prices']:
+                self.missing_prices.add(MissingPrice(
+                    from_asset=Asset(entry['from_asset']),
+                    to_asset=Asset(entry['to_asset']),
+                    time=Timestamp(entry['time']),
+                ))
+        except (KeyError, AttributeError) as e:
+            raise DeserializationError(
+                f'Could not restore cost basis state due to {str(e)}',
+            ) from e
+
     def get_events(self, asset: Asset) -> CostBasisEvents:
         """Custom getter for events so that we have common cost basis for some assets"""
         if asset == A_WETH:
@@ -547,8 +621,7 @@ class CostBasisCalculator(CustomizableDateMixin):
         the history has been processed
         """
         asset_events = self.get_events(asset)
-
-        amount = ZERO
-        for acquisition_event in asset_events.acquisitions_manager.get_acquisitions():
-            amount += acquisition_event.remaining_amount
+        amount = fval_sum(
+            x.remaining_amount for x in asset_events.acquisitions_manager.get_acquisitions()
+        )
         return amount if amount != ZERO else None
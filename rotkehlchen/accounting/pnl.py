@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
 
 from rotkehlchen.constants import ZERO
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FVal, fval_sum
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.mixins.event import AccountingEventType
@@ -91,8 +91,8 @@ class PnlTotals(MutableMapping):
 
     @property
     def taxable(self) -> FVal:
-        return FVal(sum(x.taxable for x in self.totals.values()))
+        return fval_sum(x.taxable for x in self.totals.values())
 
     @property
     def free(self) -> FVal:
-        return FVal(sum(x.free for x in self.totals.values()))
+        return fval_sum(x.free for x in self.totals.values())
@@ -13,7 +13,7 @@ from rotkehlchen.accounting.transactions import TransactionsAccountant
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.assets import A_KFEE
 from rotkehlchen.constants.misc import ONE, ZERO
-from rotkehlchen.db.reports import DBAccountingReports
+from rotkehlchen.db.reports import DBReportEventsWriter
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
@@ -59,23 +59,28 @@ class AccountingPot(CustomizableDateMixin):
         )
         self.query_start_ts = self.query_end_ts = Timestamp(0)
         self.report_id: Optional[int] = None
+        self.report_events_writer: Optional[DBReportEventsWriter] = None
 
     def _add_processed_event(self, event: ProcessedAccountingEvent) -> None:
-        dbpnl = DBAccountingReports(self.database)
         self.processed_events.append(event)
         try:
-            dbpnl.add_report_data(
-                report_id=self.report_id,  # type: ignore # report id is initialized by now
-                time=event.timestamp,
-                ts_converter=self.timestamp_to_date,
-                event=event,
-            )
+            self.report_events_writer.add(event)  # type: ignore # initialized by now
         except (DeserializationError, InputError) as e:
             log.error(str(e))
             return
 
         log.debug(event.to_string(self.timestamp_to_date))
 
+    def flush_report_events(self) -> None:
+        """Writes the processed events still buffered to the report in the DB"""
+        if self.report_events_writer is None:
+            return
+
+        try:
+            self.report_events_writer.flush()
+        except InputError as e:
+            log.error(str(e))
+
     def get_rate_in_profit_currency(self, asset: Asset, timestamp: Timestamp) -> Price:
         """Get the profit_currency price of asset in the given timestamp
 
@@ -105,6 +110,11 @@ class AccountingPot(CustomizableDateMixin):
     ) -> None:
         self.settings = settings
         self.report_id = report_id
+        self.report_events_writer = DBReportEventsWriter(
+            database=self.database,
+            report_id=report_id,
+            ts_converter=self.timestamp_to_date,
+        )
         self.profit_currency = self.settings.main_currency
         self.query_start_ts = start_ts
         self.query_end_ts = end_ts
@@ -113,6 +123,35 @@ class AccountingPot(CustomizableDateMixin):
         self.transactions.reset()
         self.processed_events = []
 
+    def serialize_state(self) -> Dict[str, Any]:
+        """Serializes the state needed to continue processing events from this point.
+
+        PnL totals are not included since a checkpoint is only restored for a report
+        starting after it, so no PnL has been counted yet at that point.
+        """
+        return {
+            'cost_basis': self.cost_basis.serialize_state(),
+            'transactions': self.transactions.evm_accounting_aggregator.serialize_state(),
+        }
+
+    def restore_report_events(self, events: List[ProcessedAccountingEvent]) -> None:
+        """Adds the report events generated up to a restored checkpoint to this report"""
+        for event in events:
+            self._add_processed_event(event)
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        """Restores the state given by serialize_state(). Should be called after reset()
+
+        May raise:
+        - DeserializationError if the data is malformed
+        - UnknownAsset if an asset of the saved state is no longer known
+        """
+        try:
+            self.cost_basis.restore_state(data['cost_basis'])
+            self.transactions.evm_accounting_aggregator.restore_state(data['transactions'])
+        except KeyError as e:
+            raise DeserializationError(f'Missing key {str(e)} in accounting pot state') from e
+
     def add_acquisition(
             self,  # pylint: disable=unused-argument
             event_type: AccountingEventType,
@@ -32,6 +32,7 @@ from .balance import Balance
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.pot import AccountingPot
+    from rotkehlchen.db.utils import DeserializationMemo
 
 
 logger = logging.getLogger(__name__)
@@ -124,8 +125,15 @@ class HistoryBaseEntry(AccountingEventMixin):
         )
 
     @classmethod
-    def deserialize_from_db(cls, entry: HISTORY_EVENT_DB_TUPLE_READ) -> 'HistoryBaseEntry':
-        """May raise:
+    def deserialize_from_db(
+            cls,
+            entry: HISTORY_EVENT_DB_TUPLE_READ,
+            memo: Optional['DeserializationMemo'] = None,
+    ) -> 'HistoryBaseEntry':
+        """If a memo is given the asset and amounts are read through it. It should be
+        a memo that forms assets with incomplete data.
+
+        May raise:
         - DeserializationError
         - UnknownAsset
         """
@@ -140,6 +148,15 @@ class HistoryBaseEntry(AccountingEventMixin):
                 )
 
         try:
+            if memo is None:
+                # Setting incomplete data to true since we save all history events,
+                # regardless of the type of token that it may involve
+                asset = Asset(entry[6], form_with_incomplete_data=True)
+                balance = Balance(amount=FVal(entry[7]), usd_value=FVal(entry[8]))
+            else:
+                asset = memo.asset(entry[6])
+                balance = Balance(amount=memo.amount(entry[7]), usd_value=memo.amount(entry[8]))  # noqa: E501
+
             return HistoryBaseEntry(
                 identifier=entry[0],
                 event_identifier=entry[1],
@@ -147,13 +164,8 @@ class HistoryBaseEntry(AccountingEventMixin):
                 timestamp=TimestampMS(entry[3]),
                 location=Location.deserialize_from_db(entry[4]),
                 location_label=entry[5],
-                # Setting incomplete data to true since we save all history events,
-                # regardless of the type of token that it may involve
-                asset=Asset(entry[6], form_with_incomplete_data=True),
-                balance=Balance(
-                    amount=FVal(entry[7]),
-                    usd_value=FVal(entry[8]),
-                ),
+                asset=asset,
+                balance=balance,
                 notes=entry[9],
                 event_type=HistoryEventType.deserialize(entry[10]),
                 event_subtype=HistoryEventSubType.deserialize(entry[11]),
@@ -92,7 +92,13 @@ from rotkehlchen.db.queried_addresses import QueriedAddresses
 from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.db.snapshots import DBSnapshot
-from rotkehlchen.db.utils import DBAssetBalance, LocationData
+from rotkehlchen.db.utils import (
+    DBAssetBalance,
+    DownsampledAssetBalance,
+    LocationData,
+    SingleDBAssetBalance,
+    TimeSeriesDownsampling,
+)
 from rotkehlchen.errors.api import (
     AuthenticationError,
     IncorrectApiKeyFormat,
@@ -314,6 +320,17 @@ class RestAPI():
             result_dict = _wrap_in_ok_result(process_result(self.rotkehlchen.get_settings(cursor)))
         return api_response(result=result_dict, status_code=HTTPStatus.OK)
 
+    def get_background_tasks_status(self) -> Response:
+        task_manager = self.rotkehlchen.task_manager
+        if task_manager is None:
+            return api_response(
+                wrap_in_fail_result('The background task manager is not running'),
+                status_code=HTTPStatus.CONFLICT,
+            )
+
+        result = task_manager.get_tasks_status()
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
     def query_tasks_outcome(self, task_id: Optional[int]) -> Response:
         if task_id is None:
             # If no task id is given return list of all pending and completed tasks
@@ -737,6 +754,11 @@ class RestAPI():
                     entries_table=table_name,  # type: ignore
                 ),
                 'entries_limit': FREE_TRADES_LIMIT if self.rotkehlchen.premium is None else -1,
+                'next_cursor': self.rotkehlchen.data.db.get_trades_next_page_cursor(
+                    cursor=cursor,
+                    filter_query=filter_query,
+                    has_premium=self.rotkehlchen.premium is not None,
+                ),
             }
 
         return {'result': result, 'message': '', 'status_code': HTTPStatus.OK}
@@ -1373,8 +1395,6 @@ class RestAPI():
         except InputError as e:
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
-        # Also clear the in-memory cache of the asset resolver to requery DB
-        AssetResolver().assets_cache.pop(data['identifier'], None)
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
     def delete_custom_asset(self, identifier: str) -> Response:
@@ -1389,7 +1409,7 @@ class RestAPI():
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
         # Also clear the in-memory cache of the asset resolver
-        AssetResolver().assets_cache.pop(identifier, None)
+        AssetResolver().clean_memory_cache(identifier)
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
     def replace_asset(self, source_identifier: str, target_asset: Asset) -> Response:
@@ -1398,8 +1418,6 @@ class RestAPI():
         except (UnknownAsset, InputError) as e:
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
-        # Also clear the in-memory cache of the asset resolver
-        AssetResolver().assets_cache.pop(source_identifier, None)
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
     @staticmethod
@@ -1451,9 +1469,6 @@ class RestAPI():
         except InputError as e:
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
-        # Also clear the in-memory cache of the asset resolver to requery DB
-        AssetResolver().assets_cache.pop(identifier, None)
-
         return api_response(
             result=_wrap_in_ok_result({'identifier': identifier}),
             status_code=HTTPStatus.OK,
@@ -1471,8 +1486,7 @@ class RestAPI():
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
         # Also clear the in-memory cache of the asset resolver
-        AssetResolver().assets_cache.pop(identifier, None)
-
+        AssetResolver().clean_memory_cache(identifier)
         return api_response(
             result=_wrap_in_ok_result({'identifier': identifier}),
             status_code=HTTPStatus.OK,
@@ -1496,7 +1510,11 @@ class RestAPI():
             return api_response(_wrap_in_ok_result(OK_RESULT), status_code=HTTPStatus.OK)
         return api_response(wrap_in_fail_result(msg), status_code=HTTPStatus.CONFLICT)
 
-    def query_netvalue_data(self, include_nfts: bool) -> Response:
+    def query_netvalue_data(
+            self,
+            include_nfts: bool,
+            downsampling: Optional[TimeSeriesDownsampling],
+    ) -> Response:
         from_ts = Timestamp(0)
         premium = self.rotkehlchen.premium
 
@@ -1505,8 +1523,21 @@ class RestAPI():
             start_of_day_today = datetime.datetime(today.year, today.month, today.day)
             from_ts = Timestamp(int((start_of_day_today - datetime.timedelta(days=14)).timestamp()))  # noqa: E501
 
-        data = self.rotkehlchen.data.db.get_netvalue_data(from_ts, include_nfts)
-        result = process_result({'times': data[0], 'data': data[1]})
+        if downsampling is not None:
+            times, data, min_data, max_data = self.rotkehlchen.data.db.get_downsampled_netvalue_data(  # noqa: E501
+                from_ts=from_ts,
+                downsampling=downsampling,
+                include_nfts=include_nfts,
+            )
+            result = process_result({
+                'times': times,
+                'data': data,
+                'min_data': min_data,
+                'max_data': max_data,
+            })
+        else:
+            times, data = self.rotkehlchen.data.db.get_netvalue_data(from_ts, include_nfts)
+            result = process_result({'times': times, 'data': data})
         return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
 
     def query_timed_balances_data(
@@ -1514,16 +1545,28 @@ class RestAPI():
             asset: Asset,
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            downsampling: Optional[TimeSeriesDownsampling],
     ) -> Response:
         # TODO: Think about this, but for now this is only balances, not liabilities
+        data: Union[List[SingleDBAssetBalance], List[DownsampledAssetBalance]]
         with self.rotkehlchen.data.db.conn.read_ctx() as cursor:
-            data = self.rotkehlchen.data.db.query_timed_balances(
-                cursor=cursor,
-                from_ts=from_timestamp,
-                to_ts=to_timestamp,
-                asset=asset,
-                balance_type=BalanceType.ASSET,
-            )
+            if downsampling is not None:
+                data = self.rotkehlchen.data.db.query_downsampled_timed_balances(
+                    cursor=cursor,
+                    asset=asset,
+                    balance_type=BalanceType.ASSET,
+                    downsampling=downsampling,
+                    from_ts=from_timestamp,
+                    to_ts=to_timestamp,
+                )
+            else:
+                data = self.rotkehlchen.data.db.query_timed_balances(
+                    cursor=cursor,
+                    from_ts=from_timestamp,
+                    to_ts=to_timestamp,
+                    asset=asset,
+                    balance_type=BalanceType.ASSET,
+                )
 
         result = process_result_list(data)
         return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
@@ -3159,6 +3202,11 @@ class RestAPI():
                     entries_table='ethereum_transactions',
                 ),
                 'entries_limit': FREE_ETH_TX_LIMIT if self.rotkehlchen.premium is None else -1,
+                'next_cursor': DBEthTx(self.rotkehlchen.data.db).get_ethereum_transactions_next_page_cursor(  # noqa: E501
+                    cursor=cursor,
+                    filter_=filter_query,
+                    has_premium=self.rotkehlchen.premium is not None,
+                ),
             }
 
         return {'result': result, 'message': message, 'status_code': status_code}
@@ -3632,7 +3680,7 @@ class RestAPI():
             status_code=HTTPStatus.OK,
         )
 
-    def add_manual_price(  # pylint: disable=no-self-use
+    def add_manual_price(
         self,
         from_asset: Asset,
         to_asset: Asset,
@@ -3648,13 +3696,14 @@ class RestAPI():
         )
         added = GlobalDBHandler().add_single_historical_price(historical_price)
         if added:
+            DBAccountingReports(self.rotkehlchen.data.db).delete_checkpoints(from_ts=timestamp)
             return api_response(OK_RESULT, status_code=HTTPStatus.OK)
         return api_response(
             result={'result': False, 'message': 'Failed to store manual price'},
             status_code=HTTPStatus.CONFLICT,
         )
 
-    def edit_manual_price(  # pylint: disable=no-self-use
+    def edit_manual_price(
         self,
         from_asset: Asset,
         to_asset: Asset,
@@ -3670,6 +3719,7 @@ class RestAPI():
         )
         edited = GlobalDBHandler().edit_manual_price(historical_price)
         if edited:
+            DBAccountingReports(self.rotkehlchen.data.db).delete_checkpoints(from_ts=timestamp)
             return api_response(OK_RESULT, status_code=HTTPStatus.OK)
         return api_response(
             result={'result': False, 'message': 'Failed to edit manual price'},
@@ -3686,7 +3736,7 @@ class RestAPI():
             status_code=HTTPStatus.OK,
         )
 
-    def delete_manual_price(  # pylint: disable=no-self-use
+    def delete_manual_price(
         self,
         from_asset: Asset,
         to_asset: Asset,
@@ -3694,6 +3744,7 @@ class RestAPI():
     ) -> Response:
         deleted = GlobalDBHandler().delete_manual_price(from_asset, to_asset, timestamp)
         if deleted:
+            DBAccountingReports(self.rotkehlchen.data.db).delete_checkpoints(from_ts=timestamp)
             return api_response(OK_RESULT, status_code=HTTPStatus.OK)
         return api_response(
             result={'result': False, 'message': 'Failed to delete manual price'},
@@ -3851,6 +3902,11 @@ class RestAPI():
             asset=asset,
         )
 
+    @staticmethod
+    def get_current_price_cache_stats() -> Response:
+        result = Inquirer().get_current_price_cache_stats()
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
     def get_database_info(self) -> Response:
         globaldb_schema_version = GlobalDBHandler().get_schema_version()
         globaldb_assets_version = GlobalDBHandler().get_setting_value(ASSETS_VERSION_KEY, 0)
@@ -4042,6 +4098,11 @@ class RestAPI():
                 'entries_found': entries_found,
                 'entries_limit': entries_limit,
                 'entries_total': entries_total,
+                'next_cursor': history_events_db.get_history_events_next_page_cursor(
+                    cursor=cursor,
+                    filter_query=query_filter,
+                    has_premium=self.rotkehlchen.premium is not None,
+                ),
                 'total_usd_value': usd_value,
                 'assets': history_events_db.get_entries_assets_history_events(
                     cursor=cursor,
@@ -37,6 +37,7 @@ from rotkehlchen.api.v1.resources import (
     AssociatedLocations,
     AsyncTasksResource,
     AvalancheTransactionsResource,
+    BackgroundTasksResource,
     BalancerBalancesResource,
     BalancerEventsHistoryResource,
     BalancerTradesHistoryResource,
@@ -49,6 +50,7 @@ from rotkehlchen.api.v1.resources import (
     CompoundHistoryResource,
     CounterpartiesResource,
     CurrentAssetsPriceResource,
+    CurrentPriceCacheResource,
     DatabaseBackupsResource,
     DatabaseInfoResource,
     DataImportResource,
@@ -154,6 +156,7 @@ URLS_V1: URLS = [
     ('/settings', SettingsResource),
     ('/tasks/', AsyncTasksResource),
     ('/tasks/<int:task_id>', AsyncTasksResource, 'specific_async_tasks_resource'),
+    ('/tasks/background', BackgroundTasksResource),
     ('/exchange_rates', ExchangeRatesResource),
     ('/external_services/', ExternalServicesResource),
     ('/oracles', OraclesResource),
@@ -270,6 +273,7 @@ URLS_V1: URLS = [
     ('/assets/all', AllAssetsResource),
     ('/assets/ethereum', EthereumAssetsResource),
     ('/assets/prices/current', CurrentAssetsPriceResource),
+    ('/assets/prices/current/cache', CurrentPriceCacheResource),
     ('/assets/prices/historical', HistoricalAssetsPriceResource),
     ('/assets/ignored', IgnoredAssetsResource),
     ('/assets/updates', AssetUpdatesResource),
@@ -14,6 +14,7 @@ from rotkehlchen.assets.types import AssetType
 from rotkehlchen.chain.bitcoin.hdkey import HDKey
 from rotkehlchen.chain.bitcoin.utils import is_valid_derivation_path
 from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.db.filtering import KeysetValue, deserialize_page_cursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import XPUBError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -494,6 +495,25 @@ class EVMTransactionHashField(fields.Field):
         return make_evm_tx_hash(txhash)
 
 
+class PageCursorField(fields.Field):
+    """The opaque cursor given out to continue a listing after its last page"""
+
+    def _deserialize(
+            self,
+            value: str,
+            attr: Optional[str],  # pylint: disable=unused-argument
+            data: Optional[Mapping[str, Any]],  # pylint: disable=unused-argument
+            **_kwargs: Any,
+    ) -> List[KeysetValue]:
+        if not isinstance(value, str):
+            raise ValidationError('Page cursor should be a string')
+
+        try:
+            return deserialize_page_cursor(value)
+        except DeserializationError as e:
+            raise ValidationError(str(e)) from e
+
+
 class AssetTypeField(fields.Field):
 
     def __init__(self, *, exclude_types: Optional[Sequence[AssetType]] = None, **kwargs: Any) -> None:  # noqa: E501
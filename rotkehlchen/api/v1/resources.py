@@ -141,7 +141,7 @@ from rotkehlchen.db.filtering import (
     TradesFilterQuery,
 )
 from rotkehlchen.db.settings import ModifiableDBSettings
-from rotkehlchen.db.utils import DBAssetBalance, LocationData
+from rotkehlchen.db.utils import DBAssetBalance, LocationData, TimeSeriesDownsampling
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.types import (
@@ -341,6 +341,13 @@ class AsyncTasksResource(BaseMethodView):
         return self.rest_api.query_tasks_outcome(task_id=task_id)
 
 
+class BackgroundTasksResource(BaseMethodView):
+
+    @require_loggedin_user()
+    def get(self) -> Response:
+        return self.rest_api.get_background_tasks_status()
+
+
 class ExchangeRatesResource(BaseMethodView):
 
     get_schema = ExchangeRatesSchema()
@@ -1125,8 +1132,15 @@ class StatisticsNetvalueResource(BaseMethodView):
     get_schema = StatisticsNetValueSchema()
 
     @use_kwargs(get_schema, location='json_and_query')
-    def get(self, include_nfts: bool) -> Response:
-        return self.rest_api.query_netvalue_data(include_nfts)
+    def get(
+            self,
+            include_nfts: bool,
+            downsampling: Optional[TimeSeriesDownsampling],
+    ) -> Response:
+        return self.rest_api.query_netvalue_data(
+            include_nfts=include_nfts,
+            downsampling=downsampling,
+        )
 
 
 class StatisticsAssetBalanceResource(BaseMethodView):
@@ -1140,11 +1154,13 @@ class StatisticsAssetBalanceResource(BaseMethodView):
             asset: Asset,
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            downsampling: Optional[TimeSeriesDownsampling],
     ) -> Response:
         return self.rest_api.query_timed_balances_data(
             asset=asset,
             from_timestamp=from_timestamp,
             to_timestamp=to_timestamp,
+            downsampling=downsampling,
         )
 
 
@@ -2218,6 +2234,12 @@ class CurrentAssetsPriceResource(BaseMethodView):
         return self.rest_api.delete_manual_current_price(asset)
 
 
+class CurrentPriceCacheResource(BaseMethodView):
+
+    def get(self) -> Response:
+        return self.rest_api.get_current_price_cache_stats()
+
+
 class HistoricalAssetsPriceResource(BaseMethodView):
 
     post_schema = HistoricalAssetsPriceSchema()
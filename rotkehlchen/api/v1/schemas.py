@@ -59,7 +59,12 @@ from rotkehlchen.db.filtering import (
     TradesFilterQuery,
 )
 from rotkehlchen.db.settings import ModifiableDBSettings
-from rotkehlchen.db.utils import DBAssetBalance, LocationData
+from rotkehlchen.db.utils import (
+    TIME_SERIES_RESOLUTION_SECONDS,
+    DBAssetBalance,
+    LocationData,
+    TimeSeriesDownsampling,
+)
 from rotkehlchen.errors.misc import InputError, RemoteError, XPUBError
 from rotkehlchen.errors.serialization import DeserializationError, EncodingError
 from rotkehlchen.exchanges.kraken import KrakenAccountType
@@ -108,6 +113,7 @@ from .fields import (
     HistoricalPriceOracleField,
     LocationField,
     MaybeAssetField,
+    PageCursorField,
     PositiveAmountField,
     PriceField,
     SerializableEnumField,
@@ -170,6 +176,32 @@ class DBPaginationSchema(Schema):
     offset = fields.Integer(load_default=None)
 
 
+class DBKeysetPaginationSchema(DBPaginationSchema):
+    """Pagination of the listings that can also be continued from the cursor given
+    out with each page. Unlike an offset it does not get slower the deeper the page."""
+    cursor = PageCursorField(load_default=None)
+
+    @validates_schema
+    def validate_keyset_pagination_schema(  # pylint: disable=no-self-use
+            self,
+            data: Dict[str, Any],
+            **_kwargs: Any,
+    ) -> None:
+        if data['cursor'] is None:
+            return
+
+        if data['limit'] is None:
+            raise ValidationError(
+                message='A limit is needed to continue from a cursor',
+                field_name='limit',
+            )
+        if data['offset'] not in (None, 0):
+            raise ValidationError(
+                message='Only one of offset and cursor can be given',
+                field_name='offset',
+            )
+
+
 class DBOrderBySchema(Schema):
     # TODO: DBFilters already allow ordering by multiple attributes. Make the API do that too
     order_by_attribute = fields.String(load_default=None)
@@ -179,7 +211,7 @@ class DBOrderBySchema(Schema):
 class EthereumTransactionQuerySchema(
         AsyncQueryArgumentSchema,
         OnlyCacheQuerySchema,
-        DBPaginationSchema,
+        DBKeysetPaginationSchema,
         DBOrderBySchema,
 ):
     address = EthereumAddressField(load_default=None)
@@ -218,17 +250,21 @@ class EthereumTransactionQuerySchema(
         order_by_attribute = data['order_by_attribute'] if data['order_by_attribute'] is not None else 'timestamp'  # noqa: E501
         protocols, asset = data['protocols'], data['asset']
         exclude_ignored_assets = data['exclude_ignored_assets']
-        filter_query = ETHTransactionsFilterQuery.make(
-            order_by_rules=[(order_by_attribute, data['ascending'])],
-            limit=data['limit'],
-            offset=data['offset'],
-            addresses=[address] if address is not None else None,
-            from_ts=data['from_timestamp'],
-            to_ts=data['to_timestamp'],
-            protocols=protocols,
-            asset=asset,
-            exclude_ignored_assets=exclude_ignored_assets,
-        )
+        try:
+            filter_query = ETHTransactionsFilterQuery.make(
+                order_by_rules=[(order_by_attribute, data['ascending'])],
+                limit=data['limit'],
+                offset=data['offset'],
+                after=data['cursor'],
+                addresses=[address] if address is not None else None,
+                from_ts=data['from_timestamp'],
+                to_ts=data['to_timestamp'],
+                protocols=protocols,
+                asset=asset,
+                exclude_ignored_assets=exclude_ignored_assets,
+            )
+        except InputError as e:
+            raise ValidationError(message=str(e), field_name='cursor') from e
         event_params = {
             'asset': asset,
             'protocols': protocols,
@@ -260,7 +296,7 @@ class EthereumTransactionDecodingSchema(AsyncIgnoreCacheQueryArgumentSchema):
 class TradesQuerySchema(
         AsyncQueryArgumentSchema,
         OnlyCacheQuerySchema,
-        DBPaginationSchema,
+        DBKeysetPaginationSchema,
         DBOrderBySchema,
 ):
     base_asset = AssetField(load_default=None)
@@ -317,17 +353,21 @@ class TradesQuerySchema(
         elif self.treat_eth2_as_eth is True and data['quote_asset'] == A_ETH:
             quote_assets = (A_ETH, A_ETH2)
 
-        filter_query = TradesFilterQuery.make(
-            order_by_rules=[(order_by_attribute, data['ascending'])],
-            limit=data['limit'],
-            offset=data['offset'],
-            from_ts=data['from_timestamp'],
-            to_ts=data['to_timestamp'],
-            base_assets=base_assets,
-            quote_assets=quote_assets,
-            trade_type=[data['trade_type']] if data['trade_type'] is not None else None,
-            location=data['location'],
-        )
+        try:
+            filter_query = TradesFilterQuery.make(
+                order_by_rules=[(order_by_attribute, data['ascending'])],
+                limit=data['limit'],
+                offset=data['offset'],
+                after=data['cursor'],
+                from_ts=data['from_timestamp'],
+                to_ts=data['to_timestamp'],
+                base_assets=base_assets,
+                quote_assets=quote_assets,
+                trade_type=[data['trade_type']] if data['trade_type'] is not None else None,
+                location=data['location'],
+            )
+        except InputError as e:
+            raise ValidationError(message=str(e), field_name='cursor') from e
 
         return {
             'async_query': data['async_query'],
@@ -339,7 +379,7 @@ class TradesQuerySchema(
 class StakingQuerySchema(
     AsyncQueryArgumentSchema,
     OnlyCacheQuerySchema,
-    DBPaginationSchema,
+    DBKeysetPaginationSchema,
     DBOrderBySchema,
 ):
     from_timestamp = TimestampField(load_default=Timestamp(0))
@@ -372,23 +412,27 @@ class StakingQuerySchema(
         if self.treat_eth2_as_eth is True and data['asset'] == A_ETH:
             asset_list = (A_ETH, A_ETH2)
 
-        query_filter = HistoryEventFilterQuery.make(
-            order_by_rules=[(order_by_attribute, data['ascending'])],
-            limit=data['limit'],
-            offset=data['offset'],
-            from_ts=data['from_timestamp'],
-            to_ts=data['to_timestamp'],
-            location=Location.KRAKEN,
-            event_types=[
-                HistoryEventType.STAKING,
-            ],
-            event_subtypes=data['event_subtypes'],
-            exclude_subtypes=[
-                HistoryEventSubType.RECEIVE_WRAPPED,
-                HistoryEventSubType.RETURN_WRAPPED,
-            ],
-            assets=asset_list,
-        )
+        try:
+            query_filter = HistoryEventFilterQuery.make(
+                order_by_rules=[(order_by_attribute, data['ascending'])],
+                limit=data['limit'],
+                offset=data['offset'],
+                after=data['cursor'],
+                from_ts=data['from_timestamp'],
+                to_ts=data['to_timestamp'],
+                location=Location.KRAKEN,
+                event_types=[
+                    HistoryEventType.STAKING,
+                ],
+                event_subtypes=data['event_subtypes'],
+                exclude_subtypes=[
+                    HistoryEventSubType.RECEIVE_WRAPPED,
+                    HistoryEventSubType.RETURN_WRAPPED,
+                ],
+                assets=asset_list,
+            )
+        except InputError as e:
+            raise ValidationError(message=str(e), field_name='cursor') from e
 
         value_filter = HistoryEventFilterQuery.make(
             limit=data['limit'],
@@ -1068,7 +1112,44 @@ class BlockchainBalanceQuerySchema(AsyncQueryArgumentSchema):
     ignore_cache = fields.Boolean(load_default=False)
 
 
-class StatisticsAssetBalanceSchema(Schema):
+class TimeSeriesDownsamplingSchema(Schema):
+    resolution = fields.String(
+        validate=webargs.validate.OneOf(choices=tuple(TIME_SERIES_RESOLUTION_SECONDS)),
+        load_default=None,
+    )
+    buckets = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(
+            min=1,
+            max=100000,
+            error='The number of buckets should be between 1 and 100000',
+        ),
+        load_default=None,
+    )
+
+    @validates_schema
+    def validate_downsampling_schema(  # pylint: disable=no-self-use
+            self,
+            data: Dict[str, Any],
+            **_kwargs: Any,
+    ) -> None:
+        if data['resolution'] is not None and data['buckets'] is not None:
+            raise ValidationError('Only one of resolution and buckets can be given')
+
+    @post_load
+    def make_downsampling(  # pylint: disable=no-self-use
+            self,
+            data: Dict[str, Any],
+            **_kwargs: Any,
+    ) -> Dict[str, Any]:
+        resolution, buckets = data.pop('resolution'), data.pop('buckets')
+        data['downsampling'] = None
+        if resolution is not None or buckets is not None:
+            data['downsampling'] = TimeSeriesDownsampling(resolution=resolution, buckets=buckets)
+        return data
+
+
+class StatisticsAssetBalanceSchema(TimeSeriesDownsamplingSchema):
     asset = AssetField(required=True)
     from_timestamp = TimestampField(load_default=Timestamp(0))
     to_timestamp = TimestampField(load_default=ts_now)
@@ -2095,7 +2176,7 @@ class Eth2DailyStatsSchema(
         }
 
 
-class StatisticsNetValueSchema(Schema):
+class StatisticsNetValueSchema(TimeSeriesDownsamplingSchema):
     include_nfts = fields.Boolean(load_default=True)
 
 
@@ -1,7 +1,8 @@
 import logging
+from collections import defaultdict
 from dataclasses import InitVar, dataclass, field
 from functools import total_ordering
-from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type, TypeVar
+from typing import Any, DefaultDict, Dict, List, NamedTuple, Optional, Set, Tuple, Type, TypeVar
 
 from rotkehlchen.constants.misc import NFT_DIRECTIVE
 from rotkehlchen.constants.resolver import (
@@ -696,10 +697,67 @@ WORLD_TO_CRYPTOCOM = {
 # Create a generic variable that can be 'Asset', or any subclass.
 Z = TypeVar('Z', bound='Asset')
 
+# The canonical instance of each constructed asset keyed by class and lowercased identifier
+INTERNED_ASSETS: Dict[Tuple[type, str], 'Asset'] = {}
+# The keys of the interned assets with each lowercased identifier, along with those of
+# the assets forked from it or swapped for it. May keep keys no longer interned.
+INTERNED_ASSETS_BY_REFERENCE: DefaultDict[str, Set[Tuple[type, str]]] = defaultdict(set)
+
+
+class InternedAssetMeta(type):
+    """Metaclass of the assets so that constructing an asset returns the instance
+    already constructed for the same identifier, if any, instead of a new equal one.
+
+    Assets are frozen so sharing a single instance is safe. Assets initialized
+    directly from fields are not interned since they may not match the DB.
+    """
+
+    def __call__(
+            cls,
+            identifier: str,
+            form_with_incomplete_data: bool = False,
+            direct_field_initialization: bool = False,
+    ) -> Any:
+        if direct_field_initialization is True or not isinstance(identifier, str):
+            return super().__call__(
+                identifier,
+                form_with_incomplete_data,
+                direct_field_initialization,
+            )
+
+        key = (cls, identifier.lower())
+        asset = INTERNED_ASSETS.get(key)
+        if asset is None:
+            asset = super().__call__(identifier, form_with_incomplete_data)
+            INTERNED_ASSETS[key] = asset
+            for referenced in (asset, asset.forked, asset.swapped_for):
+                if referenced is not None:
+                    INTERNED_ASSETS_BY_REFERENCE[referenced.identifier.lower()].add(key)
+        return asset
+
+
+def clean_interned_assets(identifier: Optional[str] = None) -> None:
+    """Forget the interned instances of either all assets or of a single asset
+
+    For a single asset the instances of the assets that are forked from or swapped for
+    it, directly or not, are also forgotten since they point to its old instance.
+    """
+    if identifier is None:
+        INTERNED_ASSETS.clear()
+        INTERNED_ASSETS_BY_REFERENCE.clear()
+        return
+
+    stale_identifiers = [identifier.lower()]
+    while len(stale_identifiers) != 0:
+        for key in INTERNED_ASSETS_BY_REFERENCE.pop(stale_identifiers.pop(), ()):
+            asset = INTERNED_ASSETS.pop(key, None)
+            if asset is not None:
+                stale_identifiers.append(asset.identifier.lower())
+
 
 @total_ordering
 @dataclass(init=True, repr=True, eq=False, order=False, unsafe_hash=False, frozen=True)
-class Asset():
+class Asset(metaclass=InternedAssetMeta):
     identifier: str
     form_with_incomplete_data: InitVar[bool] = field(default=False)
     direct_field_initialization: InitVar[bool] = field(default=False)
@@ -848,6 +906,8 @@ class Asset():
         return hash(self.identifier)
 
     def __eq__(self, other: Any) -> bool:
+        if other is self:  # most assets are interned so this is the common case
+            return True
         if other is None:
             return False
 
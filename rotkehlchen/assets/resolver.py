@@ -3,7 +3,8 @@ from typing import Dict, Optional
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.globaldb import GlobalDBHandler
 
-from .types import AssetData
+from .asset import clean_interned_assets
+from .types import AssetData, AssetType
 
 
 class AssetResolver():
@@ -24,13 +25,33 @@ class AssetResolver():
 
     @staticmethod
     def clean_memory_cache(identifier: Optional[str] = None) -> None:
-        """Clean the memory cache of either a single or all assets"""
+        """Clean the memory cache and the interned instances of either a single or all assets"""
         assert AssetResolver.__instance is not None, 'when cleaning the cache instance should be set'  # noqa: E501
 
         if identifier is None:  # clean all
             AssetResolver.__instance.assets_cache.clear()
         else:
             AssetResolver.__instance.assets_cache.pop(identifier.lower(), None)
+        clean_interned_assets(identifier)
+
+    @staticmethod
+    def load_all_asset_data() -> None:
+        """Fill the memory cache with the data of all assets of the global DB
+
+        Reads all of them with a single query instead of one query per asset the first
+        time each is used. Tokens missing their name, symbol or decimals are not cached,
+        same as when they are resolved one by one without allowing incomplete data.
+        """
+        instance = AssetResolver()
+        for asset_data in GlobalDBHandler().get_all_asset_data(mapping=False):
+            if asset_data.asset_type == AssetType.ETHEREUM_TOKEN and (
+                asset_data.name is None or
+                asset_data.symbol is None or
+                asset_data.decimals is None
+            ):
+                continue
+
+            instance.assets_cache[asset_data.identifier.lower()] = asset_data
 
     @staticmethod
     def get_asset_data(
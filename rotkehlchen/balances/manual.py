@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional
 from rotkehlchen.accounting.structures.balance import Balance, BalanceType
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.misc import ZERO
-from rotkehlchen.errors.misc import InputError, RemoteError
+from rotkehlchen.errors.misc import InputError
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.types import Location, Price
@@ -48,13 +48,13 @@ def get_manually_tracked_balances(
     with db.conn.read_ctx() as cursor:
         balances = db.get_manually_tracked_balances(cursor, balance_type=balance_type)
     balances_with_value = []
+    usd_prices = Inquirer().find_usd_prices([x.asset for x in balances])
     for entry in balances:
-        try:
-            price = Inquirer().find_usd_price(entry.asset)
-        except RemoteError as e:
+        price = usd_prices.get(entry.asset)
+        if price is None:
             db.msg_aggregator.add_warning(
                 f'Could not find price for {entry.asset.identifier} during '
-                f'manually tracked balance querying due to {str(e)}',
+                f'manually tracked balance querying. Check the logs for more details',
             )
             price = Price(ZERO)
 
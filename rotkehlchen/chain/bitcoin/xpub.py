@@ -1,6 +1,9 @@
 import logging
 from typing import TYPE_CHECKING, Any, Dict, List, Literal, NamedTuple, Optional, Tuple
 
+import gevent
+from gevent.event import AsyncResult
+from gevent.greenlet import Greenlet
 from gevent.lock import Semaphore
 
 from rotkehlchen.chain.bitcoin import have_bitcoin_transactions
@@ -66,56 +69,114 @@ class XpubDerivedAddressData(NamedTuple):
     balance: FVal
 
 
+class XpubChainDeriver():
+    """Derives the addresses of the receiving or the change chain of an xpub in the
+    hub threadpool so that derivation runs ahead of the remote activity checks.
+
+    Addresses derived in previous scans are taken from the given cache. The ones
+    derived now are kept in new_addresses so that they can be added to the cache.
+    """
+
+    def __init__(
+            self,
+            root: HDKey,
+            account_index: int,
+            cached_addresses: Dict[Tuple[int, int], BTCAddress],
+    ) -> None:
+        self.root = root
+        self.account_index = account_index
+        self.cached_addresses = cached_addresses
+        self.new_addresses: Dict[Tuple[int, int], BTCAddress] = {}
+
+    def _derive(self, start_index: int, count: int) -> List[Tuple[int, BTCAddress]]:
+        batch_addresses = []
+        for idx in range(start_index, start_index + count):
+            address = self.cached_addresses.get((self.account_index, idx))
+            if address is None:
+                address = self.root.derive_child(idx).address()
+                self.new_addresses[(self.account_index, idx)] = address
+            batch_addresses.append((idx, address))
+
+        return batch_addresses
+
+    def derive_batch(self, start_index: int, count: int) -> AsyncResult:
+        """Starts deriving the addresses of the batch. The result is the list of index
+        and address for each index of the batch"""
+        if all((self.account_index, idx) in self.cached_addresses for idx in range(start_index, start_index + count)):  # noqa: E501
+            result = AsyncResult()
+            result.set(self._derive(start_index, count))
+            return result
+
+        return gevent.get_hub().threadpool.spawn(self._derive, start_index, count)
+
+
 def _derive_addresses_loop(
-        account_index: int,
         start_index: int,
-        root: HDKey,
+        deriver: XpubChainDeriver,
         gap_limit: int,
         blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
 ) -> List[XpubDerivedAddressData]:
-    """May raise:
+    """Checks the addresses of the chain one gap_limit batch at a time until a batch
+    without any activity. The next batch is always derived while the current one is
+    checked. Once a batch had activity the next one is also checked at the same time,
+    since a scan that found activity will most probably need it.
+
+    May raise:
     - RemoteError: if blockstream/blockchain.info can't be reached
     """
+    if blockchain == SupportedBlockchain.BITCOIN:
+        have_transactions = have_bitcoin_transactions
+    else:
+        have_transactions = have_bch_transactions
     step_index = start_index
     addresses: List[XpubDerivedAddressData] = []
+    next_batch = deriver.derive_batch(step_index, gap_limit)
+    next_check: Optional[Greenlet] = None
     should_continue = True
-    while should_continue:
-        batch_addresses: List[Tuple[int, BTCAddress]] = []
-        for idx in range(step_index, step_index + gap_limit):
-            child = root.derive_child(idx)
-            batch_addresses.append((idx, child.address()))
-
-        if blockchain == SupportedBlockchain.BITCOIN:
-            have_tx_mapping = have_bitcoin_transactions([x[1] for x in batch_addresses])
-        else:
-            have_tx_mapping = have_bch_transactions([x[1] for x in batch_addresses])
-        should_continue = False
-        for idx, address in batch_addresses:
-            have_tx, balance = have_tx_mapping[address]
-            if have_tx:
-                addresses.append(XpubDerivedAddressData(
-                    account_index=account_index,
-                    derived_index=idx,
-                    address=address,
-                    balance=balance,
-                ))
-                should_continue = True
-
-        # do one more pass and add any addresses with no transactions before the max index
-        # this is so we can start new address generation from the max index later
-        if len(addresses) != 0:
-            max_index = max(x[0] for x in addresses)
-            for idx, address in batch_addresses[:max_index]:
+    try:
+        while should_continue:
+            batch_addresses: List[Tuple[int, BTCAddress]] = next_batch.get()
+            next_batch = deriver.derive_batch(step_index + gap_limit, gap_limit)
+            if next_check is None:
+                check = gevent.spawn(have_transactions, [x[1] for x in batch_addresses])
+            else:
+                check = next_check
+            next_check = None
+            if len(addresses) != 0:
+                next_check = gevent.spawn(have_transactions, [x[1] for x in next_batch.get()])
+            have_tx_mapping = check.get()
+
+            should_continue = False
+            for idx, address in batch_addresses:
                 have_tx, balance = have_tx_mapping[address]
-                if not have_tx:
+                if have_tx:
                     addresses.append(XpubDerivedAddressData(
-                        account_index=account_index,
+                        account_index=deriver.account_index,
                         derived_index=idx,
                         address=address,
                         balance=balance,
                     ))
-
-        step_index += gap_limit
+                    should_continue = True
+
+            # do one more pass and add any addresses with no transactions before the max index
+            # this is so we can start new address generation from the max index later
+            if len(addresses) != 0:
+                max_index = max(x[0] for x in addresses)
+                for idx, address in batch_addresses[:max_index]:
+                    have_tx, balance = have_tx_mapping[address]
+                    if not have_tx:
+                        addresses.append(XpubDerivedAddressData(
+                            account_index=deriver.account_index,
+                            derived_index=idx,
+                            address=address,
+                            balance=balance,
+                        ))
+
+            step_index += gap_limit
+    finally:
+        if next_check is not None:  # the scan ended so the check ahead is not needed
+            next_check.kill()
+        next_batch.wait()  # don't let the deriver change new_addresses after the scan
 
     return addresses
 
@@ -126,11 +187,16 @@ def _derive_addresses_from_xpub_data(
         start_change_index: int,
         gap_limit: int,
         blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
-) -> List[XpubDerivedAddressData]:
+        cached_addresses: Optional[Dict[Tuple[int, int], BTCAddress]] = None,
+) -> Tuple[List[XpubDerivedAddressData], Dict[Tuple[int, int], BTCAddress]]:
     """Derive all addresses from the xpub that have had transactions. Also includes
     any addresses until the biggest index derived addresses that have had no transactions.
     This is to make it easier to later derive and check more addresses
 
+    The receiving and change chains are scanned at the same time. Addresses found in
+    cached_addresses, keyed by account and derived index, are not derived again.
+    Returns the addresses along with those that were derived, to be cached.
+
     May raise:
     - RemoteError: if blockstream/blockchain.info/haskoin and others can't be reached
     """
@@ -139,28 +205,34 @@ def _derive_addresses_from_xpub_data(
     else:
         account_xpub = xpub_data.xpub
 
-    addresses = []
-    receiving_xpub = account_xpub.derive_child(0)
-    addresses.extend(
-        _derive_addresses_loop(
-            account_index=0,
-            start_index=start_receiving_index,
-            root=receiving_xpub,
+    cached_addresses = {} if cached_addresses is None else cached_addresses
+    derivers = [
+        XpubChainDeriver(
+            root=account_xpub.derive_child(account_index),
+            account_index=account_index,
+            cached_addresses=cached_addresses,
+        ) for account_index in (0, 1)
+    ]
+    scans = [
+        gevent.spawn(
+            _derive_addresses_loop,
+            start_index=start_index,
+            deriver=deriver,
             gap_limit=gap_limit,
             blockchain=blockchain,
-        ),
-    )
-    change_xpub = account_xpub.derive_child(1)
-    addresses.extend(
-        _derive_addresses_loop(
-            account_index=1,
-            start_index=start_change_index,
-            root=change_xpub,
-            gap_limit=gap_limit,
-            blockchain=blockchain,
-        ),
-    )
-    return addresses
+        ) for start_index, deriver in zip((start_receiving_index, start_change_index), derivers)
+    ]
+    try:
+        addresses = []
+        for scan in scans:
+            addresses.extend(scan.get())
+    finally:
+        gevent.killall(scans)
+
+    new_addresses = {}
+    for deriver in derivers:
+        new_addresses.update(deriver.new_addresses)
+    return addresses, new_addresses
 
 
 class XpubManager():
@@ -186,12 +258,13 @@ class XpubManager():
         """
         with self.db.conn.read_ctx() as cursor:
             last_receiving_idx, last_change_idx = self.db.get_last_consecutive_xpub_derived_indices(cursor, xpub_data)  # noqa: E501
-            derived_addresses_data = _derive_addresses_from_xpub_data(
+            derived_addresses_data, newly_derived_addresses = _derive_addresses_from_xpub_data(
                 xpub_data=xpub_data,
                 start_receiving_index=last_receiving_idx,
                 start_change_index=last_change_idx,
                 gap_limit=self.chain_manager.btc_derivation_gap_limit,
                 blockchain=blockchain,
+                cached_addresses=self.db.get_xpub_derived_addresses(cursor, xpub_data),
             )
             known_addresses = getattr(self.db.get_blockchain_accounts(cursor), blockchain.value.lower())  # noqa: E501
 
@@ -245,6 +318,11 @@ class XpubManager():
                 derived_addresses_data=derived_addresses_data,
                 blockchain=blockchain,
             )
+            self.db.add_xpub_derived_addresses(
+                write_cursor=cursor,
+                xpub_data=xpub_data,
+                addresses=newly_derived_addresses,
+            )
 
     def add_bitcoin_xpub(
         self,
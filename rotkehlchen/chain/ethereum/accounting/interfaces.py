@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Any, Dict
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.pot import AccountingPot
@@ -36,3 +36,17 @@ class ModuleAccountantInterface(metaclass=ABCMeta):
     def reset(self) -> None:  # pylint: disable=no-self-use
         """Subclasses may implement this to reset state between accounting runs"""
         return None
+
+    def serialize_state(self) -> Dict[str, Any]:  # pylint: disable=no-self-use
+        """Subclasses that keep state between events should implement this so that
+        the state can be saved at an accounting checkpoint"""
+        return {}
+
+    def restore_state(self, data: Dict[str, Any]) -> None:  # pylint: disable=no-self-use,unused-argument  # noqa: E501
+        """Subclasses that keep state between events should implement this to restore
+        the state returned by serialize_state(). Called after reset()
+
+        May raise:
+        - DeserializationError if the data is malformed
+        """
+        return None
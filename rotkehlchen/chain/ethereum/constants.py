@@ -10,6 +10,7 @@ from rotkehlchen.types import Timestamp, deserialize_evm_tx_hash
 RANGE_PREFIX_ETHTX = 'ethtxs'
 RANGE_PREFIX_ETHINTERNALTX = 'ethinternaltxs'
 RANGE_PREFIX_ETHTOKENTX = 'ethtokentxs'
+RANGE_PREFIX_ETHLOGS = 'ethlogs'
 
 MODULES_PACKAGE = 'rotkehlchen.chain.ethereum.modules'
 MODULES_PREFIX = MODULES_PACKAGE + '.'
@@ -14,6 +14,7 @@ from rotkehlchen.assets.utils import get_or_create_ethereum_token
 from rotkehlchen.chain.ethereum.abi import decode_event_data_abi_str
 from rotkehlchen.chain.ethereum.constants import MODULES_PACKAGE, MODULES_PREFIX_LENGTH
 from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxReceiptLog
+from rotkehlchen.chain.ethereum.types import string_to_ethereum_address
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_1INCH, A_ETH, A_GTC
@@ -55,6 +56,13 @@ from .constants import (
     GTC_CLAIM,
     ONEINCH_CLAIM,
 )
+from .interfaces import decodes_log, get_log_keys
+from .parallel import (
+    DEFAULT_DECODING_PROCESSES,
+    PARALLEL_DECODING_MIN_TRANSACTIONS,
+    decode_in_processes,
+    get_worker_setup,
+)
 from .structures import ActionItem
 from .utils import maybe_reshuffle_events
 
@@ -95,6 +103,7 @@ class EVMTransactionDecoder():
         self.token_enricher_rules: List[Callable] = []  # enrichers to run for token transfers
         self.initialize_all_decoders()
         self.undecoded_tx_query_lock = Semaphore()
+        self.decoding_processes = DEFAULT_DECODING_PROCESSES
 
     def _recursively_initialize_decoders(
             self, package: Union[str, ModuleType],
@@ -149,9 +158,46 @@ class EVMTransactionDecoder():
         self.address_mappings = address_result
         self.event_rules.extend(rules_result)
         self.token_enricher_rules.extend(enrichers_result)
+        self._index_event_rules()
         # update with counterparties not in any module
         self.all_counterparties.update([CPT_GAS, CPT_GNOSIS_CHAIN])
 
+    def _index_event_rules(self) -> None:
+        """Indexes the event rules by the logs they declare they can decode, so that
+        each log is only given to the rules that can match it.
+
+        Each index entry holds all the rules for it, including the rules for any log,
+        in the order they were registered.
+        """
+        self.generic_event_rules = [x for x in self.event_rules if get_log_keys(x) is None]
+        self.event_rules_by_topic: Dict[bytes, List[Callable]] = {}
+        self.event_rules_by_address_topic: Dict[Tuple[ChecksumEthAddress, bytes], List[Callable]] = {}  # noqa: E501
+        for rule in self.event_rules:
+            for address, topic in get_log_keys(rule) or ():
+                if address is None:
+                    self.event_rules_by_topic[topic] = []
+                else:
+                    self.event_rules_by_address_topic[(address, topic)] = []
+
+        for rule in self.event_rules:
+            log_keys = get_log_keys(rule)
+            for topic, rules in self.event_rules_by_topic.items():
+                if log_keys is None or (None, topic) in log_keys:
+                    rules.append(rule)
+            for (address, topic), rules in self.event_rules_by_address_topic.items():
+                if log_keys is None or (None, topic) in log_keys or (address, topic) in log_keys:  # noqa: E501
+                    rules.append(rule)
+
+    def get_event_rules(self, tx_log: EthereumTxReceiptLog) -> List[Callable]:
+        """Returns the event rules that can decode the given log"""
+        if len(tx_log.topics) == 0:
+            return self.generic_event_rules
+
+        rules = self.event_rules_by_address_topic.get((tx_log.address, tx_log.topics[0]))
+        if rules is None:
+            rules = self.event_rules_by_topic.get(tx_log.topics[0], self.generic_event_rules)
+        return rules
+
     def reload_from_db(self, cursor: 'DBCursor') -> None:
         """Reload all related settings from DB so that decoding happens with latest"""
         self.base.refresh_tracked_accounts(cursor)
@@ -161,13 +207,18 @@ class EVMTransactionDecoder():
 
     def try_all_rules(
             self,
-            token: Optional[EthereumToken],
             tx_log: EthereumTxReceiptLog,
             transaction: EthereumTransaction,
             decoded_events: List[HistoryBaseEntry],
             action_items: List[ActionItem],
     ) -> Optional[HistoryBaseEntry]:
-        for rule in self.event_rules:
+        """Tries all the event rules that can decode the log until one returns an event"""
+        rules = self.get_event_rules(tx_log)
+        if len(rules) == 0:
+            return None
+
+        token = GlobalDBHandler.get_ethereum_token(tx_log.address)
+        for rule in rules:
             event = rule(token=token, tx_log=tx_log, transaction=transaction, decoded_events=decoded_events, action_items=action_items)  # noqa: E501
             if event:
                 return event
@@ -215,6 +266,21 @@ class EVMTransactionDecoder():
             tx_receipt: EthereumTxReceipt,
     ) -> List[HistoryBaseEntry]:
         """Decodes an ethereum transaction and its receipt and saves result in the DB"""
+        events = self.decode_transaction_events(transaction, tx_receipt)
+        self.dbevents.add_history_events(write_cursor=write_cursor, history=events)
+        write_cursor.execute(
+            'INSERT OR IGNORE INTO evm_tx_mappings(tx_hash, blockchain, value) VALUES(?, ?, ?)',  # noqa: E501
+            (transaction.tx_hash, 'ETH', HISTORY_MAPPING_DECODED),
+        )
+
+        return sorted(events, key=lambda x: x.sequence_index, reverse=False)
+
+    def decode_transaction_events(
+            self,
+            transaction: EthereumTransaction,
+            tx_receipt: EthereumTxReceipt,
+    ) -> List[HistoryBaseEntry]:
+        """Decodes an ethereum transaction and its receipt without saving anything"""
         self.base.reset_sequence_counter()
         # check if any eth transfer happened in the transaction, including in internal transactions
         events = self._maybe_decode_simple_transactions(transaction, tx_receipt)
@@ -229,27 +295,62 @@ class EVMTransactionDecoder():
                 events.append(event)
                 continue
 
-            token = GlobalDBHandler.get_ethereum_token(tx_log.address)
-            event = self.try_all_rules(token=token, tx_log=tx_log, transaction=transaction, decoded_events=events, action_items=action_items)  # noqa: E501
+            event = self.try_all_rules(tx_log=tx_log, transaction=transaction, decoded_events=events, action_items=action_items)  # noqa: E501
             if event:
                 events.append(event)
 
-        self.dbevents.add_history_events(write_cursor=write_cursor, history=events)
-        write_cursor.execute(
-            'INSERT OR IGNORE INTO evm_tx_mappings(tx_hash, blockchain, value) VALUES(?, ?, ?)',  # noqa: E501
-            (transaction.tx_hash, 'ETH', HISTORY_MAPPING_DECODED),
-        )
-
-        return sorted(events, key=lambda x: x.sequence_index, reverse=False)
+        return events
 
     def get_and_decode_undecoded_transactions(self, limit: Optional[int] = None) -> None:
         """Checks the DB for up to `limit` undecoded transactions and decodes them.
 
+        If there are many of them they are decoded in parallel by worker processes.
+
         This is protected by concurrent access from a lock"""
         with self.undecoded_tx_query_lock:
             hashes = self.dbethtx.get_transaction_hashes_not_decoded(limit=limit)
+            if self.decoding_processes > 1 and len(hashes) >= PARALLEL_DECODING_MIN_TRANSACTIONS:  # noqa: E501
+                hashes = self._decode_in_processes(hashes)
             self.decode_transaction_hashes(ignore_cache=False, tx_hashes=hashes)
 
+    def _decode_in_processes(self, tx_hashes: List[EVMTxHash]) -> List[EVMTxHash]:
+        """Decodes the given transactions in worker processes with read only access to
+        the DB and saves the results of each chunk in bulk as soon as it's ready.
+
+        Returns the hashes of the transactions that the workers failed to decode."""
+        setup = get_worker_setup(self.database)
+        if setup is None:
+            log.debug('User DB can not be read by other processes. Not decoding in parallel')
+            return tx_hashes
+
+        log.debug(f'Decoding {len(tx_hashes)} transactions in {self.decoding_processes} processes')  # noqa: E501
+        not_decoded = []
+        for chunk, result in decode_in_processes(
+                setup=setup,
+                tx_hashes=tx_hashes,
+                processes=self.decoding_processes,
+        ):
+            if result is None:
+                not_decoded.extend(chunk)
+                continue
+
+            for msg in result.warnings:
+                self.msg_aggregator.add_warning(msg)
+            for msg in result.errors:
+                self.msg_aggregator.add_error(msg)
+            with self.database.user_write() as write_cursor:
+                self.database.add_asset_identifiers(write_cursor, result.new_asset_identifiers)
+                self.dbevents.add_serialized_history_events(
+                    write_cursor=write_cursor,
+                    events=result.events,
+                )
+                write_cursor.executemany(
+                    'INSERT OR IGNORE INTO evm_tx_mappings(tx_hash, blockchain, value) VALUES(?, ?, ?)',  # noqa: E501
+                    [(tx_hash, 'ETH', HISTORY_MAPPING_DECODED) for tx_hash in result.tx_hashes],
+                )
+
+        return not_decoded
+
     def decode_transaction_hashes(self, ignore_cache: bool, tx_hashes: Optional[List[EVMTxHash]]) -> List[HistoryBaseEntry]:  # noqa: E501
         """Make sure that receipts are pulled + events decoded for the given transaction hashes.
 
@@ -270,21 +371,28 @@ class EVMTransactionDecoder():
                     tx_hashes.append(EVMTxHash(entry[0]))
 
         with self.database.user_write() as cursor:
+            saved_data = {
+                transaction.tx_hash: (transaction, receipt) for transaction, receipt in
+                self.dbethtx.get_transactions_and_receipts(cursor, tx_hashes)
+            }
             for tx_hash in tx_hashes:
-                try:
-                    receipt = self.eth_transactions.get_or_query_transaction_receipt(cursor, tx_hash)  # noqa: E501
-                except RemoteError as e:
-                    raise InputError(f'Hash {tx_hash.hex()} does not correspond to a transaction') from e  # noqa: E501
-
-                # TODO: Change this if transaction filter query can accept multiple hashes
-                txs = self.dbethtx.get_ethereum_transactions(
-                    cursor=cursor,
-                    filter_=ETHTransactionsFilterQuery.make(tx_hash=tx_hash),
-                    has_premium=True,  # ignore limiting here
-                )
+                if tx_hash in saved_data:
+                    transaction, receipt = saved_data[tx_hash]
+                else:  # the transaction or its receipt still need to be queried
+                    try:
+                        receipt = self.eth_transactions.get_or_query_transaction_receipt(cursor, tx_hash)  # noqa: E501
+                    except RemoteError as e:
+                        raise InputError(f'Hash {tx_hash.hex()} does not correspond to a transaction') from e  # noqa: E501
+
+                    transaction = self.dbethtx.get_ethereum_transactions(
+                        cursor=cursor,
+                        filter_=ETHTransactionsFilterQuery.make(tx_hash=tx_hash),
+                        has_premium=True,  # ignore limiting here
+                    )[0]
+
                 events.extend(self.get_or_decode_transaction_events(
                     write_cursor=cursor,
-                    transaction=txs[0],
+                    transaction=transaction,
                     tx_receipt=receipt,
                     ignore_cache=ignore_cache,
                 ))
@@ -449,6 +557,7 @@ class EVMTransactionDecoder():
         ))
         return events
 
+    @decodes_log(ERC20_APPROVE)
     def _maybe_decode_erc20_approve(
             self,
             token: Optional[EthereumToken],
@@ -495,6 +604,7 @@ class EVMTransactionDecoder():
             counterparty=spender_address,
         )
 
+    @decodes_log(ERC20_OR_ERC721_TRANSFER)
     def _maybe_decode_erc20_721_transfer(
             self,
             token: Optional[EthereumToken],
@@ -570,6 +680,9 @@ class EVMTransactionDecoder():
         )
         return transfer
 
+    @decodes_log(GTC_CLAIM, address=string_to_ethereum_address('0xDE3e5a990bCE7fC60a6f017e7c4a95fc4939299E'))  # noqa: E501
+    @decodes_log(ONEINCH_CLAIM, address=string_to_ethereum_address('0xE295aD71242373C37C5FdA7B57F26f9eA1088AFe'))  # noqa: E501
+    @decodes_log(GNOSIS_CHAIN_BRIDGE_RECEIVE, address=string_to_ethereum_address('0x88ad09518695c6c3712AC10a214bE5109a655671'))  # noqa: E501
     def _maybe_enrich_transfers(  # pylint: disable=no-self-use
             self,
             token: Optional[EthereumToken],  # pylint: disable=unused-argument
@@ -630,6 +743,7 @@ class EVMTransactionDecoder():
             if transfer_enriched:
                 break
 
+    @decodes_log(GOVERNORALPHA_PROPOSE)
     def _maybe_decode_governance(  # pylint: disable=no-self-use
             self,
             token: Optional[EthereumToken],  # pylint: disable=unused-argument
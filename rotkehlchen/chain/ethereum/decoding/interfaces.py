@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, List, Optional, Tuple, TypeVar
 
 from rotkehlchen.types import ChecksumEthAddress
 
@@ -8,6 +8,29 @@ if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
     from rotkehlchen.user_messages import MessagesAggregator
 
+# (contract address or None for any address, topic0) of a log a decoding rule can decode
+LogRuleKey = Tuple[Optional[ChecksumEthAddress], bytes]
+T = TypeVar('T', bound=Callable)
+
+
+def decodes_log(topic: bytes, address: Optional[ChecksumEthAddress] = None) -> Callable[[T], T]:
+    """Decorator for decoding rules that declares the logs they can decode by topic0
+    and optionally by the address of the contract emitting them. Can be stacked.
+
+    Logs are only given to the rules declared for them. Rules without this decorator
+    are tried for every log.
+    """
+    def decorator(rule: T) -> T:
+        rule.log_keys = (get_log_keys(rule) or frozenset()) | {(address, topic)}  # type: ignore
+        return rule
+
+    return decorator
+
+
+def get_log_keys(rule: Callable) -> Optional[FrozenSet[LogRuleKey]]:
+    """The logs declared for a decoding rule or None if it should be tried for any log"""
+    return getattr(rule, 'log_keys', None)
+
 
 class DecoderInterface(metaclass=ABCMeta):
 
@@ -38,7 +61,7 @@ class DecoderInterface(metaclass=ABCMeta):
     def decoding_rules(self) -> List[Callable]:  # pylint: disable=no-self-use
         """
         Subclasses may implement this to add new generic decoding rules to be attempted
-        by the decoding process
+        by the decoding process. Rules should declare the logs they decode with decodes_log
         """
         return []
 
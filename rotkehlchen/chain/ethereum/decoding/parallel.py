@@ -0,0 +1,202 @@
+import importlib
+import logging
+import multiprocessing
+import os
+from collections import deque
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Iterator, List, NamedTuple, Optional, Tuple
+
+import gevent
+from gevent.queue import Queue
+
+from rotkehlchen.accounting.structures.base import HISTORY_EVENT_DB_TUPLE_WRITE
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import EVMTxHash
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Below this number of transactions starting worker processes costs more than it saves
+PARALLEL_DECODING_MIN_TRANSACTIONS = 500
+PARALLEL_DECODING_CHUNK_SIZE = 250
+DEFAULT_DECODING_PROCESSES = min(os.cpu_count() or 1, 4)
+WORKER_POLL_INTERVAL = 0.1
+WORKER_EXIT_TIMEOUT = 5
+# The worker code needs the whole ethereum stack, which itself imports the decoder.
+# So it lives in its own module that is only imported by the worker processes.
+WORKER_MODULE = 'rotkehlchen.chain.ethereum.decoding.worker'
+
+
+class DecodingWorkerSetup(NamedTuple):
+    """What a worker process needs in order to open the DBs of the logged in user"""
+    data_dir: Path
+    user_data_dir: Path
+    key_script: str
+
+
+class DecodedChunk(NamedTuple):
+    """The result of decoding a chunk of transactions in a worker process"""
+    tx_hashes: List[EVMTxHash]
+    events: List[HISTORY_EVENT_DB_TUPLE_WRITE]
+    new_asset_identifiers: List[str]
+    warnings: List[str]
+    errors: List[str]
+
+
+def get_worker_setup(database: 'DBHandler') -> Optional[DecodingWorkerSetup]:
+    """Returns the setup for the worker processes or None if the user DB can't be
+    read by other processes while this one is using it"""
+    read_pool = database.conn.read_pool
+    data_dir = GlobalDBHandler()._data_directory
+    if read_pool is None or read_pool.init_script is None or data_dir is None:
+        return None
+
+    return DecodingWorkerSetup(
+        data_dir=data_dir,
+        user_data_dir=database.user_data_dir,
+        key_script=read_pool.init_script,
+    )
+
+
+def _worker_main(
+        receiver: Connection,
+        sender: Connection,
+        setup: DecodingWorkerSetup,
+) -> None:
+    """Entry point of the worker processes. Sets up the decoding once and sends back
+    None or the setup error. Then decodes each chunk of transactions it receives,
+    sending back the result or an error, until it receives None"""
+    try:
+        worker = importlib.import_module(WORKER_MODULE)
+        worker.initialize(setup)
+    except Exception as e:  # pylint: disable=broad-except
+        sender.send(f'{e.__class__.__name__}: {str(e)}')
+        sender.close()
+        return
+
+    sender.send(None)
+    while True:
+        tx_hashes = receiver.recv()
+        if tx_hashes is None:
+            break
+
+        result: Tuple[Optional[DecodedChunk], Optional[str]]
+        try:
+            result = (worker.decode_transactions_chunk(tx_hashes=tx_hashes), None)
+        except Exception as e:  # pylint: disable=broad-except
+            result = (None, f'{e.__class__.__name__}: {str(e)}')
+        sender.send(result)
+
+    sender.close()
+
+
+def _receive(connection: Connection) -> Any:
+    """Waits for the worker without blocking other greenlets and returns what it sent
+
+    May raise:
+    - EOFError or OSError if the worker died
+    """
+    while not connection.poll():  # also returns True if the worker died
+        gevent.sleep(WORKER_POLL_INTERVAL)
+    return connection.recv()
+
+
+def _run_worker(
+        setup: DecodingWorkerSetup,
+        chunks: Deque[List[EVMTxHash]],
+        results: Queue,
+) -> None:
+    """Starts a worker process and hands it chunks of transactions to decode until
+    there are no more chunks or the worker dies. Puts each chunk along with its
+    decoded result, or None if the worker failed, in `results`."""
+    context = multiprocessing.get_context('spawn')
+    # one way pipes since the sockets of duplex ones are non blocking with gevent
+    receiver, worker_sender = context.Pipe(duplex=False)
+    worker_receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_worker_main,
+        args=(worker_receiver, worker_sender, setup),
+        daemon=True,
+    )
+    try:
+        process.start()
+    except OSError as e:
+        log.error(f'Could not start a transaction decoding process due to {str(e)}')
+        receiver.close()
+        sender.close()
+        return
+    finally:
+        worker_receiver.close()
+        worker_sender.close()
+
+    finished = False
+    try:
+        setup_error = _receive(receiver)
+        if setup_error is not None:
+            log.error(f'Failed to set up transaction decoding in a worker process: {setup_error}')  # noqa: E501
+            return
+
+        while len(chunks) != 0:
+            tx_hashes = chunks.popleft()
+            try:
+                sender.send(tx_hashes)
+                result, error = _receive(receiver)
+            except (EOFError, OSError):
+                results.put((tx_hashes, None))
+                raise
+
+            if error is not None:
+                log.error(f'Failed to decode {len(tx_hashes)} transactions in a worker process: {error}')  # noqa: E501
+            results.put((tx_hashes, result))
+
+        sender.send(None)  # no more chunks. Let the worker exit
+        finished = True
+    except (EOFError, OSError) as e:
+        log.error(f'Transaction decoding worker process exited with {str(e) or "no result"}')
+    finally:
+        receiver.close()
+        sender.close()
+        if finished:
+            process.join(timeout=WORKER_EXIT_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+
+def decode_in_processes(
+        setup: DecodingWorkerSetup,
+        tx_hashes: List[EVMTxHash],
+        processes: int,
+) -> Iterator[Tuple[List[EVMTxHash], Optional[DecodedChunk]]]:
+    """Splits the transactions in chunks and decodes them in up to `processes` worker
+    processes. The workers are started once, set up the decoding once and are then sent
+    the chunks one by one. Yields each chunk along with its result as soon as it's ready.
+    The result is None for the chunks that could not be decoded by a worker."""
+    chunks: Deque[List[EVMTxHash]] = deque(
+        tx_hashes[idx:idx + PARALLEL_DECODING_CHUNK_SIZE]
+        for idx in range(0, len(tx_hashes), PARALLEL_DECODING_CHUNK_SIZE)
+    )
+    chunks_num = len(chunks)
+    results: Queue = Queue()
+    workers = [
+        gevent.spawn(_run_worker, setup=setup, chunks=chunks, results=results)
+        for _ in range(min(processes, chunks_num))
+    ]
+
+    def report_leftover_chunks() -> None:
+        """Reports as failed the chunks left if all the workers stopped working"""
+        gevent.joinall(workers)
+        while len(chunks) != 0:
+            results.put((chunks.popleft(), None))
+
+    leftovers_reporter = gevent.spawn(report_leftover_chunks)
+    try:
+        for _ in range(chunks_num):
+            yield results.get()
+    finally:
+        gevent.killall(workers + [leftovers_reporter])
@@ -0,0 +1,132 @@
+"""Transaction decoding in worker processes. Only imported by the processes themselves"""
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional
+
+from rotkehlchen.accounting.structures.base import HISTORY_EVENT_DB_TUPLE_WRITE
+from rotkehlchen.chain.ethereum.decoding.decoder import EVMTransactionDecoder
+from rotkehlchen.chain.ethereum.manager import EthereumManager
+from rotkehlchen.chain.ethereum.transactions import EthTransactions
+from rotkehlchen.db.dbhandler import MAIN_DB_NAME, DBHandler
+from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType
+from rotkehlchen.db.misc import detect_sqlcipher_version
+from rotkehlchen.externalapis.etherscan import Etherscan
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.greenlets import GreenletManager
+from rotkehlchen.types import EVMTxHash
+from rotkehlchen.user_messages import MessagesAggregator
+
+from .parallel import DecodedChunk, DecodingWorkerSetup
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
+
+class ReadOnlyDBHandler(DBHandler):
+    """Handler of a user DB that is open, and up to date, in another process
+
+    Nothing can be written to the DB. The only exception is adding asset identifiers,
+    which happens when new tokens are seen during decoding. Those are kept in memory
+    so that the process owning the DB can save them along with the decoded events.
+    """
+
+    def __init__(  # pylint: disable=super-init-not-called
+            self,
+            setup: DecodingWorkerSetup,
+            msg_aggregator: MessagesAggregator,
+    ) -> None:
+        self.msg_aggregator = msg_aggregator
+        self.user_data_dir = setup.user_data_dir
+        self.sqlcipher_version = detect_sqlcipher_version()
+        self.last_write_ts = None
+        self.conn_transient = None  # type: ignore
+        self.new_asset_identifiers: List[str] = []
+        self.conn = DBConnection(
+            path=setup.user_data_dir / MAIN_DB_NAME,
+            connection_type=DBConnectionType.USER,
+        )
+        self.conn.executescript(setup.key_script + 'PRAGMA query_only=ON;')
+
+    def logout(self) -> None:
+        """Only closes the connection. The DB info file belongs to the owning process"""
+        self.disconnect(conn_attribute='conn')
+
+    @contextmanager
+    def user_write(self) -> Iterator['DBCursor']:
+        cursor = self.conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    def add_asset_identifiers(self, write_cursor: 'DBCursor', asset_identifiers: List[str]) -> None:  # noqa: E501
+        self.new_asset_identifiers.extend(asset_identifiers)
+
+
+class _WorkerState(NamedTuple):
+    msg_aggregator: MessagesAggregator
+    database: ReadOnlyDBHandler
+    decoder: EVMTransactionDecoder
+
+
+_state: Optional[_WorkerState] = None
+
+
+def initialize(setup: DecodingWorkerSetup) -> None:
+    """Opens the DBs and sets up the decoder. Done once per worker process, before
+    any chunk of transactions is decoded.
+
+    Any chain query the decoders need to do goes through etherscan since the worker
+    does not connect to any node.
+    """
+    global _state  # pylint: disable=global-statement
+    msg_aggregator = MessagesAggregator()
+    GlobalDBHandler(data_dir=setup.data_dir)
+    database = ReadOnlyDBHandler(setup=setup, msg_aggregator=msg_aggregator)
+    ethereum_manager = EthereumManager(
+        etherscan=Etherscan(database=database, msg_aggregator=msg_aggregator),
+        msg_aggregator=msg_aggregator,
+        greenlet_manager=GreenletManager(msg_aggregator=msg_aggregator),
+        connect_at_start=[],
+        database=database,
+    )
+    decoder = EVMTransactionDecoder(
+        database=database,
+        ethereum_manager=ethereum_manager,
+        eth_transactions=EthTransactions(ethereum=ethereum_manager, database=database),
+        msg_aggregator=msg_aggregator,
+    )
+    _state = _WorkerState(msg_aggregator=msg_aggregator, database=database, decoder=decoder)
+
+
+def decode_transactions_chunk(tx_hashes: List[EVMTxHash]) -> DecodedChunk:
+    """Decodes the given transactions, whose receipts need to be in the DB, without
+    saving anything to the user DB. The process owning it saves the result.
+
+    May raise:
+    - Any error the decoding may raise. The owning process decodes the chunk itself then.
+    """
+    assert _state is not None, 'The worker should be initialized before decoding'
+    database, decoder = _state.database, _state.decoder
+    # drop anything left by a previous chunk that failed. The owning process decodes it again
+    database.new_asset_identifiers = []
+    _state.msg_aggregator.consume_warnings()
+    _state.msg_aggregator.consume_errors()
+    events: List[HISTORY_EVENT_DB_TUPLE_WRITE] = []
+    with database.conn.read_ctx() as cursor:
+        transactions = decoder.dbethtx.get_transactions_and_receipts(cursor, tx_hashes)
+        if len(transactions) != len(tx_hashes):
+            raise ValueError('Not all transactions of the chunk or their receipts are in the DB')
+
+        for transaction, tx_receipt in transactions:
+            events.extend(
+                event.serialize_for_db() for event in
+                decoder.decode_transaction_events(transaction, tx_receipt)
+            )
+
+    return DecodedChunk(
+        tx_hashes=tx_hashes,
+        events=events,
+        new_asset_identifiers=database.new_asset_identifiers,
+        warnings=_state.msg_aggregator.consume_warnings(),
+        errors=_state.msg_aggregator.consume_errors(),
+    )
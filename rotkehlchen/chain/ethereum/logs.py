@@ -0,0 +1,132 @@
+"""Scanning of contract logs over a block range with concurrent queries of subranges"""
+import logging
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+import gevent
+from gevent.greenlet import Greenlet
+
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Gets the first and last block of a range and returns the logs in it along with the
+# last block they cover, which is before the end of the range if the results got capped
+LogsRangeQuery = Callable[[int, int], Tuple[List[Dict[str, Any]], int]]
+
+
+class LogsRangeTooBig(Exception):
+    """Raised by a logs range query when the node refuses to return the logs of
+    that many blocks at once"""
+
+
+class AdaptiveBlockWindow():
+    """The number of blocks to query logs for at once
+
+    Aims at target_results logs per query by following the density of the logs
+    in the ranges queried so far. Grows at most twofold per query and shrinks to
+    half of any range that is too big for the node.
+    """
+
+    def __init__(self, size: int, min_size: int, max_size: int, target_results: int) -> None:
+        self.size = size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_results = target_results
+
+    def update(self, blocks: int, results: int) -> None:
+        """Adjusts the window after a query of the given number of blocks"""
+        if results == 0:
+            new_size = blocks * 2
+        else:
+            new_size = min(blocks * 2, blocks * self.target_results // results)
+        self.size = max(self.min_size, min(self.max_size, new_size))
+
+    def split(self, start: int, end: int) -> int:
+        """Shrinks the window after the range from start to end was too big and
+        returns the last block of the first half of the range
+
+        May raise:
+        - RemoteError if the range can't be split below the minimum window size
+        """
+        blocks = end - start + 1
+        if blocks // 2 < self.min_size:
+            raise RemoteError(
+                f'Logs query for blocks {start} - {end} returns too many results '
+                f'even for a range of {blocks} blocks',
+            )
+        self.size = min(self.size, blocks // 2)
+        return start + blocks // 2 - 1
+
+
+def _query_range(
+        query_range: LogsRangeQuery,
+        from_block: int,
+        to_block: int,
+) -> Union[Tuple[List[Dict[str, Any]], int], LogsRangeTooBig]:
+    """Returns LogsRangeTooBig instead of raising it, since it's an expected outcome
+    that should not be reported as a failed greenlet"""
+    try:
+        return query_range(from_block, to_block)
+    except LogsRangeTooBig as e:
+        return e
+
+
+def scan_logs_block_range(
+        query_range: LogsRangeQuery,
+        from_block: int,
+        to_block: int,
+        window: AdaptiveBlockWindow,
+        concurrency: int,
+) -> List[Dict[str, Any]]:
+    """Queries the logs from from_block to to_block in ranges of the size of the
+    window, with up to concurrency ranges queried at once. Ranges that are too big
+    are split in half and those whose results got capped are continued from the
+    last block covered.
+
+    Returns the logs ordered by block number and log index without duplicates.
+
+    May raise:
+    - RemoteError if a range is too big even at the minimum window size
+    - Anything query_range raises. The rest of the queries are killed then.
+    """
+    events: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    pending: List[Tuple[int, int]] = []  # ranges to retry, used as a stack
+    next_block = from_block
+    running: Dict[Greenlet, Tuple[int, int]] = {}
+    try:
+        while True:
+            while len(running) < concurrency:
+                if len(pending) != 0:
+                    block_range = pending.pop()
+                elif next_block <= to_block:
+                    block_range = (next_block, min(next_block + window.size - 1, to_block))
+                    next_block = block_range[1] + 1
+                else:
+                    break
+                running[gevent.spawn(_query_range, query_range, *block_range)] = block_range
+
+            if len(running) == 0:
+                break
+
+            greenlet = gevent.wait(list(running), count=1)[0]
+            start, end = running.pop(greenlet)  # type: ignore  # it's a key of running
+            result = greenlet.get()  # type: ignore  # same as above
+            if isinstance(result, LogsRangeTooBig):
+                middle = window.split(start, end)
+                log.debug(f'Logs query for blocks {start} - {end} is too big. Splitting it')
+                pending.append((middle + 1, end))
+                pending.append((start, middle))
+                continue
+
+            range_events, last_block = result
+            for event in range_events:
+                events[(event['transactionHash'], event['logIndex'])] = event
+            window.update(blocks=last_block - start + 1, results=len(range_events))
+            if last_block < end:
+                pending.append((last_block + 1, end))
+    finally:
+        gevent.killall(list(running))
+
+    return sorted(events.values(), key=lambda x: (x['blockNumber'], x['logIndex']))
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 import random
@@ -45,11 +46,17 @@ from web3.types import BlockIdentifier, FilterParams
 from rotkehlchen.chain.constants import DEFAULT_EVM_RPC_TIMEOUT
 from rotkehlchen.chain.ethereum.contracts import EthereumContract
 from rotkehlchen.chain.ethereum.graph import Graph
+from rotkehlchen.chain.ethereum.logs import (
+    AdaptiveBlockWindow,
+    LogsRangeTooBig,
+    scan_logs_block_range,
+)
 from rotkehlchen.chain.ethereum.modules.eth2.constants import ETH2_DEPOSIT
 from rotkehlchen.chain.ethereum.types import EnsContractParams, string_to_ethereum_address
 from rotkehlchen.chain.ethereum.utils import multicall, multicall_2
 from rotkehlchen.constants import ONE
 from rotkehlchen.constants.ethereum import ERC20TOKEN_ABI, ETH_SCAN, UNIV1_LP_ABI
+from rotkehlchen.db.ethlogs import DBEthLogs
 from rotkehlchen.errors.misc import (
     BlockchainQueryError,
     InputError,
@@ -75,11 +82,11 @@ from rotkehlchen.types import (
     Timestamp,
 )
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import from_wei, hex_or_bytes_to_str
+from rotkehlchen.utils.misc import from_wei, get_chunks, hex_or_bytes_to_int, hex_or_bytes_to_str
 from rotkehlchen.utils.network import request_get_dict
 
-from .constants import ETHERSCAN_NODE
-from .types import ETHERSCAN_NODE_NAME, NodeName, WeightedNode
+from .constants import ETHERSCAN_NODE, RANGE_PREFIX_ETHLOGS
+from .types import ETHERSCAN_NODE_NAME, ContractCall, NodeName, WeightedNode
 from .utils import ENS_RESOLVER_ABI_MULTICHAIN_ADDRESS
 
 if TYPE_CHECKING:
@@ -110,84 +117,160 @@ def _is_synchronized(current_block: int, latest_block: int) -> Tuple[bool, str]:
 
 
 WEB3_LOGQUERY_BLOCK_RANGE = 250000
-
-
-def _query_web3_get_logs(
+LOGQUERY_MAX_BLOCK_RANGE = 1000000
+WEB3_LOGQUERY_TARGET_RESULTS = 2000
+WEB3_LOGQUERY_CONCURRENCY = 4
+ETHERSCAN_LOGQUERY_BLOCK_RANGE = 300000
+ETHERSCAN_LOGQUERY_TARGET_RESULTS = 500
+ETHERSCAN_LOGQUERY_CONCURRENCY = 2
+ETHERSCAN_LOGS_LIMIT = 1000
+# Logs of blocks less deep than this are not saved in the DB since they can still change
+LOGS_CACHE_CONFIRMATIONS = 64
+JSON_RPC_BATCH_SIZE = 100
+
+
+def _query_web3_logs_range(
         web3: Web3,
         filter_args: FilterParams,
         from_block: int,
-        to_block: Union[int, Literal['latest']],
-        contract_address: ChecksumEthAddress,
-        event_name: str,
-        argument_filters: Dict[str, Any],
-) -> List[Dict[str, Any]]:
-    until_block = web3.eth.block_number if to_block == 'latest' else to_block
-    events: List[Dict[str, Any]] = []
-    start_block = from_block
-    # we know that in most of its early life the Eth2 contract address returns a
-    # a lot of results. So limit the query range to not hit the infura limits every time
-    # supress https://lgtm.com/rules/1507386916281/ since it does not apply here
-    infura_eth2_log_query = (
-        'infura.io' in web3.manager.provider.endpoint_uri and  # type: ignore # noqa: E501 lgtm [py/incomplete-url-substring-sanitization]
-        contract_address == ETH2_DEPOSIT.address
+        to_block: int,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Queries the logs of the filter from from_block to to_block at the web3 node
+
+    May raise:
+    - LogsRangeTooBig if the node does not return the logs of so many blocks
+    - ValueError or KeyError if the query fails for another reason
+    """
+    range_filter_args: FilterParams = {**filter_args, 'fromBlock': from_block, 'toBlock': to_block}  # type: ignore  # noqa: E501
+    log.debug(
+        'Querying web3 node for contract logs',
+        contract_address=filter_args.get('address'),
+        from_block=from_block,
+        to_block=to_block,
     )
-    block_range = initial_block_range = WEB3_LOGQUERY_BLOCK_RANGE
-    if infura_eth2_log_query:
-        block_range = initial_block_range = 75000
-
-    while start_block <= until_block:
-        filter_args['fromBlock'] = start_block
-        end_block = min(start_block + block_range, until_block)
-        filter_args['toBlock'] = end_block
-        log.debug(
-            'Querying web3 node for contract event',
-            contract_address=contract_address,
-            event_name=event_name,
-            argument_filters=argument_filters,
-            from_block=filter_args['fromBlock'],
-            to_block=filter_args['toBlock'],
+    # As seen in https://github.com/rotki/rotki/issues/1787, the json RPC, if it
+    # is infura can throw an error here which we can only parse by catching the  exception
+    try:
+        events: List[Dict[str, Any]] = [dict(x) for x in web3.eth.get_logs(range_filter_args)]  # noqa: E501
+    except (ValueError, KeyError) as e:
+        if isinstance(e, ValueError):
+            try:
+                decoded_error = json.loads(str(e).replace("'", '"'))
+            except json.JSONDecodeError:
+                # reraise the value error if the error is not json
+                raise e from None
+
+            msg = decoded_error.get('message', '')
+        else:  # temporary hack for key error seen from pokt
+            msg = 'query returned more than 10000 results'
+
+        # errors from: https://infura.io/docs/ethereum/json-rpc/eth-getLogs
+        if msg in ('query returned more than 10000 results', 'query timeout exceeded'):
+            raise LogsRangeTooBig(msg) from e
+        # else, well we tried .. reraise the error
+        raise e
+
+    # Turn all HexBytes into hex strings
+    for event in events:
+        event['blockHash'] = event['blockHash'].hex()
+        event['topics'] = [topic.hex() for topic in event['topics']]
+        event['transactionHash'] = event['transactionHash'].hex()
+
+    return events, to_block
+
+
+def _deserialize_etherscan_log(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Turns the hex ints of a log returned by etherscan to ints
+
+    May raise:
+    - DeserializationError if a value can't be deserialized
+    """
+    event['address'] = deserialize_ethereum_address(event['address'])
+    for key in ('blockNumber', 'timeStamp', 'gasPrice', 'gasUsed', 'logIndex', 'transactionIndex'):  # noqa: E501
+        event[key] = deserialize_int_from_hex(symbol=event[key], location='etherscan log query')
+    return event
+
+
+def _query_json_rpc_batch(
+        endpoint: str,
+        rpc_method: str,
+        params_list: Sequence[List[Any]],
+        timeout: int,
+) -> Dict[int, Any]:
+    """Sends one JSON-RPC request per entry of params_list to the node at the endpoint
+    in a single HTTP POST and matches the responses back to the requests by id.
+
+    Returns the result of each request by its index in params_list. Requests that got
+    an error, a null result or no response at all are missing from it.
+
+    May raise:
+    - RemoteError if the POST fails or the node does not respond with a batch
+    """
+    payload = [
+        {'jsonrpc': '2.0', 'id': idx, 'method': rpc_method, 'params': params}
+        for idx, params in enumerate(params_list)
+    ]
+    try:
+        response = requests.post(endpoint, json=payload, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        raise RemoteError(f'Batch {rpc_method} request to {endpoint} failed due to {str(e)}') from e  # noqa: E501
+
+    if response.status_code != 200:
+        raise RemoteError(
+            f'Batch {rpc_method} request to {endpoint} failed with HTTP status '
+            f'code {response.status_code} and text {response.text}',
         )
-        # As seen in https://github.com/rotki/rotki/issues/1787, the json RPC, if it
-        # is infura can throw an error here which we can only parse by catching the  exception
-        try:
-            new_events_web3: List[Dict[str, Any]] = [dict(x) for x in web3.eth.get_logs(filter_args)]  # noqa: E501
-        except (ValueError, KeyError) as e:
-            if isinstance(e, ValueError):
-                try:
-                    decoded_error = json.loads(str(e).replace("'", '"'))
-                except json.JSONDecodeError:
-                    # reraise the value error if the error is not json
-                    raise e from None
-
-                msg = decoded_error.get('message', '')
-            else:  # temporary hack for key error seen from pokt
-                msg = 'query returned more than 10000 results'
-
-            # errors from: https://infura.io/docs/ethereum/json-rpc/eth-getLogs
-            if msg in ('query returned more than 10000 results', 'query timeout exceeded'):
-                block_range = block_range // 2
-                if block_range < 50:
-                    raise  # stop retrying if block range gets too small
-                # repeat the query with smaller block range
-                continue
-            # else, well we tried .. reraise the error
-            raise e
 
-        # Turn all HexBytes into hex strings
-        for e_idx, event in enumerate(new_events_web3):
-            new_events_web3[e_idx]['blockHash'] = event['blockHash'].hex()
-            new_topics = []
-            for topic in event['topics']:
-                new_topics.append(topic.hex())
-            new_events_web3[e_idx]['topics'] = new_topics
-            new_events_web3[e_idx]['transactionHash'] = event['transactionHash'].hex()
+    try:
+        responses = response.json()
+    except ValueError as e:
+        raise RemoteError(f'Batch {rpc_method} request to {endpoint} returned invalid JSON') from e  # noqa: E501
 
-        start_block = end_block + 1
-        events.extend(new_events_web3)
-        # end of the loop, end of 1 query. Reset the block range to max
-        block_range = initial_block_range
+    if not isinstance(responses, list):
+        # Nodes that do not support batches respond with a single error object
+        raise RemoteError(
+            f'Batch {rpc_method} request to {endpoint} was not answered with a batch: '
+            f'{responses}',
+        )
 
-    return events
+    results = {}
+    for entry in responses:
+        if not isinstance(entry, dict):
+            continue
+        idx = entry.get('id')
+        if not isinstance(idx, int) or not 0 <= idx < len(params_list):
+            continue
+        if entry.get('error') is not None:
+            log.debug(f'{rpc_method} with params {params_list[idx]} failed at {endpoint} due to {entry["error"]}')  # noqa: E501
+            continue
+        if entry.get('result') is not None:
+            results[idx] = entry['result']
+
+    return results
+
+
+def _deserialize_raw_transaction_receipt(tx_receipt: Dict[str, Any], location: str) -> Dict[str, Any]:  # noqa: E501
+    """Turns the hex numbers of a receipt, as returned by the JSON-RPC API, to int
+
+    May raise:
+    - DeserializationError, ValueError or KeyError if the receipt is malformed
+    """
+    block_number = int(tx_receipt['blockNumber'], 16)
+    tx_receipt['blockNumber'] = block_number
+    tx_receipt['cumulativeGasUsed'] = int(tx_receipt['cumulativeGasUsed'], 16)
+    tx_receipt['gasUsed'] = int(tx_receipt['gasUsed'], 16)
+    tx_receipt['status'] = int(tx_receipt.get('status', '0x1'), 16)
+    tx_index = int(tx_receipt['transactionIndex'], 16)
+    tx_receipt['transactionIndex'] = tx_index
+    for receipt_log in tx_receipt['logs']:
+        receipt_log['blockNumber'] = block_number
+        receipt_log['logIndex'] = deserialize_int_from_hex(
+            symbol=receipt_log['logIndex'],
+            location=location,
+        )
+        receipt_log['transactionIndex'] = tx_index
+
+    return tx_receipt
 
 
 def _prepare_ens_call_arguments(addr: ChecksumEthAddress) -> List[Any]:
@@ -441,6 +524,74 @@ class EthereumManager():
             f'nodes: {[str(x) for x in call_order]}. Check logs for details.',
         )
 
+    def query_batch(
+            self,
+            rpc_method: str,
+            params_list: Sequence[List[Any]],
+            deserialize: Callable[[int, Any], Any],
+            fallback: Callable[[int], Any],
+            call_order: Sequence[WeightedNode],
+    ) -> List[Any]:
+        """Sends JSON-RPC requests of the given method, one per entry of params_list,
+        to the web3 nodes of the call order in batches of up to JSON_RPC_BATCH_SIZE
+        requests per HTTP POST. Returns the deserialized results in the given order.
+        deserialize and fallback are given the index of the request in params_list.
+
+        Each node only gets the requests the nodes before it failed to answer, so a
+        batch that partially fails continues at the next node. Requests no node
+        answered, for example since only etherscan is in the call order, are done
+        one by one with fallback.
+
+        May raise:
+        - RemoteError if the fallback of a request fails
+        - Anything else the fallback raises
+        """
+        results: Dict[int, Any] = {}
+        pending = list(range(len(params_list)))
+        for weighted_node in call_order:
+            if len(pending) == 0:
+                break
+
+            node = weighted_node.node_info
+            if node not in self.web3_mapping:  # etherscan has no batches
+                continue
+
+            for chunk in get_chunks(pending, JSON_RPC_BATCH_SIZE):
+                try:
+                    chunk_results = _query_json_rpc_batch(
+                        endpoint=node.endpoint,
+                        rpc_method=rpc_method,
+                        params_list=[params_list[idx] for idx in chunk],
+                        timeout=self.eth_rpc_timeout,
+                    )
+                except RemoteError as e:
+                    log.warning(f'Failed to query {node} for a batch of {rpc_method} due to {str(e)}')  # noqa: E501
+                    break  # leave the rest of the requests for the next node
+
+                for position, result in chunk_results.items():
+                    try:
+                        results[chunk[position]] = deserialize(chunk[position], result)
+                    except (
+                            DeserializationError,
+                            BlockchainQueryError,
+                            ValueError,
+                            KeyError,
+                            TypeError,
+                    ) as e:
+                        log.warning(
+                            f'Failed to deserialize {rpc_method} result {result} '
+                            f'from {node} due to {str(e)}',
+                        )
+
+            pending = [idx for idx in pending if idx not in results]
+
+        if len(pending) != 0:
+            log.debug(f'Querying {len(pending)} {rpc_method} requests one by one')
+        for idx in pending:
+            results[idx] = fallback(idx)
+
+        return [results[idx] for idx in range(len(params_list))]
+
     def _get_latest_block_number(self, web3: Optional[Web3]) -> int:
         if web3 is not None:
             return web3.eth.block_number
@@ -572,6 +723,31 @@ class EthereumManager():
             num=num,
         )
 
+    def get_blocks_by_number(
+            self,
+            nums: Sequence[int],
+            call_order: Optional[Sequence[WeightedNode]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Batch variant of get_block_by_number(). Blocks come without transactions.
+
+        May raise:
+        - RemoteError if a block can't be queried from any of the nodes
+        """
+        call_order = call_order if call_order is not None else self.default_call_order()
+
+        def deserialize_block(_: int, block_data: Dict[str, Any]) -> Dict[str, Any]:
+            block_data['timestamp'] = hex_or_bytes_to_int(block_data['timestamp'])
+            block_data['number'] = hex_or_bytes_to_int(block_data['number'])
+            return block_data
+
+        return self.query_batch(
+            rpc_method='eth_getBlockByNumber',
+            params_list=[[hex(num), False] for num in nums],
+            deserialize=deserialize_block,
+            fallback=lambda idx: self.get_block_by_number(num=nums[idx], call_order=call_order),
+            call_order=call_order,
+        )
+
     def _get_block_by_number(self, web3: Optional[Web3], num: int) -> Dict[str, Any]:
         """Returns the block object corresponding to the given block number
 
@@ -599,6 +775,25 @@ class EthereumManager():
             account=account,
         )
 
+    def get_codes(
+            self,
+            accounts: Sequence[ChecksumEthAddress],
+            call_order: Optional[Sequence[WeightedNode]] = None,
+    ) -> List[str]:
+        """Batch variant of get_code()
+
+        May raise:
+        - RemoteError if a code can't be queried from any of the nodes
+        """
+        call_order = call_order if call_order is not None else self.default_call_order()
+        return self.query_batch(
+            rpc_method='eth_getCode',
+            params_list=[[account, 'latest'] for account in accounts],
+            deserialize=lambda _, result: result,  # hex string like in _get_code()
+            fallback=lambda idx: self.get_code(account=accounts[idx], call_order=call_order),
+            call_order=call_order,
+        )
+
     def _get_code(self, web3: Optional[Web3], account: ChecksumEthAddress) -> str:
         """Gets the deployment bytecode at the given address
 
@@ -836,21 +1031,10 @@ class EthereumManager():
         if web3 is None:
             tx_receipt = self.etherscan.get_transaction_receipt(tx_hash)
             try:
-                # Turn hex numbers to int
-                block_number = int(tx_receipt['blockNumber'], 16)
-                tx_receipt['blockNumber'] = block_number
-                tx_receipt['cumulativeGasUsed'] = int(tx_receipt['cumulativeGasUsed'], 16)
-                tx_receipt['gasUsed'] = int(tx_receipt['gasUsed'], 16)
-                tx_receipt['status'] = int(tx_receipt.get('status', '0x1'), 16)
-                tx_index = int(tx_receipt['transactionIndex'], 16)
-                tx_receipt['transactionIndex'] = tx_index
-                for receipt_log in tx_receipt['logs']:
-                    receipt_log['blockNumber'] = block_number
-                    receipt_log['logIndex'] = deserialize_int_from_hex(
-                        symbol=receipt_log['logIndex'],
-                        location='etherscan tx receipt',
-                    )
-                    receipt_log['transactionIndex'] = tx_index
+                return _deserialize_raw_transaction_receipt(
+                    tx_receipt=tx_receipt,
+                    location='etherscan tx receipt',
+                )
             except (DeserializationError, ValueError, KeyError) as e:
                 msg = str(e)
                 if isinstance(e, KeyError):
@@ -863,7 +1047,6 @@ class EthereumManager():
                     f'Couldnt deserialize transaction receipt data from etherscan '
                     f'due to {msg}. Check logs for details',
                 ) from e
-            return tx_receipt
 
         # Can raise TransactionNotFound if the user's node is pruned and transaction is old
         tx_receipt = web3.eth.get_transaction_receipt(tx_hash)  # type: ignore
@@ -880,6 +1063,31 @@ class EthereumManager():
             tx_hash=tx_hash,
         )
 
+    def get_transaction_receipts(
+            self,
+            tx_hashes: Sequence[EVMTxHash],
+            call_order: Optional[Sequence[WeightedNode]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Batch variant of get_transaction_receipt()
+
+        May raise:
+        - RemoteError if a receipt can't be queried from any of the nodes
+        """
+        call_order = call_order if call_order is not None else self.default_call_order()
+        return self.query_batch(
+            rpc_method='eth_getTransactionReceipt',
+            params_list=[[tx_hash.hex()] for tx_hash in tx_hashes],
+            deserialize=lambda _, result: _deserialize_raw_transaction_receipt(
+                tx_receipt=result,
+                location='batch tx receipt',
+            ),
+            fallback=lambda idx: self.get_transaction_receipt(
+                tx_hash=tx_hashes[idx],
+                call_order=call_order,
+            ),
+            call_order=call_order,
+        )
+
     def _get_transaction_by_hash(
             self,
             web3: Optional[Web3],
@@ -929,6 +1137,58 @@ class EthereumManager():
             block_identifier=block_identifier,
         )
 
+    def call_contracts(
+            self,
+            calls: Sequence[ContractCall],
+            call_order: Optional[Sequence[WeightedNode]] = None,
+            block_identifier: BlockIdentifier = 'latest',
+    ) -> List[Any]:
+        """Batch variant of call_contract()
+
+        May raise:
+        - RemoteError if a call can't be done at any of the nodes
+        """
+        call_order = call_order if call_order is not None else self.default_call_order()
+        contracts = [
+            EthereumContract(address=call.address, abi=call.abi, deployed_block=0)
+            for call in calls
+        ]
+        block = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+
+        def decode_result(idx: int, result: str) -> Any:
+            if result == '0x':
+                raise BlockchainQueryError(
+                    f'Error doing call on contract {calls[idx].address} for '
+                    f'{calls[idx].method_name}. Returned 0x result',
+                )
+            output_data = contracts[idx].decode(
+                result=bytes.fromhex(result[2:]),
+                method_name=calls[idx].method_name,
+                arguments=calls[idx].arguments,
+            )
+            return output_data[0] if len(output_data) == 1 else output_data
+
+        return self.query_batch(
+            rpc_method='eth_call',
+            params_list=[
+                [{
+                    'to': call.address,
+                    'data': contract.encode(method_name=call.method_name, arguments=call.arguments),  # noqa: E501
+                }, block]
+                for call, contract in zip(calls, contracts)
+            ],
+            deserialize=decode_result,
+            fallback=lambda idx: self.call_contract(
+                contract_address=calls[idx].address,
+                abi=calls[idx].abi,
+                method_name=calls[idx].method_name,
+                arguments=calls[idx].arguments,
+                call_order=call_order,
+                block_identifier=block_identifier,
+            ),
+            call_order=call_order,
+        )
+
     def _call_contract(
             self,
             web3: Optional[Web3],
@@ -973,6 +1233,15 @@ class EthereumManager():
             to_block: Union[int, Literal['latest']] = 'latest',
             call_order: Optional[Sequence[WeightedNode]] = None,
     ) -> List[Dict[str, Any]]:
+        """Queries logs of an ethereum contract
+
+        The blocks scanned for the same contract and filter are remembered in the DB
+        along with their logs, up to LOGS_CACHE_CONFIRMATIONS blocks before the
+        latest, so that later queries only scan the blocks not seen yet.
+
+        May raise:
+        - RemoteError if the logs can't be queried from any node of the call order
+        """
         if call_order is None:  # Default call order for logs
             call_order = [ETHERSCAN_NODE]
             if (node_info := self.get_own_node_info()) is not None:
@@ -983,33 +1252,7 @@ class EthereumManager():
                         weight=ONE,
                     ),
                 )
-        return self.query(
-            method=self._get_logs,
-            call_order=call_order,
-            contract_address=contract_address,
-            abi=abi,
-            event_name=event_name,
-            argument_filters=argument_filters,
-            from_block=from_block,
-            to_block=to_block,
-        )
 
-    def _get_logs(
-            self,
-            web3: Optional[Web3],
-            contract_address: ChecksumEthAddress,
-            abi: List,
-            event_name: str,
-            argument_filters: Dict[str, Any],
-            from_block: int,
-            to_block: Union[int, Literal['latest']] = 'latest',
-    ) -> List[Dict[str, Any]]:
-        """Queries logs of an ethereum contract
-
-        May raise:
-        - RemoteError if etherscan is used and there is a problem with
-        reaching it or with the returned result
-        """
         event_abi = find_matching_event_abi(abi=abi, event_name=event_name)
         _, filter_args = construct_event_filter_params(
             event_abi=event_abi,
@@ -1022,107 +1265,174 @@ class EthereumManager():
         if event_abi['anonymous']:
             # web3.py does not handle the anonymous events correctly and adds the first topic
             filter_args['topics'] = filter_args['topics'][1:]
-        events: List[Dict[str, Any]] = []
-        start_block = from_block
-        if web3 is not None:
-            events = _query_web3_get_logs(
-                web3=web3,
+        topics_hash = hashlib.sha256(json.dumps(filter_args['topics']).encode()).hexdigest()
+        query_name = f'{RANGE_PREFIX_ETHLOGS}_{contract_address}_{topics_hash}'
+
+        dbethlogs = DBEthLogs(self.database)
+        with self.database.conn.read_ctx() as cursor:
+            saved_range = dbethlogs.get_query_range(cursor, query_name)
+        latest_block = None
+        if to_block == 'latest' or saved_range is None or to_block > saved_range[1]:
+            latest_block = self.get_latest_block_number(call_order=call_order)
+        until_block = latest_block if to_block == 'latest' else to_block
+        assert until_block is not None, 'latest block is always queried for latest'
+
+        if saved_range is None:
+            ranges_to_query = [(from_block, until_block)]
+        else:  # query only outside the saved range, always keeping it contiguous
+            ranges_to_query = []
+            if from_block < saved_range[0]:
+                ranges_to_query.append((from_block, saved_range[0] - 1))
+            if until_block > saved_range[1]:
+                ranges_to_query.append((saved_range[1] + 1, until_block))
+
+        new_events = []
+        for range_start, range_end in ranges_to_query:
+            new_events.extend(self.query(
+                method=self._get_logs,
+                call_order=call_order,
                 filter_args=filter_args,
+                from_block=range_start,
+                to_block=range_end,
+            ))
+
+        if len(ranges_to_query) != 0:
+            # all scanned blocks are saved, so that the saved range stays contiguous
+            cache_until = max(x[1] for x in ranges_to_query)
+            if latest_block is not None:  # logs of the latest blocks can still change
+                cache_until = min(cache_until, latest_block - LOGS_CACHE_CONFIRMATIONS)
+            cache_from = min(x[0] for x in ranges_to_query)
+            if cache_from <= cache_until:
+                with self.database.user_write() as write_cursor:
+                    dbethlogs.add_logs(
+                        write_cursor=write_cursor,
+                        query_name=query_name,
+                        from_block=cache_from,
+                        to_block=cache_until,
+                        logs=[x for x in new_events if x['blockNumber'] <= cache_until],
+                    )
+
+        # the scanned ranges can start and end outside of the requested one
+        new_events = [x for x in new_events if from_block <= x['blockNumber'] <= until_block]
+        if saved_range is None:
+            return new_events
+
+        with self.database.conn.read_ctx() as cursor:
+            saved_events = dbethlogs.get_logs(
+                cursor=cursor,
+                query_name=query_name,
+                from_block=max(from_block, saved_range[0]),
+                to_block=min(until_block, saved_range[1]),
+            )
+        return sorted(new_events + saved_events, key=lambda x: (x['blockNumber'], x['logIndex']))  # noqa: E501
+
+    def _get_logs(
+            self,
+            web3: Optional[Web3],
+            filter_args: FilterParams,
+            from_block: int,
+            to_block: int,
+    ) -> List[Dict[str, Any]]:
+        """Queries the logs of the filter from from_block to to_block with
+        concurrent queries of subranges whose size adapts to the density of the logs
+
+        May raise:
+        - RemoteError if etherscan is used and there is a problem with
+        reaching it or with the returned result, or if a range can't be queried
+        even at the minimum window size
+        - ValueError or KeyError if a web3 query fails
+        """
+        if web3 is not None:
+            # we know that in most of its early life the Eth2 contract address returns a
+            # a lot of results. So limit the query range to not hit the infura limits
+            # supress https://lgtm.com/rules/1507386916281/ since it does not apply here
+            infura_eth2_log_query = (
+                'infura.io' in web3.manager.provider.endpoint_uri and  # type: ignore # noqa: E501 lgtm [py/incomplete-url-substring-sanitization]
+                filter_args.get('address') == ETH2_DEPOSIT.address
+            )
+            window = AdaptiveBlockWindow(
+                size=75000 if infura_eth2_log_query else WEB3_LOGQUERY_BLOCK_RANGE,
+                min_size=50,
+                max_size=LOGQUERY_MAX_BLOCK_RANGE,
+                target_results=WEB3_LOGQUERY_TARGET_RESULTS,
+            )
+            return scan_logs_block_range(
+                query_range=lambda start, end: _query_web3_logs_range(
+                    web3=web3,
+                    filter_args=filter_args,
+                    from_block=start,
+                    to_block=end,
+                ),
                 from_block=from_block,
                 to_block=to_block,
-                contract_address=contract_address,
-                event_name=event_name,
-                argument_filters=argument_filters,
-            )
-        else:  # etherscan
-            until_block = (
-                self.etherscan.get_latest_block_number() if to_block == 'latest' else to_block
+                window=window,
+                concurrency=WEB3_LOGQUERY_CONCURRENCY,
             )
-            blocks_step = 300000
-            while start_block <= until_block:
-                while True:  # loop to continuously reduce block range if need b
-                    end_block = min(start_block + blocks_step, until_block)
-                    try:
-                        new_events = self.etherscan.get_logs(
-                            contract_address=contract_address,
-                            topics=filter_args['topics'],  # type: ignore
-                            from_block=start_block,
-                            to_block=end_block,
-                        )
-                    except RemoteError as e:
-                        if 'Please select a smaller result dataset' in str(e):
 
-                            blocks_step = blocks_step // 2
-                            if blocks_step < 100:
-                                raise  # stop trying
-                            # else try with the smaller step
-                            continue
+        # else etherscan
+        window = AdaptiveBlockWindow(
+            size=ETHERSCAN_LOGQUERY_BLOCK_RANGE,
+            min_size=100,
+            max_size=LOGQUERY_MAX_BLOCK_RANGE,
+            target_results=ETHERSCAN_LOGQUERY_TARGET_RESULTS,
+        )
+        return scan_logs_block_range(
+            query_range=lambda start, end: self._query_etherscan_logs_range(
+                filter_args=filter_args,
+                from_block=start,
+                to_block=end,
+            ),
+            from_block=from_block,
+            to_block=to_block,
+            window=window,
+            concurrency=ETHERSCAN_LOGQUERY_CONCURRENCY,
+        )
+
+    def _query_etherscan_logs_range(
+            self,
+            filter_args: FilterParams,
+            from_block: int,
+            to_block: int,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Queries the logs of the filter from from_block to to_block at etherscan
 
-                        # else some other error
-                        raise
+        Etherscan returns at most 1000 logs at once. If it returns that many the
+        logs are only known to cover the blocks before the one of the last log.
+        If they are all logs of from_block then the block has more logs than
+        etherscan can return and the range is reported as too big. Splitting it
+        ends in a RemoteError so the block is queried at the next node.
 
-                    break  # we must have a result
+        May raise:
+        - LogsRangeTooBig if etherscan asks for a smaller range or if it can't
+        return all the logs of from_block
+        - RemoteError if there is a problem with reaching etherscan or with the
+        returned result
+        """
+        try:
+            events = self.etherscan.get_logs(
+                contract_address=filter_args['address'],  # type: ignore
+                topics=filter_args['topics'],  # type: ignore
+                from_block=from_block,
+                to_block=to_block,
+            )
+        except RemoteError as e:
+            if 'Please select a smaller result dataset' in str(e):
+                raise LogsRangeTooBig(str(e)) from e
+            raise
 
-                # Turn all Hex ints to ints
-                for e_idx, event in enumerate(new_events):
-                    try:
-                        block_number = deserialize_int_from_hex(
-                            symbol=event['blockNumber'],
-                            location='etherscan log query',
-                        )
-                        log_index = deserialize_int_from_hex(
-                            symbol=event['logIndex'],
-                            location='etherscan log query',
-                        )
-                        # Try to see if the event is a duplicate that got returned
-                        # in the previous iteration
-                        for previous_event in reversed(events):
-                            if previous_event['blockNumber'] < block_number:
-                                break
-
-                            same_event = (
-                                previous_event['logIndex'] == log_index and
-                                previous_event['transactionHash'] == event['transactionHash']
-                            )
-                            if same_event:
-                                events.pop()
-
-                        new_events[e_idx]['address'] = deserialize_ethereum_address(
-                            event['address'],
-                        )
-                        new_events[e_idx]['blockNumber'] = block_number
-                        new_events[e_idx]['timeStamp'] = deserialize_int_from_hex(
-                            symbol=event['timeStamp'],
-                            location='etherscan log query',
-                        )
-                        new_events[e_idx]['gasPrice'] = deserialize_int_from_hex(
-                            symbol=event['gasPrice'],
-                            location='etherscan log query',
-                        )
-                        new_events[e_idx]['gasUsed'] = deserialize_int_from_hex(
-                            symbol=event['gasUsed'],
-                            location='etherscan log query',
-                        )
-                        new_events[e_idx]['logIndex'] = log_index
-                        new_events[e_idx]['transactionIndex'] = deserialize_int_from_hex(
-                            symbol=event['transactionIndex'],
-                            location='etherscan log query',
-                        )
-                    except DeserializationError as e:
-                        raise RemoteError(
-                            'Couldnt decode an etherscan event due to {str(e)}}',
-                        ) from e
-
-                # etherscan will only return 1000 events in one go. If more than 1000
-                # are returned such as when no filter args are provided then continue
-                # the query from the last block
-                if len(new_events) == 1000:
-                    start_block = new_events[-1]['blockNumber']
-                else:
-                    start_block = end_block + 1
-                events.extend(new_events)
-
-        return events
+        try:
+            events = [_deserialize_etherscan_log(event) for event in events]
+        except DeserializationError as e:
+            raise RemoteError(f'Couldnt decode an etherscan event due to {str(e)}') from e
+
+        if len(events) == ETHERSCAN_LOGS_LIMIT:
+            if events[-1]['blockNumber'] == from_block:
+                raise LogsRangeTooBig(
+                    f'Etherscan returned {ETHERSCAN_LOGS_LIMIT} logs of block '
+                    f'{from_block} which may have more logs',
+                )
+            return events, events[-1]['blockNumber'] - 1
+        return events, to_block
 
     def get_event_timestamp(self, event: Dict[str, Any]) -> Timestamp:
         """Reads an event returned either by etherscan or web3 and gets its timestamp
@@ -1,5 +1,5 @@
 from collections import defaultdict
-from typing import TYPE_CHECKING, Dict, List, cast
+from typing import TYPE_CHECKING, Any, Dict, List, cast
 
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry, get_tx_event_type_identifier
@@ -8,7 +8,9 @@ from rotkehlchen.chain.ethereum.accounting.interfaces import ModuleAccountantInt
 from rotkehlchen.chain.ethereum.accounting.structures import TxEventSettings, TxMultitakeTreatment
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_DAI
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
+from rotkehlchen.serialization.deserialize import deserialize_fval
 from rotkehlchen.types import ChecksumEthAddress
 
 from .constants import CPT_DSR, CPT_MIGRATION, CPT_VAULT
@@ -23,6 +25,21 @@ class MakerdaoAccountant(ModuleAccountantInterface):
         self.vault_balances: Dict[str, FVal] = defaultdict(FVal)
         self.dsr_balances: Dict[ChecksumEthAddress, FVal] = defaultdict(FVal)
 
+    def serialize_state(self) -> Dict[str, Any]:
+        return {
+            'vault_balances': {k: str(v) for k, v in self.vault_balances.items()},
+            'dsr_balances': {k: str(v) for k, v in self.dsr_balances.items()},
+        }
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        try:
+            for cdp_id, amount in data['vault_balances'].items():
+                self.vault_balances[cdp_id] = deserialize_fval(amount, 'vault_balance', 'checkpoint')  # noqa: E501
+            for address, amount in data['dsr_balances'].items():
+                self.dsr_balances[address] = deserialize_fval(amount, 'dsr_balance', 'checkpoint')  # noqa: E501
+        except (KeyError, AttributeError) as e:
+            raise DeserializationError(f'Could not restore makerdao accountant state due to {str(e)}') from e  # noqa: E501
+
     def _process_vault_dai_generation(
             self,
             pot: 'AccountingPot',  # pylint: disable=unused-argument
@@ -3,7 +3,7 @@ from typing import Callable, List, Optional
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.assets.asset import EthereumToken
-from rotkehlchen.chain.ethereum.decoding.interfaces import DecoderInterface
+from rotkehlchen.chain.ethereum.decoding.interfaces import DecoderInterface, decodes_log
 from rotkehlchen.chain.ethereum.decoding.structures import ActionItem
 from rotkehlchen.chain.ethereum.decoding.utils import maybe_reshuffle_events
 from rotkehlchen.chain.ethereum.structures import EthereumTxReceiptLog
@@ -20,6 +20,8 @@ ETH_PURCHASE = b'\x7f@\x91\xb4l3\xe9\x18\xa0\xf3\xaaB0vA\xd1{\xb6p)BzSi\xe5K59\x
 
 class Uniswapv1Decoder(DecoderInterface):  # lgtm[py/missing-call-to-init]
 
+    @decodes_log(TOKEN_PURCHASE)
+    @decodes_log(ETH_PURCHASE)
     def _maybe_decode_swap(  # pylint: disable=no-self-use
             self,
             token: Optional[EthereumToken],  # pylint: disable=unused-argument
@@ -10,12 +10,12 @@ from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.constants.ethereum import ETH_SCAN
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.dbhandler import DBHandler
-from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.types import ChecksumEthAddress, Price
+from rotkehlchen.types import ChecksumEthAddress, Price, Timestamp
 from rotkehlchen.utils.misc import get_chunks, ts_now
 
 if TYPE_CHECKING:
@@ -58,6 +58,9 @@ TokensReturn = Tuple[
 
 ETHERSCAN_MAX_TOKEN_CHUNK_LENGTH = 120
 OTHER_MAX_TOKEN_CHUNK_LENGTH = 590
+# Cached token balances older than this are queried again even if no transaction
+# of the address touched the token since
+TOKEN_BALANCES_CACHE_TTL = 3600
 
 
 class EthTokens():
@@ -70,34 +73,40 @@ class EthTokens():
             self,
             write_cursor: 'DBCursor',
             address: ChecksumEthAddress,
-            token_usd_price: Dict[EthereumToken, Price],
             etherscan_chunks: List[List[EthereumToken]],
             other_chunks: List[List[EthereumToken]],
     ) -> Dict[EthereumToken, FVal]:
         balances: Dict[EthereumToken, FVal] = defaultdict(FVal)
+        # query the block first so that the balances are at least as recent as it
+        block_number = self.ethereum.get_latest_block_number()
         if self.ethereum.connected_to_any_web3():
             # For all the chunks we use the same order of the nodes
             call_order = self.ethereum.default_call_order()
             for chunk in other_chunks:
-                self._get_tokens_balance_and_price(
+                self._get_tokens_balance(
                     address=address,
                     tokens=chunk,
                     balances=balances,
-                    token_usd_price=token_usd_price,
                     call_order=call_order,
                 )
         else:
             for chunk in etherscan_chunks:
-                self._get_tokens_balance_and_price(
+                self._get_tokens_balance(
                     address=address,
                     tokens=chunk,
                     balances=balances,
-                    token_usd_price=token_usd_price,
                     call_order=(ETHERSCAN_NODE,),
                 )
 
         # now that detection happened we also have to save it in the DB for the address
         self.db.save_tokens_for_address(write_cursor, address, list(balances.keys()))
+        self.db.save_token_balances_cache(
+            write_cursor=write_cursor,
+            address=address,
+            balances=balances,
+            block_number=block_number,
+            replace_all=True,
+        )
 
         return balances
 
@@ -109,7 +118,9 @@ class EthTokens():
         """Queries/detects token balances for a list of addresses
 
         If an address's tokens were recently autodetected they are not detected again but the
-        balances are simply queried. Unless force_detection is True.
+        balances are simply queried, and of those only the ones that may have changed since
+        they were cached. Unless force_detection is True, in which case the tokens are
+        detected again and all their balances are queried.
 
         Returns the token balances of each address and the usd prices of the tokens
         """
@@ -153,7 +164,6 @@ class EthTokens():
         etherscan_chunks = list(get_chunks(all_tokens, n=ETHERSCAN_MAX_TOKEN_CHUNK_LENGTH))
         other_chunks = list(get_chunks(all_tokens, n=OTHER_MAX_TOKEN_CHUNK_LENGTH))
         now = ts_now()
-        token_usd_price: Dict[EthereumToken, Price] = {}
         result = {}
 
         for address in addresses:
@@ -163,7 +173,6 @@ class EthTokens():
                     balances = self.detect_tokens_for_address(
                         write_cursor=cursor,
                         address=address,
-                        token_usd_price=token_usd_price,
                         etherscan_chunks=etherscan_chunks,
                         other_chunks=other_chunks,
                     )
@@ -171,25 +180,95 @@ class EthTokens():
                     if len(saved_list) == 0:
                         continue  # Do not query if we know the address has no tokens
 
-                    balances = defaultdict(FVal)
-                    self._get_tokens_balance_and_price(
+                    balances = self._get_cached_tokens_balance(
+                        write_cursor=cursor,
                         address=address,
                         tokens=saved_list,
-                        balances=balances,
-                        token_usd_price=token_usd_price,
-                        call_order=None,  # use defaults
+                        current_time=now,
                     )
 
             result[address] = balances
 
+        # query the prices of all found tokens at once
+        all_tokens_found = {token for balances in result.values() for token in balances}
+        usd_prices = Inquirer().find_usd_prices(list(all_tokens_found))
+        token_usd_price = {x: usd_prices.get(x, Price(ZERO)) for x in all_tokens_found}
+
         return result, token_usd_price
 
-    def _get_tokens_balance_and_price(
+    def _get_cached_tokens_balance(
+            self,
+            write_cursor: 'DBCursor',
+            address: ChecksumEthAddress,
+            tokens: List[EthereumToken],
+            current_time: Timestamp,
+    ) -> Dict[EthereumToken, FVal]:
+        """Returns the balances of the tokens for the address, querying only the tokens
+        whose cached balance is missing, older than TOKEN_BALANCES_CACHE_TTL or may
+        have changed since the block it was queried at.
+
+        A balance may have changed if the token contract emitted a log in a saved
+        transaction of the address after that block. A transaction without a saved
+        receipt after that block may have changed any of them. Changes not caused by
+        transactions of the address, such as rebases, are picked up after the TTL.
+        """
+        cached_balances = self.db.get_token_balances_cache(
+            cursor=write_cursor,
+            address=address,
+            min_time=Timestamp(current_time - TOKEN_BALANCES_CACHE_TTL),
+        )
+        contract_blocks: Dict[ChecksumEthAddress, int] = {}
+        no_receipt_block = None
+        if len(cached_balances) != 0:
+            contract_blocks, no_receipt_block = DBEthTx(self.db).get_token_activity_blocks(
+                cursor=write_cursor,
+                address=address,
+                from_block=min(x[1] for x in cached_balances.values()),
+            )
+
+        balances: Dict[EthereumToken, FVal] = defaultdict(FVal)
+        stale_tokens = []
+        for token in tokens:
+            cached_entry = cached_balances.get(token.identifier)
+            if (
+                cached_entry is None or
+                (no_receipt_block is not None and no_receipt_block > cached_entry[1]) or
+                contract_blocks.get(token.ethereum_address, -1) > cached_entry[1]
+            ):
+                stale_tokens.append(token)
+            elif cached_entry[0] != ZERO:
+                balances[token] = cached_entry[0]
+
+        if len(stale_tokens) == 0:
+            return balances
+
+        log.debug(
+            f'Querying {len(stale_tokens)} out of {len(tokens)} token balances of {address}',
+        )
+        block_number = self.ethereum.get_latest_block_number()
+        queried_balances: Dict[EthereumToken, FVal] = defaultdict(FVal)
+        self._get_tokens_balance(
+            address=address,
+            tokens=stale_tokens,
+            balances=queried_balances,
+            call_order=None,  # use defaults
+        )
+        # zero balances are also cached so that they are not queried again
+        self.db.save_token_balances_cache(
+            write_cursor=write_cursor,
+            address=address,
+            balances={x: queried_balances.get(x, ZERO) for x in stale_tokens},
+            block_number=block_number,
+            replace_all=False,
+        )
+        balances.update(queried_balances)
+        return balances
+
+    def _get_tokens_balance(
             self,
             address: ChecksumEthAddress,
             tokens: List[EthereumToken],
             balances: Dict[EthereumToken, FVal],
-            token_usd_price: Dict[EthereumToken, Price],
             call_order: Optional[Sequence[WeightedNode]],
     ) -> None:
         ret = self._get_multitoken_account_balance(
@@ -206,14 +285,6 @@ class EthTokens():
                 )
                 continue
             balances[token] += value
-            if token in token_usd_price:
-                continue
-            # else get the price
-            try:
-                usd_price = Inquirer().find_usd_price(token)
-            except RemoteError:
-                usd_price = Price(ZERO)
-            token_usd_price[token] = usd_price
 
     def _get_multitoken_account_balance(
             self,
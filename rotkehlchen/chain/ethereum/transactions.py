@@ -1,10 +1,12 @@
 import logging
 from collections import defaultdict
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
 import gevent
 from gevent.lock import Semaphore
+from gevent.pool import Pool
+from pysqlcipher3 import dbapi2 as sqlcipher
 
 from rotkehlchen.api.websockets.typedefs import TransactionStatusStep, WSMessageType
 from rotkehlchen.chain.ethereum.constants import (
@@ -16,6 +18,7 @@ from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
 from rotkehlchen.db.ranges import DBQueryRanges
 from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import (
     ChecksumEthAddress,
@@ -24,7 +27,8 @@ from rotkehlchen.types import (
     Timestamp,
     deserialize_evm_tx_hash,
 )
-from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.hexbytes import hexstring_to_bytes
+from rotkehlchen.utils.misc import get_chunks, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
@@ -36,6 +40,10 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+RECEIPTS_QUERY_CONCURRENCY = 8
+RECEIPTS_QUERY_BATCH_SIZE = 20
+RECEIPTS_WRITE_BATCH_SIZE = 100
+
 
 class EthTransactions:
 
@@ -447,26 +455,77 @@ class EthTransactions:
 
         return tx_receipt  # type: ignore  # tx_receipt was just added in the DB so should be there  # noqa: E501
 
+    def _add_receipts(self, dbethtx: DBEthTx, receipts: List[Dict[str, Any]]) -> None:
+        """Saves the queried receipts. Since they were queried without holding the DB
+        write lock, the receipts saved in the meantime and those whose transaction
+        got deleted in the meantime are skipped.
+
+        May raise:
+        - KeyError if any of the expected fields are missing
+        - DeserializationError if there is a problem deserializing a value
+        """
+        if len(receipts) == 0:
+            return
+
+        tx_hashes = [hexstring_to_bytes(x['transactionHash']) for x in receipts]
+        with self.database.user_write() as cursor:
+            cursor.execute(
+                f'SELECT tx_hash FROM ethereum_transactions WHERE tx_hash IN '
+                f'({",".join("?" * len(tx_hashes))}) AND tx_hash NOT IN '
+                f'(SELECT tx_hash FROM ethtx_receipts)',
+                tx_hashes,
+            )
+            missing_receipts = {x[0] for x in cursor}
+            for tx_hash, tx_receipt_data in zip(tx_hashes, receipts):
+                if tx_hash in missing_receipts:
+                    dbethtx.add_receipt_data(cursor, tx_receipt_data)
+                    missing_receipts.remove(tx_hash)
+
     def get_receipts_for_transactions_missing_them(self, limit: Optional[int] = None) -> None:
         """
         Searches the database for up to `limit` transactions that have no corresponding receipt
         and for each one of them queries the receipt and saves it in the DB.
 
+        Receipts are queried in JSON-RPC batches of RECEIPTS_QUERY_BATCH_SIZE by up to
+        RECEIPTS_QUERY_CONCURRENCY greenlets at a time and saved every
+        RECEIPTS_WRITE_BATCH_SIZE receipts, so the DB write lock is never
+        held while waiting for the nodes. If a query fails the receipts queried until
+        then are still saved.
+
         It's protected by a lock to not enter the same code twice
         (i.e. from periodic tasks and from pnl report history events gathering)
+
+        May raise:
+        - RemoteError if a receipt can't be queried from any of the connected nodes
         """
         with self.missing_receipts_lock:
             dbethtx = DBEthTx(self.database)
-            with self.database.conn.read_ctx() as cursor:
-                hash_results = dbethtx.get_transaction_hashes_no_receipt(
-                    tx_filter_query=None,
-                    limit=limit,
-                )
-
+            hash_results = dbethtx.get_transaction_hashes_no_receipt(
+                tx_filter_query=None,
+                limit=limit,
+            )
             if len(hash_results) == 0:
                 return  # nothing to do
 
-            with self.database.user_write() as cursor:
-                for entry in hash_results:
-                    tx_receipt_data = self.ethereum.get_transaction_receipt(tx_hash=entry)
-                    dbethtx.add_receipt_data(cursor, tx_receipt_data)
+            pool = Pool(size=RECEIPTS_QUERY_CONCURRENCY)
+            receipts: List[Dict[str, Any]] = []
+            try:
+                for receipts_data in pool.imap_unordered(
+                        lambda tx_hashes: self.ethereum.get_transaction_receipts(tx_hashes=tx_hashes),  # noqa: E501
+                        get_chunks(hash_results, RECEIPTS_QUERY_BATCH_SIZE),
+                ):
+                    receipts.extend(receipts_data)
+                    if len(receipts) >= RECEIPTS_WRITE_BATCH_SIZE:
+                        self._add_receipts(dbethtx, receipts)
+                        receipts = []
+            except RemoteError:
+                pool.kill()
+                try:  # save the receipts queried until the failure without hiding it
+                    self._add_receipts(dbethtx, receipts)
+                except (KeyError, DeserializationError, sqlcipher.DatabaseError) as e:  # pylint: disable=no-member  # noqa: E501
+                    log.error(f'Failed to save queried receipts due to {str(e)}')
+                raise
+            finally:
+                pool.kill()
+
+            self._add_receipts(dbethtx, receipts)
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, NamedTuple, Tuple, Type, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type, Union
 
 from eth_typing import HexAddress, HexStr
 from rotkehlchen.fval import FVal
@@ -44,6 +44,15 @@ class EnsContractParams(NamedTuple):
     arguments: List[Any]
 
 
+class ContractCall(NamedTuple):
+    """A call to a contract method, for calls done in batches"""
+
+    address: ChecksumEthAddress
+    abi: List[Any]
+    method_name: str
+    arguments: Optional[List[Any]] = None
+
+
 class WeightedNode(NamedTuple):
     node_info: NodeName
     active: bool
@@ -613,6 +613,21 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         should_query_dot = not blockchain or blockchain == SupportedBlockchain.POLKADOT
         should_query_avax = not blockchain or blockchain == SupportedBlockchain.AVALANCHE
 
+        # Query the prices of the native assets of the chains at once. The balance
+        # queries below then find them in the price cache.
+        native_assets = [
+            asset for should_query, chain, asset in (
+                (should_query_eth, SupportedBlockchain.ETHEREUM, A_ETH),
+                (should_query_btc, SupportedBlockchain.BITCOIN, A_BTC),
+                (should_query_bch, SupportedBlockchain.BITCOIN_CASH, A_BCH),
+                (should_query_ksm, SupportedBlockchain.KUSAMA, A_KSM),
+                (should_query_dot, SupportedBlockchain.POLKADOT, A_DOT),
+                (should_query_avax, SupportedBlockchain.AVALANCHE, A_AVAX),
+            ) if should_query and len(self.accounts.get(chain)) != 0
+        ]
+        if len(native_assets) > 1:
+            Inquirer().find_usd_prices(native_assets)
+
         if should_query_eth:
             self.query_ethereum_balances(
                 force_token_detection=force_token_detection,
@@ -1,5 +1,7 @@
 import base64
+import binascii
 import os
+from typing import Iterable, Iterator
 
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -60,6 +62,88 @@ def decrypt(key: bytes, given_source: str) -> bytes:
     return data[:-padding]  # remove the padding
 
 
+def _aes_key(key: bytes) -> bytes:
+    digest = hashes.Hash(hashes.SHA256())
+    digest.update(key)
+    return digest.finalize()  # use SHA-256 over our key to get a proper-sized AES key
+
+
+def encrypt_stream(key: bytes, source: Iterable[bytes]) -> Iterator[bytes]:
+    """Streaming version of encrypt(). Encrypts the source pieces as they come and
+    yields the base64 encoded result in pieces which joined are in the same format
+    as the output of encrypt() for the joined source"""
+    assert isinstance(key, bytes), 'key should be given in bytes'
+    iv = os.urandom(AES_BLOCK_SIZE)
+    encryptor = Cipher(algorithms.AES(_aes_key(key)), modes.CBC(iv)).encryptor()
+    pending = iv  # encrypted bytes not yet base64 encoded
+    source_length = 0
+    for data in source:
+        source_length += len(data)
+        pending += encryptor.update(data)
+        encodable = len(pending) - len(pending) % 3  # no base64 padding in the middle
+        yield base64.b64encode(pending[:encodable])
+        pending = pending[encodable:]
+
+    padding = AES_BLOCK_SIZE - source_length % AES_BLOCK_SIZE
+    pending += encryptor.update(bytes([padding]) * padding) + encryptor.finalize()
+    yield base64.b64encode(pending)
+
+
+def decrypt_stream(key: bytes, given_source: Iterable[bytes]) -> Iterator[bytes]:
+    """Streaming version of decrypt(). Takes the base64 encoded data in pieces and
+    yields the decrypted data in pieces.
+
+    If data can't be decrypted then raises UnableToDecryptRemoteData, possibly after
+    having yielded most of the data. So the yielded data should not be used before
+    the whole source is decrypted.
+    """
+    assert isinstance(key, bytes), 'key should be given in bytes'
+    aes_key = _aes_key(key)
+    decryptor = None
+    undecoded = b''  # base64 characters not yet decoded
+    encrypted = b''  # decoded bytes not yet decrypted
+    decrypted = b''  # the last block is kept until the end to check the padding
+    for data in given_source:
+        undecoded += data
+        decodable = len(undecoded) - len(undecoded) % 4
+        try:
+            encrypted += base64.b64decode(undecoded[:decodable])
+        except binascii.Error as e:
+            raise UnableToDecryptRemoteData(
+                f'Could not decode the DB data we received from the server: {str(e)}',
+            ) from e
+        undecoded = undecoded[decodable:]
+        if decryptor is None:
+            if len(encrypted) < AES_BLOCK_SIZE:
+                continue
+            decryptor = Cipher(algorithms.AES(aes_key), modes.CBC(encrypted[:AES_BLOCK_SIZE])).decryptor()  # noqa: E501
+            encrypted = encrypted[AES_BLOCK_SIZE:]
+
+        decrypted += decryptor.update(encrypted)
+        encrypted = b''
+        if len(decrypted) > AES_BLOCK_SIZE:
+            yield decrypted[:-AES_BLOCK_SIZE]
+            decrypted = decrypted[-AES_BLOCK_SIZE:]
+
+    try:
+        if decryptor is None or len(undecoded) != 0:
+            raise ValueError('incomplete data')
+        decrypted += decryptor.finalize()
+    except ValueError as e:
+        raise UnableToDecryptRemoteData(
+            f'Could not decrypt the DB data we received from the server: {str(e)}',
+        ) from e
+
+    padding = decrypted[-1] if len(decrypted) != 0 else 0
+    if padding == 0 or padding > AES_BLOCK_SIZE or decrypted[-padding:] != bytes([padding]) * padding:  # noqa: E501
+        raise UnableToDecryptRemoteData(
+            'Invalid padding when decrypting the DB data we received from the server. '
+            'Are you using a new user and if yes have you used the same password as before? '
+            'If you have then please open a bug report.',
+        )
+    yield decrypted[:-padding]
+
+
 def sha3(data: bytes) -> bytes:
     """
     Raises:
@@ -4,16 +4,20 @@ import logging
 import shutil
 import tempfile
 import zlib
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import gevent
 
 from rotkehlchen.assets.asset import Asset
-from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.crypto import decrypt_stream, encrypt_stream
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.errors.api import AuthenticationError
-from rotkehlchen.errors.misc import SystemPermissionError
+from rotkehlchen.errors.misc import SystemPermissionError, UnableToDecryptRemoteData
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.premium.chunks import ChunkedDBFile, assemble_db_file
 from rotkehlchen.types import B64EncodedBytes, B64EncodedString
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import timestamp_to_date, ts_now
@@ -24,6 +28,51 @@ log = RotkehlchenLogsAdapter(logger)
 BUFFERSIZE = 64 * 1024
 
 
+def compress_and_encrypt_file(path: Path, password: str) -> Tuple[B64EncodedBytes, str]:
+    """Compresses and encrypts the file reading it one block at a time, so that apart
+    from the result only a block of it is in memory at any point.
+
+    Returns the b64 encoded encrypted data and the b64 encoded sha256 of the file.
+    Never yields to other greenlets so it should run in a thread.
+    """
+    data_hash = hashlib.sha256()
+    compressor = zlib.compressobj(level=9)
+
+    def compressed_blocks() -> Iterator[bytes]:
+        with open(path, 'rb') as source:
+            for block in iter(lambda: source.read(BUFFERSIZE), b''):
+                data_hash.update(block)
+                yield compressor.compress(block)
+        yield compressor.flush()
+
+    encrypted_data = b''.join(encrypt_stream(password.encode(), compressed_blocks()))
+    return B64EncodedBytes(encrypted_data), base64.b64encode(data_hash.digest()).decode()
+
+
+def decrypt_and_decompress_to_file(password: str, encrypted_data: str, path: Path) -> None:
+    """Decrypts and decompresses the data one block at a time writing the result
+    to the given path. Never yields to other greenlets so it should run in a thread.
+
+    May raise:
+    - UnableToDecryptRemoteData if the data can't be decrypted or decompressed
+    """
+    decompressor = zlib.decompressobj()
+    source = (
+        encrypted_data[idx:idx + BUFFERSIZE].encode('latin-1')
+        for idx in range(0, len(encrypted_data), BUFFERSIZE)
+    )
+    try:
+        with open(path, 'wb') as destination:
+            for block in decrypt_stream(password.encode(), source):
+                destination.write(decompressor.decompress(block))
+            destination.write(decompressor.flush())
+    except zlib.error as e:
+        raise UnableToDecryptRemoteData(f'Could not decompress the DB data: {str(e)}') from e
+
+    if not decompressor.eof:
+        raise UnableToDecryptRemoteData('The DB data we received from the server is truncated')
+
+
 class DataHandler():
 
     def __init__(self, data_directory: Path, msg_aggregator: MessagesAggregator):
@@ -179,28 +228,18 @@ class DataHandler():
         """Decrypt the DB, dump in temporary plaintextdb, compress it,
         and then re-encrypt it
 
+        Compression and encryption run in a thread so that other greenlets are not
+        blocked while they go through the plaintext DB.
+
         Returns a b64 encoded binary blob"""
         log.info('Compress and encrypt DB')
-        compressor = zlib.compressobj(level=9)
         with tempfile.TemporaryDirectory() as tmpdirname:
             tempdb = Path(tmpdirname) / 'temp.db'
             self.db.export_unencrypted(tempdb)
-            source_data = bytearray()
-            compressed_data = bytearray()
-            with open(tempdb, 'rb') as src_f:
-                block = src_f.read(BUFFERSIZE)
-                while block:
-                    source_data += block
-                    compressed_data += compressor.compress(block)
-                    block = src_f.read(BUFFERSIZE)
-
-                compressed_data += compressor.flush()
-
-        original_data_hash = base64.b64encode(
-            hashlib.sha256(source_data).digest(),
-        ).decode()
-        encrypted_data = encrypt(password.encode(), bytes(compressed_data))
-        return B64EncodedBytes(encrypted_data.encode()), original_data_hash
+            return gevent.get_hub().threadpool.apply(
+                compress_and_encrypt_file,
+                (tempdb, password),
+            )
 
     def decompress_and_decrypt_db(self, password: str, encrypted_data: B64EncodedString) -> None:
         """Decrypt and decompress the encrypted data we receive from the server
@@ -208,20 +247,66 @@ class DataHandler():
         If successful then replace our local Database
 
         May Raise:
-        - UnableToDecryptRemoteData due to decrypt()
+        - UnableToDecryptRemoteData due to decrypt_stream() or if the decrypted
+        data can't be decompressed
         - DBUpgradeError if the rotki DB version is newer than the software or
         there is a DB upgrade and there is an error.
         - SystemPermissionError if the DB file permissions are not correct
         """
         log.info('Decompress and decrypt DB')
-
-        # First make a backup of the DB we are about to replace
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            tempdb = Path(tmpdirname) / 'temp.db'
+            gevent.get_hub().threadpool.apply(
+                decrypt_and_decompress_to_file,
+                (password, encrypted_data, tempdb),
+            )
+            self._backup_db()
+            self.db.import_unencrypted_file(tempdb, password)
+
+    def _backup_db(self) -> None:
+        """Makes a backup of the DB we are about to replace"""
         date = timestamp_to_date(ts=ts_now(), formatstr='%Y_%m_%d_%H_%M_%S', treat_as_local=True)
+        self.db.conn.wal_checkpoint()
         shutil.copyfile(
             self.data_directory / self.username / 'rotkehlchen.db',
             self.data_directory / self.username / f'rotkehlchen_db_{date}.backup',
         )
 
-        decrypted_data = decrypt(password.encode(), encrypted_data)
-        decompressed_data = zlib.decompress(decrypted_data)
-        self.db.import_unencrypted(decompressed_data, password)
+    @contextmanager
+    def export_db_in_chunks(self, password: str) -> Iterator[ChunkedDBFile]:
+        """Dumps the DB in a temporary plaintext DB that is split in chunks which can
+        be encrypted one by one for as long as the context is open"""
+        log.info('Export DB in chunks')
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            tempdb = Path(tmpdirname) / 'temp.db'
+            self.db.export_unencrypted(tempdb)
+            yield ChunkedDBFile(path=tempdb, password=password)
+
+    def import_db_chunks(
+            self,
+            password: str,
+            encrypted_manifest: str,
+            get_chunk: Callable[[str], str],
+    ) -> None:
+        """Assembles the DB described by the encrypted manifest from its chunks, retrieved
+        with get_chunk, in a temporary file and if successful replaces our local DB with it
+
+        May Raise:
+        - UnableToDecryptRemoteData if the manifest or a chunk can't be decrypted
+        - DeserializationError if the manifest is malformed
+        - RemoteError if a chunk can't be retrieved or the chunks are not valid
+        - PremiumAuthenticationError if get_chunk is rejected by the server
+        - DBUpgradeError if the rotki DB version is newer than the software or
+        there is a DB upgrade and there is an error.
+        """
+        log.info('Import DB chunks')
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            tempdb = Path(tmpdirname) / 'temp.db'
+            assemble_db_file(
+                path=tempdb,
+                password=password,
+                encrypted_manifest=encrypted_manifest,
+                get_chunk=get_chunk,
+            )
+            self._backup_db()
+            self.db.import_unencrypted_file(tempdb, password)
@@ -9,6 +9,7 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import (
     Any,
+    Callable,
     Dict,
     Iterator,
     List,
@@ -72,7 +73,11 @@ from rotkehlchen.db.constants import (
 from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType, DBCursor
 from rotkehlchen.db.eth2 import ETH2_DEPOSITS_PREFIX
 from rotkehlchen.db.ethtx import DBEthTx
-from rotkehlchen.db.filtering import AssetMovementsFilterQuery, TradesFilterQuery
+from rotkehlchen.db.filtering import (
+    AssetMovementsFilterQuery,
+    TradesFilterQuery,
+    serialize_page_cursor,
+)
 from rotkehlchen.db.loopring import DBLoopring
 from rotkehlchen.db.misc import detect_sqlcipher_version
 from rotkehlchen.db.schema import DB_SCRIPT_CREATE_TABLES
@@ -87,16 +92,22 @@ from rotkehlchen.db.settings import (
 )
 from rotkehlchen.db.upgrade_manager import DBUpgradeManager
 from rotkehlchen.db.utils import (
+    TIME_SERIES_RESOLUTION_SECONDS,
     BlockchainAccounts,
     DBAssetBalance,
+    DeserializationMemo,
+    DownsampledAssetBalance,
+    EntriesCountCache,
     LocationData,
     SingleDBAssetBalance,
     Tag,
+    TimeSeriesDownsampling,
     combine_asset_balances,
     deserialize_tags_from_db,
     form_query_to_filter_timestamps,
     insert_tag_mappings,
     is_valid_db_blockchain_account,
+    iterate_deserialized_rows,
     need_cursor,
     need_writable_cursor,
     str_to_bool,
@@ -109,7 +120,7 @@ from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition,
 from rotkehlchen.exchanges.ftx import FTX_SUBACCOUNT_DB_SETTING
 from rotkehlchen.exchanges.kraken import KrakenAccountType
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FVal, fvals_from_strings
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import PremiumCredentials
@@ -260,6 +271,7 @@ class DBHandler:
         self.last_write_ts: Optional[Timestamp] = None
         self.conn: DBConnection = None  # type: ignore
         self.conn_transient: DBConnection = None  # type: ignore
+        self.entries_count_cache = EntriesCountCache(self)
         self._connect(password)
         self._run_actions_after_first_connection(password)
         with self.user_write() as cursor:
@@ -307,6 +319,8 @@ class DBHandler:
                 'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
                 ('version', str(ROTKEHLCHEN_DB_VERSION)),
             )
+            # the journal mode can't be switched to WAL for the read pool in a transaction
+            self.conn.commit()
         # set up transient connection
         self._connect(password, conn_attribute='conn_transient')
         # creating tables if necessary
@@ -333,6 +347,12 @@ class DBHandler:
             )
             self.conn_transient.commit()
 
+        # Serve reads from a pool of read only connections from now on
+        key_script = self._get_key_script(password)
+        self.conn.enable_read_pool(init_script=key_script, keep_wal=False)
+        if self.conn_transient:
+            self.conn_transient.enable_read_pool(init_script=key_script, keep_wal=False)
+
     def get_md5hash(self, transient: bool = False) -> str:
         """Get the md5hash of the DB
 
@@ -411,12 +431,8 @@ class DBHandler:
                 f'Could not open database file: {fullpath}. Permission errors?',
             ) from e
 
-        password_for_sqlcipher = _protect_password_sqlcipher(password)
-        script = f'PRAGMA key="{password_for_sqlcipher}";'
-        if self.sqlcipher_version == 3:
-            script += f'PRAGMA kdf_iter={KDF_ITER};'
         try:
-            conn.executescript(script)
+            conn.executescript(self._get_key_script(password))
             conn.execute('PRAGMA foreign_keys=ON')
             # Optimizations for the combined trades view
             # the following will fail with DatabaseError in case of wrong password.
@@ -428,8 +444,23 @@ class DBHandler:
                 'Wrong password or invalid/corrupt database for user',
             ) from e
 
+        try:
+            # The DB is only in WAL mode while connected. Make sure any leftover WAL
+            # from a previous session is merged into the DB file before doing
+            # anything that copies it, like the backups taken at DB upgrades.
+            conn.execute('PRAGMA journal_mode=DELETE')
+        except sqlcipher.OperationalError as e:  # pylint: disable=no-member
+            log.warning(f'Could not switch {fullpath} out of WAL mode: {str(e)}')
+
         setattr(self, conn_attribute, conn)
 
+    def _get_key_script(self, password: str) -> str:
+        password_for_sqlcipher = _protect_password_sqlcipher(password)
+        script = f'PRAGMA key="{password_for_sqlcipher}";'
+        if self.sqlcipher_version == 3:
+            script += f'PRAGMA kdf_iter={KDF_ITER};'
+        return script
+
     def _change_password(
             self,
             new_password: str,
@@ -454,6 +485,8 @@ class DBHandler:
                 f'database: {str(e)}',
             )
             return False
+        # the readers of the pool were opened with the old key
+        conn.reset_read_pool(init_script=self._get_key_script(new_password))
         return True
 
     def change_password(self, new_password: str) -> bool:
@@ -480,6 +513,22 @@ class DBHandler:
     def import_unencrypted(self, unencrypted_db_data: bytes, password: str) -> None:
         """Imports an unencrypted DB from raw data
 
+        May raise:
+        - DBUpgradeError if the rotki DB version is newer than the software or
+        there is a DB upgrade and there is an error.
+        - AuthenticationError if the wrong password is given
+        """
+        # dump the unencrypted data into a temporary file
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            tempdbpath = Path(tmpdirname) / 'temp.db'
+            with open(tempdbpath, 'wb') as f:
+                f.write(unencrypted_db_data)
+
+            self.import_unencrypted_file(tempdbpath, password)
+
+    def import_unencrypted_file(self, unencrypted_db_path: Path, password: str) -> None:
+        """Imports an unencrypted DB from the given file, replacing the user DB
+
         May raise:
         - DBUpgradeError if the rotki DB version is newer than the software or
         there is a DB upgrade and there is an error.
@@ -494,21 +543,15 @@ class DBHandler:
         )
         rdbpath.unlink()
 
-        # dump the unencrypted data into a temporary file
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            tempdbpath = os.path.join(tmpdirname, 'temp.db')
-            with open(tempdbpath, 'wb') as f:
-                f.write(unencrypted_db_data)
-
-            # Now attach to the unencrypted DB and copy it to our DB and encrypt it
-            self.conn = DBConnection(path=tempdbpath, connection_type=DBConnectionType.USER)
-            password_for_sqlcipher = _protect_password_sqlcipher(password)
-            script = f'ATTACH DATABASE "{rdbpath}" AS encrypted KEY "{password_for_sqlcipher}";'
-            if self.sqlcipher_version == 3:
-                script += f'PRAGMA encrypted.kdf_iter={KDF_ITER};'
-            script += 'SELECT sqlcipher_export("encrypted");DETACH DATABASE encrypted;'
-            self.conn.executescript(script)
-            self.disconnect()
+        # Now attach to the unencrypted DB and copy it to our DB and encrypt it
+        self.conn = DBConnection(path=unencrypted_db_path, connection_type=DBConnectionType.USER)
+        password_for_sqlcipher = _protect_password_sqlcipher(password)
+        script = f'ATTACH DATABASE "{rdbpath}" AS encrypted KEY "{password_for_sqlcipher}";'
+        if self.sqlcipher_version == 3:
+            script += f'PRAGMA encrypted.kdf_iter={KDF_ITER};'
+        script += 'SELECT sqlcipher_export("encrypted");DETACH DATABASE encrypted;'
+        self.conn.executescript(script)
+        self.disconnect()
 
         try:
             self._connect(password)
@@ -1434,6 +1477,46 @@ class DBHandler:
             (address, json.dumps(new_details), now),
         )
 
+    def get_token_balances_cache(
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEthAddress,
+            min_time: Timestamp,
+    ) -> Dict[str, Tuple[FVal, int]]:
+        """Gets the cached token balances of the address saved at or after min_time
+
+        Returns a mapping of token identifiers to the balance and the block number
+        it was queried at
+        """
+        cursor.execute(
+            'SELECT token, amount, block_number FROM token_balances_cache '
+            'WHERE address=? AND time >= ?',
+            (address, min_time),
+        )
+        return {entry[0]: (FVal(entry[1]), entry[2]) for entry in cursor}
+
+    def save_token_balances_cache(
+            self,
+            write_cursor: 'DBCursor',
+            address: ChecksumEthAddress,
+            balances: Dict[EthereumToken, FVal],
+            block_number: int,
+            replace_all: bool,
+    ) -> None:
+        """Saves the token balances of the address queried at block_number
+
+        If replace_all is True the previously cached balances of the address for
+        other tokens are removed.
+        """
+        if replace_all:
+            write_cursor.execute('DELETE FROM token_balances_cache WHERE address=?', (address,))
+        now = ts_now()
+        write_cursor.executemany(
+            'INSERT OR REPLACE INTO token_balances_cache '
+            '(address, token, amount, block_number, time) VALUES (?, ?, ?, ?, ?)',
+            [(address, token.identifier, str(amount), block_number, now) for token, amount in balances.items()],  # noqa: E501
+        )
+
     def get_blockchain_accounts(self, cursor: 'DBCursor') -> BlockchainAccounts:
         """Returns a Blockchain accounts instance containing all blockchain account addresses"""
         eth_list = []
@@ -1812,12 +1895,32 @@ class DBHandler:
                     for entry_type in entry_types
                 ],
             )
+            if location_is_binance:
+                trade_cursors = self.get_binance_trade_cursors(write_cursor, name, location)
+                self._delete_binance_trade_cursors(write_cursor, name, location)
+                self.set_binance_trade_cursors(write_cursor, new_name, location, trade_cursors)
+
+    def _delete_binance_trade_cursors(
+            self,
+            write_cursor: 'DBCursor',
+            name: str,
+            location: Location,
+    ) -> None:
+        write_cursor.executemany(
+            'DELETE FROM used_query_ranges WHERE name=?',
+            [
+                (f'{str(location)}_mytrades_{name}_{symbol}',)
+                for symbol in self.get_binance_trade_cursors(write_cursor, name, location)
+            ],
+        )
 
     def remove_exchange(self, write_cursor: 'DBCursor', name: str, location: Location) -> None:
         write_cursor.execute(
             'DELETE FROM user_credentials WHERE name=? AND location=?',
             (name, location.serialize_for_db()),
         )
+        if location in (Location.BINANCE, Location.BINANCEUS):
+            self._delete_binance_trade_cursors(write_cursor, name, location)
 
     def get_exchange_credentials(
             self,
@@ -1917,6 +2020,49 @@ class DBHandler:
                 return json.loads(data[0])
             return []
 
+    def get_binance_trade_cursors(
+            self,
+            cursor: 'DBCursor',
+            name: str,
+            location: Location,
+    ) -> Dict[str, Tuple[int, Timestamp]]:
+        """Gets the trade cursors of the market symbols of a specific binance exchange
+
+        A cursor is the id from which to continue querying the trades of a symbol
+        along with the timestamp up to which all trades before that id are. They
+        are kept in used_query_ranges, with the id in place of the start timestamp.
+        """
+        prefix = f'{str(location)}_mytrades_{name}_'
+        escaped_prefix = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        cursor.execute(
+            'SELECT name, start_ts, end_ts FROM used_query_ranges WHERE name LIKE ? ESCAPE ?',
+            (f'{escaped_prefix}%', '\\'),
+        )
+        cursors = {}
+        for entry in cursor:
+            symbol = entry[0][len(prefix):]
+            if '_' in symbol:  # belongs to an exchange whose name starts with this name
+                continue
+            cursors[symbol] = (int(entry[1]), Timestamp(int(entry[2])))
+
+        return cursors
+
+    def set_binance_trade_cursors(
+            self,
+            write_cursor: 'DBCursor',
+            name: str,
+            location: Location,
+            cursors: Dict[str, Tuple[int, Timestamp]],
+    ) -> None:
+        """Sets the trade cursors of market symbols of a specific binance exchange"""
+        write_cursor.executemany(
+            'INSERT OR REPLACE INTO used_query_ranges(name, start_ts, end_ts) VALUES (?, ?, ?)',
+            [
+                (f'{str(location)}_mytrades_{name}_{symbol}', from_id, timestamp)
+                for symbol, (from_id, timestamp) in cursors.items()
+            ],
+        )
+
     def set_ftx_subaccount(self, write_cursor: 'DBCursor', ftx_name: str, subaccount_name: str) -> None:  # noqa: E501
         """This function may raise sqlcipher.DatabaseError"""
         write_cursor.execute(
@@ -2144,33 +2290,50 @@ class DBHandler:
 
         Returned list is ordered according to the passed filter query
         """
+        return list(self.iterate_asset_movements(cursor, filter_query=filter_query, has_premium=has_premium))  # noqa: E501
+
+    def iterate_asset_movements(
+            self,
+            cursor: 'DBCursor',
+            filter_query: AssetMovementsFilterQuery,
+            has_premium: bool,
+    ) -> Iterator[AssetMovement]:
+        """Like get_asset_movements but yields the asset movements as they are read
+        from the DB. The cursor can't be used for anything else until the iteration
+        is over."""
         query, bindings = filter_query.prepare()
         if has_premium:
             query = 'SELECT * from asset_movements ' + query
-            results = cursor.execute(query, bindings)
+            cursor.execute(query, bindings)
         else:
             query = 'SELECT * FROM (SELECT * from asset_movements ORDER BY time DESC LIMIT ?) ' + query  # noqa: E501
-            results = cursor.execute(query, [FREE_ASSET_MOVEMENTS_LIMIT] + bindings)
+            cursor.execute(query, [FREE_ASSET_MOVEMENTS_LIMIT] + bindings)
 
-        asset_movements = []
-        for result in results:
-            try:
-                movement = AssetMovement.deserialize_from_db(result)
-            except DeserializationError as e:
-                self.msg_aggregator.add_error(
-                    f'Error deserializing asset movement from the DB. '
-                    f'Skipping it. Error was: {str(e)}',
-                )
-                continue
-            except UnknownAsset as e:
-                self.msg_aggregator.add_error(
-                    f'Error deserializing asset movement from the DB. Skipping it. '
-                    f'Unknown asset {e.asset_name} found',
-                )
-                continue
-            asset_movements.append(movement)
+        yield from iterate_deserialized_rows(
+            cursor=cursor,
+            deserialize=AssetMovement.deserialize_from_db,
+            memo=DeserializationMemo(),
+            on_error=self._deserialization_error_reporter('asset movement', 'it'),
+            amount_columns=(7, 9),
+        )
+
+    def _deserialization_error_reporter(
+            self,
+            entry_name: str,
+            skipped_name: str,
+    ) -> Callable[[Any, Exception], None]:
+        """Returns a callback that reports an entry that could not be deserialized
+        from the DB to the user, as 'Skipping {skipped_name}.'"""
+        def report_error(entry: Any, e: Exception) -> None:  # pylint: disable=unused-argument
+            if isinstance(e, UnknownAsset):
+                error = f'Unknown asset {e.asset_name} found'
+            else:
+                error = f'Error was: {str(e)}'
+            self.msg_aggregator.add_error(
+                f'Error deserializing {entry_name} from the DB. Skipping {skipped_name}. {error}',  # noqa: E501
+            )
 
-        return asset_movements
+        return report_error
 
     # pylint: disable=no-self-use
     def get_entries_count(
@@ -2194,8 +2357,7 @@ class DBHandler:
             cursorstr += ' WHERE'
         op.join([f' {arg} = "{val}" ' for arg, val in kwargs.items()])
         cursorstr += ';'
-        cursor.execute(cursorstr)
-        return cursor.fetchone()[0]
+        return self.entries_count_cache.count(cursor, cursorstr, [])
 
     def delete_data_for_ethereum_address(self, write_cursor: 'DBCursor', address: ChecksumEthAddress) -> None:  # noqa: E501
         """Deletes all ethereum related data from the DB for a single ethereum address"""
@@ -2229,6 +2391,7 @@ class DBHandler:
             (f'{ETH2_DEPOSITS_PREFIX}_{address}',),
         )
         write_cursor.execute('DELETE FROM ethereum_accounts_details WHERE account = ?', (address,))
+        write_cursor.execute('DELETE FROM token_balances_cache WHERE address = ?', (address,))
         write_cursor.execute('DELETE FROM aave_events WHERE address = ?', (address,))
         write_cursor.execute('DELETE FROM adex_events WHERE address = ?', (address,))
         write_cursor.execute('DELETE FROM balancer_events WHERE address=?;', (address,))
@@ -2337,8 +2500,28 @@ class DBHandler:
         table_name = 'combined_trades_view' if has_premium else 'trades'
         query, bindings = filter_query.prepare(with_pagination=False)
         query = f'SELECT COUNT(*) from {table_name} ' + query
-        total_found_result = cursor.execute(query, bindings)
-        return trades, total_found_result.fetchone()[0]
+        return trades, self.entries_count_cache.count(cursor, query, bindings)
+
+    def get_trades_next_page_cursor(
+            self,
+            cursor: 'DBCursor',
+            filter_query: TradesFilterQuery,
+            has_premium: bool,
+    ) -> Optional[str]:
+        """Returns the cursor to continue the trades of the filter query after its page.
+        None if it is the last page or the query can't be continued from a cursor."""
+        last_entry = filter_query.prepare_last_page_entry()
+        if last_entry is None:
+            return None
+
+        columns, query, bindings = last_entry
+        if has_premium:
+            query = f'SELECT {columns} from combined_trades_view ' + query
+        else:
+            query = f'SELECT {columns} FROM (SELECT * from trades ORDER BY time DESC LIMIT ?) ' + query  # noqa: E501
+            bindings = [FREE_TRADES_LIMIT] + bindings
+        result = cursor.execute(query, bindings).fetchone()
+        return None if result is None else serialize_page_cursor(result)
 
     def get_trades(self, cursor: 'DBCursor', filter_query: TradesFilterQuery, has_premium: bool) -> List[Trade]:  # noqa: E501
         """Returns a list of trades optionally filtered by various filters.
@@ -2346,32 +2529,26 @@ class DBHandler:
         This will also take into account AMMSwaps and return them as trades via a view.
 
         The returned list is ordered according to the passed filter query"""
+        return list(self.iterate_trades(cursor, filter_query=filter_query, has_premium=has_premium))  # noqa: E501
+
+    def iterate_trades(self, cursor: 'DBCursor', filter_query: TradesFilterQuery, has_premium: bool) -> Iterator[Trade]:  # noqa: E501
+        """Like get_trades but yields the trades as they are read from the DB. The
+        cursor can't be used for anything else until the iteration is over."""
         query, bindings = filter_query.prepare()
         if has_premium:
             query = 'SELECT * from combined_trades_view ' + query
-            results = cursor.execute(query, bindings)
+            cursor.execute(query, bindings)
         else:
             query = 'SELECT * FROM (SELECT * from trades ORDER BY time DESC LIMIT ?) ' + query  # noqa: E501
-            results = cursor.execute(query, [FREE_TRADES_LIMIT] + bindings)
+            cursor.execute(query, [FREE_TRADES_LIMIT] + bindings)
 
-        trades = []
-        for result in results:
-            try:
-                trade = Trade.deserialize_from_db(result)
-            except DeserializationError as e:
-                self.msg_aggregator.add_error(
-                    f'Error deserializing trade from the DB. Skipping trade. Error was: {str(e)}',
-                )
-                continue
-            except UnknownAsset as e:
-                self.msg_aggregator.add_error(
-                    f'Error deserializing trade from the DB. Skipping trade. '
-                    f'Unknown asset {e.asset_name} found',
-                )
-                continue
-            trades.append(trade)
-
-        return trades
+        yield from iterate_deserialized_rows(
+            cursor=cursor,
+            deserialize=Trade.deserialize_from_db,
+            memo=DeserializationMemo(),
+            on_error=self._deserialization_error_reporter('trade', 'trade'),
+            amount_columns=(6, 7, 8),
+        )
 
     def delete_trade(self, write_cursor: 'DBCursor', trade_id: str) -> Tuple[bool, str]:
         write_cursor.execute('DELETE FROM trades WHERE id=?', (trade_id,))
@@ -2569,6 +2746,8 @@ class DBHandler:
 
         cursor.execute(querystr, bindings)
         results = cursor.fetchall()
+        amounts = fvals_from_strings(x[1] for x in results)
+        usd_values = fvals_from_strings(x[2] for x in results)
         balances = []
         results_length = len(results)
         for idx, result in enumerate(results):
@@ -2577,8 +2756,8 @@ class DBHandler:
             balances.append(
                 SingleDBAssetBalance(
                     time=entry_time,
-                    amount=FVal(result[1]),
-                    usd_value=FVal(result[2]),
+                    amount=amounts[idx],
+                    usd_value=usd_values[idx],
                     category=category,
                 ),
             )
@@ -2606,6 +2785,165 @@ class DBHandler:
 
         return balances
 
+    def _query_downsampled_series(
+            self,
+            cursor: 'DBCursor',
+            series: str,
+            bindings: List[Any],
+            columns: Tuple[str, ...],
+            downsampling: TimeSeriesDownsampling,
+    ) -> Tuple[int, int, List[Tuple[Any, ...]]]:
+        """Groups the rows of the series query, which needs to select `time` and the
+        given value columns, in time buckets. All the aggregation happens in SQL.
+
+        Returns the origin and width of the buckets along with a row per non empty
+        bucket ordered by time. Each row contains the bucket index, the times of the
+        first and last snapshots in the bucket, the min and max of each value column and
+        then the values of the last snapshot.
+        """
+        if downsampling.resolution is not None:
+            origin, width = 0, TIME_SERIES_RESOLUTION_SECONDS[downsampling.resolution]
+        else:
+            assert downsampling.buckets is not None, 'Either resolution or buckets is needed'
+            cursor.execute(f'SELECT MIN(time), MAX(time) FROM ({series})', bindings)
+            min_time, max_time = cursor.fetchone()
+            if min_time is None:
+                return 0, 1, []
+            origin = min_time
+            width = max(1, -(-(max_time - min_time + 1) // downsampling.buckets))
+
+        aggregates = ', '.join(
+            f'MIN(CAST({x} AS REAL)), MAX(CAST({x} AS REAL))' for x in columns
+        )
+        last_values = ', '.join(f'series.{x}' for x in columns)
+        cursor.execute(
+            f'WITH series AS ({series}), buckets AS ('
+            f'SELECT (time - ?) / ? AS bucket, MIN(time) AS first_time, '
+            f'MAX(time) AS last_time, {aggregates} FROM series GROUP BY bucket) '
+            f'SELECT buckets.*, {last_values} FROM buckets INNER JOIN series '
+            f'ON series.time = buckets.last_time ORDER BY buckets.bucket ASC;',
+            bindings + [origin, width],
+        )
+        return origin, width, cursor.fetchall()
+
+    def query_downsampled_timed_balances(
+            self,
+            cursor: 'DBCursor',
+            asset: Asset,
+            balance_type: BalanceType,
+            downsampling: TimeSeriesDownsampling,
+            from_ts: Optional[Timestamp] = None,
+            to_ts: Optional[Timestamp] = None,
+    ) -> List[DownsampledAssetBalance]:
+        """Like query_timed_balances but returns a single balance per time bucket with
+        the last, min and max values of the snapshots in it.
+
+        If ssf_0graph_multiplier is set then the empty buckets in gaps bigger than what
+        query_timed_balances would fill with zero balances get a zero balance.
+        """
+        if from_ts is None:
+            from_ts = Timestamp(0)
+        if to_ts is None:
+            to_ts = ts_now()
+
+        settings = self.get_settings(cursor)
+        if settings.treat_eth2_as_eth and asset.identifier == 'ETH':
+            series = (
+                'SELECT time, SUM(CAST(amount AS REAL)) AS amount, '
+                'SUM(CAST(usd_value AS REAL)) AS usd_value FROM timed_balances '
+                'WHERE time BETWEEN ? AND ? AND currency IN (?,?) AND category=? GROUP BY time'
+            )
+            bindings = [from_ts, to_ts, 'ETH', 'ETH2', balance_type.serialize_for_db()]
+        else:
+            series = (
+                'SELECT time, amount, usd_value FROM timed_balances '
+                'WHERE time BETWEEN ? AND ? AND currency=? AND category=?'
+            )
+            bindings = [from_ts, to_ts, asset.identifier, balance_type.serialize_for_db()]
+
+        origin, width, rows = self._query_downsampled_series(
+            cursor=cursor,
+            series=series,
+            bindings=bindings,
+            columns=('amount', 'usd_value'),
+            downsampling=downsampling,
+        )
+        max_diff = settings.balance_save_frequency * HOUR_IN_SECONDS * settings.ssf_0graph_multiplier  # noqa: E501
+        balances: List[DownsampledAssetBalance] = []
+        for idx, row in enumerate(rows):
+            bucket, _, last_time, min_amount, max_amount, min_usd_value, max_usd_value, amount, usd_value = row  # noqa: E501
+            balances.append(DownsampledAssetBalance(
+                category=balance_type,
+                time=Timestamp(last_time),
+                amount=FVal(amount),
+                usd_value=FVal(usd_value),
+                min_amount=FVal(min_amount),
+                max_amount=FVal(max_amount),
+                min_usd_value=FVal(min_usd_value),
+                max_usd_value=FVal(max_usd_value),
+            ))
+            if settings.ssf_0graph_multiplier == 0 or idx == len(rows) - 1:
+                continue
+
+            next_bucket, next_first_time = rows[idx + 1][0], rows[idx + 1][1]
+            if next_first_time - last_time <= max_diff:
+                continue
+
+            balances.extend(
+                DownsampledAssetBalance(
+                    category=balance_type,
+                    time=Timestamp(origin + empty_bucket * width),
+                    amount=ZERO,
+                    usd_value=ZERO,
+                    min_amount=ZERO,
+                    max_amount=ZERO,
+                    min_usd_value=ZERO,
+                    max_usd_value=ZERO,
+                ) for empty_bucket in range(bucket + 1, next_bucket)
+            )
+
+        return balances
+
+    def get_downsampled_netvalue_data(
+            self,
+            from_ts: Timestamp,
+            downsampling: TimeSeriesDownsampling,
+            include_nfts: bool = True,
+    ) -> Tuple[List[Timestamp], List[str], List[str], List[str]]:
+        """Like get_netvalue_data but returns a single entry per time bucket. Returns the
+        time and net value of the last snapshot of each bucket and the min and max net
+        values of the snapshots in each bucket."""
+        if include_nfts:
+            series = 'SELECT time, usd_value FROM timed_location_data WHERE location="H" AND time >= ?'  # noqa: E501
+            bindings: List[Any] = [from_ts]
+        else:
+            series = (
+                'SELECT location_data.time AS time, CAST(location_data.usd_value AS REAL) - '
+                'IFNULL(nfts.usd_value, 0) AS usd_value FROM timed_location_data AS location_data '
+                'LEFT JOIN (SELECT time, SUM(usd_value) AS usd_value FROM timed_balances '
+                'WHERE time >= ? AND currency LIKE ? GROUP BY time) AS nfts '
+                'ON nfts.time = location_data.time '
+                'WHERE location_data.location="H" AND location_data.time >= ?'
+            )
+            bindings = [from_ts, f'{NFT_DIRECTIVE}%', from_ts]
+
+        with self.conn.read_ctx() as cursor:
+            _, _, rows = self._query_downsampled_series(
+                cursor=cursor,
+                series=series,
+                bindings=bindings,
+                columns=('usd_value',),
+                downsampling=downsampling,
+            )
+
+        times, data, min_data, max_data = [], [], [], []
+        for _, _, last_time, min_value, max_value, value in rows:
+            times.append(Timestamp(last_time))
+            data.append(str(FVal(value)))
+            min_data.append(str(FVal(min_value)))
+            max_data.append(str(FVal(max_value)))
+        return times, data, min_data, max_data
+
     def query_owned_assets(self, cursor: 'DBCursor') -> List[Asset]:
         """Query the DB for a list of all assets ever owned
 
@@ -2791,6 +3129,27 @@ class DBHandler:
 
         return asset_balances
 
+    def get_latest_snapshot_assets(self, cursor: 'DBCursor') -> List[Asset]:
+        """Gets the assets and liabilities of the latest balance snapshot, without
+        the ignored assets and NFTs. Unknown assets are skipped."""
+        ignored_assets = self.get_ignored_assets(cursor)
+        cursor.execute(
+            'SELECT DISTINCT currency FROM timed_balances WHERE '
+            'time=(SELECT MAX(time) from timed_balances) AND currency NOT LIKE ?',
+            (f'{NFT_DIRECTIVE}%',),
+        )
+        assets = []
+        for (identifier,) in cursor:
+            try:
+                asset = Asset(identifier)
+            except (UnknownAsset, DeserializationError) as e:
+                log.debug(f'Skipping asset {identifier} of the latest balance snapshot due to {str(e)}')  # noqa: E501
+                continue
+            if asset not in ignored_assets:
+                assets.append(asset)
+
+        return assets
+
     def get_tags(self, cursor: 'DBCursor') -> Dict[str, Tag]:
         tags_mapping: Dict[str, Tag] = {}
         cursor.execute(
@@ -3023,6 +3382,10 @@ class DBHandler:
             'DELETE FROM xpubs WHERE xpub=? AND derivation_path IS ?;',
             (xpub_data.xpub.xpub, xpub_data.serialize_derivation_path_for_db()),
         )
+        write_cursor.execute(
+            'DELETE FROM xpub_derived_addresses WHERE xpub=? AND derivation_path IS ?;',
+            (xpub_data.xpub.xpub, xpub_data.serialize_derivation_path_for_db()),
+        )
 
     def edit_bitcoin_xpub(self, write_cursor: 'DBCursor', xpub_data: XpubData) -> None:
         """Edit the xpub tags and label
@@ -3124,6 +3487,39 @@ class DBHandler:
 
         return data
 
+    def get_xpub_derived_addresses(
+            self,
+            cursor: 'DBCursor',
+            xpub_data: XpubData,
+    ) -> Dict[Tuple[int, int], BTCAddress]:
+        """Get the addresses derived so far from the xpub keyed by account and derived index"""
+        cursor.execute(
+            'SELECT account_index, derived_index, address FROM xpub_derived_addresses '
+            'WHERE xpub=? AND derivation_path IS ?;',
+            (xpub_data.xpub.xpub, xpub_data.serialize_derivation_path_for_db()),
+        )
+        return {(entry[0], entry[1]): BTCAddress(entry[2]) for entry in cursor}
+
+    def add_xpub_derived_addresses(
+            self,
+            write_cursor: 'DBCursor',
+            xpub_data: XpubData,
+            addresses: Dict[Tuple[int, int], BTCAddress],
+    ) -> None:
+        """Cache addresses derived from the xpub keyed by account and derived index"""
+        write_cursor.executemany(
+            'INSERT OR IGNORE INTO xpub_derived_addresses'
+            '(xpub, derivation_path, account_index, derived_index, address) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [(
+                xpub_data.xpub.xpub,
+                xpub_data.serialize_derivation_path_for_db(),
+                account_index,
+                derived_index,
+                address,
+            ) for (account_index, derived_index), address in addresses.items()],
+        )
+
     def ensure_xpub_mappings_exist(
             self,
             write_cursor: 'DBCursor',
@@ -3238,6 +3634,7 @@ class DBHandler:
             version = self.get_setting(cursor, 'version')
         new_db_filename = f'{ts_now()}_rotkehlchen_db_v{version}.backup'
         new_db_path = self.user_data_dir / new_db_filename
+        self.conn.wal_checkpoint()
         shutil.copyfile(
             self.user_data_dir / 'rotkehlchen.db',
             new_db_path,
@@ -3,11 +3,23 @@
 but heavily modified"""
 
 import sqlite3
+import time
 from contextlib import contextmanager
 from enum import Enum, auto
 from pathlib import Path
 from types import TracebackType
-from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Sequence, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 import gevent
 from pysqlcipher3 import dbapi2 as sqlcipher
@@ -23,6 +35,7 @@ import logging
 
 logger: 'RotkehlchenLogger' = logging.getLogger(__name__)  # type: ignore
 SQL_VM_INSTRUCTIONS_CB = 5000  # maybe make this configurable
+DEFAULT_READ_POOL_SIZE = 4
 
 
 class DBCursor:
@@ -181,6 +194,128 @@ CALLBACK_MAP = {
 }
 
 
+def reader_callback() -> int:
+    """Progress callback of the read only connections. They never enter a critical
+    section so they can always yield to other greenlets"""
+    gevent.sleep(0)
+    return 0
+
+
+class ConnectionWaitStats:
+    """Keeps track of the time spent waiting to get hold of a connection"""
+
+    __slots__ = ('waits', 'total_wait', 'max_wait')
+
+    def __init__(self) -> None:
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.waits += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+    def serialize(self) -> Dict[str, Union[int, float]]:
+        return {'waits': self.waits, 'total_wait': self.total_wait, 'max_wait': self.max_wait}
+
+
+class DBReadPool:
+    """A pool of read only connections to the same DB file as a DBConnection
+
+    The DB needs to be in WAL mode so that the readers see the last committed state
+    of the DB without ever waiting for the writer and without blocking it.
+
+    Connections are opened lazily up to the size of the pool. A greenlet keeps using
+    the same reader for nested read contexts. If all readers are busy acquire() does
+    not wait but returns None so that the caller can read from the main connection.
+
+    Readers that are in use when the pool is reset are closed once released.
+    """
+
+    def __init__(
+            self,
+            path: Union[str, Path],
+            connection_type: DBConnectionType,
+            size: int,
+            init_script: Optional[str],
+    ) -> None:
+        self.path = path
+        self.connection_type = connection_type
+        self.size = size
+        self.init_script = init_script
+        self.idle: List[UnderlyingConnection] = []
+        self.readers: List[UnderlyingConnection] = []
+        # greenlet -> (reader, number of read contexts of the greenlet using it)
+        self.in_use: Dict[Any, Tuple[UnderlyingConnection, int]] = {}
+        self.fallbacks = 0
+
+    def _open_reader(self) -> UnderlyingConnection:
+        conn: UnderlyingConnection
+        if self.connection_type == DBConnectionType.GLOBAL:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+        else:
+            conn = sqlcipher.connect(self.path, check_same_thread=False)  # pylint: disable=no-member  # noqa: E501
+        if self.init_script is not None:
+            conn.executescript(self.init_script)
+        conn.execute('PRAGMA query_only=ON')
+        # https://github.com/python/typeshed/issues/8105
+        conn.set_progress_handler(reader_callback, SQL_VM_INSTRUCTIONS_CB)  # type: ignore
+        return conn
+
+    def acquire(self) -> Optional[UnderlyingConnection]:
+        """Gets the reader of the current greenlet, an idle one or a newly opened one
+        if the pool is not full yet. Returns None if all readers are busy."""
+        greenlet = gevent.getcurrent()
+        entry = self.in_use.get(greenlet)
+        if entry is not None:
+            self.in_use[greenlet] = (entry[0], entry[1] + 1)
+            return entry[0]
+
+        if len(self.idle) != 0:
+            conn = self.idle.pop()
+        elif len(self.readers) < self.size:
+            conn = self._open_reader()
+            self.readers.append(conn)
+        else:
+            self.fallbacks += 1
+            return None
+
+        self.in_use[greenlet] = (conn, 1)
+        return conn
+
+    def release(self) -> None:
+        """Releases the reader of the current greenlet once its last read context exits"""
+        greenlet = gevent.getcurrent()
+        entry = self.in_use.pop(greenlet, None)
+        if entry is None:  # the pool got closed in the meantime
+            return
+
+        conn, users = entry
+        if users > 1:
+            self.in_use[greenlet] = (conn, users - 1)
+        elif conn in self.readers:
+            self.idle.append(conn)
+        else:  # opened before the pool got reset
+            conn.close()
+
+    def reset(self, init_script: Optional[str]) -> None:
+        """Closes the readers so that new ones are opened with the given init script.
+        Readers in use are closed once released."""
+        self.init_script = init_script
+        for conn in self.idle:
+            conn.close()
+        self.readers = []
+        self.idle = []
+
+    def close(self) -> None:
+        for conn in self.readers:
+            conn.close()
+        self.readers = []
+        self.idle = []
+        self.in_use = {}
+
+
 class DBConnection:
 
     def _set_progress_handler(self) -> None:
@@ -191,8 +326,14 @@ class DBConnection:
     def __init__(self, path: Union[str, Path], connection_type: DBConnectionType) -> None:
         self._conn: UnderlyingConnection
         self._in_critical_section = False
+        self._critical_section_owner: Any = None  # the greenlet in the critical section
         self.in_callback = gevent.lock.Semaphore()
         self.connection_type = connection_type
+        self.path = path
+        self.read_pool: Optional[DBReadPool] = None
+        self._keep_wal = True
+        self.writer_wait_stats = ConnectionWaitStats()
+        self.reader_wait_stats = ConnectionWaitStats()
         if connection_type == DBConnectionType.GLOBAL:
             self._conn = sqlite3.connect(path, check_same_thread=False)
         else:
@@ -201,18 +342,81 @@ class DBConnection:
         CONNECTION_MAP[connection_type] = self
 
     def enter_critical_section(self) -> None:
+        start = time.monotonic()
         with self.in_callback:
+            self.writer_wait_stats.record(time.monotonic() - start)
             if __debug__:
                 logger.trace('entering critical section')
             self._in_critical_section = True
+            self._critical_section_owner = gevent.getcurrent()
             self._conn.set_progress_handler(None, 0)
 
     def exit_critical_section(self) -> None:
         if __debug__:
             logger.trace('exiting critical section')
         self._in_critical_section = False
+        self._critical_section_owner = None
         self._set_progress_handler()
 
+    def enable_read_pool(
+            self,
+            init_script: Optional[str] = None,
+            keep_wal: bool = True,
+            size: int = DEFAULT_READ_POOL_SIZE,
+    ) -> bool:
+        """Switches the DB to WAL mode and creates a pool of read only connections
+        to be handed out by read_ctx. init_script is run at each new reader connection.
+
+        If keep_wal is False the DB is switched back to the default journal mode when
+        the connection is closed, so that the DB is always a single file while not in use.
+
+        Returns False if the DB could not be switched to WAL mode, in which case
+        all reads keep going through this connection.
+        """
+        result = self._conn.execute('PRAGMA journal_mode=WAL').fetchone()
+        if result is None or result[0].lower() != 'wal':
+            logger.warning(
+                f'Could not switch {self.connection_type.name} DB to WAL mode. '
+                f'Will not use a read connection pool',
+            )
+            return False
+
+        self._keep_wal = keep_wal
+        self.read_pool = DBReadPool(
+            path=self.path,
+            connection_type=self.connection_type,
+            size=size,
+            init_script=init_script,
+        )
+        return True
+
+    def _should_read_from_pool(self) -> bool:
+        """Reads go to the pool unless they need to see changes not yet committed
+        by this connection. That is reads of the greenlet in the critical section and
+        any read while there are pending changes made outside of a critical section.
+        """
+        if self._in_critical_section:
+            return self._critical_section_owner is not gevent.getcurrent()
+        return not self.in_transaction
+
+    def reset_read_pool(self, init_script: Optional[str]) -> None:
+        """Makes the read pool open its connections with a new init script, such as
+        after the DB key changed"""
+        if self.read_pool is not None:
+            self.read_pool.reset(init_script)
+
+    def get_wait_stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """Returns the time spent waiting to get hold of the writer and of a connection
+        to read from. The latter counts reads from a pool reader and from this
+        connection, such as when all readers are busy."""
+        stats: Dict[str, Dict[str, Union[int, float]]] = {
+            'writer': self.writer_wait_stats.serialize(),
+            'reader': self.reader_wait_stats.serialize(),
+        }
+        if self.read_pool is not None:
+            stats['pool_exhausted'] = {'waits': self.read_pool.fallbacks}
+        return stats
+
     def execute(self, statement: str, *bindings: Sequence) -> DBCursor:
         if __debug__:
             logger.trace(f'DB CONNECTION EXECUTE {statement}')
@@ -263,17 +467,55 @@ class DBConnection:
     def cursor(self) -> DBCursor:
         return DBCursor(connection=self, cursor=self._conn.cursor())
 
+    def wal_checkpoint(self) -> None:
+        """Moves all committed changes from the WAL into the DB file itself.
+        Needs to be called before copying the DB file while connected."""
+        if self.read_pool is not None:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
     def close(self) -> None:
+        if self.read_pool is not None:
+            logger.debug(f'{self.connection_type.name} DB connection wait stats: {self.get_wait_stats()}')  # noqa: E501
+            self.read_pool.close()
+            self.read_pool = None
+            if self._keep_wal is False:
+                try:
+                    self._conn.execute('PRAGMA journal_mode=DELETE')
+                except (sqlite3.OperationalError, sqlcipher.OperationalError) as e:  # pylint: disable=no-member  # noqa: E501
+                    logger.warning(f'Could not switch {self.connection_type.name} DB out of WAL mode: {str(e)}')  # noqa: E501
         self._conn.close()
         CONNECTION_MAP.pop(self.connection_type, None)
 
     @contextmanager
     def read_ctx(self) -> Generator['DBCursor', None, None]:
-        cursor = self.cursor()
+        start = time.monotonic()
+        read_pool = self.read_pool
+        if read_pool is None or self._should_read_from_pool() is False:
+            cursor = self.cursor()
+            self.reader_wait_stats.record(time.monotonic() - start)
+            try:
+                yield cursor
+            finally:
+                cursor.close()  # lgtm [py/should-use-with]
+            return
+
+        reader = read_pool.acquire()
+        if reader is None:  # all readers are busy
+            cursor = self.cursor()
+            self.reader_wait_stats.record(time.monotonic() - start)
+            try:
+                yield cursor
+            finally:
+                cursor.close()  # lgtm [py/should-use-with]
+            return
+
+        cursor = DBCursor(connection=self, cursor=reader.cursor())
+        self.reader_wait_stats.record(time.monotonic() - start)
         try:
             yield cursor
         finally:
             cursor.close()  # lgtm [py/should-use-with]
+            read_pool.release()
 
     @contextmanager
     def write_ctx(self) -> Generator['DBCursor', None, None]:
@@ -290,6 +532,11 @@ class DBConnection:
             cursor.close()  # lgtm [py/should-use-with]
             self.exit_critical_section()
 
+    @property
+    def in_transaction(self) -> bool:
+        """True if there are changes made through this connection not committed yet"""
+        return self._conn.in_transaction
+
     @property
     def total_changes(self) -> int:
         """total number of database rows that have been modified, inserted,
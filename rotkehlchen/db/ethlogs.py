@@ -0,0 +1,76 @@
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from rotkehlchen.chain.ethereum.constants import RANGE_PREFIX_ETHLOGS
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
+
+class DBEthLogs():
+    """The block ranges already scanned by get_logs queries and the logs in them
+
+    The ranges are kept in used_query_ranges, with block numbers instead of timestamps
+    """
+
+    def __init__(self, database: 'DBHandler') -> None:
+        self.db = database
+
+    def get_query_range(self, cursor: 'DBCursor', query_name: str) -> Optional[Tuple[int, int]]:  # noqa: E501
+        cursor.execute(
+            'SELECT start_ts, end_ts FROM used_query_ranges WHERE name=?',
+            (query_name,),
+        )
+        result = cursor.fetchone()
+        if result is None:
+            return None
+
+        return int(result[0]), int(result[1])
+
+    def get_logs(
+            self,
+            cursor: 'DBCursor',
+            query_name: str,
+            from_block: int,
+            to_block: int,
+    ) -> List[Dict[str, Any]]:
+        cursor.execute(
+            'SELECT log FROM ethereum_logs_cache WHERE query_name=? AND '
+            'block_number >= ? AND block_number <= ? ORDER BY block_number, log_index',
+            (query_name, from_block, to_block),
+        )
+        return [json.loads(entry[0]) for entry in cursor]
+
+    def add_logs(
+            self,
+            write_cursor: 'DBCursor',
+            query_name: str,
+            from_block: int,
+            to_block: int,
+            logs: List[Dict[str, Any]],
+    ) -> None:
+        """Saves the logs of a query that has scanned all blocks from from_block to
+        to_block and extends its saved range to cover them. The given range has to be
+        contiguous with the saved one."""
+        write_cursor.executemany(
+            'INSERT OR IGNORE INTO ethereum_logs_cache(query_name, block_number, log_index, log) '  # noqa: E501
+            'VALUES(?, ?, ?, ?)',
+            [(query_name, x['blockNumber'], x['logIndex'], json.dumps(x)) for x in logs],
+        )
+        saved_range = self.get_query_range(write_cursor, query_name)
+        if saved_range is not None:
+            from_block = min(from_block, saved_range[0])
+            to_block = max(to_block, saved_range[1])
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO used_query_ranges(name, start_ts, end_ts) VALUES (?, ?, ?)',
+            (query_name, from_block, to_block),
+        )
+
+    def purge_logs(self, write_cursor: 'DBCursor') -> None:
+        """Deletes all saved logs along with the block ranges they were scanned in"""
+        write_cursor.execute(
+            'DELETE FROM used_query_ranges WHERE name LIKE ? ESCAPE ?;',
+            (f'{RANGE_PREFIX_ETHLOGS}\\_%', '\\'),
+        )
+        write_cursor.execute('DELETE FROM ethereum_logs_cache;')
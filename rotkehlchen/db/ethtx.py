@@ -11,7 +11,8 @@ from rotkehlchen.chain.ethereum.constants import (
 )
 from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxReceiptLog
 from rotkehlchen.db.constants import HISTORY_MAPPING_DECODED
-from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
+from rotkehlchen.db.ethlogs import DBEthLogs
+from rotkehlchen.db.filtering import ETHTransactionsFilterQuery, serialize_page_cursor
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -29,7 +30,7 @@ from rotkehlchen.types import (
     make_evm_tx_hash,
 )
 from rotkehlchen.utils.hexbytes import hexstring_to_bytes
-from rotkehlchen.utils.misc import hexstr_to_int
+from rotkehlchen.utils.misc import get_chunks, hexstr_to_int
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -40,6 +41,10 @@ if TYPE_CHECKING:
 
 from rotkehlchen.constants.limits import FREE_ETH_TX_LIMIT
 
+# Max number of transactions whose data are loaded by a single query. Keeps the
+# number of bindings of the query below the limit of sqlite.
+TX_BULK_LOAD_CHUNK_SIZE = 500
+
 
 class DBEthTx():
 
@@ -178,31 +183,36 @@ class DBEthTx():
 
         ethereum_transactions = []
         for result in results:
-            try:
-                tx = EthereumTransaction(
-                    tx_hash=make_evm_tx_hash(result[0]),
-                    timestamp=deserialize_timestamp(result[1]),
-                    block_number=result[2],
-                    from_address=result[3],
-                    to_address=result[4],
-                    value=int(result[5]),
-                    gas=int(result[6]),
-                    gas_price=int(result[7]),
-                    gas_used=int(result[8]),
-                    input_data=result[9],
-                    nonce=result[10],
-                )
-            except DeserializationError as e:
-                self.db.msg_aggregator.add_error(
-                    f'Error deserializing ethereum transaction from the DB. '
-                    f'Skipping it. Error was: {str(e)}',
-                )
-                continue
-
-            ethereum_transactions.append(tx)
+            tx = self._deserialize_ethereum_transaction(result)
+            if tx is not None:
+                ethereum_transactions.append(tx)
 
         return ethereum_transactions
 
+    def _deserialize_ethereum_transaction(self, entry: Tuple[Any, ...]) -> Optional[EthereumTransaction]:  # noqa: E501
+        """Turns a row of ethereum_transactions into an EthereumTransaction. If that's
+        not possible the error is reported to the user and None is returned"""
+        try:
+            return EthereumTransaction(
+                tx_hash=make_evm_tx_hash(entry[0]),
+                timestamp=deserialize_timestamp(entry[1]),
+                block_number=entry[2],
+                from_address=entry[3],
+                to_address=entry[4],
+                value=int(entry[5]),
+                gas=int(entry[6]),
+                gas_price=int(entry[7]),
+                gas_used=int(entry[8]),
+                input_data=entry[9],
+                nonce=entry[10],
+            )
+        except DeserializationError as e:
+            self.db.msg_aggregator.add_error(
+                f'Error deserializing ethereum transaction from the DB. '
+                f'Skipping it. Error was: {str(e)}',
+            )
+            return None
+
     def get_ethereum_transactions_and_limit_info(
             self,
             cursor: 'DBCursor',
@@ -216,8 +226,28 @@ class DBEthTx():
         txs = self.get_ethereum_transactions(cursor, filter_=filter_, has_premium=has_premium)
         query, bindings = filter_.prepare(with_pagination=False)
         query = 'SELECT COUNT(DISTINCT ethereum_transactions.tx_hash) FROM ethereum_transactions ' + query  # noqa: E501
-        total_found_result = cursor.execute(query, bindings)
-        return txs, total_found_result.fetchone()[0]  # always returns result
+        return txs, self.db.entries_count_cache.count(cursor, query, bindings)
+
+    def get_ethereum_transactions_next_page_cursor(
+            self,
+            cursor: 'DBCursor',
+            filter_: ETHTransactionsFilterQuery,
+            has_premium: bool,
+    ) -> Optional[str]:
+        """Returns the cursor to continue the transactions of the filter after its page.
+        None if it is the last page or the query can't be continued from a cursor."""
+        last_entry = filter_.prepare_last_page_entry()
+        if last_entry is None:
+            return None
+
+        columns, query, bindings = last_entry
+        if has_premium:
+            query = f'SELECT DISTINCT {columns} FROM ethereum_transactions ' + query
+        else:
+            query = f'SELECT DISTINCT {columns} FROM (SELECT * from ethereum_transactions ORDER BY timestamp DESC LIMIT ?) ethereum_transactions ' + query  # noqa: E501
+            bindings = [FREE_ETH_TX_LIMIT] + bindings
+        result = cursor.execute(query, bindings).fetchone()
+        return None if result is None else serialize_page_cursor(result)
 
     def purge_ethereum_transaction_data(self) -> None:
         """Deletes all ethereum transaction related data from the DB"""
@@ -231,6 +261,7 @@ class DBEthTx():
                 ],
             )
             cursor.execute('DELETE FROM ethereum_transactions;')
+            DBEthLogs(self.db).purge_logs(cursor)
 
     def get_transaction_hashes_no_receipt(
             self,
@@ -337,40 +368,90 @@ class DBEthTx():
                     topic_tuples,
                 )
 
-    def get_receipt(self, cursor: 'DBCursor', tx_hash: EVMTxHash) -> Optional[EthereumTxReceipt]:  # pylint: disable=no-self-use  # noqa: E501
-        cursor.execute('SELECT * from ethtx_receipts WHERE tx_hash=?', (tx_hash,))
-        result = cursor.fetchone()
-        if result is None:
-            return None
+    def get_receipt(self, cursor: 'DBCursor', tx_hash: EVMTxHash) -> Optional[EthereumTxReceipt]:  # noqa: E501
+        return self.get_receipts(cursor, [tx_hash]).get(tx_hash)
 
-        tx_receipt = EthereumTxReceipt(
-            tx_hash=tx_hash,
-            contract_address=result[1],
-            status=bool(result[2]),  # works since value is either 0 or 1
-            type=result[3],
-        )
+    def get_receipts(  # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            tx_hashes: List[EVMTxHash],
+    ) -> Dict[EVMTxHash, EthereumTxReceipt]:
+        """Gets the receipts of the given transactions along with their logs and topics
+        with three queries per TX_BULK_LOAD_CHUNK_SIZE transactions
 
-        cursor.execute('SELECT * from ethtx_receipt_logs WHERE tx_hash=?', (tx_hash,))
-        with self.db.conn.read_ctx() as other_cursor:
-            for result in cursor:
-                log_index = result[1]
-                tx_receipt_log = EthereumTxReceiptLog(
-                    log_index=log_index,
-                    data=result[2],
-                    address=result[3],
-                    removed=bool(result[4]),  # works since value is either 0 or 1
+        Transactions whose receipt is not in the DB are missing from the result
+        """
+        receipts: Dict[EVMTxHash, EthereumTxReceipt] = {}
+        for chunk in get_chunks(tx_hashes, n=TX_BULK_LOAD_CHUNK_SIZE):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(
+                f'SELECT tx_hash, contract_address, status, type FROM ethtx_receipts '
+                f'WHERE tx_hash IN ({placeholders})',
+                chunk,
+            )
+            for entry in cursor:
+                tx_hash = make_evm_tx_hash(entry[0])
+                receipts[tx_hash] = EthereumTxReceipt(
+                    tx_hash=tx_hash,
+                    contract_address=entry[1],
+                    status=bool(entry[2]),  # works since value is either 0 or 1
+                    type=entry[3],
                 )
-                other_cursor.execute(
-                    'SELECT topic from ethtx_receipt_log_topics WHERE tx_hash=? AND log_index=? '
-                    'ORDER BY topic_index ASC',
-                    (tx_hash, log_index),
+
+            tx_logs: Dict[Tuple[bytes, int], EthereumTxReceiptLog] = {}
+            cursor.execute(
+                f'SELECT tx_hash, log_index, data, address, removed FROM ethtx_receipt_logs '
+                f'WHERE tx_hash IN ({placeholders}) ORDER BY tx_hash, log_index',
+                chunk,
+            )
+            for entry in cursor:
+                tx_log = EthereumTxReceiptLog(
+                    log_index=entry[1],
+                    data=entry[2],
+                    address=entry[3],
+                    removed=bool(entry[4]),  # works since value is either 0 or 1
                 )
-                for topic_result in other_cursor:
-                    tx_receipt_log.topics.append(topic_result[0])
+                receipts[entry[0]].logs.append(tx_log)
+                tx_logs[(entry[0], entry[1])] = tx_log
+
+            cursor.execute(
+                f'SELECT tx_hash, log_index, topic FROM ethtx_receipt_log_topics '
+                f'WHERE tx_hash IN ({placeholders}) ORDER BY tx_hash, log_index, topic_index',
+                chunk,
+            )
+            for entry in cursor:
+                tx_logs[(entry[0], entry[1])].topics.append(entry[2])
+
+        return receipts
+
+    def get_transactions_and_receipts(
+            self,
+            cursor: 'DBCursor',
+            tx_hashes: List[EVMTxHash],
+    ) -> List[Tuple[EthereumTransaction, EthereumTxReceipt]]:
+        """Gets the given transactions along with their receipts with four queries per
+        TX_BULK_LOAD_CHUNK_SIZE transactions, in the order of the given hashes
 
-                tx_receipt.logs.append(tx_receipt_log)
+        Transactions that are not in the DB or whose receipt is not are skipped
+        """
+        receipts = self.get_receipts(cursor, tx_hashes)
+        transactions: Dict[EVMTxHash, EthereumTransaction] = {}
+        for chunk in get_chunks(list(receipts), n=TX_BULK_LOAD_CHUNK_SIZE):
+            cursor.execute(
+                'SELECT tx_hash, timestamp, block_number, from_address, to_address, value, '
+                'gas, gas_price, gas_used, input_data, nonce FROM ethereum_transactions '
+                f'WHERE tx_hash IN ({",".join("?" * len(chunk))})',
+                chunk,
+            )
+            for entry in cursor:
+                tx = self._deserialize_ethereum_transaction(entry)
+                if tx is not None:
+                    transactions[tx.tx_hash] = tx
 
-        return tx_receipt
+        return [
+            (transactions[tx_hash], receipts[tx_hash])
+            for tx_hash in tx_hashes if tx_hash in transactions
+        ]
 
     def delete_transactions(self, write_cursor: 'DBCursor', address: ChecksumEthAddress) -> None:
         """Delete all transactions related data to the given address from the DB
@@ -425,6 +506,37 @@ class DBEthTx():
 
         return max(starts), min(ends)
 
+    def get_token_activity_blocks(  # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEthAddress,
+            from_block: int,
+    ) -> Tuple[Dict[ChecksumEthAddress, int], Optional[int]]:
+        """Finds which contracts may have changed a token balance of the address after
+        from_block, according to the saved transactions of the address
+
+        Returns a mapping of each contract that emitted a log in a transaction of the
+        address after from_block to the last block it did so, along with the last block
+        after from_block of a transaction of the address whose receipt is not saved yet,
+        or None if there is no such transaction.
+        """
+        cursor.execute(
+            'SELECT C.address, MAX(A.block_number) FROM ethereum_transactions AS A '
+            'INNER JOIN ethtx_address_mappings AS B ON A.tx_hash=B.tx_hash '
+            'INNER JOIN ethtx_receipt_logs AS C ON A.tx_hash=C.tx_hash '
+            'WHERE B.address=? AND A.block_number > ? GROUP BY C.address',
+            (address, from_block),
+        )
+        contract_blocks = {x[0]: x[1] for x in cursor}
+        cursor.execute(
+            'SELECT MAX(A.block_number) FROM ethereum_transactions AS A '
+            'INNER JOIN ethtx_address_mappings AS B ON A.tx_hash=B.tx_hash '
+            'WHERE B.address=? AND A.block_number > ? AND '
+            'A.tx_hash NOT IN (SELECT tx_hash FROM ethtx_receipts)',
+            (address, from_block),
+        )
+        return contract_blocks, cursor.fetchone()[0]
+
     def get_max_genesis_trace_id(self) -> int:
         """Get the max trace id of genesis internal transactions from the database.
         If no internal transactions were found, returns 0 (zero)."""
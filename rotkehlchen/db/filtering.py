@@ -1,11 +1,16 @@
+import base64
+import binascii
+import copy
+import json
 import logging
 from dataclasses import dataclass
-from typing import Any, List, Literal, NamedTuple, Optional, Tuple, Union, cast
+from typing import Any, List, Literal, NamedTuple, Optional, Sequence, Tuple, Union, cast
 
 from rotkehlchen.accounting.ledger_actions import LedgerActionType
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.accounting.types import SchemaEventType
 from rotkehlchen.assets.asset import Asset
+from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -22,6 +27,49 @@ from rotkehlchen.utils.misc import ts_now
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+KeysetValue = Union[int, str, bytes]
+
+
+def serialize_page_cursor(values: Sequence[KeysetValue]) -> str:
+    """Turns the values of the keyset columns of the last entry of a page into the
+    opaque cursor string the API gives out for the next page"""
+    tagged_values = []
+    for value in values:
+        if isinstance(value, bytes):
+            tagged_values.append(['b', value.hex()])
+        elif isinstance(value, int):
+            tagged_values.append(['i', value])
+        else:
+            tagged_values.append(['s', value])
+
+    return base64.urlsafe_b64encode(json.dumps(tagged_values).encode()).decode()
+
+
+def deserialize_page_cursor(cursor: str) -> List[KeysetValue]:
+    """Reverses serialize_page_cursor
+
+    May raise:
+    - DeserializationError if the cursor was not given out by serialize_page_cursor
+    """
+    try:
+        tagged_values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values: List[KeysetValue] = []
+        for tag, value in tagged_values:
+            if tag == 'b':
+                values.append(bytes.fromhex(value))
+            elif tag == 'i' and isinstance(value, int):
+                values.append(value)
+            elif tag == 's' and isinstance(value, str):
+                values.append(value)
+            else:
+                raise ValueError(f'Unexpected value {value} with tag {tag}')
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise DeserializationError(f'Invalid page cursor {cursor}') from e
+
+    if len(values) == 0:
+        raise DeserializationError(f'Invalid page cursor {cursor}')
+    return values
+
 
 class DBFilterOrder(NamedTuple):
     rules: List[Tuple[str, bool]]
@@ -57,6 +105,25 @@ class DBFilter():
         raise NotImplementedError('prepare should be implemented by subclasses')
 
 
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class DBKeysetFilter(DBFilter):
+    """Continues a listing ordered by the given columns after the entry that had the
+    given values in them. The last column needs to be unique. Unlike with an offset
+    SQLite seeks to the first entry of the page in the index of the columns instead of
+    walking and discarding all the entries of the earlier pages."""
+    columns: List[str]
+    ascending: bool
+    after: Optional[List[KeysetValue]] = None
+
+    def prepare(self) -> Tuple[List[str], List[Any]]:
+        if self.after is None:
+            return [], []
+
+        questionmarks = ','.join('?' * len(self.columns))
+        operator = '>' if self.ascending else '<'
+        return [f'({",".join(self.columns)}) {operator} ({questionmarks})'], list(self.after)
+
+
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
 class DBTimestampFilter(DBFilter):
     timestamp_attribute: str = 'timestamp'
@@ -186,6 +253,7 @@ class DBFilterQuery():
     join_clause: Optional[DBFilter] = None
     order_by: Optional[DBFilterOrder] = None
     pagination: Optional[DBFilterPagination] = None
+    keyset: Optional[DBKeysetFilter] = None
 
     def prepare(
             self,
@@ -210,9 +278,17 @@ class DBFilterQuery():
             filterstrings.append(f'({operator.join(filters)})')
             bindings.extend(single_bindings)
 
-        if len(filterstrings) != 0:
+        keyset_filters: List[str] = []
+        if with_pagination and self.pagination is not None and self.keyset is not None:
+            keyset_filters, keyset_bindings = self.keyset.prepare()
+
+        if len(filterstrings) != 0 or len(keyset_filters) != 0:
             operator = ' AND ' if self.and_op else ' OR '
-            filter_query = f'{"WHERE " if self.join_clause is None else "AND ("}{operator.join(filterstrings)}{"" if self.join_clause is None else ")"}'  # noqa: E501
+            conditions = operator.join(filterstrings)
+            if len(keyset_filters) != 0:  # the page bound applies whatever the operator is
+                conditions = keyset_filters[0] if conditions == '' else f'({conditions}) AND {keyset_filters[0]}'  # noqa: E501
+                bindings.extend(keyset_bindings)
+            filter_query = f'{"WHERE " if self.join_clause is None else "AND ("}{conditions}{"" if self.join_clause is None else ")"}'  # noqa: E501
             query_parts.append(filter_query)
 
         if with_order and self.order_by is not None:
@@ -232,11 +308,47 @@ class DBFilterQuery():
             limit: Optional[int],
             offset: Optional[int],
             order_by_rules: Optional[List[Tuple[str, bool]]] = None,
+            keyset_columns: Optional[List[str]] = None,
+            after: Optional[List[KeysetValue]] = None,
     ) -> 'DBFilterQuery':
-        if limit is None or offset is None:
+        """If the query is paginated and ordered by the first of keyset_columns then
+        it is ordered by all of them, so that the pages can also be continued with a
+        cursor. after are the values of the keyset columns of the last entry of the
+        previous page, as selected by the query of prepare_last_page_entry.
+
+        May raise:
+        - InputError if after is given but the query can't be continued from it
+        """
+        if limit is None or (offset is None and after is None):
             pagination = None
-        else:
-            pagination = DBFilterPagination(limit=limit, offset=offset)
+        else:  # a cursor replaces the offset
+            pagination = DBFilterPagination(limit=limit, offset=offset or 0)
+
+        keyset = None
+        if pagination is not None and order_by_rules is not None and keyset_columns is not None:
+            ascending = order_by_rules[0][1]
+            ordered_columns = [column for column, _ in order_by_rules]
+            if (
+                keyset_columns[:len(ordered_columns)] == ordered_columns and
+                all(rule_ascending == ascending for _, rule_ascending in order_by_rules)
+            ):
+                order_by_rules = [(column, ascending) for column in keyset_columns]
+                keyset = DBKeysetFilter(
+                    and_op=True,
+                    columns=keyset_columns,
+                    ascending=ascending,
+                    after=after,
+                )
+
+        if after is not None:
+            if keyset is None:
+                raise InputError(
+                    f'Only queries with a limit that are ordered by '
+                    f'{keyset_columns[0] if keyset_columns else "their keyset columns"} '
+                    f'can be continued from a cursor',
+                )
+            if len(after) != len(keyset.columns):
+                raise InputError('The given cursor is not one of this query')
 
         if order_by_rules is None:
             order_by = None
@@ -248,7 +360,23 @@ class DBFilterQuery():
             filters=[],
             order_by=order_by,
             pagination=pagination,
+            keyset=keyset,
+        )
+
+    def prepare_last_page_entry(self) -> Optional[Tuple[str, str, List[Any]]]:
+        """Returns the keyset columns along with the query and bindings that select
+        only the last entry of the page of this query, which the next page continues
+        from. None if the query can't be continued from a cursor."""
+        if self.keyset is None or self.pagination is None:
+            return None
+
+        last_entry_query = copy.copy(self)
+        last_entry_query.pagination = DBFilterPagination(
+            limit=1,
+            offset=self.pagination.offset + self.pagination.limit - 1,
         )
+        query, bindings = last_entry_query.prepare()
+        return ','.join(self.keyset.columns), query, bindings
 
 
 class FilterWithTimestamp():
@@ -308,6 +436,7 @@ class ETHTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp):
             order_by_rules: Optional[List[Tuple[str, bool]]] = None,
             limit: Optional[int] = None,
             offset: Optional[int] = None,
+            after: Optional[List[KeysetValue]] = None,
             addresses: Optional[List[ChecksumEthAddress]] = None,  # noqa: E501
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
@@ -324,6 +453,8 @@ class ETHTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp):
             limit=limit,
             offset=offset,
             order_by_rules=order_by_rules,
+            keyset_columns=['timestamp', 'ethereum_transactions.tx_hash'],
+            after=after,
         )
         filter_query = cast('ETHTransactionsFilterQuery', filter_query)
         filters: List[DBFilter] = []
@@ -441,6 +572,7 @@ class TradesFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLocation):
             order_by_rules: Optional[List[Tuple[str, bool]]] = None,
             limit: Optional[int] = None,
             offset: Optional[int] = None,
+            after: Optional[List[KeysetValue]] = None,
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
             base_assets: Optional[Tuple[Asset, ...]] = None,
@@ -456,6 +588,9 @@ class TradesFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLocation):
             limit=limit,
             offset=offset,
             order_by_rules=order_by_rules,
+            # the two trades a swap can be split into in combined_trades_view share an id
+            keyset_columns=['time', 'id', 'quote_asset'],
+            after=after,
         )
         filter_query = cast('TradesFilterQuery', filter_query)
         filters: List[DBFilter] = []
@@ -734,6 +869,7 @@ class HistoryEventFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLoca
             order_by_rules: Optional[List[Tuple[str, bool]]] = None,
             limit: Optional[int] = None,
             offset: Optional[int] = None,
+            after: Optional[List[KeysetValue]] = None,
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
             assets: Optional[Tuple[Asset, ...]] = None,
@@ -756,6 +892,8 @@ class HistoryEventFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLoca
             limit=limit,
             offset=offset,
             order_by_rules=order_by_rules,
+            keyset_columns=['timestamp', 'sequence_index', 'identifier'],
+            after=after,
         )
         filter_query = cast('HistoryEventFilterQuery', filter_query)
         filters: List[DBFilter] = []
@@ -1,14 +1,15 @@
 import logging
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Iterator, List, Optional
 
 from pysqlcipher3 import dbapi2 as sqlcipher
 
-from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.accounting.structures.base import HISTORY_EVENT_DB_TUPLE_WRITE, HistoryBaseEntry
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.limits import FREE_HISTORY_EVENTS_LIMIT
 from rotkehlchen.db.constants import HISTORY_MAPPING_CUSTOMIZED
-from rotkehlchen.db.filtering import HistoryEventFilterQuery
+from rotkehlchen.db.filtering import HistoryEventFilterQuery, serialize_page_cursor
+from rotkehlchen.db.utils import DeserializationMemo, iterate_deserialized_rows
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
@@ -71,9 +72,21 @@ class DBHistoryEvents():
         May raise:
         - InputError if the events couldn't be stored in the database
         """
-        events = []
-        for event in history:
-            events.append(event.serialize_for_db())
+        self.add_serialized_history_events(
+            write_cursor=write_cursor,
+            events=[event.serialize_for_db() for event in history],
+        )
+
+    def add_serialized_history_events(
+            self,
+            write_cursor: 'DBCursor',
+            events: List[HISTORY_EVENT_DB_TUPLE_WRITE],
+    ) -> None:
+        """Insert a list of history events already serialized for the DB
+
+        May raise:
+        - InputError if the events couldn't be stored in the database
+        """
         self.db.write_tuples(
             write_cursor=write_cursor,
             tuple_type='history_event',
@@ -162,7 +175,7 @@ class DBHistoryEvents():
         )
         return [x[0] for x in cursor]
 
-    def get_history_events(      # pylint: disable=no-self-use
+    def get_history_events(
             self,
             cursor: 'DBCursor',
             filter_query: HistoryEventFilterQuery,
@@ -171,6 +184,17 @@ class DBHistoryEvents():
         """
         Get history events using the provided query filter
         """
+        return list(self.iterate_history_events(cursor=cursor, filter_query=filter_query, has_premium=has_premium))  # noqa: E501
+
+    def iterate_history_events(      # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            filter_query: HistoryEventFilterQuery,
+            has_premium: bool,
+    ) -> Iterator[HistoryBaseEntry]:
+        """Like get_history_events but yields the events as they are read from the DB.
+        The cursor can't be used for anything else until the iteration is over.
+        """
         query, bindings = filter_query.prepare()
 
         if has_premium:
@@ -180,14 +204,14 @@ class DBHistoryEvents():
             query = 'SELECT * FROM (SELECT * from history_events ORDER BY timestamp DESC, sequence_index ASC LIMIT ?) ' + query  # noqa: E501
             cursor.execute(query, [FREE_HISTORY_EVENTS_LIMIT] + bindings)
 
-        output = []
-        for entry in cursor:
-            try:
-                output.append(HistoryBaseEntry.deserialize_from_db(entry))
-            except (DeserializationError, UnknownAsset) as e:
-                log.debug(f'Failed to deserialize history event {entry} due to {str(e)}')
-
-        return output
+        yield from iterate_deserialized_rows(
+            cursor=cursor,
+            deserialize=HistoryBaseEntry.deserialize_from_db,
+            # all history events are saved, regardless of the type of token they involve
+            memo=DeserializationMemo(form_with_incomplete_data=True),
+            on_error=lambda entry, e: log.debug(f'Failed to deserialize history event {entry} due to {str(e)}'),  # noqa: E501
+            amount_columns=(7, 8),
+        )
 
     def get_history_events_and_limit_info(
             self,
@@ -206,8 +230,28 @@ class DBHistoryEvents():
         )
         query, bindings = filter_query.prepare(with_pagination=False)
         query = 'SELECT COUNT(*) from history_events ' + query
-        cursor.execute(query, bindings)
-        return events, cursor.fetchone()[0]  # count always has value
+        return events, self.db.entries_count_cache.count(cursor, query, bindings)
+
+    def get_history_events_next_page_cursor(  # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            filter_query: HistoryEventFilterQuery,
+            has_premium: bool,
+    ) -> Optional[str]:
+        """Returns the cursor to continue the events of the filter query after its page.
+        None if it is the last page or the query can't be continued from a cursor."""
+        last_entry = filter_query.prepare_last_page_entry()
+        if last_entry is None:
+            return None
+
+        columns, query, bindings = last_entry
+        if has_premium:
+            query = f'SELECT {columns} from history_events ' + query
+        else:
+            query = f'SELECT {columns} FROM (SELECT * from history_events ORDER BY timestamp DESC, sequence_index ASC LIMIT ?) ' + query  # noqa: E501
+            bindings = [FREE_HISTORY_EVENTS_LIMIT] + bindings
+        result = cursor.execute(query, bindings).fetchone()
+        return None if result is None else serialize_page_cursor(result)
 
     def rows_missing_prices_in_base_entries(
         self,
@@ -268,12 +312,11 @@ class DBHistoryEvents():
                 )
         return assets
 
-    def get_history_events_count(self, cursor: 'DBCursor', query_filter: HistoryEventFilterQuery) -> int:  # noqa: E501  # pylint: disable=no-self-use
+    def get_history_events_count(self, cursor: 'DBCursor', query_filter: HistoryEventFilterQuery) -> int:  # noqa: E501
         """Returns how many of certain base entry events are in the database"""
         query, bindings = query_filter.prepare(with_pagination=False)
         query = 'SELECT COUNT(*) from history_events ' + query
-        cursor.execute(query, bindings)
-        return cursor.fetchone()[0]  # count(*) always returns
+        return self.db.entries_count_cache.count(cursor, query, bindings)
 
     def get_value_stats(      # pylint: disable=no-self-use
             self,
@@ -1,5 +1,6 @@
 import logging
 from copy import deepcopy
+from json.decoder import JSONDecodeError
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -15,20 +16,26 @@ from typing import (
 
 from pysqlcipher3 import dbapi2 as sqlcipher
 
+from rotkehlchen.accounting.checkpoints import PnlCheckpoint
 from rotkehlchen.accounting.constants import FREE_PNL_EVENTS_LIMIT, FREE_REPORTS_LOOKUP_LIMIT
 from rotkehlchen.accounting.pnl import PnlTotals
 from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
 from rotkehlchen.db.filtering import ReportDataFilterQuery
 from rotkehlchen.db.settings import DBSettings
+from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Timestamp
 from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.serialization import jsonloads_dict, rlk_jsondumps
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Number of PnL events kept in memory before they are written to the DB in one transaction
+PNL_EVENTS_WRITE_BATCH_SIZE = 1000
+
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
@@ -244,33 +251,6 @@ class DBAccountingReports():
                     f'Could not delete PnL report {report_id} from the DB. Report was not found',
                 )
 
-    def add_report_data(
-            self,
-            report_id: int,
-            time: Timestamp,
-            ts_converter: Callable[[Timestamp], str],
-            event: ProcessedAccountingEvent,
-    ) -> None:
-        """Adds a new entry to a transient report for the PnL history in a given time range
-        May raise:
-        - DeserializationError if there is a conflict at serialization of the event
-        - InputError if the event can not be written to the DB. Probably report id does not exist.
-        """
-        data = event.serialize_for_db(ts_converter)
-        query = """
-        INSERT INTO pnl_events(
-            report_id, timestamp, data
-        )
-        VALUES(?, ?, ?);"""
-        with self.db.transient_write() as cursor:
-            try:
-                cursor.execute(query, (report_id, time, data))
-            except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
-                raise InputError(
-                    f'Could not write {event} data to the DB due to {str(e)}. '
-                    f'Probably report {report_id} does not exist?',
-                ) from e
-
     def get_report_data(
             self,
             filter_: ReportDataFilterQuery,
@@ -325,3 +305,166 @@ class DBAccountingReports():
             entries=records,
             with_limit=with_limit,
         )
+
+    def add_checkpoint(
+            self,
+            timestamp: Timestamp,
+            events_processed: int,
+            events_hash: str,
+            settings_hash: str,
+            report_id: int,
+            report_events: int,
+            state: Dict[str, Any],
+    ) -> None:
+        """Saves the state of an accounting pot after processing `events_processed` events
+
+        Checkpoints made with other settings are deleted since only the latest settings
+        are likely to be used again.
+        """
+        with self.db.transient_write() as cursor:
+            cursor.execute(
+                'DELETE FROM pnl_checkpoints WHERE settings_hash != ?', (settings_hash,),
+            )
+            cursor.execute(
+                'INSERT OR REPLACE INTO pnl_checkpoints(timestamp, events_processed, '
+                'events_hash, settings_hash, report_id, report_events, state) '
+                'VALUES(?, ?, ?, ?, ?, ?, ?)',
+                (
+                    timestamp,
+                    events_processed,
+                    events_hash,
+                    settings_hash,
+                    report_id,
+                    report_events,
+                    rlk_jsondumps(state),
+                ),
+            )
+
+    def get_checkpoints(self, settings_hash: str) -> List[PnlCheckpoint]:
+        """Returns the checkpoints saved for the given settings in ascending processing order"""
+        with self.db.conn_transient.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT identifier, timestamp, events_processed, events_hash, report_id, '
+                'report_events FROM pnl_checkpoints WHERE settings_hash=? '
+                'ORDER BY events_processed ASC',
+                (settings_hash,),
+            )
+            return [PnlCheckpoint(*entry) for entry in cursor]
+
+    def get_checkpoint_state(self, identifier: int) -> Optional[Dict[str, Any]]:
+        """Returns the saved accounting pot state of a checkpoint or None if it
+        does not exist or can't be read"""
+        with self.db.conn_transient.read_ctx() as cursor:
+            result = cursor.execute(
+                'SELECT state FROM pnl_checkpoints WHERE identifier=?',
+                (identifier,),
+            ).fetchone()
+        if result is None:
+            return None
+
+        try:
+            return jsonloads_dict(result[0])
+        except JSONDecodeError as e:
+            log.error(f'Could not read state of PnL checkpoint {identifier} due to {str(e)}')
+            return None
+
+    def get_checkpoint_report_events(
+            self,
+            checkpoint: PnlCheckpoint,
+    ) -> Optional[List[ProcessedAccountingEvent]]:
+        """Returns the report events generated up to a checkpoint or None if they
+        can't all be read from the report that made it"""
+        with self.db.conn_transient.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT timestamp, data FROM pnl_events WHERE report_id=? '
+                'ORDER BY identifier ASC LIMIT ?',
+                (checkpoint.report_id, checkpoint.report_events),
+            )
+            try:
+                events = [ProcessedAccountingEvent.deserialize_from_db(*entry) for entry in cursor]  # noqa: E501
+            except (DeserializationError, UnknownAsset) as e:
+                log.error(
+                    f'Could not read the report events of PnL checkpoint '
+                    f'{checkpoint.identifier} due to {str(e)}',
+                )
+                return None
+
+        if len(events) != checkpoint.report_events:
+            return None
+        return events
+
+    def delete_checkpoints(
+            self,
+            from_events_processed: Optional[int] = None,
+            from_ts: Optional[Timestamp] = None,
+    ) -> None:
+        """Deletes all checkpoints covering at least the given amount of events or
+        the given timestamp. If no argument is given all checkpoints are deleted."""
+        query = 'DELETE FROM pnl_checkpoints'
+        bindings: List[int] = []
+        if from_events_processed is not None:
+            query += ' WHERE events_processed >= ?'
+            bindings.append(from_events_processed)
+        elif from_ts is not None:
+            query += ' WHERE timestamp >= ?'
+            bindings.append(from_ts)
+        with self.db.transient_write() as cursor:
+            cursor.execute(query, bindings)
+
+
+class DBReportEventsWriter():
+    """Buffers the events of a PnL report as they are processed and writes them to the
+    DB in batches, each in a single transaction.
+
+    flush() needs to be called when processing ends, even if it ends with an error,
+    for the last buffered events to be written.
+    """
+
+    def __init__(
+            self,
+            database: 'DBHandler',
+            report_id: int,
+            ts_converter: Callable[[Timestamp], str],
+            batch_size: int = PNL_EVENTS_WRITE_BATCH_SIZE,
+    ) -> None:
+        self.db = database
+        self.report_id = report_id
+        self.ts_converter = ts_converter
+        self.batch_size = batch_size
+        self.pending: List[Tuple[int, Timestamp, str]] = []
+
+    def add(self, event: ProcessedAccountingEvent) -> None:
+        """Buffers the event and writes the buffer if it's full
+
+        May raise:
+        - DeserializationError if there is a conflict at serialization of the event
+        - InputError if the buffered events can not be written to the DB.
+        Probably report id does not exist.
+        """
+        data = event.serialize_for_db(self.ts_converter)
+        self.pending.append((self.report_id, event.timestamp, data))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes all buffered events to the DB. They are dropped even if writing fails.
+
+        May raise:
+        - InputError if the events can not be written to the DB. Probably report id
+        does not exist.
+        """
+        if len(self.pending) == 0:
+            return
+
+        entries, self.pending = self.pending, []
+        with self.db.transient_write() as cursor:
+            try:
+                cursor.executemany(
+                    'INSERT INTO pnl_events(report_id, timestamp, data) VALUES(?, ?, ?)',
+                    entries,
+                )
+            except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
+                raise InputError(
+                    f'Could not write {len(entries)} events to the DB due to {str(e)}. '
+                    f'Probably report {self.report_id} does not exist?',
+                ) from e
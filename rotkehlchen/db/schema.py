@@ -182,6 +182,9 @@ CREATE TABLE IF NOT EXISTS timed_balances (
     FOREIGN KEY(currency) REFERENCES assets(identifier) ON UPDATE CASCADE,
     PRIMARY KEY (time, currency, category)
 );
+-- Covers the time series queries of an asset so they don't need to touch the table
+CREATE INDEX IF NOT EXISTS timed_balances_currency_category_time
+ON timed_balances(currency, category, time, amount, usd_value);
 """
 
 DB_CREATE_TIMED_LOCATION_DATA = """
@@ -313,6 +316,42 @@ CREATE TABLE IF NOT EXISTS xpub_mappings (
 );
 """  # noqa: E501
 
+# Cache of the addresses derived from xpubs so that re-scanning never derives them again
+DB_CREATE_XPUB_DERIVED_ADDRESSES = """
+CREATE TABLE IF NOT EXISTS xpub_derived_addresses (
+    xpub TEXT NOT NULL,
+    derivation_path TEXT NOT NULL,
+    account_index INTEGER NOT NULL,
+    derived_index INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    PRIMARY KEY (xpub, derivation_path, account_index, derived_index)
+);
+"""
+
+# Logs of the ranges in used_query_ranges of get_logs queries, by query. Each log is the
+# JSON of the event as returned by the node or etherscan that queried it.
+DB_CREATE_ETHEREUM_LOGS_CACHE = """
+CREATE TABLE IF NOT EXISTS ethereum_logs_cache (
+    query_name TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    log TEXT NOT NULL,
+    PRIMARY KEY (query_name, block_number, log_index)
+);
+"""
+
+# Token balances of an address along with the block they were queried at
+DB_CREATE_TOKEN_BALANCES_CACHE = """
+CREATE TABLE IF NOT EXISTS token_balances_cache (
+    address VARCHAR[42] NOT NULL,
+    token TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    PRIMARY KEY (address, token)
+);
+"""
+
 DB_CREATE_ETHEREUM_ACCOUNTS_DETAILS = """
 CREATE TABLE IF NOT EXISTS ethereum_accounts_details (
     account VARCHAR[42] NOT NULL PRIMARY KEY,
@@ -370,6 +409,8 @@ CREATE TABLE IF NOT EXISTS trades (
     FOREIGN KEY(quote_asset) REFERENCES assets(identifier) ON UPDATE CASCADE,
     FOREIGN KEY(fee_currency) REFERENCES assets(identifier) ON UPDATE CASCADE
 );
+CREATE INDEX IF NOT EXISTS trades_time ON trades(time);
+CREATE INDEX IF NOT EXISTS trades_location_time ON trades(location, time);
 """
 
 DB_CREATE_MARGIN = """
@@ -405,6 +446,8 @@ CREATE TABLE IF NOT EXISTS asset_movements (
     FOREIGN KEY(asset) REFERENCES assets(identifier) ON UPDATE CASCADE,
     FOREIGN KEY(fee_asset) REFERENCES assets(identifier) ON UPDATE CASCADE
 );
+CREATE INDEX IF NOT EXISTS asset_movements_time ON asset_movements(time);
+CREATE INDEX IF NOT EXISTS asset_movements_location_time ON asset_movements(location, time);
 """
 
 DB_CREATE_LEDGER_ACTIONS = """
@@ -422,7 +465,9 @@ CREATE TABLE IF NOT EXISTS ledger_actions (
     FOREIGN KEY(asset) REFERENCES assets(identifier) ON UPDATE CASCADE,
     FOREIGN KEY(rate_asset) REFERENCES assets(identifier) ON UPDATE CASCADE
 );
-"""
+CREATE INDEX IF NOT EXISTS ledger_actions_timestamp ON ledger_actions(timestamp);
+CREATE INDEX IF NOT EXISTS ledger_actions_location_timestamp ON ledger_actions(location, timestamp);
+"""  # noqa: E501
 
 DB_CREATE_ETHEREUM_TRANSACTIONS = """
 CREATE TABLE IF NOT EXISTS ethereum_transactions (
@@ -438,6 +483,7 @@ CREATE TABLE IF NOT EXISTS ethereum_transactions (
     input_data BLOB NOT NULL,
     nonce INTEGER NOT NULL
 );
+CREATE INDEX IF NOT EXISTS ethereum_transactions_timestamp ON ethereum_transactions(timestamp);
 """
 
 DB_CREATE_ETHEREUM_INTERNAL_TRANSACTIONS = """
@@ -608,6 +654,7 @@ CREATE TABLE IF NOT EXISTS eth2_daily_staking_details (
     FOREIGN KEY(validator_index) REFERENCES eth2_validators(validator_index) ON UPDATE CASCADE ON DELETE CASCADE,
     PRIMARY KEY (validator_index, timestamp)
 );
+CREATE INDEX IF NOT EXISTS eth2_daily_staking_details_timestamp ON eth2_daily_staking_details(timestamp);
 """  # noqa: E501
 
 DB_CREATE_HISTORY_EVENTS = """
@@ -628,7 +675,11 @@ CREATE TABLE IF NOT EXISTS history_events (
     extra_data TEXT,
     UNIQUE(event_identifier, sequence_index)
 );
-"""
+-- The filters of history events queries are combined with a timestamp range and ordered by it
+CREATE INDEX IF NOT EXISTS history_events_timestamp_sequence_index ON history_events(timestamp, sequence_index);
+CREATE INDEX IF NOT EXISTS history_events_location_timestamp ON history_events(location, timestamp);
+CREATE INDEX IF NOT EXISTS history_events_asset_timestamp ON history_events(asset, timestamp);
+"""  # noqa: E501
 
 DB_CREATE_HISTORY_EVENTS_MAPPINGS = """
 CREATE TABLE IF NOT EXISTS history_events_mappings (
@@ -861,6 +912,9 @@ BEGIN TRANSACTION;
 {DB_CREATE_YEARN_VAULT_EVENTS}
 {DB_CREATE_XPUBS}
 {DB_CREATE_XPUB_MAPPINGS}
+{DB_CREATE_XPUB_DERIVED_ADDRESSES}
+{DB_CREATE_ETHEREUM_LOGS_CACHE}
+{DB_CREATE_TOKEN_BALANCES_CACHE}
 {DB_CREATE_AMM_SWAPS}
 {DB_CREATE_AMM_EVENTS}
 {DB_CREATE_ETH2_VALIDATORS}
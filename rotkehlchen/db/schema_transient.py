@@ -45,6 +45,24 @@ CREATE TABLE IF NOT EXISTS pnl_events (
     data TEXT NOT NULL,
     FOREIGN KEY (report_id) REFERENCES pnl_reports(identifier) ON DELETE CASCADE ON UPDATE CASCADE
 );
+CREATE INDEX IF NOT EXISTS pnl_events_report_id_timestamp ON pnl_events(report_id, timestamp);
+"""
+
+# Saved accounting pot states so that PnL reports can resume processing from them.
+# The report events generated up to each checkpoint are read from the report that made it.
+DB_CREATE_PNL_CHECKPOINTS = """
+CREATE TABLE IF NOT EXISTS pnl_checkpoints (
+    identifier INTEGER NOT NULL PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    events_processed INTEGER NOT NULL,
+    events_hash TEXT NOT NULL,
+    settings_hash TEXT NOT NULL,
+    report_id INTEGER NOT NULL,
+    report_events INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    FOREIGN KEY (report_id) REFERENCES pnl_reports(identifier) ON DELETE CASCADE ON UPDATE CASCADE,
+    UNIQUE(events_processed, settings_hash)
+);
 """
 
 DB_CREATE_SETTINGS = """
@@ -61,6 +79,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_REPORT_SETTINGS}
 {DB_CREATE_REPORT_TOTALS}
 {DB_CREATE_PNL_EVENTS}
+{DB_CREATE_PNL_CHECKPOINTS}
 {DB_CREATE_SETTINGS}
 COMMIT;
 PRAGMA foreign_keys=on;
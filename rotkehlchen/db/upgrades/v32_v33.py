@@ -88,6 +88,70 @@ def _create_nodes(cursor: 'DBCursor') -> None:
 """)
 
 
+def _create_xpub_derived_addresses(cursor: 'DBCursor') -> None:
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS xpub_derived_addresses (
+        xpub TEXT NOT NULL,
+        derivation_path TEXT NOT NULL,
+        account_index INTEGER NOT NULL,
+        derived_index INTEGER NOT NULL,
+        address TEXT NOT NULL,
+        PRIMARY KEY (xpub, derivation_path, account_index, derived_index)
+    );
+""")
+
+
+def _create_ethereum_logs_cache(cursor: 'DBCursor') -> None:
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ethereum_logs_cache (
+        query_name TEXT NOT NULL,
+        block_number INTEGER NOT NULL,
+        log_index INTEGER NOT NULL,
+        log TEXT NOT NULL,
+        PRIMARY KEY (query_name, block_number, log_index)
+    );
+""")
+
+
+def _create_token_balances_cache(cursor: 'DBCursor') -> None:
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS token_balances_cache (
+        address VARCHAR[42] NOT NULL,
+        token TEXT NOT NULL,
+        amount TEXT NOT NULL,
+        block_number INTEGER NOT NULL,
+        time INTEGER NOT NULL,
+        PRIMARY KEY (address, token)
+    );
+""")
+
+
+def _add_timed_balances_index(cursor: 'DBCursor') -> None:
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS timed_balances_currency_category_time
+    ON timed_balances(currency, category, time, amount, usd_value);
+""")
+
+
+def _add_filter_indexes(cursor: 'DBCursor') -> None:
+    """Adds the indexes used by the timestamp, location and asset filters of the
+    queries of the tables that grow with the user's history"""
+    for table, name, columns in (
+            ('trades', 'trades_time', 'time'),
+            ('trades', 'trades_location_time', 'location, time'),
+            ('asset_movements', 'asset_movements_time', 'time'),
+            ('asset_movements', 'asset_movements_location_time', 'location, time'),
+            ('ledger_actions', 'ledger_actions_timestamp', 'timestamp'),
+            ('ledger_actions', 'ledger_actions_location_timestamp', 'location, timestamp'),
+            ('ethereum_transactions', 'ethereum_transactions_timestamp', 'timestamp'),
+            ('eth2_daily_staking_details', 'eth2_daily_staking_details_timestamp', 'timestamp'),
+            ('history_events', 'history_events_timestamp_sequence_index', 'timestamp, sequence_index'),  # noqa: E501
+            ('history_events', 'history_events_location_timestamp', 'location, timestamp'),
+            ('history_events', 'history_events_asset_timestamp', 'asset, timestamp'),
+    ):
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table}({columns});')
+
+
 def _force_bytes_for_tx_hashes(cursor: 'DBCursor') -> None:
     """This DB upgrade function:
     - Updates the `tx_hash` column schema in aave_events, adex_events, balancer_events, amm_swaps,
@@ -484,10 +548,20 @@ def upgrade_v32_to_v33(db: 'DBHandler') -> None:
     - Change the schema of `blockchain` column in `xpub_mappings` table to be required.
     - Add blockchain column to `xpubs` table.
     - Change tx_hash for tables to BLOB type & history events event_identifier column to BLOB type.
+    - Add an index covering the time series queries of timed_balances.
+    - Add the xpub_derived_addresses table that caches the addresses derived from xpubs.
+    - Add the ethereum_logs_cache table that keeps the logs of the scanned block ranges.
+    - Add the token_balances_cache table that keeps the last queried token balances.
+    - Add indexes for the timestamp, location and asset filters of the history tables.
     """
     with db.user_write() as cursor:
         _refactor_xpubs_and_xpub_mappings(cursor)
         _create_new_tables(cursor)
         _refactor_blockchain_account_labels(cursor)
         _create_nodes(cursor)
+        _add_timed_balances_index(cursor)
+        _create_xpub_derived_addresses(cursor)
+        _create_ethereum_logs_cache(cursor)
+        _create_token_balances_cache(cursor)
         _force_bytes_for_tx_hashes(cursor)
+        _add_filter_indexes(cursor)  # after history_events is recreated
@@ -6,11 +6,13 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Literal,
     NamedTuple,
     Optional,
     Protocol,
+    Sequence,
     Tuple,
     TypeVar,
     Union,
@@ -24,8 +26,11 @@ from rotkehlchen.accounting.structures.balance import BalanceType
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.chain.substrate.types import KusamaAddress, PolkadotAddress
 from rotkehlchen.chain.substrate.utils import is_valid_kusama_address, is_valid_polkadot_address
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS, WEEK_IN_SECONDS
 from rotkehlchen.db.drivers.gevent import DBCursor
-from rotkehlchen.fval import FVal
+from rotkehlchen.errors.asset import UnknownAsset
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.fval import FVal, fvals_from_strings
 from rotkehlchen.types import (
     BlockchainAccountData,
     BTCAddress,
@@ -46,6 +51,7 @@ if TYPE_CHECKING:
 
 P = ParamSpec('P')
 T = TypeVar('T', covariant=True)
+R = TypeVar('R')
 
 
 class MaybeInjectWriteCursor(Protocol[P, T]):
@@ -183,6 +189,47 @@ class SingleDBAssetBalance():
     usd_value: FVal
 
 
+TimeSeriesResolution = Literal['hour', 'day', 'week']
+TIME_SERIES_RESOLUTION_SECONDS: Dict[TimeSeriesResolution, int] = {
+    'hour': HOUR_IN_SECONDS,
+    'day': DAY_IN_SECONDS,
+    'week': WEEK_IN_SECONDS,
+}
+
+
+class TimeSeriesDownsampling(NamedTuple):
+    """How to group the snapshots of a time series in buckets. Either by resolution,
+    with the buckets aligned to the unix epoch, or in a number of equally long
+    buckets spanning the snapshots of the queried range."""
+    resolution: Optional[TimeSeriesResolution] = None
+    buckets: Optional[int] = None
+
+
+class DownsampledAssetBalance(NamedTuple):
+    """The balance of an asset in a time bucket. Time, amount and usd_value are those
+    of the last snapshot in the bucket"""
+    category: BalanceType
+    time: Timestamp
+    amount: FVal
+    usd_value: FVal
+    min_amount: FVal
+    max_amount: FVal
+    min_usd_value: FVal
+    max_usd_value: FVal
+
+    def serialize(self) -> Dict[str, Union[str, int]]:
+        return {
+            'time': self.time,
+            'category': str(self.category),
+            'amount': str(self.amount),
+            'usd_value': str(self.usd_value),
+            'min_amount': str(self.min_amount),
+            'max_amount': str(self.max_amount),
+            'min_usd_value': str(self.min_usd_value),
+            'max_usd_value': str(self.max_usd_value),
+        }
+
+
 class LocationData(NamedTuple):
     time: Timestamp
     location: str  # Location serialized in a DB enum
@@ -331,3 +378,155 @@ def combine_asset_balances(balances: List[SingleDBAssetBalance]) -> List[SingleD
             new_balances = _append_or_combine(new_balances, balance)
 
     return new_balances
+
+
+# Number of rows fetched at once when deserializing the results of big queries
+DB_FETCH_BATCH_SIZE = 5000
+
+
+class DeserializationMemo():
+    """Memo of the values deserialized from DB rows, for reading many rows that
+    mostly refer to the same few assets and amounts.
+
+    Each asset identifier is resolved only once. Amounts are converted in bulk by
+    add_amounts() and are only kept until clear_amounts() is called, so that the memo
+    does not grow with the number of rows.
+    """
+
+    def __init__(self, form_with_incomplete_data: bool = False) -> None:
+        self.form_with_incomplete_data = form_with_incomplete_data
+        self.assets: Dict[str, Optional[Asset]] = {}  # None for unknown assets
+        self.amounts: Dict[str, FVal] = {}
+
+    def asset(self, identifier: str) -> Asset:
+        """May raise:
+        - UnknownAsset
+        - DeserializationError
+        """
+        try:
+            asset = self.assets[identifier]
+        except KeyError:
+            try:
+                asset = Asset(identifier, form_with_incomplete_data=self.form_with_incomplete_data)  # noqa: E501
+            except UnknownAsset:
+                asset = None
+            self.assets[identifier] = asset
+
+        if asset is None:
+            raise UnknownAsset(identifier)
+        return asset
+
+    def amount(self, value: str) -> FVal:
+        """May raise:
+        - DeserializationError if the value is not a number
+        """
+        amount = self.amounts.get(value)
+        if amount is None:
+            try:
+                amount = FVal(value)
+            except ValueError as e:
+                raise DeserializationError(f'Failed to deserialize {value} as a number from the DB') from e  # noqa: E501
+            self.amounts[value] = amount
+
+        return amount
+
+    def add_amounts(self, values: Sequence[str]) -> None:
+        """Converts the given amounts at once so that amount() finds them converted.
+        If any of them is not a number none is converted and amount() converts each
+        one on its own, raising for the invalid ones."""
+        try:
+            amounts = fvals_from_strings(values)
+        except ValueError:
+            return
+        self.amounts.update(zip(values, amounts))
+
+    def clear_amounts(self) -> None:
+        self.amounts.clear()
+
+
+def iterate_deserialized_rows(
+        cursor: DBCursor,
+        deserialize: Callable[[Any, DeserializationMemo], R],
+        memo: DeserializationMemo,
+        on_error: Callable[[Any, Exception], None],
+        amount_columns: Sequence[int] = (),
+) -> Iterator[R]:
+    """Deserializes the rows of the query last executed by the cursor, fetching them
+    in batches of DB_FETCH_BATCH_SIZE rows. The distinct values of the amount_columns
+    of each batch are converted at once before deserializing its rows.
+
+    Rows that can't be deserialized due to a DeserializationError or UnknownAsset
+    are given to on_error and skipped. The cursor can't be used for anything else
+    until the iteration is over.
+    """
+    while True:
+        rows = cursor.fetchmany(DB_FETCH_BATCH_SIZE)
+        if len(rows) == 0:
+            break
+
+        if len(amount_columns) != 0:
+            memo.add_amounts(list({
+                row[column] for row in rows for column in amount_columns
+                if row[column] is not None
+            }))
+        for row in rows:
+            try:
+                entry = deserialize(row, memo)
+            except (DeserializationError, UnknownAsset) as e:
+                on_error(row, e)
+                continue
+
+            yield entry
+
+        memo.clear_amounts()
+
+
+# Number of distinct count queries whose results are kept at once
+ENTRIES_COUNT_CACHE_SIZE = 128
+
+
+class EntriesCountCache():
+    """Cache of the results of the COUNT queries of the listings of the user DB, so
+    that paging through a listing does not count all of its entries for every page.
+
+    All counts are dropped as soon as any row of the DB has been changed through its
+    connection. Nothing is cached while that connection has uncommitted changes, since
+    the count may then be done by a reader of the pool that can't see them yet.
+    """
+
+    def __init__(self, db: 'DBHandler', size: int = ENTRIES_COUNT_CACHE_SIZE) -> None:
+        self.db = db
+        self.size = size
+        self.version: Optional[Tuple[Any, int]] = None
+        self.counts: Dict[Tuple[str, Tuple[Any, ...]], int] = {}
+
+    def _get_version(self) -> Optional[Tuple[Any, int]]:
+        """The DB connection along with the rows changed through it. None if there
+        are uncommitted changes."""
+        conn = self.db.conn
+        if conn.in_transaction:
+            return None
+        return conn, conn.total_changes
+
+    def count(self, cursor: DBCursor, query: str, bindings: List[Any]) -> int:
+        """Returns the single number the given query selects, from the cache if the
+        DB has not been changed since the same query was last executed"""
+        version = self._get_version()
+        if version is None:
+            return cursor.execute(query, bindings).fetchone()[0]
+
+        if version != self.version:
+            self.counts.clear()
+            self.version = version
+        key = (query, tuple(bindings))
+        result = self.counts.get(key)
+        if result is not None:
+            return result
+
+        result = cursor.execute(query, bindings).fetchone()[0]
+        if self._get_version() == version:  # else the DB was written while counting
+            if len(self.counts) >= self.size:
+                del self.counts[next(iter(self.counts))]
+            self.counts[key] = result
+
+        return result
@@ -2,6 +2,7 @@ import hashlib
 import hmac
 import json
 import logging
+import time
 from collections import defaultdict
 from json.decoder import JSONDecodeError
 from typing import (
@@ -20,6 +21,8 @@ from urllib.parse import urlencode
 
 import gevent
 import requests
+from gevent.event import Event
+from gevent.pool import Pool
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures.balance import Balance
@@ -82,6 +85,10 @@ V3_METHODS = (
 PUBLIC_METHODS = ('exchangeInfo', 'time')
 
 RETRY_AFTER_LIMIT = 60
+# https://binance-docs.github.io/apidocs/spot/en/#limits
+REQUEST_WEIGHT_LIMIT = 1200  # per minute
+MYTRADES_WEIGHT = 10
+TRADES_QUERY_CONCURRENCY = 5
 # Binance api error codes we check for (all below apis seem to have the same)
 # https://binance-docs.github.io/apidocs/spot/en/#error-codes-2
 # https://binance-docs.github.io/apidocs/futures/en/#error-codes-2
@@ -101,6 +108,64 @@ class BinancePermissionError(RemoteError):
     Example is when there is no margin account to query or insufficient api key permissions."""
 
 
+class RequestWeightBudget():
+    """The request weight that can still be used in the current minute
+
+    Binance reports the weight used by the IP in the current minute with each
+    response. Until a report of the current minute is in, requests are made one at
+    a time. Once it is in, the weight of the requests made after it is added to it
+    and requests that would go over the limit wait for the next minute.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.minute = 0
+        self.used_weight: Optional[int] = None  # None until binance reports it
+        self.response_pending = False  # a request is made while used_weight is None
+        self.response_received = Event()
+
+    def _refresh(self) -> None:
+        minute = int(time.time() // 60)
+        if minute != self.minute:
+            self.minute = minute
+            self.used_weight = None
+            self.response_pending = False
+
+    def spend(self, weight: int) -> None:
+        """Waits until the given weight fits in the budget and spends it"""
+        while True:
+            self._refresh()
+            if self.used_weight is None:
+                if not self.response_pending:
+                    self.response_pending = True
+                    self.response_received.clear()
+                    return
+                # wait for the response of the request made while the weight is unknown
+                self.response_received.wait(timeout=60 - time.time() % 60)
+                continue
+            if self.used_weight + weight <= self.limit:
+                self.used_weight += weight
+                return
+
+            wait_secs = 60 - time.time() % 60
+            log.debug(f'Binance request weight limit reached. Waiting {wait_secs:.1f} secs')
+            gevent.sleep(wait_secs)
+
+    def report(self, used_weight: Optional[str]) -> None:
+        """Updates the budget with the used weight binance returned in a response.
+        Should be called after each request, with None if no weight was returned."""
+        self.response_pending = False
+        self.response_received.set()
+        if used_weight is None:
+            return
+        try:
+            reported = int(used_weight)
+        except ValueError:
+            return
+        self._refresh()
+        self.used_weight = max(self.used_weight or 0, reported)
+
+
 def trade_from_binance(
         binance_trade: Dict,
         binance_symbols_to_pair: Dict[str, BinancePair],
@@ -212,6 +277,7 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         self.msg_aggregator = msg_aggregator
         self.offset_ms = 0
         self.selected_pairs = binance_selected_trade_pairs
+        self.weight_budget = RequestWeightBudget(limit=REQUEST_WEIGHT_LIMIT)
 
     def first_connection(self) -> None:
         if self.first_connection_made:
@@ -349,10 +415,15 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             try:
                 response = self.session.get(request_url, timeout=DEFAULT_TIMEOUT_TUPLE)
             except requests.exceptions.RequestException as e:
+                if api_type == 'api':
+                    self.weight_budget.report(None)
                 raise RemoteError(
                     f'{self.name} API request failed due to {str(e)}',
                 ) from e
 
+            if api_type == 'api':
+                self.weight_budget.report(response.headers.get('x-mbx-used-weight-1m'))
+
             if response.status_code not in (200, 418, 429):
                 code = 'no code found'
                 msg = 'no message found'
@@ -836,12 +907,56 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         )
         return dict(returned_balances), ''
 
+    def _query_symbol_trades(self, symbol: str, from_id: int) -> List[Dict[str, Any]]:
+        """Queries all trades of a market symbol starting from the given trade id
+
+        May raise:
+        - RemoteError
+        - BinancePermissionError
+        """
+        raw_data = []
+        # Limit of results to return. 1000 is max limit according to docs
+        limit = 1000
+        len_result = limit
+        while len_result == limit:
+            self.weight_budget.spend(MYTRADES_WEIGHT)
+            # We know that myTrades returns a list from the api docs
+            result = self.api_query_list(
+                'api',
+                'myTrades',
+                options={
+                    'symbol': symbol,
+                    'fromId': from_id,
+                    'limit': limit,
+                    # Not specifying them since binance does not seem to
+                    # respect them and always return all trades
+                    # 'startTime': start_ts * 1000,
+                    # 'endTime': end_ts * 1000,
+                })
+            if result:
+                try:
+                    from_id = int(result[-1]['id']) + 1
+                except (ValueError, KeyError, IndexError) as e:
+                    raise RemoteError(
+                        f'Could not parse id from Binance myTrades api query result: {result}',
+                    ) from e
+
+            len_result = len(result)
+            log.debug(f'{self.name} myTrades query result', results_num=len_result)
+            for r in result:
+                r['symbol'] = symbol
+            raw_data.extend(result)
+
+        return raw_data
+
     def query_online_trade_history(
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
     ) -> Tuple[List[Trade], Tuple[Timestamp, Timestamp]]:
-        """
+        """Queries the trades of all markets concurrently. For each market the query
+        continues from the trade after the last one seen up to end_ts in a previous
+        query, unless the trades before it are needed for the given range.
 
         May raise due to api query and unexpected id:
         - RemoteError
@@ -853,42 +968,43 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         else:
             iter_markets = list(self._symbols_to_pair.keys())
 
-        raw_data = []
-        # Limit of results to return. 1000 is max limit according to docs
-        limit = 1000
+        with self.db.conn.read_ctx() as cursor:
+            trade_cursors = self.db.get_binance_trade_cursors(cursor, self.name, self.location)
+        from_ids = {}
         for symbol in iter_markets:
-            last_trade_id = 0
-            len_result = limit
-            while len_result == limit:
-                # We know that myTrades returns a list from the api docs
-                result = self.api_query_list(
-                    'api',
-                    'myTrades',
-                    options={
-                        'symbol': symbol,
-                        'fromId': last_trade_id,
-                        'limit': limit,
-                        # Not specifying them since binance does not seem to
-                        # respect them and always return all trades
-                        # 'startTime': start_ts * 1000,
-                        # 'endTime': end_ts * 1000,
-                    })
-                if result:
-                    try:
-                        last_trade_id = int(result[-1]['id']) + 1
-                    except (ValueError, KeyError, IndexError) as e:
-                        raise RemoteError(
-                            f'Could not parse id from Binance myTrades api query result: {result}',
-                        ) from e
-
-                len_result = len(result)
-                log.debug(f'{self.name} myTrades query result', results_num=len_result)
-                for r in result:
-                    r['symbol'] = symbol
-                raw_data.extend(result)
-
-            raw_data.sort(key=lambda x: x['time'])
+            from_id, cursor_ts = trade_cursors.get(symbol, (0, Timestamp(0)))
+            from_ids[symbol] = from_id if cursor_ts < start_ts else 0
+        # Query first the markets with trades so that they don't wait behind the
+        # many markets the user never traded in if the request weight runs out
+        iter_markets.sort(key=lambda x: trade_cursors.get(x, (0,))[0] == 0)
+
+        pool = Pool(size=TRADES_QUERY_CONCURRENCY)
+        try:
+            symbol_results = pool.map(
+                lambda symbol: self._query_symbol_trades(symbol, from_ids[symbol]),
+                iter_markets,
+            )
+        finally:
+            pool.kill()
 
+        raw_data = []
+        new_cursors = {}
+        for symbol, symbol_trades in zip(iter_markets, symbol_results):
+            raw_data.extend(symbol_trades)
+            saved_cursor = trade_cursors.get(symbol)
+            if saved_cursor is not None and saved_cursor[1] >= end_ts:
+                continue  # don't move back a cursor that's further than this query
+            from_id = from_ids[symbol]
+            for raw_trade in symbol_trades:  # advance over the trades up to end_ts
+                try:
+                    if deserialize_timestamp_from_binance(raw_trade['time']) > end_ts:
+                        break
+                    from_id = int(raw_trade['id']) + 1
+                except (DeserializationError, KeyError, ValueError):
+                    break
+            new_cursors[symbol] = (from_id, end_ts)
+
+        raw_data.sort(key=lambda x: x['time'])
         trades = []
         for raw_trade in raw_data:
             try:
@@ -938,6 +1054,9 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             trades += fiat_payments
             trades.sort(key=lambda x: x.timestamp)
 
+        with self.db.user_write() as write_cursor:
+            self.db.set_binance_trade_cursors(write_cursor, self.name, self.location, new_cursors)  # noqa: E501
+
         return trades, (start_ts, end_ts)
 
     def _query_online_fiat_payments(self, start_ts: Timestamp, end_ts: Timestamp) -> List[Trade]:
@@ -35,6 +35,7 @@ from rotkehlchen.user_messages import MessagesAggregator
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.pot import AccountingPot
+    from rotkehlchen.db.utils import DeserializationMemo
 
 
 logger = logging.getLogger(__name__)
@@ -139,21 +140,35 @@ class AssetMovement(AccountingEventMixin):
         )
 
     @classmethod
-    def deserialize_from_db(cls, entry: AssetMovementDBTuple) -> 'AssetMovement':
-        """May raise:
+    def deserialize_from_db(
+            cls,
+            entry: AssetMovementDBTuple,
+            memo: Optional['DeserializationMemo'] = None,
+    ) -> 'AssetMovement':
+        """If a memo is given the assets and amounts are read through it
+
+        May raise:
             - DeserializationError
             - UnknownAsset
         """
+        if memo is None:
+            asset, fee_asset = Asset(entry[6]), Asset(entry[8])
+            amount, fee = deserialize_asset_amount(entry[7]), deserialize_fee(entry[9])
+        else:
+            asset, fee_asset = memo.asset(entry[6]), memo.asset(entry[8])
+            amount = AssetAmount(memo.amount(entry[7]))
+            fee = Fee(ZERO) if entry[9] is None else Fee(memo.amount(entry[9]))
+
         return AssetMovement(
             location=Location.deserialize_from_db(entry[1]),
             category=AssetMovementCategory.deserialize_from_db(entry[2]),
             address=entry[3],
             transaction_id=entry[4],
             timestamp=Timestamp(entry[5]),
-            asset=Asset(entry[6]),
-            amount=deserialize_asset_amount(entry[7]),
-            fee_asset=Asset(entry[8]),
-            fee=deserialize_fee(entry[9]),
+            asset=asset,
+            amount=amount,
+            fee_asset=fee_asset,
+            fee=fee,
             link=entry[10],
         )
 
@@ -306,21 +321,38 @@ class Trade(AccountingEventMixin):
         )
 
     @classmethod
-    def deserialize_from_db(cls, entry: TradeDBTuple) -> 'Trade':
-        """May raise:
+    def deserialize_from_db(
+            cls,
+            entry: TradeDBTuple,
+            memo: Optional['DeserializationMemo'] = None,
+    ) -> 'Trade':
+        """If a memo is given the assets and amounts are read through it
+
+        May raise:
             - DeserializationError
             - UnknownAsset
         """
+        if memo is None:
+            base_asset, quote_asset = Asset(entry[3]), Asset(entry[4])
+            amount, rate = deserialize_asset_amount(entry[6]), deserialize_price(entry[7])
+            fee = deserialize_optional(entry[8], deserialize_fee)
+            fee_currency = deserialize_optional(entry[9], Asset)
+        else:
+            base_asset, quote_asset = memo.asset(entry[3]), memo.asset(entry[4])
+            amount, rate = AssetAmount(memo.amount(entry[6])), Price(memo.amount(entry[7]))
+            fee = None if entry[8] is None else Fee(memo.amount(entry[8]))
+            fee_currency = None if entry[9] is None else memo.asset(entry[9])
+
         return Trade(
             timestamp=deserialize_timestamp(entry[1]),
             location=Location.deserialize_from_db(entry[2]),
-            base_asset=Asset(entry[3]),
-            quote_asset=Asset(entry[4]),
+            base_asset=base_asset,
+            quote_asset=quote_asset,
             trade_type=TradeType.deserialize_from_db(entry[5]),
-            amount=deserialize_asset_amount(entry[6]),
-            rate=deserialize_price(entry[7]),
-            fee=deserialize_optional(entry[8], deserialize_fee),
-            fee_currency=deserialize_optional(entry[9], Asset),
+            amount=amount,
+            rate=rate,
+            fee=fee,
+            fee_currency=fee_currency,
             link=entry[10],
             notes=entry[11],
         )
@@ -1,5 +1,6 @@
 import json
 import logging
+from collections import defaultdict
 from typing import Any, Dict, List, Literal, NamedTuple, Optional, Union, overload
 from urllib.parse import urlencode
 
@@ -19,12 +20,14 @@ from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.interfaces import HistoricalPriceOracleInterface
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Price, Timestamp
-from rotkehlchen.utils.misc import create_timestamp, timestamp_to_date
+from rotkehlchen.utils.misc import create_timestamp, get_chunks, timestamp_to_date
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 COINGECKO_QUERY_RETRY_TIMES = 4
+# Max coingecko ids per simple/price query. Keeps the request uri within limits
+COINGECKO_SIMPLE_PRICE_MAX_IDS = 100
 
 
 class CoingeckoAssetData(NamedTuple):
@@ -540,6 +543,56 @@ class Coingecko(HistoricalPriceOracleInterface):
             )
             return Price(ZERO)
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: List[Asset],
+            to_asset: Asset,
+    ) -> Dict[Asset, Price]:
+        """Returns the simple prices of from_assets in to_asset in coingecko
+
+        Uses the simple/price endpoint of coingecko with many ids per query. Assets not
+        supported in coingecko, or for which coingecko has no price, get price zero.
+        Assets whose query failed are not in the result.
+        """
+        vs_currency = to_asset.identifier.lower()
+        if vs_currency not in COINGECKO_SIMPLE_VS_CURRENCIES:
+            log.warning(
+                f'Tried to query coingecko simple prices in {to_asset.identifier}. '
+                f'But to_asset is not supported',
+            )
+            return {x: Price(ZERO) for x in from_assets}
+
+        prices: Dict[Asset, Price] = {}
+        assets_by_id: Dict[str, List[Asset]] = defaultdict(list)
+        for asset in from_assets:
+            try:
+                assets_by_id[asset.to_coingecko()].append(asset)
+            except UnsupportedAsset:
+                prices[asset] = Price(ZERO)
+
+        for chunk in get_chunks(list(assets_by_id), n=COINGECKO_SIMPLE_PRICE_MAX_IDS):
+            try:
+                result = self._query(
+                    module='simple/price',
+                    options={
+                        'ids': ','.join(chunk),
+                        'vs_currencies': vs_currency,
+                    })
+            except RemoteError as e:
+                log.warning(f'Failed to query coingecko simple prices of {len(chunk)} assets due to {str(e)}')  # noqa: E501
+                continue
+
+            for coingecko_id in chunk:
+                try:
+                    price = Price(FVal(result[coingecko_id][vs_currency]))  # pylint: disable=unsubscriptable-object  # noqa: E501
+                except (KeyError, TypeError, ValueError):
+                    price = Price(ZERO)
+
+                for asset in assets_by_id[coingecko_id]:
+                    prices[asset] = price
+
+        return prices
+
     def can_query_history(  # pylint: disable=no-self-use
             self,
             from_asset: Asset,  # pylint: disable=unused-argument
@@ -1,6 +1,6 @@
 import logging
 import os
-from collections import deque
+from collections import defaultdict, deque
 from json.decoder import JSONDecodeError
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Deque, Dict, List, Literal, Optional
@@ -64,6 +64,8 @@ log = RotkehlchenLogsAdapter(logger)
 RATE_LIMIT_MSG = 'You are over your rate limit please upgrade your account!'
 CRYPTOCOMPARE_QUERY_RETRY_TIMES = 3
 CRYPTOCOMPARE_RATE_LIMIT_WAIT_TIME = 60
+# Max length of the comma separated fsyms argument of pricemulti
+CRYPTOCOMPARE_PRICEMULTI_MAX_FSYMS_LENGTH = 300
 CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
     'ADADOWN': A_USDT,
     'ADAUP': A_USDT,
@@ -158,6 +160,9 @@ CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
 }
 CRYPTOCOMPARE_SPECIAL_CASES = CRYPTOCOMPARE_SPECIAL_CASES_MAPPING.keys()
 CRYPTOCOMPARE_HOURQUERYLIMIT = 2000
+# Minimum number of timestamps missing from the hourly price cache of a pair for which
+# prefetching the whole range is cheaper than querying the daily price of each timestamp
+CRYPTOCOMPARE_PREFETCH_MIN_TIMESTAMPS = 10
 
 
 def _multiply_str_nums(a: str, b: str) -> str:
@@ -465,6 +470,64 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface):
 
         return Price(FVal(result[cc_to_asset_symbol]))
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: List[Asset],
+            to_asset: Asset,
+    ) -> Dict[Asset, Price]:
+        """Returns the current prices of from_assets in to_asset
+
+        Uses the pricemulti endpoint with as many symbols per query as it accepts.
+        Assets not supported by cryptocompare, or without a price, get price zero.
+        Assets that need an intermediate asset and the ones whose query failed are not
+        in the result.
+        """
+        if to_asset.identifier in CRYPTOCOMPARE_SPECIAL_CASES:
+            return {}
+        try:
+            cc_to_asset_symbol = to_asset.to_cryptocompare()
+        except UnsupportedAsset:
+            return {x: Price(ZERO) for x in from_assets}
+
+        prices: Dict[Asset, Price] = {}
+        assets_by_symbol: Dict[str, List[Asset]] = defaultdict(list)
+        for asset in from_assets:
+            if asset.identifier in CRYPTOCOMPARE_SPECIAL_CASES:
+                continue
+            try:
+                assets_by_symbol[asset.to_cryptocompare()].append(asset)
+            except UnsupportedAsset:
+                prices[asset] = Price(ZERO)
+
+        chunks: List[List[str]] = []
+        chunk_length = CRYPTOCOMPARE_PRICEMULTI_MAX_FSYMS_LENGTH
+        for symbol in assets_by_symbol:
+            chunk_length += len(symbol) + 1
+            if chunk_length > CRYPTOCOMPARE_PRICEMULTI_MAX_FSYMS_LENGTH + 1:
+                chunks.append([])
+                chunk_length = len(symbol) + 1
+            chunks[-1].append(symbol)
+
+        for chunk in chunks:
+            try:
+                result = self._api_query(
+                    path=f'pricemulti?fsyms={",".join(chunk)}&tsyms={cc_to_asset_symbol}',
+                )
+            except RemoteError as e:
+                log.warning(f'Failed to query cryptocompare prices of {len(chunk)} assets due to {str(e)}')  # noqa: E501
+                continue
+
+            for symbol in chunk:
+                try:
+                    price = Price(FVal(result[symbol][cc_to_asset_symbol]))
+                except (KeyError, TypeError, ValueError):
+                    price = Price(ZERO)
+
+                for asset in assets_by_symbol[symbol]:
+                    prices[asset] = price
+
+        return prices
+
     def query_endpoint_pricehistorical(
             self,
             from_asset: Asset,
@@ -732,6 +795,73 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface):
         GlobalDBHandler().add_historical_prices(prices)
         self.last_histohour_query_ts = ts_now()  # also save when last query finished
 
+    def prefetch_historical_prices(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamps: List[Timestamp],
+    ) -> List[Timestamp]:
+        """Extends the hourly price cache of the pair so that it covers all the given
+        sorted timestamps. This uses the ranged histohour queries instead of querying
+        the historical price endpoint once per timestamp.
+
+        If only a few timestamps are missing from the cache nothing is done since
+        querying them one by one is cheaper than querying the whole range.
+
+        Returns the timestamps that the cache does not cover.
+        """
+        uncovered = self._get_uncovered_timestamps(from_asset, to_asset, timestamps)
+        if len(uncovered) < CRYPTOCOMPARE_PREFETCH_MIN_TIMESTAMPS or self.rate_limited_in_last():
+            return uncovered
+
+        data_range = GlobalDBHandler().get_historical_price_range(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        )
+
+        log.debug(
+            f'Prefetching cryptocompare hourly prices of {from_asset.identifier} -> '
+            f'{to_asset.identifier} for {len(uncovered)} timestamps',
+        )
+        try:
+            # without cache this queries everything from now until the start of the asset
+            if data_range is None or uncovered[-1] > data_range[1]:
+                self.query_and_store_historical_data(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    timestamp=uncovered[-1],
+                )
+            if data_range is not None and uncovered[0] < data_range[0]:
+                self.query_and_store_historical_data(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    timestamp=uncovered[0],
+                )
+        except (PriceQueryUnsupportedAsset, RemoteError) as e:
+            log.warning(
+                f'Failed to prefetch cryptocompare hourly prices of {from_asset.identifier} '
+                f'-> {to_asset.identifier} due to {str(e)}. Prices will be queried on demand',
+            )
+
+        return self._get_uncovered_timestamps(from_asset, to_asset, uncovered)
+
+    @staticmethod
+    def _get_uncovered_timestamps(
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamps: List[Timestamp],
+    ) -> List[Timestamp]:
+        """Returns the timestamps outside the range of the hourly price cache of the pair"""
+        data_range = GlobalDBHandler().get_historical_price_range(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        )
+        if data_range is None:
+            return timestamps
+        return [x for x in timestamps if not data_range[0] <= x <= data_range[1]]
+
     def query_historical_price(
             self,
             from_asset: Asset,
@@ -1,5 +1,5 @@
 from decimal import Decimal, InvalidOperation
-from typing import Any, Union
+from typing import Any, Iterable, List, Union
 
 from rotkehlchen.errors.serialization import ConversionError
 
@@ -7,6 +7,9 @@ from rotkehlchen.errors.serialization import ConversionError
 AcceptableFValInitInput = Union[float, bytes, Decimal, int, str, 'FVal']
 AcceptableFValOtherInput = Union[int, 'FVal']
 
+_DECIMAL_ZERO = Decimal(0)
+_object_new = object.__new__
+
 
 class FVal():
     """A value to represent numbers for financial applications. At the moment
@@ -51,77 +54,75 @@ class FVal():
     def __repr__(self) -> str:
         return 'FVal({})'.format(str(self.num))
 
+    # Ordering comparisons of Decimals raise InvalidOperation for NaN just like
+    # compare_signal does, so they can be used directly
     def __gt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('1')
+        return self.num > evaluate_input(other)
 
     def __lt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('-1')
+        return self.num < evaluate_input(other)
 
     def __le__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('-1'), Decimal('0'))
+        return self.num <= evaluate_input(other)
 
     def __ge__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('1'), Decimal('0'))
+        return self.num >= evaluate_input(other)
 
     def __eq__(self, other: object) -> bool:
         evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('0')
+        return self.num.compare_signal(evaluated_other) == _DECIMAL_ZERO
 
     def __add__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__add__(evaluated_other))
+        return _fval_from_decimal(self.num.__add__(evaluated_other))
 
     def __sub__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__sub__(evaluated_other))
+        return _fval_from_decimal(self.num.__sub__(evaluated_other))
 
     def __mul__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__mul__(evaluated_other))
+        return _fval_from_decimal(self.num.__mul__(evaluated_other))
 
     def __truediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__truediv__(evaluated_other))
+        return _fval_from_decimal(self.num.__truediv__(evaluated_other))
 
     def __floordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__floordiv__(evaluated_other))
+        return _fval_from_decimal(self.num.__floordiv__(evaluated_other))
 
     def __pow__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__pow__(evaluated_other))
+        return _fval_from_decimal(self.num.__pow__(evaluated_other))
 
     def __radd__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__radd__(evaluated_other))
+        return _fval_from_decimal(self.num.__radd__(evaluated_other))
 
     def __rsub__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rsub__(evaluated_other))
+        return _fval_from_decimal(self.num.__rsub__(evaluated_other))
 
     def __rmul__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rmul__(evaluated_other))
+        return _fval_from_decimal(self.num.__rmul__(evaluated_other))
 
     def __rtruediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rtruediv__(evaluated_other))
+        return _fval_from_decimal(self.num.__rtruediv__(evaluated_other))
 
     def __rfloordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rfloordiv__(evaluated_other))
+        return _fval_from_decimal(self.num.__rfloordiv__(evaluated_other))
 
     def __mod__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__mod__(evaluated_other))
+        return _fval_from_decimal(self.num.__mod__(evaluated_other))
 
     def __rmod__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rmod__(evaluated_other))
+        return _fval_from_decimal(self.num.__rmod__(evaluated_other))
 
     def __float__(self) -> float:
         return float(self.num)
@@ -129,10 +130,10 @@ class FVal():
     # --- Unary operands
 
     def __neg__(self) -> 'FVal':
-        return FVal(self.num.__neg__())
+        return _fval_from_decimal(self.num.__neg__())
 
     def __abs__(self) -> 'FVal':
-        return FVal(self.num.copy_abs())
+        return _fval_from_decimal(self.num.copy_abs())
 
     # --- Other operations
 
@@ -143,7 +144,7 @@ class FVal():
         """
         evaluated_other = evaluate_input(other)
         evaluated_third = evaluate_input(third)
-        return FVal(self.num.fma(evaluated_other, evaluated_third))
+        return _fval_from_decimal(self.num.fma(evaluated_other, evaluated_third))
 
     def to_percentage(self, precision: int = 4, with_perc_sign: bool = True) -> str:
         return f'{self.num*100:.{precision}f}{"%" if with_perc_sign else ""}'
@@ -170,6 +171,16 @@ class FVal():
         return diff_num <= evaluated_max_diff.num
 
 
+def _fval_from_decimal(num: Decimal) -> FVal:
+    """Fast path constructor for the result of an operation, which is always a Decimal.
+
+    Skips all the input type checks of FVal.__init__ and the copy of the Decimal.
+    """
+    result = _object_new(FVal)
+    result.num = num
+    return result
+
+
 def evaluate_input(other: Any) -> Union[Decimal, int]:
     """Evaluate 'other' and return its Decimal representation"""
     if isinstance(other, FVal):
@@ -178,3 +189,25 @@ def evaluate_input(other: Any) -> Union[Decimal, int]:
         raise NotImplementedError("Expected either FVal or int.")
     # else
     return other
+
+
+def fval_sum(values: Iterable[FVal]) -> FVal:
+    """Sums the given values operating directly on their underlying Decimals
+
+    Same result as sum(values, ZERO) but without creating an intermediate FVal for
+    each partial sum, which is much faster for big collections of values.
+    """
+    return _fval_from_decimal(sum((x.num for x in values), _DECIMAL_ZERO))
+
+
+def fvals_from_strings(values: Iterable[str]) -> List[FVal]:
+    """Converts a column of stringified numbers, such as the amounts read from the DB,
+    to FVals in one go
+
+    May raise:
+    - ValueError if any of the values is not a valid number
+    """
+    try:
+        return [_fval_from_decimal(Decimal(x)) for x in values]
+    except (InvalidOperation, TypeError) as e:
+        raise ValueError(f'Could not convert a value to FVal due to {str(e)}') from e
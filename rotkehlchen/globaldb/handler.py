@@ -31,6 +31,7 @@ from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChecksumEthAddress, Timestamp
 
+from .price_index import HistoricalPriceIndex
 from .schema import DB_SCRIPT_CREATE_TABLES
 
 if TYPE_CHECKING:
@@ -54,6 +55,13 @@ def _get_setting_value(cursor: DBCursor, name: str, default_value: int) -> int:
     return int(result[0][0])
 
 
+def _clean_assets_memory_cache(identifier: Optional[str] = None) -> None:
+    """Make the resolver forget an edited asset, or all of them, so that it's read again"""
+    # TODO: figure out a way to move this out. Moved in here due to cyclic imports
+    from rotkehlchen.assets.resolver import AssetResolver  # isort:skip  # noqa: E501  # pylint: disable=import-outside-toplevel
+    AssetResolver().clean_memory_cache(identifier)
+
+
 def initialize_globaldb(dbpath: Path) -> DBConnection:
     connection = DBConnection(path=dbpath, connection_type=DBConnectionType.GLOBAL)
     connection.executescript(DB_SCRIPT_CREATE_TABLES)
@@ -92,6 +100,7 @@ class GlobalDBHandler():
     __instance: Optional['GlobalDBHandler'] = None
     _data_directory: Optional[Path] = None
     conn: DBConnection
+    price_index: HistoricalPriceIndex
 
     def __new__(
             cls,
@@ -110,6 +119,8 @@ class GlobalDBHandler():
         GlobalDBHandler.__instance = object.__new__(cls)
         GlobalDBHandler.__instance._data_directory = data_dir
         GlobalDBHandler.__instance.conn = _initialize_global_db_directory(data_dir)
+        GlobalDBHandler.__instance.conn.enable_read_pool()
+        GlobalDBHandler.__instance.price_index = HistoricalPriceIndex()
         _reload_constant_assets(GlobalDBHandler.__instance)
         return GlobalDBHandler.__instance
 
@@ -228,6 +239,9 @@ class GlobalDBHandler():
 
         If mapping is True, return them as a Dict of identifier to data
         If mapping is False, return them as a List of AssetData
+
+        Assets with an unknown type or without their details are skipped, same as
+        when they are read one by one with get_asset_data
         """
         result: Union[List[AssetData], Dict[str, Dict[str, Any]]]
         if mapping:
@@ -238,10 +252,10 @@ class GlobalDBHandler():
         if specific_ids is not None:
             specific_ids_query = f'AND A.identifier in ({",".join("?" * len(specific_ids))})'
         querystr = f"""
-        SELECT A.identifier, A.type, B.address, B.decimals, A.name, A.symbol, A.started, null, A.swapped_for, A.coingecko, A.cryptocompare, B.protocol from assets as A LEFT OUTER JOIN ethereum_tokens as B
+        SELECT A.identifier, A.type, B.address, B.decimals, A.name, A.symbol, A.started, null, A.swapped_for, A.coingecko, A.cryptocompare, B.protocol, B.address from assets as A LEFT OUTER JOIN ethereum_tokens as B
         ON B.address = A.details_reference WHERE A.type=? {specific_ids_query}
         UNION ALL
-        SELECT A.identifier, A.type, null, null, A.name, A.symbol, A.started, B.forked, A.swapped_for, A.coingecko, A.cryptocompare, null from assets as A LEFT OUTER JOIN common_asset_details as B
+        SELECT A.identifier, A.type, null, null, A.name, A.symbol, A.started, B.forked, A.swapped_for, A.coingecko, A.cryptocompare, null, B.asset_id from assets as A LEFT OUTER JOIN common_asset_details as B
         ON B.asset_id = A.identifier WHERE A.type!=? {specific_ids_query};
         """  # noqa: E501
         eth_token_type = AssetType.ETHEREUM_TOKEN.serialize_for_db()    # pylint: disable=no-member
@@ -253,7 +267,23 @@ class GlobalDBHandler():
         with GlobalDBHandler().conn.read_ctx() as cursor:
             cursor.execute(querystr, bindings)
             for entry in cursor:
-                asset_type = AssetType.deserialize_from_db(entry[1])
+                try:
+                    asset_type = AssetType.deserialize_from_db(entry[1])
+                except DeserializationError as e:
+                    log.debug(
+                        f'Failed to read asset {entry[0]} from the DB due to '
+                        f'{str(e)}. Skipping',
+                    )
+                    continue
+
+                if entry[12] is None:
+                    details_table = 'token details' if asset_type == AssetType.ETHEREUM_TOKEN else 'common asset details'  # noqa: E501
+                    log.error(
+                        f'Found asset {entry[0]} in the DB assets table but not '
+                        f'in the {details_table} table.',
+                    )
+                    continue
+
                 ethereum_address: Optional[ChecksumEthAddress]
                 if asset_type == AssetType.ETHEREUM_TOKEN:
                     ethereum_address = string_to_ethereum_address(entry[2])
@@ -677,12 +707,16 @@ class GlobalDBHandler():
                 f'due to a constraint being hit. Make sure the new values are valid ',
             ) from e
 
+        _clean_assets_memory_cache(rotki_id)
         return rotki_id
 
     @staticmethod
     def delete_ethereum_token(write_cursor: 'DBCursor', address: ChecksumEthAddress) -> str:
         """Deletes an ethereum token from the global DB
 
+        The caller should clean the asset from the memory cache once the deletion
+        is committed.
+
         May raise InputError if the token does not exist in the DB or
         some other constraint is hit. Such as for example trying to delete
         a token that is in another token's underlying tokens list.
@@ -796,6 +830,8 @@ class GlobalDBHandler():
                     f'Failure at editing custom asset {identifier} common asset details',
                 ) from e
 
+        _clean_assets_memory_cache(identifier)
+
     @staticmethod
     def add_common_asset_details(write_cursor: 'DBCursor', data: Dict[str, Any]) -> None:
         """Adds a new row in common asset details
@@ -818,6 +854,9 @@ class GlobalDBHandler():
     def delete_custom_asset(write_cursor: 'DBCursor', identifier: str) -> None:
         """Deletes an asset (non-ethereum token) from the global DB
 
+        The caller should clean the asset from the memory cache once the deletion
+        is committed.
+
         May raise InputError if the asset does not exist in the DB or
         some other constraint is hit. Such as for example trying to delete
         an asset that is in another asset's forked or swapped attribute
@@ -889,9 +928,16 @@ class GlobalDBHandler():
             else:
                 globaldb.delete_custom_asset(write_cursor, identifier)
 
+        globaldb.price_index.clear()
+        _clean_assets_memory_cache(identifier)
+
     @staticmethod
     def get_assets_with_symbol(symbol: str, asset_type: Optional[AssetType] = None) -> List[AssetData]:  # noqa: E501
-        """Find all asset entries that have the given symbol"""
+        """Find all asset entries that have the given symbol
+
+        Assets with an unknown type or without their details are skipped, same as
+        when they are read one by one with get_asset_data
+        """
         query_tuples: Union[Tuple[str, str, str, str], Tuple[str, str, str, str, str]]
         eth_token_type = AssetType.ETHEREUM_TOKEN.serialize_for_db()    # pylint: disable=no-member
         if asset_type is not None:
@@ -901,17 +947,33 @@ class GlobalDBHandler():
             asset_type_check = ''
             query_tuples = (symbol, eth_token_type, symbol, eth_token_type)
         querystr = f"""
-        SELECT A.identifier, A.type, B.address, B.decimals, A.name, A.symbol, A.started, null, A.swapped_for, A.coingecko, A.cryptocompare, B.protocol from assets as A LEFT OUTER JOIN ethereum_tokens as B
+        SELECT A.identifier, A.type, B.address, B.decimals, A.name, A.symbol, A.started, null, A.swapped_for, A.coingecko, A.cryptocompare, B.protocol, B.address from assets as A LEFT OUTER JOIN ethereum_tokens as B
         ON B.address = A.details_reference WHERE A.symbol=? COLLATE NOCASE AND A.type=?
         UNION ALL
-        SELECT A.identifier, A.type, null, null, A.name, A.symbol, A.started, B.forked, A.swapped_for, A.coingecko, A.cryptocompare, null from assets as A LEFT OUTER JOIN common_asset_details as B
+        SELECT A.identifier, A.type, null, null, A.name, A.symbol, A.started, B.forked, A.swapped_for, A.coingecko, A.cryptocompare, null, B.asset_id from assets as A LEFT OUTER JOIN common_asset_details as B
         ON B.asset_id = A.identifier WHERE A.symbol=? COLLATE NOCASE AND A.type!=?{asset_type_check};
         """  # noqa: E501
         with GlobalDBHandler().conn.read_ctx() as cursor:
             cursor.execute(querystr, query_tuples)
             assets = []
             for entry in cursor:
-                asset_type = AssetType.deserialize_from_db(entry[1])
+                try:
+                    asset_type = AssetType.deserialize_from_db(entry[1])
+                except DeserializationError as e:
+                    log.debug(
+                        f'Failed to read asset {entry[0]} from the DB due to '
+                        f'{str(e)}. Skipping',
+                    )
+                    continue
+
+                if entry[12] is None:
+                    details_table = 'token details' if asset_type == AssetType.ETHEREUM_TOKEN else 'common asset details'  # noqa: E501
+                    log.error(
+                        f'Found asset {entry[0]} in the DB assets table but not '
+                        f'in the {details_table} table.',
+                    )
+                    continue
+
                 ethereum_address: Optional[ChecksumEthAddress]
                 if asset_type == AssetType.ETHEREUM_TOKEN:
                     ethereum_address = string_to_ethereum_address(entry[2])
@@ -944,27 +1006,24 @@ class GlobalDBHandler():
     ) -> Optional['HistoricalPrice']:
         """Gets the price around a particular timestamp
 
+        Lookups are served by the in-memory price index, which loads the whole price
+        history of the pair at the first lookup.
+
         If no price can be found returns None
         """
-        querystr = (
-            'SELECT from_asset, to_asset, source_type, timestamp, price FROM price_history '
-            'WHERE from_asset=? AND to_asset=? AND ABS(timestamp - ?) <= ? '
-        )
-        querylist = [from_asset.identifier, to_asset.identifier, timestamp, max_seconds_distance]
-        if source is not None:
-            querystr += ' AND source_type=?'
-            querylist.append(source.serialize_for_db())
-
-        querystr += 'ORDER BY ABS(timestamp - ?) ASC LIMIT 1'
-        querylist.append(timestamp)
+        source_type = source.serialize_for_db() if source is not None else None
+        globaldb = GlobalDBHandler()
+        with globaldb.conn.read_ctx() as cursor:
+            pair_prices = globaldb.price_index.get(
+                cursor=cursor,
+                key=(from_asset.identifier, to_asset.identifier, source_type),
+            )
 
-        with GlobalDBHandler().conn.read_ctx() as cursor:
-            query = cursor.execute(querystr, tuple(querylist))
-            result = query.fetchone()
-            if result is None:
-                return None
+        result = pair_prices.nearest(timestamp=timestamp, max_seconds_distance=max_seconds_distance)  # noqa: E501
+        if result is None:
+            return None
 
-        return HistoricalPrice.deserialize_from_db(result)
+        return HistoricalPrice.deserialize_from_db((from_asset.identifier, to_asset.identifier, *result))  # noqa: E501
 
     @staticmethod
     def add_historical_prices(entries: List['HistoricalPrice']) -> None:
@@ -1000,6 +1059,10 @@ class GlobalDBHandler():
                         log.error(
                             f'Failed to add {str(entry)} due to {str(entry_error)}. Skipping entry addition',  # noqa: E501
                         )
+        finally:
+            price_index = GlobalDBHandler().price_index
+            for from_asset, to_asset in {(x.from_asset.identifier, x.to_asset.identifier) for x in entries}:  # noqa: E501
+                price_index.invalidate(from_asset, to_asset)
 
     @staticmethod
     def add_single_historical_price(entry: HistoricalPrice) -> bool:
@@ -1023,6 +1086,7 @@ class GlobalDBHandler():
             )
             return False
 
+        GlobalDBHandler().price_index.invalidate(entry.from_asset.identifier, entry.to_asset.identifier)  # noqa: E501
         return True
 
     @staticmethod
@@ -1083,6 +1147,7 @@ class GlobalDBHandler():
             )
             return False
 
+        GlobalDBHandler().price_index.invalidate(entry.from_asset.identifier, entry.to_asset.identifier)  # noqa: E501
         return True
 
     @staticmethod
@@ -1105,14 +1170,18 @@ class GlobalDBHandler():
             timestamp,
             HistoricalPriceOracle.MANUAL.serialize_for_db(),  # pylint: disable=no-member
         )
-        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+        globaldb = GlobalDBHandler()
+        with globaldb.conn.write_ctx() as write_cursor:
             write_cursor.execute(querystr, bindings)
-            if write_cursor.rowcount != 1:
-                log.error(
-                    f'Failed to delete historical price from {from_asset} to {to_asset} '
-                    f'and timestamp: {str(timestamp)}.',
-                )
-                return False
+            deleted_rows = write_cursor.rowcount
+
+        globaldb.price_index.invalidate(from_asset.identifier, to_asset.identifier)
+        if deleted_rows != 1:
+            log.error(
+                f'Failed to delete historical price from {from_asset} to {to_asset} '
+                f'and timestamp: {str(timestamp)}.',
+            )
+            return False
 
         return True
 
@@ -1136,6 +1205,8 @@ class GlobalDBHandler():
                 f'Failed to delete historical prices from {from_asset} to {to_asset} '
                 f'and source: {str(source)} due to {str(e)}',
             )
+        finally:
+            GlobalDBHandler().price_index.invalidate(from_asset.identifier, to_asset.identifier)
 
     @staticmethod
     def get_historical_price_range(
@@ -1245,6 +1316,7 @@ class GlobalDBHandler():
         with GlobalDBHandler().conn.write_ctx() as write_cursor:
             write_cursor.execute(detach_database)
 
+        _clean_assets_memory_cache()
         return True, ''
 
     @staticmethod
@@ -1300,6 +1372,7 @@ class GlobalDBHandler():
 
         with GlobalDBHandler().conn.write_ctx() as write_cursor:
             write_cursor.execute(detach_database)
+        _clean_assets_memory_cache()
         return True, ''
 
     @staticmethod
@@ -1,5 +1,5 @@
 import logging
-from typing import Optional
+from typing import List, Optional
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp
@@ -23,6 +23,25 @@ class ManualPriceOracle:
     ) -> bool:
         return True
 
+    def prefetch_historical_prices(  # pylint: disable=no-self-use
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamps: List[Timestamp],
+    ) -> List[Timestamp]:
+        """Manual prices are only in the global DB so there is nothing to prefetch.
+        Returns the timestamps that have no manual price."""
+        return [
+            timestamp for timestamp in timestamps
+            if GlobalDBHandler().get_historical_price(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                timestamp=timestamp,
+                max_seconds_distance=3600,
+                source=HistoricalPriceOracle.MANUAL,
+            ) is None
+        ]
+
     @classmethod
     def query_historical_price(
         cls,
@@ -0,0 +1,121 @@
+import logging
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Tuple
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Upper bound of price_history rows kept in memory by the index across all pairs
+DEFAULT_PRICE_INDEX_MAX_ROWS = 1_000_000
+
+# (from_asset identifier, to_asset identifier, serialized source or None for any source)
+PriceIndexKey = Tuple[str, str, Optional[str]]
+
+
+class PairPrices(NamedTuple):
+    """All the known prices of a pair sorted by timestamp in parallel compact arrays
+
+    `sources` holds one serialized HistoricalPriceOracle character per entry and
+    `prices` the price strings as they are stored in the DB.
+    """
+    timestamps: array
+    sources: str
+    prices: List[str]
+
+    def nearest(
+            self,
+            timestamp: int,
+            max_seconds_distance: int,
+    ) -> Optional[Tuple[str, int, str]]:
+        """Binary search for the entry closest to timestamp that is at most
+        max_seconds_distance away. Returns (source, timestamp, price) if found."""
+        idx = bisect_left(self.timestamps, timestamp)
+        best_idx, best_distance = None, max_seconds_distance + 1
+        if idx < len(self.timestamps):  # first entry at or after the timestamp
+            best_idx, best_distance = idx, self.timestamps[idx] - timestamp
+        if idx > 0 and timestamp - self.timestamps[idx - 1] < best_distance:  # entry before
+            best_idx, best_distance = idx - 1, timestamp - self.timestamps[idx - 1]
+
+        if best_idx is None or best_distance > max_seconds_distance:
+            return None
+
+        return self.sources[best_idx], self.timestamps[best_idx], self.prices[best_idx]
+
+
+class HistoricalPriceIndex():
+    """In-memory index of the global DB price_history table
+
+    The price history of a pair is loaded in one go the first time it's needed and
+    all lookups for it are then binary searches. Pairs are evicted whole in least
+    recently used order once the total number of cached rows exceeds max_rows.
+
+    Any write to price_history needs to invalidate the affected pairs.
+    """
+
+    def __init__(self, max_rows: int = DEFAULT_PRICE_INDEX_MAX_ROWS) -> None:
+        self.max_rows = max_rows
+        self.rows = 0
+        self.pairs: 'OrderedDict[PriceIndexKey, PairPrices]' = OrderedDict()
+        # bumped by every invalidation so that a load racing with a write is not kept
+        self.generation = 0
+
+    def get(self, cursor: 'DBCursor', key: PriceIndexKey) -> PairPrices:
+        """Returns the prices of the given pair, loading them from the DB if needed"""
+        pair_prices = self.pairs.get(key)
+        if pair_prices is not None:
+            self.pairs.move_to_end(key)
+            return pair_prices
+
+        generation = self.generation
+        pair_prices = self._load(cursor, key)
+        if generation == self.generation:
+            self._insert(key, pair_prices)
+
+        return pair_prices
+
+    def invalidate(self, from_asset: str, to_asset: str) -> None:
+        """Drops all cached entries of the pair, regardless of source"""
+        self.generation += 1
+        for key in [x for x in self.pairs if x[0] == from_asset and x[1] == to_asset]:
+            self.rows -= len(self.pairs.pop(key).prices)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.pairs.clear()
+        self.rows = 0
+
+    def _insert(self, key: PriceIndexKey, pair_prices: PairPrices) -> None:
+        self.pairs[key] = pair_prices
+        self.rows += len(pair_prices.prices)
+        # always keep the most recent pair, even if it's on its own above the limit
+        while self.rows > self.max_rows and len(self.pairs) > 1:
+            evicted_key, evicted = self.pairs.popitem(last=False)
+            self.rows -= len(evicted.prices)
+            log.debug(f'Evicted {evicted_key} with {len(evicted.prices)} prices from the price index')  # noqa: E501
+
+    @staticmethod
+    def _load(cursor: 'DBCursor', key: PriceIndexKey) -> PairPrices:
+        querystr = (
+            'SELECT source_type, timestamp, price FROM price_history '
+            'WHERE from_asset=? AND to_asset=?'
+        )
+        bindings: Tuple[str, ...] = (key[0], key[1])
+        if key[2] is not None:
+            querystr += ' AND source_type=?'
+            bindings += (key[2],)
+        querystr += ' ORDER BY timestamp ASC, source_type ASC'
+
+        timestamps, sources, prices = array('q'), [], []
+        for source, timestamp, price in cursor.execute(querystr, bindings):
+            timestamps.append(timestamp)
+            sources.append(source)
+            prices.append(price)
+
+        return PairPrices(timestamps=timestamps, sources=''.join(sources), prices=prices)
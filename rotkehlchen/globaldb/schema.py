@@ -148,6 +148,8 @@ CREATE TABLE IF NOT EXISTS price_history (
     FOREIGN KEY(to_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
     PRIMARY KEY(from_asset, to_asset, source_type, timestamp)
 );
+-- For the deletion of all prices of an asset and the cascades of its identifier changes
+CREATE INDEX IF NOT EXISTS price_history_to_asset ON price_history(to_asset);
 """
 
 DB_CREATE_BINANCE_PARIS = """
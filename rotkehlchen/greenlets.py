@@ -1,4 +1,5 @@
 import logging
+import time
 import traceback
 from typing import Any, Callable, List, Optional
 
@@ -22,6 +23,7 @@ class GreenletManager():
         greenlet.link_exception(self._handle_killed_greenlets)
         greenlet.task_name = task_name
         greenlet.exception_is_error = exception_is_error
+        greenlet.spawned_at = time.monotonic()
         self.greenlets.append(greenlet)
 
     def clear(self) -> None:
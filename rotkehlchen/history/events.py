@@ -381,12 +381,11 @@ class EventsHistorian:
         for location in EXTERNAL_LOCATION:
             self.processing_state_name = f'Querying {location} trades history'
             with self.db.conn.read_ctx() as cursor:
-                external_trades = self.db.get_trades(
+                history.extend(self.db.iterate_trades(
                     cursor,
                     filter_query=TradesFilterQuery.make(location=location),
                     has_premium=True,  # we need all trades for accounting -- limit happens later
-                )
-            history.extend(external_trades)
+                ))
             step = self._increase_progress(step, total_steps)
 
         # include all ledger actions
@@ -418,7 +417,7 @@ class EventsHistorian:
         # Include base history entries
         history_events_db = DBHistoryEvents(self.db)
         with self.db.conn.read_ctx() as cursor:
-            base_entries, _ = history_events_db.get_history_events_and_limit_info(
+            history.extend(history_events_db.iterate_history_events(
                 cursor=cursor,
                 filter_query=HistoryEventFilterQuery.make(
                     # We need to have history since before the range
@@ -426,8 +425,7 @@ class EventsHistorian:
                     to_ts=end_ts,
                 ),
                 has_premium=True,  # ignore limits here. Limit applied at processing
-            )
-        history.extend(base_entries)
+            ))
         self._increase_progress(step, total_steps)
 
         history.sort(  # sort events first by timestamp and if history base by sequence index
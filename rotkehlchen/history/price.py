@@ -1,6 +1,6 @@
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.assets import A_KFEE, A_USD
@@ -142,6 +142,40 @@ class PriceHistorian():
             return Price(usd_price * price_mapping)
         return None
 
+    @staticmethod
+    def prefetch_historical_prices(
+            to_asset: Asset,
+            queries: Dict[Asset, List[Timestamp]],
+    ) -> None:
+        """Fetches in bulk the historical prices in `to_asset` of all the assets in
+        `queries` at the given sorted timestamps, so that the query_historical_price
+        calls for them that follow are served from the local cache.
+
+        The oracles are tried in the configured order. Each oracle that supports it
+        fetches the prices of an asset with ranged queries and only the timestamps it
+        has no price for are left to the next oracles. Anything that could not be
+        prefetched is still queried on demand.
+        """
+        instance = PriceHistorian()
+        oracle_instances = instance._oracle_instances
+        assert isinstance(oracle_instances, list), (
+            'PriceHistorian should never be called before setting the oracles'
+        )
+        for from_asset, timestamps in queries.items():
+            if from_asset == to_asset or from_asset == A_KFEE or len(timestamps) == 0:
+                continue  # handled without querying the oracles
+            if from_asset.is_fiat() and to_asset.is_fiat():
+                continue  # queried from the forex apis first
+
+            for oracle_instance in oracle_instances:
+                timestamps = oracle_instance.prefetch_historical_prices(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    timestamps=timestamps,
+                )
+                if len(timestamps) == 0:
+                    break  # higher priority oracles have all the prices
+
     @staticmethod
     def query_historical_price(
             from_asset: Asset,
@@ -2,9 +2,24 @@ from __future__ import unicode_literals  # isort:skip
 
 import logging
 import operator
+from collections import defaultdict
 from enum import auto
+from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from rotkehlchen.assets.asset import Asset, EthereumToken
 from rotkehlchen.chain.ethereum.contracts import EthereumContract
@@ -81,6 +96,7 @@ from rotkehlchen.types import (
     Price,
     Timestamp,
 )
+from rotkehlchen.utils.cache import LRUTTLCache
 from rotkehlchen.utils.misc import timestamp_to_daystart_timestamp, ts_now
 from rotkehlchen.utils.mixins.serializableenum import SerializableEnumMixin
 from rotkehlchen.utils.network import request_get_dict
@@ -97,6 +113,7 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 CURRENT_PRICE_CACHE_SECS = 300  # 5 mins
+CURRENT_PRICE_CACHE_MAX_ENTRIES = 10000
 BTC_PER_BSQ = FVal('0.00000100')
 
 ASSETS_UNDERLYING_BTC = (
@@ -149,6 +166,16 @@ DEFAULT_CURRENT_PRICE_ORACLES_ORDER = [
     CurrentPriceOracle.UNISWAPV3,
     CurrentPriceOracle.SADDLE,
 ]
+# Time to live of the cached prices of each oracle. Prices of the on-chain oracles take
+# multiple contract calls to calculate so they are kept for longer. Prices that did
+# not come from an oracle are kept for CURRENT_PRICE_CACHE_SECS.
+CURRENT_PRICE_ORACLE_CACHE_SECS: Dict[CurrentPriceOracle, int] = {
+    CurrentPriceOracle.COINGECKO: CURRENT_PRICE_CACHE_SECS,
+    CurrentPriceOracle.CRYPTOCOMPARE: CURRENT_PRICE_CACHE_SECS,
+    CurrentPriceOracle.UNISWAPV2: 600,
+    CurrentPriceOracle.UNISWAPV3: 600,
+    CurrentPriceOracle.SADDLE: 600,
+}
 
 
 def get_underlying_asset_price(token: EthereumToken) -> Optional[Price]:
@@ -238,7 +265,8 @@ class CachedPriceEntry(NamedTuple):
 class Inquirer():
     __instance: Optional['Inquirer'] = None
     _cached_forex_data: Dict
-    _cached_current_price: Dict  # Can't use CacheableMixIn due to Singleton
+    # Can't use CacheableMixIn due to Singleton
+    _cached_current_price: LRUTTLCache[Tuple[Asset, Asset], CachedPriceEntry]
     _data_directory: Path
     _cryptocompare: 'Cryptocompare'
     _coingecko: 'Coingecko'
@@ -268,7 +296,7 @@ class Inquirer():
         Inquirer.__instance._data_directory = data_dir
         Inquirer._cryptocompare = cryptocompare
         Inquirer._coingecko = coingecko
-        Inquirer._cached_current_price = {}
+        Inquirer._cached_current_price = LRUTTLCache(max_size=CURRENT_PRICE_CACHE_MAX_ENTRIES)
         Inquirer.special_tokens = [
             A_YV1_DAIUSDCTBUSD,
             A_CRVP_DAIUSDCTBUSD,
@@ -319,11 +347,24 @@ class Inquirer():
 
     @staticmethod
     def get_cached_current_price_entry(cache_key: Tuple[Asset, Asset]) -> Optional[CachedPriceEntry]:  # noqa: E501
-        cache = Inquirer()._cached_current_price.get(cache_key, None)
-        if cache is None or ts_now() - cache.time > CURRENT_PRICE_CACHE_SECS:
-            return None
+        return Inquirer()._cached_current_price.get(cache_key)
+
+    @staticmethod
+    def set_cached_current_price(
+            cache_key: Tuple[Asset, Asset],
+            price: Price,
+            oracle: Optional[CurrentPriceOracle] = None,
+    ) -> None:
+        """Caches the price for the time to live of the oracle that returned it"""
+        Inquirer()._cached_current_price.set(
+            key=cache_key,
+            value=CachedPriceEntry(price=price, time=ts_now()),
+            ttl=CURRENT_PRICE_CACHE_SECS if oracle is None else CURRENT_PRICE_ORACLE_CACHE_SECS[oracle],  # noqa: E501
+        )
 
-        return cache
+    @staticmethod
+    def get_current_price_cache_stats() -> Dict[str, Any]:
+        return Inquirer()._cached_current_price.get_stats()
 
     @staticmethod
     def set_oracles_order(oracles: List[CurrentPriceOracle]) -> None:
@@ -338,7 +379,10 @@ class Inquirer():
     def _query_oracle_instances(
             from_asset: Asset,
             to_asset: Asset,
+            skip_oracles: Optional[Set[CurrentPriceOracle]] = None,
     ) -> Price:
+        """Queries the oracles in order until one of them returns a price. The oracles
+        in skip_oracles, if given, are not queried."""
         instance = Inquirer()
         cache_key = (from_asset, to_asset)
         oracles = instance._oracles
@@ -347,7 +391,10 @@ class Inquirer():
             'Inquirer should never be called before the setting the oracles'
         )
         price = Price(ZERO)
+        price_oracle: Optional[CurrentPriceOracle] = None
         for oracle, oracle_instance in zip(oracles, oracle_instances):
+            if skip_oracles is not None and oracle in skip_oracles:
+                continue
             if (
                 isinstance(oracle_instance, CurrentPriceOracleInterface) and
                 oracle_instance.rate_limited_in_last() is True
@@ -373,11 +420,67 @@ class Inquirer():
                     to_asset=to_asset,
                     price=price,
                 )
+                price_oracle = oracle
                 break
 
-        Inquirer._cached_current_price[cache_key] = CachedPriceEntry(price=price, time=ts_now())
+        Inquirer.set_cached_current_price(cache_key=cache_key, price=price, oracle=price_oracle)
         return price
 
+    @staticmethod
+    def _query_multiple_oracle_instances(
+            assets: List[Asset],
+    ) -> Tuple[Dict[Asset, Price], Dict[Asset, Set[CurrentPriceOracle]]]:
+        """Queries the USD prices of the assets from the oracles that can query many
+        prices at once. Stops at the first oracle that can't, so that the order of the
+        oracles is respected when the rest are queried one by one.
+
+        Returns the found prices and, for each asset without a price, the oracles that
+        were asked and had no price for it.
+        """
+        instance = Inquirer()
+        oracles = instance._oracles
+        oracle_instances = instance._oracle_instances
+        assert isinstance(oracles, list) and isinstance(oracle_instances, list), (
+            'Inquirer should never be called before the setting the oracles'
+        )
+        prices: Dict[Asset, Price] = {}
+        asked_oracles: Dict[Asset, Set[CurrentPriceOracle]] = defaultdict(set)
+        remaining = assets
+        for oracle, oracle_instance in zip(oracles, oracle_instances):
+            if len(remaining) == 0 or not isinstance(oracle_instance, CurrentPriceOracleInterface):  # noqa: E501
+                break
+            if oracle_instance.rate_limited_in_last() is True:
+                continue
+
+            result = oracle_instance.query_multiple_current_prices(
+                from_assets=remaining,
+                to_asset=A_USD,
+            )
+            if result is None:
+                break
+
+            not_found = []
+            for asset in remaining:
+                price = result.get(asset)
+                if price is None:
+                    continue  # needs to be queried on its own starting from this oracle
+                if price == ZERO:
+                    asked_oracles[asset].add(oracle)
+                    not_found.append(asset)
+                    continue
+
+                prices[asset] = price
+                Inquirer.set_cached_current_price(
+                    cache_key=(asset, A_USD),
+                    price=price,
+                    oracle=oracle,
+                )
+
+            log.debug(f'Current price oracle {oracle} got {len(remaining) - len(not_found)} prices out of {len(remaining)}')  # noqa: E501
+            remaining = not_found
+
+        return prices, asked_oracles
+
     @staticmethod
     def find_price(
             from_asset: Asset,
@@ -396,13 +499,16 @@ class Inquirer():
         if to_asset == A_USD:
             return instance.find_usd_price(asset=from_asset, ignore_cache=ignore_cache)
 
+        cache_key = (from_asset, to_asset)
         if ignore_cache is False:
-            cache = instance.get_cached_current_price_entry(cache_key=(from_asset, to_asset))
+            cache = instance.get_cached_current_price_entry(cache_key=cache_key)
             if cache is not None:
                 return cache.price
 
-        oracle_price = instance._query_oracle_instances(from_asset=from_asset, to_asset=to_asset)
-        return oracle_price
+        return instance._cached_current_price.get_or_query(
+            key=cache_key,
+            query=lambda: instance._query_oracle_instances(from_asset=from_asset, to_asset=to_asset),  # noqa: E501
+        )
 
     @staticmethod
     def find_usd_price(
@@ -411,6 +517,8 @@ class Inquirer():
     ) -> Price:
         """Returns the current USD price of the asset
 
+        Concurrent queries for the price of the same asset are coalesced into one.
+
         Returns Price(ZERO) if all options have been exhausted and errors are logged in the logs
         """
         if asset == A_USD:
@@ -423,6 +531,89 @@ class Inquirer():
             if cache is not None:
                 return cache.price
 
+        return instance._cached_current_price.get_or_query(
+            key=cache_key,
+            query=lambda: instance._query_usd_price(asset),
+        )
+
+    @staticmethod
+    def find_usd_prices(
+            assets: Sequence[Asset],
+            ignore_cache: bool = False,
+    ) -> Dict[Asset, Price]:
+        """Returns the current USD prices of the given assets
+
+        The assets priced by the oracles are first queried in batches from the oracles
+        that support it, such as coingecko and cryptocompare, and only the ones
+        not found that way are queried one by one like in find_usd_price.
+
+        Assets whose price query raised a RemoteError are not in the result.
+        """
+        instance = Inquirer()
+        prices: Dict[Asset, Price] = {}
+        oracle_priced_assets = []
+        other_assets = []
+        for asset in dict.fromkeys(assets):  # remove duplicates but keep the order
+            if asset == A_USD:
+                prices[asset] = Price(ONE)
+                continue
+            if ignore_cache is False:
+                cache = instance.get_cached_current_price_entry(cache_key=(asset, A_USD))
+                if cache is not None:
+                    prices[asset] = cache.price
+                    continue
+
+            if instance._is_priced_by_oracles(asset):
+                oracle_priced_assets.append(asset)
+            else:
+                other_assets.append(asset)
+
+        asked_oracles: Dict[Asset, Set[CurrentPriceOracle]] = {}
+        if len(oracle_priced_assets) != 0:
+            batch_prices, asked_oracles = instance._query_multiple_oracle_instances(oracle_priced_assets)  # noqa: E501
+            prices.update(batch_prices)
+
+        queries: List[Tuple[Asset, Callable[[], Price]]] = [
+            (asset, partial(
+                instance._query_oracle_instances,
+                from_asset=asset,
+                to_asset=A_USD,
+                skip_oracles=asked_oracles.get(asset),
+            )) for asset in oracle_priced_assets if asset not in prices
+        ]
+        queries.extend((asset, partial(instance._query_usd_price, asset)) for asset in other_assets)  # noqa: E501
+        for asset, query in queries:
+            try:
+                prices[asset] = instance._cached_current_price.get_or_query(
+                    key=(asset, A_USD),
+                    query=query,
+                )
+            except RemoteError as e:
+                log.error(f'Could not find the USD price of {asset.identifier} due to {str(e)}')
+
+        return prices
+
+    @staticmethod
+    def _is_priced_by_oracles(asset: Asset) -> bool:
+        """Whether the USD price of the asset is queried straight from the oracles and
+        not calculated in a special way by _query_usd_price"""
+        if asset.is_fiat() or asset in (A_BSQ, A_KFEE) or asset in Inquirer().special_tokens:
+            return False
+        try:
+            token = EthereumToken.from_asset(asset)
+        except UnknownAsset:
+            return True
+
+        return token is None or (
+            token.protocol not in KnownProtocolsAssets and
+            token.underlying_tokens is None
+        )
+
+    @staticmethod
+    def _query_usd_price(asset: Asset) -> Price:
+        """Queries the current USD price of the asset, skipping the cache"""
+        instance = Inquirer()
+        cache_key = (asset, A_USD)
         if asset.is_fiat():
             try:
                 return instance._query_fiat_pair(base=asset, quote=A_USD)
@@ -459,7 +650,7 @@ class Inquirer():
             else:
                 price = Price(usd_price)
 
-            Inquirer._cached_current_price[cache_key] = CachedPriceEntry(price=price, time=ts_now())  # noqa: E501
+            Inquirer.set_cached_current_price(cache_key=cache_key, price=price)
             return price
 
         if is_known_protocol is True or underlying_tokens is not None:
@@ -473,10 +664,7 @@ class Inquirer():
                     )
             else:
                 usd_price = Price(result)
-            Inquirer._cached_current_price[cache_key] = CachedPriceEntry(
-                price=usd_price,
-                time=ts_now(),
-            )
+            Inquirer.set_cached_current_price(cache_key=cache_key, price=usd_price)
             return usd_price
 
         # BSQ is a special asset that doesnt have oracle information but its custom API
@@ -485,10 +673,7 @@ class Inquirer():
                 price_in_btc = get_bisq_market_price(asset)
                 btc_price = Inquirer().find_usd_price(A_BTC)
                 usd_price = Price(price_in_btc * btc_price)
-                Inquirer._cached_current_price[cache_key] = CachedPriceEntry(
-                    price=usd_price,
-                    time=ts_now(),
-                )
+                Inquirer.set_cached_current_price(cache_key=cache_key, price=usd_price)
                 return usd_price
             except (RemoteError, DeserializationError) as e:
                 msg = f'Could not find price for BSQ. {str(e)}'
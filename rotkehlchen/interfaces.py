@@ -1,5 +1,5 @@
 import abc
-from typing import Optional
+from typing import Dict, List, Optional
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.types import Price, Timestamp
@@ -27,6 +27,23 @@ class CurrentPriceOracleInterface(metaclass=abc.ABCMeta):
         """
         ...
 
+    def query_multiple_current_prices(  # pylint: disable=no-self-use
+            self,
+            from_assets: List[Asset],  # pylint: disable=unused-argument
+            to_asset: Asset,  # pylint: disable=unused-argument
+    ) -> Optional[Dict[Asset, Price]]:
+        """An oracle that can query the current prices of many assets in one request
+        implements this to return the prices of from_assets in to_asset.
+
+        Assets the oracle was asked for but has no price for are returned with a zero
+        price. Assets it could not be asked for, due to an error or because they need
+        special handling, are not in the result so that they are queried one by one.
+        Returns None if the oracle can't query multiple prices at once.
+
+        Should not raise.
+        """
+        return None
+
 
 class HistoricalPriceOracleInterface(CurrentPriceOracleInterface):
     """Query prices for certain timestamps. Oracle could be rate limited"""
@@ -57,3 +74,20 @@ class HistoricalPriceOracleInterface(CurrentPriceOracleInterface):
         - RemoteError
         """
         ...
+
+    def prefetch_historical_prices(  # pylint: disable=no-self-use
+            self,
+            from_asset: Asset,  # pylint: disable=unused-argument
+            to_asset: Asset,  # pylint: disable=unused-argument
+            timestamps: List[Timestamp],
+    ) -> List[Timestamp]:
+        """An oracle that can query a range of prices at once implements this to fetch
+        and cache all the prices from_asset to to_asset needed for the given sorted
+        timestamps. Subsequent query_historical_price calls are then served from the cache.
+
+        Returns the timestamps the oracle has no cached price for, which are left for
+        the next oracles.
+
+        Should not raise. Any price that could not be prefetched is queried on demand.
+        """
+        return timestamps
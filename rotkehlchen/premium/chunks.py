@@ -0,0 +1,190 @@
+"""Chunked format of the DB data synced with the rotki server
+
+The plaintext export of the DB is split in chunks at page boundaries chosen by the
+content of the pages. Inserting or deleting pages then only changes the chunks around
+them instead of shifting every chunk after them, so only the chunks that changed since
+the last sync need to be uploaded.
+
+Each chunk is identified by a keyed hash of its content, so that the server can't
+learn anything about the data from the identifiers, and is compressed and encrypted
+on its own. The manifest lists the chunk identifiers in DB order and is encrypted
+the same way.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, NamedTuple, Set, Tuple
+
+from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.types import B64EncodedBytes
+
+CHUNKED_SYNC_VERSION = 1
+SYNC_PAGE_SIZE = 4096  # default sqlite page size
+SYNC_CHUNK_MIN_PAGES = 16
+SYNC_CHUNK_MAX_PAGES = 256
+# A chunk ends after a page whose crc32 has these bits unset. Around every 64 pages.
+SYNC_CHUNK_BOUNDARY_MASK = 0x3f
+
+
+class DBChunk(NamedTuple):
+    chunk_id: str
+    offset: int
+    size: int
+
+
+class DBChunksManifest(NamedTuple):
+    data_hash: str  # base64 sha256 of the whole plaintext DB
+    size: int
+    chunk_ids: List[str]
+
+    def serialize(self) -> bytes:
+        return json.dumps({
+            'version': CHUNKED_SYNC_VERSION,
+            'data_hash': self.data_hash,
+            'size': self.size,
+            'chunks': self.chunk_ids,
+        }).encode()
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> 'DBChunksManifest':
+        """May raise:
+        - DeserializationError if the manifest is malformed or of an unknown version
+        """
+        try:
+            manifest = json.loads(data)
+            if manifest['version'] != CHUNKED_SYNC_VERSION:
+                raise DeserializationError(
+                    f'Unknown DB chunks manifest version {manifest["version"]}',
+                )
+            return cls(
+                data_hash=manifest['data_hash'],
+                size=manifest['size'],
+                chunk_ids=manifest['chunks'],
+            )
+        except (ValueError, TypeError, KeyError) as e:
+            raise DeserializationError(f'Malformed DB chunks manifest: {str(e)}') from e
+
+
+def _chunk_id_key(password: str) -> bytes:
+    """A key for the chunk identifiers different from the one used for encryption"""
+    return hashlib.sha256(b'rotki db sync chunk id' + password.encode()).digest()
+
+
+def _chunk_id(key: bytes, data: bytes) -> str:
+    return hmac.new(key, data, hashlib.sha256).hexdigest()
+
+
+def encrypt_chunk(password: str, data: bytes) -> B64EncodedBytes:
+    return B64EncodedBytes(encrypt(password.encode(), zlib.compress(data, level=9)).encode())
+
+
+def decrypt_chunk(password: str, encrypted_data: str) -> bytes:
+    """May raise:
+    - UnableToDecryptRemoteData if the data can't be decrypted with the password
+    """
+    decrypted_data = decrypt(password.encode(), encrypted_data)
+    try:
+        return zlib.decompress(decrypted_data)
+    except zlib.error as e:
+        raise UnableToDecryptRemoteData(f'Could not decompress DB chunk: {str(e)}') from e
+
+
+def _iterate_chunks(source: BinaryIO) -> Iterator[bytes]:
+    """Yields the content of the chunks of the file, reading it one page at a time"""
+    pages: List[bytes] = []
+    while True:
+        page = source.read(SYNC_PAGE_SIZE)
+        if not page:
+            break
+
+        pages.append(page)
+        if len(pages) >= SYNC_CHUNK_MAX_PAGES or (
+            len(pages) >= SYNC_CHUNK_MIN_PAGES and
+            zlib.crc32(page) & SYNC_CHUNK_BOUNDARY_MASK == 0
+        ):
+            yield b''.join(pages)
+            pages = []
+
+    if len(pages) != 0:
+        yield b''.join(pages)
+
+
+class ChunkedDBFile():
+    """A plaintext DB export split in chunks. The file needs to exist for as long
+    as the encrypted chunks are read."""
+
+    def __init__(self, path: Path, password: str) -> None:
+        self.path = path
+        self.password = password
+        self.chunks: List[DBChunk] = []
+        key = _chunk_id_key(password)
+        data_hash = hashlib.sha256()
+        offset = 0
+        with open(path, 'rb') as source:
+            for data in _iterate_chunks(source):
+                data_hash.update(data)
+                self.chunks.append(DBChunk(chunk_id=_chunk_id(key, data), offset=offset, size=len(data)))  # noqa: E501
+                offset += len(data)
+
+        self.size = offset
+        self.data_hash = base64.b64encode(data_hash.digest()).decode()
+
+    def manifest(self) -> DBChunksManifest:
+        return DBChunksManifest(
+            data_hash=self.data_hash,
+            size=self.size,
+            chunk_ids=[x.chunk_id for x in self.chunks],
+        )
+
+    def encrypted_manifest(self) -> B64EncodedBytes:
+        return encrypt_chunk(self.password, self.manifest().serialize())
+
+    def encrypted_chunks(self, skip_ids: Set[str]) -> Iterator[Tuple[str, B64EncodedBytes]]:
+        """Yields the identifier and encrypted content of each distinct chunk whose
+        identifier is not in skip_ids, reading only those chunks from the file"""
+        seen_ids = set(skip_ids)
+        with open(self.path, 'rb') as source:
+            for chunk in self.chunks:
+                if chunk.chunk_id in seen_ids:
+                    continue
+
+                seen_ids.add(chunk.chunk_id)
+                source.seek(chunk.offset)
+                yield chunk.chunk_id, encrypt_chunk(self.password, source.read(chunk.size))
+
+
+def assemble_db_file(
+        path: Path,
+        password: str,
+        encrypted_manifest: str,
+        get_chunk: Callable[[str], str],
+) -> None:
+    """Writes the plaintext DB described by the manifest to path, one chunk at a time
+
+    May raise:
+    - UnableToDecryptRemoteData if the manifest or a chunk can't be decrypted with
+    the password
+    - DeserializationError if the manifest is malformed
+    - RemoteError if a chunk can't be retrieved or the assembled data does not match
+    the manifest
+    - Anything else get_chunk raises
+    """
+    manifest = DBChunksManifest.deserialize(decrypt_chunk(password, encrypted_manifest))
+    key = _chunk_id_key(password)
+    data_hash = hashlib.sha256()
+    with open(path, 'wb') as destination:
+        for chunk_id in manifest.chunk_ids:
+            data = decrypt_chunk(password, get_chunk(chunk_id))
+            if _chunk_id(key, data) != chunk_id:
+                raise RemoteError(f'Content of DB chunk {chunk_id} does not match its id')
+
+            data_hash.update(data)
+            destination.write(data)
+
+    if base64.b64encode(data_hash.digest()).decode() != manifest.data_hash:
+        raise RemoteError('Assembled DB does not match the hash of the DB chunks manifest')
@@ -7,7 +7,7 @@ from base64 import b64decode, b64encode
 from binascii import Error as BinasciiError
 from enum import Enum
 from http import HTTPStatus
-from typing import Any, Dict, Literal, NamedTuple, Optional, Tuple
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, Set, Tuple
 from urllib.parse import urlencode
 
 import requests
@@ -271,6 +271,146 @@ class Premium():
 
         return _process_dict_response(response)
 
+    def _signed_request(
+            self,
+            http_method: Literal['GET', 'PUT', 'DELETE'],
+            method: str,
+            timeout: int = ROTKEHLCHEN_SERVER_TIMEOUT,
+            **kwargs: Any,
+    ) -> requests.Response:
+        """Sends a signed request to the given method of the server
+
+        May raise:
+        - RemoteError if there are problems reaching the server
+        """
+        signature, data = self.sign(method, **kwargs)
+        self.session.headers.update({
+            'API-SIGN': base64.b64encode(signature.digest()),
+        })
+        requester = {
+            'GET': self.session.get,
+            'PUT': self.session.put,
+            'DELETE': self.session.delete,
+        }[http_method]
+        try:
+            return requester(self.uri + method, data=data, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            msg = f'Could not connect to rotki server due to {str(e)}'
+            log.error(msg)
+            raise RemoteError(msg) from e
+
+    def query_data_chunks(self) -> Optional[Set[str]]:
+        """Queries the identifiers of the DB chunks saved in the server
+
+        Returns None if the server does not support saving the DB in chunks.
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        response = self._signed_request('GET', 'data_chunks')
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            return None
+
+        result = _process_dict_response(response)
+        return set(result['chunks'])
+
+    def upload_data_chunk(self, chunk_id: str, data_blob: B64EncodedBytes) -> None:
+        """Uploads a compressed and encrypted DB chunk to the server
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        response = self._signed_request(
+            'PUT',
+            'save_data_chunk',
+            timeout=ROTKEHLCHEN_SERVER_TIMEOUT * 10,
+            chunk_id=chunk_id,
+            data_blob=data_blob,
+        )
+        _process_dict_response(response)
+
+    def delete_data_chunks(self, chunk_ids: List[str]) -> None:
+        """Deletes the given DB chunks from the server
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        response = self._signed_request(
+            'DELETE',
+            'delete_data_chunks',
+            chunk_ids=','.join(chunk_ids),
+        )
+        _process_dict_response(response)
+
+    def upload_data_manifest(
+            self,
+            manifest_blob: B64EncodedBytes,
+            our_hash: str,
+            last_modify_ts: Timestamp,
+            data_size: int,
+    ) -> Dict:
+        """Uploads the encrypted manifest of the DB chunks, all of which need to be
+        in the server, making it the saved DB. Returns the response dict
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        response = self._signed_request(
+            'PUT',
+            'save_data_manifest',
+            manifest_blob=manifest_blob,
+            original_hash=our_hash,
+            last_modify_ts=last_modify_ts,
+            length=data_size,
+            compression='zlib',
+        )
+        return _process_dict_response(response)
+
+    def pull_data_manifest(self) -> Optional[str]:
+        """Pulls the encrypted manifest of the DB chunks saved in the server
+
+        Returns None if the server does not support saving the DB in chunks or if
+        the saved DB was not uploaded in chunks.
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        response = self._signed_request('GET', 'get_data_manifest')
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            return None
+
+        return _process_dict_response(response)['data']
+
+    def pull_data_chunk(self, chunk_id: str) -> str:
+        """Pulls a compressed and encrypted DB chunk from the server
+
+        May raise:
+        - RemoteError if there are problems reaching the server, if
+        there is an error returned by the server or if the chunk is missing
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        response = self._signed_request(
+            'GET',
+            'get_data_chunk',
+            timeout=ROTKEHLCHEN_SERVER_TIMEOUT * 10,
+            chunk_id=chunk_id,
+        )
+        data = _process_dict_response(response).get('data')
+        if data is None:
+            raise RemoteError(f'DB chunk {chunk_id} is missing from the rotki server')
+
+        return data
+
     def query_last_data_metadata(self) -> RemoteMetadata:
         """Queries last metadata from the server and returns the response
         as a RemoteMetadata object.
@@ -2,15 +2,25 @@ import base64
 import logging
 import shutil
 from enum import Enum
-from typing import Any, Dict, Literal, NamedTuple, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Literal, NamedTuple, Optional, Set, Tuple, Union
 
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.errors.api import PremiumAuthenticationError, RotkehlchenPermissionError
 from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.premium.premium import Premium, PremiumCredentials, premium_create_and_verify
+from rotkehlchen.premium.premium import (
+    Premium,
+    PremiumCredentials,
+    RemoteMetadata,
+    premium_create_and_verify,
+)
+from rotkehlchen.types import B64EncodedString
 from rotkehlchen.utils.misc import ts_now
 
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
@@ -95,18 +105,31 @@ class PremiumSyncManager():
         if self.premium is None:
             return False, 'Pulling failed. User does not have active premium.'
 
+        data: Optional[B64EncodedString] = None
         try:
-            result = self.premium.pull_data()
+            manifest = self.premium.pull_data_manifest()
+            if manifest is None:  # the saved DB was not uploaded in chunks
+                data = self.premium.pull_data()['data']
         except (RemoteError, PremiumAuthenticationError) as e:
             log.debug('sync from server -- pulling failed.', error=str(e))
             return False, f'Pulling failed: {str(e)}'
 
-        if result['data'] is None:
+        if manifest is None and data is None:
             log.debug('sync from server -- no data found.')
             return False, 'No data found'
 
         try:
-            self.data.decompress_and_decrypt_db(self.password, result['data'])
+            if manifest is not None:
+                self.data.import_db_chunks(
+                    password=self.password,
+                    encrypted_manifest=manifest,
+                    get_chunk=self.premium.pull_data_chunk,
+                )
+            elif data is not None:
+                self.data.decompress_and_decrypt_db(self.password, data)
+        except (RemoteError, PremiumAuthenticationError, DeserializationError) as e:
+            log.debug('sync from server -- pulling chunks failed.', error=str(e))
+            return False, f'Pulling failed: {str(e)}'
         except UnableToDecryptRemoteData as e:
             raise PremiumAuthenticationError(
                 'The given password can not unlock the database that was retrieved  from '
@@ -115,6 +138,131 @@ class PremiumSyncManager():
 
         return True, ''
 
+    def _should_upload(
+            self,
+            cursor: 'DBCursor',
+            metadata: RemoteMetadata,
+            our_hash: str,
+            data_size: Optional[int],
+            force_upload: bool,
+    ) -> bool:
+        """data_size is None if it can't be compared with the size of the remote DB,
+        in which case the sizes are not checked"""
+        log.debug(
+            'CAN_PUSH',
+            ours=our_hash,
+            theirs=metadata.data_hash,
+        )
+        if our_hash == metadata.data_hash and not force_upload:
+            log.debug('upload to server stopped -- same hash')
+            # same hash -- no need to upload anything
+            return False
+
+        our_last_write_ts = self.data.db.get_setting(cursor=cursor, name='last_write_ts')
+        if our_last_write_ts <= metadata.last_modify_ts and not force_upload:
+            # Server's DB was modified after our local DB
+            log.debug(
+                f'upload to server stopped -- remote db({metadata.last_modify_ts}) '
+                f'more recent than local({our_last_write_ts})',
+            )
+            return False
+
+        if data_size is not None and data_size < metadata.data_size and not force_upload:
+            # Let's be conservative.
+            # TODO: Here perhaps prompt user in the future
+            log.debug(
+                f'upload to server stopped -- remote db({metadata.data_size}) '
+                f'bigger than local({data_size})',
+            )
+            return False
+
+        return True
+
+    def _upload_whole_db(
+            self,
+            cursor: 'DBCursor',
+            metadata: RemoteMetadata,
+            force_upload: bool,
+    ) -> bool:
+        """Uploads the entire DB as a single blob, for servers that can't save chunks"""
+        assert self.premium is not None, 'caller should make sure premium is active'
+        b64_encoded_data, our_hash = self.data.compress_and_encrypt_db(self.password)
+        data_bytes_size = len(base64.b64decode(b64_encoded_data))
+        if not self._should_upload(cursor, metadata, our_hash, data_bytes_size, force_upload):
+            return False
+
+        try:
+            self.premium.upload_data(
+                data_blob=b64_encoded_data,
+                our_hash=our_hash,
+                last_modify_ts=self.data.db.get_setting(cursor=cursor, name='last_write_ts'),
+                compression_type='zlib',
+            )
+        except (RemoteError, PremiumAuthenticationError) as e:
+            log.debug('upload to server -- upload error', error=str(e))
+            return False
+
+        return True
+
+    def _upload_db_chunks(
+            self,
+            cursor: 'DBCursor',
+            metadata: RemoteMetadata,
+            remote_chunks: Set[str],
+            force_upload: bool,
+    ) -> bool:
+        """Uploads only the DB chunks the server does not have and then the manifest
+        that makes them the saved DB. Then deletes the server chunks the manifest
+        does not use."""
+        assert self.premium is not None, 'caller should make sure premium is active'
+        try:
+            # The size of a DB saved in chunks is that of the plaintext DB while the
+            # size of a DB saved as a whole is that of the compressed and encrypted one
+            remote_in_chunks = force_upload or self.premium.pull_data_manifest() is not None
+        except (RemoteError, PremiumAuthenticationError) as e:
+            log.debug('upload to server -- fetching manifest error', error=str(e))
+            return False
+
+        with self.data.export_db_in_chunks(self.password) as chunked_db:
+            if not self._should_upload(
+                    cursor=cursor,
+                    metadata=metadata,
+                    our_hash=chunked_db.data_hash,
+                    data_size=chunked_db.size if remote_in_chunks else None,
+                    force_upload=force_upload,
+            ):
+                return False
+
+            uploaded_num = 0
+            try:
+                for chunk_id, data_blob in chunked_db.encrypted_chunks(skip_ids=remote_chunks):
+                    self.premium.upload_data_chunk(chunk_id=chunk_id, data_blob=data_blob)
+                    uploaded_num += 1
+
+                self.premium.upload_data_manifest(
+                    manifest_blob=chunked_db.encrypted_manifest(),
+                    our_hash=chunked_db.data_hash,
+                    last_modify_ts=self.data.db.get_setting(cursor=cursor, name='last_write_ts'),  # noqa: E501
+                    data_size=chunked_db.size,
+                )
+            except (RemoteError, PremiumAuthenticationError) as e:
+                log.debug('upload to server -- chunks upload error', error=str(e))
+                return False
+
+        log.debug(
+            f'upload to server -- uploaded {uploaded_num} out of '
+            f'{len(chunked_db.chunks)} DB chunks',
+        )
+        unused_chunks = remote_chunks - {x.chunk_id for x in chunked_db.chunks}
+        if len(unused_chunks) != 0:
+            try:
+                self.premium.delete_data_chunks(sorted(unused_chunks))
+            except (RemoteError, PremiumAuthenticationError) as e:
+                # they are deleted at the next upload
+                log.debug('upload to server -- deleting unused chunks error', error=str(e))
+
+        return True
+
     def maybe_upload_data_to_server(self, force_upload: bool = False) -> bool:
         # if user has no premium do nothing
         if self.premium is None:
@@ -131,49 +279,16 @@ class PremiumSyncManager():
 
             try:
                 metadata = self.premium.query_last_data_metadata()
+                remote_chunks = self.premium.query_data_chunks()
             except (RemoteError, PremiumAuthenticationError) as e:
                 log.debug('upload to server -- fetching metadata error', error=str(e))
                 return False
-            b64_encoded_data, our_hash = self.data.compress_and_encrypt_db(self.password)
 
-            log.debug(
-                'CAN_PUSH',
-                ours=our_hash,
-                theirs=metadata.data_hash,
-            )
-            if our_hash == metadata.data_hash and not force_upload:
-                log.debug('upload to server stopped -- same hash')
-                # same hash -- no need to upload anything
-                return False
-
-            our_last_write_ts = self.data.db.get_setting(cursor=cursor, name='last_write_ts')
-            if our_last_write_ts <= metadata.last_modify_ts and not force_upload:
-                # Server's DB was modified after our local DB
-                log.debug(
-                    f'upload to server stopped -- remote db({metadata.last_modify_ts}) '
-                    f'more recent than local({our_last_write_ts})',
-                )
-                return False
-
-            data_bytes_size = len(base64.b64decode(b64_encoded_data))
-            if data_bytes_size < metadata.data_size and not force_upload:
-                # Let's be conservative.
-                # TODO: Here perhaps prompt user in the future
-                log.debug(
-                    f'upload to server stopped -- remote db({metadata.data_size}) '
-                    f'bigger than local({data_bytes_size})',
-                )
-                return False
-
-            try:
-                self.premium.upload_data(
-                    data_blob=b64_encoded_data,
-                    our_hash=our_hash,
-                    last_modify_ts=our_last_write_ts,
-                    compression_type='zlib',
-                )
-            except (RemoteError, PremiumAuthenticationError) as e:
-                log.debug('upload to server -- upload error', error=str(e))
+            if remote_chunks is None:  # server can only save the entire DB
+                uploaded = self._upload_whole_db(cursor, metadata, force_upload)
+            else:
+                uploaded = self._upload_db_chunks(cursor, metadata, remote_chunks, force_upload)  # noqa: E501
+            if uploaded is False:
                 return False
 
             # update the last data upload value
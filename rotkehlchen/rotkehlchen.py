@@ -27,6 +27,7 @@ from rotkehlchen.accounting.structures.balance import Balance, BalanceType
 from rotkehlchen.api.websockets.notifier import RotkiNotifier
 from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import Asset
+from rotkehlchen.assets.resolver import AssetResolver
 from rotkehlchen.balances.manual import (
     account_for_manually_tracked_asset_balances,
     get_manually_tracked_balances,
@@ -59,7 +60,7 @@ from rotkehlchen.externalapis.coingecko import Coingecko
 from rotkehlchen.externalapis.covalent import Covalent, chains_id
 from rotkehlchen.externalapis.cryptocompare import Cryptocompare
 from rotkehlchen.externalapis.etherscan import Etherscan
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FVal, fval_sum
 from rotkehlchen.globaldb import GlobalDBHandler
 from rotkehlchen.globaldb.updates import AssetsUpdater
 from rotkehlchen.greenlets import GreenletManager
@@ -137,6 +138,8 @@ class Rotkehlchen():
         self.exchange_manager = ExchangeManager(msg_aggregator=self.msg_aggregator)
         # Initialize the GlobalDBHandler singleton. Has to be initialized BEFORE asset resolver
         GlobalDBHandler(data_dir=self.data_dir)
+        # Read all assets at once instead of one query per asset as they are first used
+        AssetResolver().load_all_asset_data()
         self.data = DataHandler(self.data_dir, self.msg_aggregator)
         self.cryptocompare = Cryptocompare(data_directory=self.data_dir, database=None)
         self.coingecko = Coingecko()
@@ -675,6 +678,12 @@ class Rotkehlchen():
             save_despite_errors=save_despite_errors,
         )
 
+        # Query the prices of the assets of the latest balance snapshot at once so that
+        # the balance queries below mostly find them in the price cache
+        with self.data.db.conn.read_ctx() as cursor:
+            latest_assets = self.data.db.get_latest_snapshot_assets(cursor)
+        Inquirer().find_usd_prices(latest_assets)
+
         balances: Dict[str, Dict[Asset, Balance]] = {}
         problem_free = True
         for exchange in self.exchange_manager.iterate_exchanges():
@@ -776,8 +785,8 @@ class Rotkehlchen():
                 assets_total_balance[asset] += balance
                 total_usd_per_location[location] += balance.usd_value
 
-        net_usd = sum((balance.usd_value for _, balance in assets_total_balance.items()), ZERO)
-        liabilities_total_usd = sum((liability.usd_value for _, liability in liabilities.items()), ZERO)  # noqa: E501
+        net_usd = fval_sum(balance.usd_value for balance in assets_total_balance.values())
+        liabilities_total_usd = fval_sum(liability.usd_value for liability in liabilities.values())  # noqa: E501
         net_usd -= liabilities_total_usd
 
         # Calculate location stats
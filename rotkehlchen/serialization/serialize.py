@@ -61,7 +61,12 @@ from rotkehlchen.chain.ethereum.modules.yearn.vaults import (
 from rotkehlchen.chain.ethereum.trades import AMMTrade
 from rotkehlchen.chain.ethereum.types import NodeName, WeightedNode
 from rotkehlchen.db.settings import DBSettings
-from rotkehlchen.db.utils import DBAssetBalance, LocationData, SingleDBAssetBalance
+from rotkehlchen.db.utils import (
+    DBAssetBalance,
+    DownsampledAssetBalance,
+    LocationData,
+    SingleDBAssetBalance,
+)
 from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.exchanges.kraken import KrakenAccountType
 from rotkehlchen.fval import FVal
@@ -124,6 +129,7 @@ def _process_entry(entry: Any) -> Union[str, List[Any], Dict[str, Any], Any]:
             Eth2Deposit,
             StakingEvent,
             NodeName,
+            DownsampledAssetBalance,
     )):
         return entry.serialize()
     if isinstance(entry, (
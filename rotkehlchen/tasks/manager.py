@@ -1,8 +1,10 @@
 import copy
 import logging
 import random
+import time
 from collections import defaultdict
-from typing import TYPE_CHECKING, Callable, DefaultDict, List, NamedTuple, Set, Tuple
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, DefaultDict, Dict, List, NamedTuple, Set, Tuple
 
 import gevent
 
@@ -57,6 +59,10 @@ PREMIUM_STATUS_CHECK = 3600  # every hour
 TX_RECEIPTS_QUERY_LIMIT = 500
 TX_DECODING_LIMIT = 500
 PREMIUM_CHECK_RETRY_LIMIT = 3
+# A task type whose greenlet died with a remote error is not scheduled again for
+# base * 2 ** (consecutive failures - 1) seconds, up to the max
+TASK_BACKOFF_BASE_SECS = 60
+TASK_BACKOFF_MAX_SECS = 3600
 
 
 def noop_exchange_success_cb(trades, margin, asset_movements, exchange_specific_data) -> None:  # type: ignore # noqa: E501
@@ -72,6 +78,42 @@ class CCHistoQuery(NamedTuple):
     to_asset: Asset
 
 
+class TaskSchedulingOptions(NamedTuple):
+    priority: int  # lower priority tasks are scheduled first
+    max_concurrent: int  # max greenlets of the task type running at once
+
+
+# Keyed by the name of the potential task's callable without leading underscores
+TASK_SCHEDULING_OPTIONS: Dict[str, TaskSchedulingOptions] = {
+    'maybe_check_premium_status': TaskSchedulingOptions(priority=0, max_concurrent=1),
+    'maybe_schedule_ethereum_txreceipts': TaskSchedulingOptions(priority=1, max_concurrent=1),
+    'maybe_decode_evm_transactions': TaskSchedulingOptions(priority=1, max_concurrent=1),
+    'maybe_query_ethereum_transactions': TaskSchedulingOptions(priority=2, max_concurrent=1),
+    'maybe_schedule_exchange_history_query': TaskSchedulingOptions(priority=2, max_concurrent=1),  # noqa: E501
+    'maybe_update_snapshot_balances': TaskSchedulingOptions(priority=2, max_concurrent=1),
+    'maybe_schedule_xpub_derivation': TaskSchedulingOptions(priority=3, max_concurrent=2),
+    'maybe_query_missing_prices': TaskSchedulingOptions(priority=3, max_concurrent=1),
+    'maybe_upload_data_to_server': TaskSchedulingOptions(priority=4, max_concurrent=1),
+    'maybe_schedule_cryptocompare_query': TaskSchedulingOptions(priority=5, max_concurrent=1),
+}
+DEFAULT_TASK_SCHEDULING_OPTIONS = TaskSchedulingOptions(priority=3, max_concurrent=1)
+
+
+@dataclass
+class TaskTypeState():
+    """Scheduling history of a potential task. Times come from time.monotonic()"""
+    last_scheduled: float = 0
+    last_duration: Optional[float] = None
+    runs: int = 0
+    failures: int = 0  # consecutive remote errors
+    backoff_until: float = 0
+    last_error: Optional[str] = None
+
+
+def _task_type_name(potential_task: Callable) -> str:
+    return potential_task.__name__.lstrip('_')
+
+
 class TaskManager():
 
     def __init__(
@@ -132,6 +174,7 @@ class TaskManager():
         ]
         if premium_sync_manager is not None:
             self.potential_tasks.append(premium_sync_manager.maybe_upload_data_to_server)
+        self.task_states: DefaultDict[str, TaskTypeState] = defaultdict(TaskTypeState)
         self.schedule_lock = gevent.lock.Semaphore()
 
     def _prepare_cryptocompare_queries(self) -> None:
@@ -492,8 +535,72 @@ class TaskManager():
                     ignore_cache=True,
                 )
 
+    def _running_greenlets_of(self, task_type: str) -> int:
+        return sum(
+            1 for x in self.greenlet_manager.greenlets
+            if not x.dead and getattr(x, 'task_type', None) == task_type
+        )
+
+    def _backoff(self, task_type: str, error: str) -> None:
+        state = self.task_states[task_type]
+        state.failures += 1
+        state.last_error = error
+        backoff_secs = min(
+            TASK_BACKOFF_BASE_SECS * 2 ** (state.failures - 1),
+            TASK_BACKOFF_MAX_SECS,
+        )
+        state.backoff_until = time.monotonic() + backoff_secs
+        log.debug(f'Backing off {task_type} for {backoff_secs} seconds due to {error}')
+
+    def _task_greenlet_finished(self, greenlet: gevent.Greenlet) -> None:
+        state = self.task_states[greenlet.task_type]
+        state.last_duration = time.monotonic() - greenlet.spawned_at
+        if greenlet.successful():
+            state.failures = 0
+            state.backoff_until = 0
+        elif isinstance(greenlet.exception, RemoteError):
+            self._backoff(greenlet.task_type, str(greenlet.exception))
+
+    def _get_task_queue(self) -> List[Tuple[Callable, str, TaskSchedulingOptions]]:
+        """Returns the potential tasks in the order they are considered for scheduling.
+        By priority and among the same priority the least recently scheduled first."""
+        queue = []
+        for potential_task in self.potential_tasks:
+            task_type = _task_type_name(potential_task)
+            options = TASK_SCHEDULING_OPTIONS.get(task_type, DEFAULT_TASK_SCHEDULING_OPTIONS)
+            queue.append((potential_task, task_type, options))
+
+        queue.sort(key=lambda x: (x[2].priority, self.task_states[x[1]].last_scheduled))
+        return queue
+
+    def _schedule_task(self, potential_task: Callable, task_type: str) -> int:
+        """Runs the potential task and tags the greenlets it spawned with its type so
+        that they can be limited and timed. Returns the number of spawned greenlets."""
+        state = self.task_states[task_type]
+        state.last_scheduled = time.monotonic()
+        existing_greenlets = set(self.greenlet_manager.greenlets)
+        try:
+            potential_task()
+        except RemoteError as e:
+            self._backoff(task_type, str(e))
+            return 0
+
+        current = gevent.getcurrent()
+        spawned = [  # api requests may spawn greenlets at the same time
+            x for x in self.greenlet_manager.greenlets
+            if x not in existing_greenlets and x.spawning_greenlet() is current
+        ]
+        for greenlet in spawned:
+            greenlet.task_type = task_type
+            greenlet.link(self._task_greenlet_finished)
+
+        state.runs += len(spawned)
+        return len(spawned)
+
     def _schedule(self) -> None:
-        """Schedules background tasks"""
+        """Schedules background tasks in priority order for as long as the number of
+        running greenlets is below the max and respecting each task type's
+        concurrency limit and backoff"""
         self.greenlet_manager.clear_finished()
         current_greenlets = len(self.greenlet_manager.greenlets) + len(self.api_task_greenlets)
         not_proceed = current_greenlets >= self.max_tasks_num
@@ -505,13 +612,62 @@ class TaskManager():
         if not_proceed:
             return  # too busy
 
-        callables = random.sample(
-            population=self.potential_tasks,
-            k=min(self.max_tasks_num - current_greenlets, len(self.potential_tasks)),
-        )
+        now = time.monotonic()
+        for potential_task, task_type, options in self._get_task_queue():
+            if current_greenlets >= self.max_tasks_num:
+                break
+            if self.task_states[task_type].backoff_until > now:
+                continue
+            if self._running_greenlets_of(task_type) >= options.max_concurrent:
+                continue
 
-        for callable_fn in callables:
-            callable_fn()
+            current_greenlets += self._schedule_task(potential_task, task_type)
+
+    def get_tasks_status(self) -> Dict[str, Any]:
+        """Returns the queue of potential tasks in scheduling order along with the
+        running background greenlets and their latencies in seconds"""
+        now = time.monotonic()
+        running = []
+        for greenlet in self.greenlet_manager.greenlets:
+            if greenlet.dead:
+                continue
+            spawned_at = getattr(greenlet, 'spawned_at', None)
+            running.append({
+                'task_name': greenlet.task_name,
+                'task_type': getattr(greenlet, 'task_type', None),
+                'running_secs': None if spawned_at is None else round(now - spawned_at, 3),
+            })
+
+        queue = []
+        for _, task_type, options in self._get_task_queue():
+            state = self.task_states[task_type]
+            running_num = self._running_greenlets_of(task_type)
+            if state.backoff_until > now:
+                status = 'backoff'
+            elif running_num >= options.max_concurrent:
+                status = 'at_limit'
+            else:
+                status = 'pending'
+            queue.append({
+                'task_type': task_type,
+                'status': status,
+                'priority': options.priority,
+                'max_concurrent': options.max_concurrent,
+                'running': running_num,
+                'runs': state.runs,
+                'failures': state.failures,
+                'last_error': state.last_error,
+                'backoff_secs': round(max(state.backoff_until - now, 0), 3),
+                'last_scheduled_secs_ago': None if state.last_scheduled == 0 else round(now - state.last_scheduled, 3),  # noqa: E501
+                'last_duration_secs': None if state.last_duration is None else round(state.last_duration, 3),  # noqa: E501
+            })
+
+        return {
+            'max_tasks_num': self.max_tasks_num,
+            'api_tasks_running': len([x for x in self.api_task_greenlets if not x.dead]),
+            'running': running,
+            'queue': queue,
+        }
 
     def schedule(self) -> None:
         """Schedules background task while holding the scheduling lock
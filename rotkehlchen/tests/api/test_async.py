@@ -145,3 +145,19 @@ def test_query_async_task_that_died(rotkehlchen_api_server_with_exchanges):
     assert result['outcome']['result'] is None
     msg = 'The backend query task died unexpectedly: BOOM!'
     assert result['outcome']['message'] == msg
+
+
+def test_query_background_tasks(rotkehlchen_api_server):
+    """Test that the queue and the running greenlets of the task manager can be queried"""
+    task_manager = rotkehlchen_api_server.rest_api.rotkehlchen.task_manager
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'backgroundtasksresource'))
+    result = assert_proper_response_with_result(response)
+    assert result['max_tasks_num'] == task_manager.max_tasks_num
+    assert result['api_tasks_running'] == 0
+    assert {x['task_type'] for x in result['queue']} == {
+        x.__name__.lstrip('_') for x in task_manager.potential_tasks
+    }
+    priorities = [x['priority'] for x in result['queue']]
+    assert priorities == sorted(priorities)
+    for entry in result['running']:
+        assert entry['running_secs'] >= 0
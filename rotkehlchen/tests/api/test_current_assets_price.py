@@ -71,3 +71,24 @@ def test_get_current_assets_price_in_btc(rotkehlchen_api_server):
     assert result['assets']['GBP'] == '0.00004119457641910343485018976024'
     assert result['assets']['USD'] == '0.00003013502298398202988309419184'
     assert result['target_asset'] == 'BTC'
+
+
+def test_get_current_price_cache_stats(rotkehlchen_api_server):
+    response = requests.get(
+        api_url_for(
+            rotkehlchen_api_server,
+            'currentpricecacheresource',
+        ),
+    )
+    result = assert_proper_response_with_result(response)
+    assert set(result) == {
+        'size',
+        'max_size',
+        'hits',
+        'misses',
+        'evictions',
+        'expirations',
+        'coalesced',
+        'in_flight',
+    }
+    assert all(isinstance(x, int) for x in result.values())
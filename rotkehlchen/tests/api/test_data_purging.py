@@ -2,6 +2,7 @@ import pytest
 import requests
 
 from rotkehlchen.constants import ONE
+from rotkehlchen.db.ethlogs import DBEthLogs
 from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
 from rotkehlchen.tests.utils.api import api_url_for, assert_simple_ok_response
@@ -82,6 +83,13 @@ def test_purge_ethereum_transaction_data(rotkehlchen_api_server):
             )],
             relevant_address=addr1,
         )
+        DBEthLogs(rotki.data.db).add_logs(
+            write_cursor=cursor,
+            query_name=f'ethlogs_{make_ethereum_address()}_topicshash',
+            from_block=1,
+            to_block=10,
+            logs=[{'blockNumber': 5, 'logIndex': 0}],
+        )
         filter_ = ETHTransactionsFilterQuery.make()
 
         result, filter_count = db.get_ethereum_transactions_and_limit_info(cursor, filter_, True)
@@ -97,3 +105,8 @@ def test_purge_ethereum_transaction_data(rotkehlchen_api_server):
         result, filter_count = db.get_ethereum_transactions_and_limit_info(cursor, filter_, True)
     assert len(result) == 0
     assert filter_count == 0
+    with rotki.data.db.conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT COUNT(*) FROM ethereum_logs_cache').fetchone()[0] == 0
+        assert cursor.execute(
+            'SELECT COUNT(*) FROM used_query_ranges WHERE name LIKE "ethlogs%"',
+        ).fetchone()[0] == 0
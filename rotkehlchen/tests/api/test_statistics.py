@@ -63,6 +63,30 @@ def test_query_statistics_netvalue(
     assert len(result['times']) == 1
     assert len(result['data']) == 1
 
+    response = requests.get(
+        api_url_for(
+            rotkehlchen_api_server_with_exchanges,
+            "statisticsnetvalueresource",
+        ), json={'resolution': 'day'},
+    )
+    downsampled_result = assert_proper_response_with_result(response)
+    assert downsampled_result['times'] == result['times']
+    assert downsampled_result['data'] == result['data']
+    for key in ('min_data', 'max_data'):  # aggregated as floats so compare the values
+        assert FVal(downsampled_result[key][0]) == FVal(result['data'][0])
+
+    response = requests.get(
+        api_url_for(
+            rotkehlchen_api_server_with_exchanges,
+            "statisticsnetvalueresource",
+        ), json={'resolution': 'day', 'buckets': 10},
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg='Only one of resolution and buckets can be given',
+        status_code=HTTPStatus.BAD_REQUEST,
+    )
+
 
 @pytest.mark.parametrize('number_of_eth_accounts', [2])
 @pytest.mark.parametrize('btc_accounts', [[UNIT_BTC_ADDRESS1, UNIT_BTC_ADDRESS2]])
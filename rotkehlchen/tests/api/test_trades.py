@@ -272,6 +272,92 @@ def test_query_trades_errors(rotkehlchen_api_server_with_exchanges):
     )
 
 
+@pytest.mark.parametrize('start_with_valid_premium', [False, True])
+def test_query_trades_with_cursor(rotkehlchen_api_server, start_with_valid_premium):
+    """Test that following the cursors of the trades pages gives all the trades once,
+    even when many of them share a timestamp, and that the cursor is validated"""
+    trades = [Trade(
+        timestamp=Timestamp(1 + x // 4),
+        location=Location.EXTERNAL,
+        base_asset=A_WETH,
+        quote_asset=A_EUR,
+        trade_type=TradeType.BUY,
+        amount=AssetAmount(FVal(x + 1)),
+        rate=Price(FVal('320')),
+        fee=Fee(ZERO),
+        fee_currency=A_EUR,
+        link='',
+        notes='',
+    ) for x in range(20)]
+    swaps = [AMMSwap(
+        tx_hash='0x' + str(x),
+        log_index=x + i,
+        address='0xfoo',
+        from_address='0xfrom',
+        to_address='0xto',
+        timestamp=Timestamp(2 + x),
+        location=Location.UNISWAP,
+        token0=A_WETH,
+        token1=A_EUR,
+        amount0_in=FVal(5),
+        amount1_in=ZERO,
+        amount0_out=ZERO,
+        amount1_out=FVal(4.95),
+    ) for x in range(3) for i in range(2)]
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    with rotki.data.db.user_write() as cursor:
+        rotki.data.db.add_trades(cursor, trades)
+        rotki.data.db.add_amm_swaps(cursor, swaps)
+
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server, 'tradesresource'),
+        json={'only_cache': True},
+    )
+    result = assert_proper_response_with_result(response)
+    assert result['next_cursor'] is None  # not paginated
+    all_trades = result['entries']
+    assert len(all_trades) == (23 if start_with_valid_premium else 20)
+
+    paged_trades, data, pages = [], {'only_cache': True, 'limit': 3, 'offset': 0}, 0
+    while True:
+        response = requests.get(
+            api_url_for(rotkehlchen_api_server, 'tradesresource'),
+            json=data,
+        )
+        result = assert_proper_response_with_result(response)
+        assert result['entries_found'] == len(all_trades)
+        paged_trades.extend(result['entries'])
+        pages += 1
+        if result['next_cursor'] is None:
+            break
+        data = {'only_cache': True, 'limit': 3, 'cursor': result['next_cursor']}
+
+    assert pages == len(all_trades) // 3 + 1
+    assert [x['entry']['timestamp'] for x in paged_trades] == sorted(
+        (x['entry']['timestamp'] for x in all_trades), reverse=True,
+    )
+    assert sorted(x['entry']['trade_id'] for x in paged_trades) == sorted(
+        x['entry']['trade_id'] for x in all_trades
+    )
+
+    page_cursor = data['cursor']
+    for data, msg in (
+        ({'limit': 3, 'offset': 3, 'cursor': page_cursor}, 'Only one of offset and cursor'),
+        ({'offset': 0, 'cursor': page_cursor}, 'A limit is needed to continue from a cursor'),
+        ({'limit': 3, 'cursor': page_cursor, 'order_by_attribute': 'amount'}, 'ordered by time can be continued'),  # noqa: E501
+        ({'limit': 3, 'cursor': 'foo'}, 'Invalid page cursor foo'),
+    ):
+        response = requests.get(
+            api_url_for(rotkehlchen_api_server, 'tradesresource'),
+            json={'only_cache': True, **data},
+        )
+        assert_error_response(
+            response=response,
+            contained_in_msg=msg,
+            status_code=HTTPStatus.BAD_REQUEST,
+        )
+
+
 @pytest.mark.parametrize('start_with_valid_premium', [False, True])
 @pytest.mark.parametrize('added_exchanges', [(Location.BINANCE, Location.POLONIEX)])
 def test_query_trades_over_limit(rotkehlchen_api_server_with_exchanges, start_with_valid_premium):
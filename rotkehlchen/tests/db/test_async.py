@@ -70,3 +70,45 @@ def test_async_segfault(database, function_scope_messages_aggregator):
     b = gevent.spawn(write_actions, database=database, num=200)
     c = gevent.spawn(write_actions, database=database, num=200)
     gevent.joinall([a, b, c])
+
+
+def test_read_pool(database):
+    """Test that reads are served by the read only connections of the pool while
+    reads that need to see uncommitted changes go through the main connection"""
+    assert database.conn.read_pool is not None
+
+    def read_setting():
+        with database.conn.read_ctx() as cursor:
+            assert cursor._cursor.connection is not database.conn._conn
+            result = cursor.execute('SELECT value FROM settings WHERE name="foo"').fetchone()
+        return None if result is None else result[0]
+
+    with database.user_write() as write_cursor:
+        write_cursor.execute('INSERT INTO settings(name, value) VALUES("foo", "bar")')
+        with database.conn.read_ctx() as cursor:  # the writer sees its own changes
+            assert cursor._cursor.connection is database.conn._conn
+            result = cursor.execute('SELECT value FROM settings WHERE name="foo"').fetchone()
+            assert result == ('bar',)
+        # while other greenlets read the last committed state without waiting
+        reader = gevent.spawn(read_setting)
+        reader.join()
+        assert reader.get() is None
+
+    assert read_setting() == 'bar'
+    stats = database.conn.get_wait_stats()
+    assert stats['writer']['waits'] >= 1
+    assert stats['reader']['waits'] >= 3
+    assert stats['pool_exhausted'] == {'waits': 0}
+
+
+def test_read_pool_after_password_change(database):
+    """Test that after changing the password the pool reads with the new key"""
+    with database.conn.read_ctx() as cursor:
+        old_reader = cursor._cursor.connection
+        assert cursor.execute('SELECT COUNT(*) FROM settings').fetchone()[0] != 0
+
+    assert database.change_password('new_password') is True
+    with database.conn.read_ctx() as cursor:
+        assert cursor._cursor.connection is not database.conn._conn
+        assert cursor._cursor.connection is not old_reader
+        assert cursor.execute('SELECT COUNT(*) FROM settings').fetchone()[0] != 0
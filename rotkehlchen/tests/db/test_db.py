@@ -1,6 +1,8 @@
 import logging
 import os
+import random
 import time
+import zlib
 from copy import deepcopy
 from unittest.mock import patch
 
@@ -11,10 +13,15 @@ from rotkehlchen.accounting.structures.balance import BalanceType
 from rotkehlchen.accounting.structures.types import ActionType
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.balances.manual import ManuallyTrackedBalance
-from rotkehlchen.constants import ONE, YEAR_IN_SECONDS
+from rotkehlchen.constants import DAY_IN_SECONDS, ONE, YEAR_IN_SECONDS
 from rotkehlchen.constants.assets import A_1INCH, A_BTC, A_DAI, A_ETH, A_ETH2, A_USD
 from rotkehlchen.constants.misc import ZERO
-from rotkehlchen.data_handler import DataHandler
+from rotkehlchen.crypto import decrypt, decrypt_stream, encrypt, encrypt_stream
+from rotkehlchen.data_handler import (
+    DataHandler,
+    compress_and_encrypt_file,
+    decrypt_and_decompress_to_file,
+)
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.filtering import AssetMovementsFilterQuery, TradesFilterQuery
 from rotkehlchen.db.misc import detect_sqlcipher_version
@@ -49,9 +56,10 @@ from rotkehlchen.db.utils import (
     DBAssetBalance,
     LocationData,
     SingleDBAssetBalance,
+    TimeSeriesDownsampling,
 )
 from rotkehlchen.errors.api import AuthenticationError
-from rotkehlchen.errors.misc import InputError
+from rotkehlchen.errors.misc import InputError, UnableToDecryptRemoteData
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
 from rotkehlchen.fval import FVal
 from rotkehlchen.premium.premium import PremiumCredentials
@@ -137,6 +145,9 @@ TABLES_AT_INIT = [
     'ens_mappings',
     'address_book',
     'web3_nodes',
+    'xpub_derived_addresses',
+    'ethereum_logs_cache',
+    'token_balances_cache',
 ]
 
 
@@ -274,6 +285,58 @@ def test_export_import_db(data_dir, username):
     assert balances == [starting_balance]
 
 
+def test_encryption_streams_match_whole_data_encryption():
+    """Test that the streaming encryption is interchangeable with encrypt/decrypt
+    no matter how the data is split in pieces"""
+    rng = random.Random(42)
+    for size in (0, 1, 15, 16, 17, 4095, 70000):
+        data = rng.randbytes(size)
+        pieces, idx = [], 0
+        while idx < size:
+            step = rng.randint(1, 5000)
+            pieces.append(data[idx:idx + step])
+            idx += step
+
+        encrypted_data = b''.join(encrypt_stream(b'123', pieces))
+        assert decrypt(b'123', encrypted_data.decode()) == data
+        whole_encrypted_data = encrypt(b'123', data).encode()
+        for step in (1, 7, 1000):
+            source = [
+                whole_encrypted_data[idx:idx + step]
+                for idx in range(0, len(whole_encrypted_data), step)
+            ]
+            assert b''.join(decrypt_stream(b'123', source)) == data
+
+    with pytest.raises(UnableToDecryptRemoteData):
+        b''.join(decrypt_stream(b'123', [b'abc']))
+    with pytest.raises(UnableToDecryptRemoteData):  # not base64
+        b''.join(decrypt_stream(b'123', [b'ab=c' * 10]))
+
+
+def test_db_file_compress_and_encrypt_roundtrip(tmp_path):
+    rng = random.Random(42)
+    data = rng.randbytes(300000) + bytes(500000)
+    db_path = tmp_path / 'original.db'
+    db_path.write_bytes(data)
+    encrypted_data, _ = compress_and_encrypt_file(path=db_path, password='123')
+    assert zlib.decompress(decrypt(b'123', encrypted_data.decode())) == data
+
+    decrypted_path = tmp_path / 'decrypted.db'
+    decrypt_and_decompress_to_file(
+        password='123',
+        encrypted_data=encrypted_data.decode(),
+        path=decrypted_path,
+    )
+    assert decrypted_path.read_bytes() == data
+
+    with pytest.raises(UnableToDecryptRemoteData):
+        decrypt_and_decompress_to_file(
+            password='123',
+            encrypted_data=encrypted_data.decode()[:len(encrypted_data) // 8 * 4],
+            path=decrypted_path,
+        )
+
+
 def test_writing_fetching_data(data_dir, username):
     msg_aggregator = MessagesAggregator()
     data = DataHandler(data_dir, msg_aggregator)
@@ -752,6 +815,47 @@ def test_get_latest_asset_value_distribution(data_dir, username):
     assert FVal(assets[1].usd_value) > FVal(assets[2].usd_value)
 
 
+def test_get_latest_snapshot_assets(database):
+    """Test that the assets of the latest snapshot are read without the ignored assets,
+    NFTs and unknown assets"""
+    balances = [DBAssetBalance(
+        category=BalanceType.ASSET,
+        time=Timestamp(1488326400),
+        asset=A_XMR,
+        amount='1',
+        usd_value='10',
+    )] + [DBAssetBalance(
+        category=category,
+        time=Timestamp(1491607800),
+        asset=asset,
+        amount='1',
+        usd_value='10',
+    ) for category, asset in (
+        (BalanceType.ASSET, A_BTC),
+        (BalanceType.ASSET, A_ETH),
+        (BalanceType.ASSET, A_EUR),
+        (BalanceType.ASSET, Asset('_nft_pickle')),
+        (BalanceType.LIABILITY, A_ETH),
+        (BalanceType.LIABILITY, A_DAI),
+    )]
+    with database.user_write() as cursor:
+        database.add_asset_identifiers(cursor, ['_nft_pickle', 'UNKNOWNASSET'])
+        database.add_multiple_balances(cursor, balances)
+        cursor.execute(
+            'INSERT INTO timed_balances(category, time, currency, amount, usd_value) '
+            'VALUES(?, ?, ?, ?, ?)',
+            (BalanceType.ASSET.serialize_for_db(), 1491607800, 'UNKNOWNASSET', '1', '10'),
+        )
+        database.add_to_ignored_assets(cursor, A_EUR)
+
+    last_write_ts = database.last_write_ts
+    with database.conn.read_ctx() as cursor:
+        assets = database.get_latest_snapshot_assets(cursor)
+    assert set(assets) == {A_BTC, A_ETH, A_DAI}
+    assert len(assets) == 3
+    assert database.last_write_ts == last_write_ts
+
+
 def test_get_netvalue_data(data_dir, username):
     msg_aggregator = MessagesAggregator()
     data = DataHandler(data_dir, msg_aggregator)
@@ -810,6 +914,87 @@ def test_get_netvalue_without_nfts(data_dir, username):
     assert values[3] == '4500'
 
 
+@pytest.mark.parametrize('db_settings', [{'ssf_0graph_multiplier': 2}])
+def test_query_downsampled_timed_balances(database):
+    """Test that hourly balances are grouped in buckets with their last, min and max
+    values and that empty buckets in big gaps get zero balances"""
+    start_ts = 1640995200  # start of a day
+    balances = [
+        DBAssetBalance(
+            category=BalanceType.ASSET,
+            time=Timestamp(start_ts + idx * 3600),
+            asset=A_BTC,
+            amount=str(idx % 5),
+            usd_value=str(idx),
+        ) for idx in range(48)
+    ]
+    balances.append(DBAssetBalance(
+        category=BalanceType.ASSET,
+        time=Timestamp(start_ts + 6 * DAY_IN_SECONDS),
+        asset=A_BTC,
+        amount='1',
+        usd_value='100',
+    ))
+    balances.append(DBAssetBalance(
+        category=BalanceType.LIABILITY,
+        time=Timestamp(start_ts + 3600),
+        asset=A_BTC,
+        amount='1000',
+        usd_value='1000',
+    ))
+    with database.user_write() as cursor:
+        database.add_multiple_balances(cursor, balances)
+        result = database.query_downsampled_timed_balances(
+            cursor=cursor,
+            asset=A_BTC,
+            balance_type=BalanceType.ASSET,
+            downsampling=TimeSeriesDownsampling(resolution='day'),
+        )
+        assert len(result) == 7
+        assert result[0].time == start_ts + 23 * 3600
+        assert result[0].amount == FVal(3)
+        assert result[0].usd_value == FVal(23)
+        assert (result[0].min_amount, result[0].max_amount) == (ZERO, FVal(4))
+        assert (result[0].min_usd_value, result[0].max_usd_value) == (ZERO, FVal(23))
+        assert result[1].time == start_ts + 47 * 3600
+        assert result[1].usd_value == FVal(47)
+        assert (result[1].min_usd_value, result[1].max_usd_value) == (FVal(24), FVal(47))
+        for day, entry in enumerate(result[2:6], start=2):
+            assert entry.time == start_ts + day * DAY_IN_SECONDS
+            assert entry.usd_value == entry.max_usd_value == ZERO
+        assert result[6].time == start_ts + 6 * DAY_IN_SECONDS
+        assert result[6].usd_value == FVal(100)
+
+        result = database.query_downsampled_timed_balances(
+            cursor=cursor,
+            asset=A_BTC,
+            balance_type=BalanceType.ASSET,
+            downsampling=TimeSeriesDownsampling(buckets=1),
+            to_ts=Timestamp(start_ts + DAY_IN_SECONDS),
+        )
+        assert len(result) == 1
+        assert result[0].time == start_ts + DAY_IN_SECONDS
+        assert result[0].usd_value == FVal(24)
+        assert (result[0].min_usd_value, result[0].max_usd_value) == (ZERO, FVal(24))
+
+        database.add_multiple_location_data(cursor, [
+            LocationData(
+                time=Timestamp(start_ts + idx * 3600),
+                location=Location.TOTAL.serialize_for_db(),  # pylint: disable=no-member
+                usd_value=str(idx),
+            ) for idx in range(48)
+        ])
+
+    times, values, min_values, max_values = database.get_downsampled_netvalue_data(
+        from_ts=Timestamp(0),
+        downsampling=TimeSeriesDownsampling(buckets=2),
+    )
+    assert times == [start_ts + 23 * 3600, start_ts + 47 * 3600]
+    assert values == ['23', '47']
+    assert [FVal(x) for x in min_values] == [ZERO, FVal(24)]
+    assert [FVal(x) for x in max_values] == [FVal(23), FVal(47)]
+
+
 def test_add_trades(data_dir, username, caplog):
     """Test that adding and retrieving trades from the DB works fine.
 
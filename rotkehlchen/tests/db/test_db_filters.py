@@ -8,7 +8,12 @@ from rotkehlchen.db.filtering import (
     DBLocationFilter,
     DBTimestampFilter,
     ETHTransactionsFilterQuery,
+    HistoryEventFilterQuery,
+    deserialize_page_cursor,
+    serialize_page_cursor,
 )
+from rotkehlchen.errors.misc import InputError
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.tests.utils.factories import make_ethereum_address
 from rotkehlchen.types import Location, Timestamp
 
@@ -23,7 +28,7 @@ def test_ethereum_transaction_filter():
         to_ts=Timestamp(999),
     )
     query, bindings = filter_query.prepare()
-    assert query == ' INNER JOIN ethtx_address_mappings WHERE ethereum_transactions.tx_hash=ethtx_address_mappings.tx_hash AND ethtx_address_mappings.address IN (?)  AND ((timestamp >= ? AND timestamp <= ?)) ORDER BY timestamp ASC LIMIT 10 OFFSET 10'  # noqa: E501
+    assert query == ' INNER JOIN ethtx_address_mappings WHERE ethereum_transactions.tx_hash=ethtx_address_mappings.tx_hash AND ethtx_address_mappings.address IN (?)  AND ((timestamp >= ? AND timestamp <= ?)) ORDER BY timestamp ASC,ethereum_transactions.tx_hash ASC LIMIT 10 OFFSET 10'  # noqa: E501
     assert bindings == [
         addresses[0],
         filter_query.from_ts,
@@ -75,3 +80,38 @@ def test_filter_arguments(and_op, order_by, pagination):
         time_filter.to_ts,
         location_filter.location.serialize_for_db(),
     ]
+
+
+def test_keyset_pagination_filter():
+    """Test that a paginated query ordered by timestamp is continued after the values
+    of the keyset columns given in the cursor instead of with an offset"""
+    filter_query = HistoryEventFilterQuery.make(
+        limit=10,
+        offset=0,
+        location=Location.KRAKEN,
+        order_by_rules=[('timestamp', False)],
+        after=[1500, 2, 42],
+    )
+    query, bindings = filter_query.prepare()
+    assert query == 'WHERE ((location=?)) AND (timestamp,sequence_index,identifier) < (?,?,?) ORDER BY timestamp DESC,sequence_index DESC,identifier DESC LIMIT 10 OFFSET 0'  # noqa: E501
+    assert bindings == [Location.KRAKEN.serialize_for_db(), 1500, 2, 42]
+    # the counts of the whole filter are not bounded by the cursor
+    assert filter_query.prepare(with_pagination=False) == ('WHERE (location=?) ORDER BY timestamp DESC,sequence_index DESC,identifier DESC', [Location.KRAKEN.serialize_for_db()])  # noqa: E501
+    assert filter_query.prepare_last_page_entry() == (
+        'timestamp,sequence_index,identifier',
+        query.replace('LIMIT 10 OFFSET 0', 'LIMIT 1 OFFSET 9'),
+        bindings,
+    )
+    # not paginated or ordered by something else they can't be continued
+    assert HistoryEventFilterQuery.make().prepare_last_page_entry() is None
+    assert HistoryEventFilterQuery.make(order_by_rules=[('amount', True)], limit=1, offset=0).prepare_last_page_entry() is None  # noqa: E501
+    with pytest.raises(InputError):
+        HistoryEventFilterQuery.make(order_by_rules=[('amount', True)], limit=1, after=[1, 1, 1])  # noqa: E501
+    with pytest.raises(InputError):
+        HistoryEventFilterQuery.make(limit=1, after=[1, 1])
+
+    for values in ([1500, 2, 42], [1, 'trade_id', 'EUR'], [1, b'\x01' * 32]):
+        assert deserialize_page_cursor(serialize_page_cursor(values)) == values
+    for cursor in ('', 'foo', serialize_page_cursor([1, 2])[:-4]):
+        with pytest.raises(DeserializationError):
+            deserialize_page_cursor(cursor)
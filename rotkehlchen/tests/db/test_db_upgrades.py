@@ -2800,17 +2800,42 @@ def test_latest_upgrade_adds_remove_tables(user_data_dir):
     cursor = db.conn.cursor()
     result = cursor.execute('SELECT name FROM sqlite_master WHERE type="table"')
     tables_after_upgrade = {x[0] for x in result}
+    result = cursor.execute('SELECT name FROM sqlite_master WHERE type="index" AND tbl_name="timed_balances"')  # noqa: E501
+    assert 'timed_balances_currency_category_time' in {x[0] for x in result}
+    result = cursor.execute('SELECT name FROM sqlite_master WHERE type="index" AND sql IS NOT NULL')  # noqa: E501
+    indexes_after_upgrade = {x[0] for x in result}
+    assert {
+        'trades_time',
+        'trades_location_time',
+        'asset_movements_time',
+        'asset_movements_location_time',
+        'ledger_actions_timestamp',
+        'ledger_actions_location_timestamp',
+        'ethereum_transactions_timestamp',
+        'eth2_daily_staking_details_timestamp',
+        'history_events_timestamp_sequence_index',
+        'history_events_location_timestamp',
+        'history_events_asset_timestamp',
+    } <= indexes_after_upgrade
     # also add latest tables (this will indicate if DB upgrade missed something
     db.conn.executescript(DB_SCRIPT_CREATE_TABLES)
     result = cursor.execute('SELECT name FROM sqlite_master WHERE type="table"')
     tables_after_creation = {x[0] for x in result}
+    result = cursor.execute('SELECT name FROM sqlite_master WHERE type="index" AND sql IS NOT NULL')  # noqa: E501
+    assert {x[0] for x in result} == indexes_after_upgrade
 
     removed_tables = set()
     missing_tables = tables_before - tables_after_upgrade
     assert missing_tables == removed_tables
     assert tables_after_creation - tables_after_upgrade == set()
     new_tables = tables_after_upgrade - tables_before
-    assert new_tables == {'address_book', 'web3_nodes'}
+    assert new_tables == {
+        'address_book',
+        'web3_nodes',
+        'xpub_derived_addresses',
+        'ethereum_logs_cache',
+        'token_balances_cache',
+    }
 
 
 def test_db_newer_than_software_raises_error(data_dir, username):
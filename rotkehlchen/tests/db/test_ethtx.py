@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxReceiptLog
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
@@ -8,7 +11,8 @@ from rotkehlchen.tests.utils.constants import (
     ETH_ADDRESS3,
     MOCK_INPUT_DATA,
 )
-from rotkehlchen.tests.utils.factories import make_ethereum_address
+from rotkehlchen.tests.utils.ethereum import txreceipt_to_data
+from rotkehlchen.tests.utils.factories import make_ethereum_address, make_random_bytes
 from rotkehlchen.types import (
     BlockchainAccountData,
     EthereumInternalTransaction,
@@ -284,3 +288,58 @@ def test_query_also_internal_ethereum_transactions(data_dir, username):
             has_premium=True,
         )
         assert result == [tx1, tx3, tx4]
+
+
+def test_get_receipts_in_bulk(database):
+    """Test that receipts are loaded in bulk with their logs and topics in order and that
+    transactions without a receipt are skipped"""
+    dbethtx = DBEthTx(database)
+    transactions, receipts = [], []
+    for idx in range(5):
+        tx_hash = make_evm_tx_hash(make_random_bytes(32))
+        transactions.append(EthereumTransaction(
+            tx_hash=tx_hash,
+            timestamp=Timestamp(1451606400 + idx),
+            block_number=idx,
+            from_address=ETH_ADDRESS1,
+            to_address=make_ethereum_address(),
+            value=0,
+            gas=1,
+            gas_price=1,
+            gas_used=1,
+            input_data=b'',
+            nonce=idx,
+        ))
+        receipts.append(EthereumTxReceipt(
+            tx_hash=tx_hash,
+            contract_address=None,
+            status=idx != 2,
+            type=2,
+            logs=[EthereumTxReceiptLog(
+                log_index=log_index,
+                data=make_random_bytes(32),
+                address=make_ethereum_address(),
+                removed=False,
+                topics=[make_random_bytes(32) for _ in range(log_index % 4)],
+            ) for log_index in range(idx * 3)],
+        ))
+
+    with database.user_write() as cursor:
+        database.add_blockchain_accounts(
+            write_cursor=cursor,
+            blockchain=SupportedBlockchain.ETHEREUM,
+            account_data=[BlockchainAccountData(address=ETH_ADDRESS1)],
+        )
+        dbethtx.add_ethereum_transactions(cursor, transactions, relevant_address=ETH_ADDRESS1)
+        for receipt in receipts[:4]:  # last transaction has no receipt
+            dbethtx.add_receipt_data(cursor, txreceipt_to_data(receipt))
+
+    tx_hashes = [x.tx_hash for x in reversed(transactions)]
+    with patch('rotkehlchen.db.ethtx.TX_BULK_LOAD_CHUNK_SIZE', new=2), database.conn.read_ctx() as cursor:  # noqa: E501
+        assert dbethtx.get_receipts(cursor, tx_hashes) == {x.tx_hash: x for x in receipts[:4]}
+        assert dbethtx.get_transactions_and_receipts(cursor, tx_hashes) == list(zip(
+            reversed(transactions[:4]),
+            reversed(receipts[:4]),
+        ))
+        assert dbethtx.get_receipt(cursor, receipts[3].tx_hash) == receipts[3]
+        assert dbethtx.get_receipt(cursor, transactions[4].tx_hash) is None
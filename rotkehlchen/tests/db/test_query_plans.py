@@ -0,0 +1,135 @@
+"""Tests that the queries of the tables that grow with the user's history use indexes
+for their filters instead of scanning the whole table"""
+from typing import Any, Dict, List, Tuple, Type
+
+import pytest
+
+from rotkehlchen.accounting.structures.types import HistoryEventType
+from rotkehlchen.constants.assets import A_BTC, A_ETH
+from rotkehlchen.db.drivers.gevent import DBCursor
+from rotkehlchen.db.filtering import (
+    AssetMovementsFilterQuery,
+    DBFilterQuery,
+    Eth2DailyStatsFilterQuery,
+    ETHTransactionsFilterQuery,
+    HistoryEventFilterQuery,
+    LedgerActionsFilterQuery,
+    ReportDataFilterQuery,
+    TradesFilterQuery,
+)
+from rotkehlchen.tests.utils.factories import make_ethereum_address
+from rotkehlchen.types import Location, Timestamp, make_evm_tx_hash
+
+LARGE_TABLES = {
+    'trades',
+    'asset_movements',
+    'ledger_actions',
+    'history_events',
+    'ethereum_transactions',
+    'ethtx_address_mappings',
+    'eth2_daily_staking_details',
+    'timed_balances',
+    'pnl_events',
+    'price_history',
+}
+TRADES = 'SELECT * from combined_trades_view '
+FREE_TRADES = 'SELECT * FROM (SELECT * from trades ORDER BY time DESC LIMIT ?) '
+ETH_TRANSACTIONS = 'SELECT DISTINCT ethereum_transactions.tx_hash, timestamp, block_number, from_address, to_address, value, gas, gas_price, gas_used, input_data, nonce FROM ethereum_transactions '  # noqa: E501
+TIME_RANGE = {'from_ts': Timestamp(1609459200), 'to_ts': Timestamp(1640995200)}
+FROM_TS = {'from_ts': Timestamp(1609459200)}
+
+
+def _get_full_scans(cursor: DBCursor, query: str, bindings: List[Any]) -> List[str]:
+    """Returns the steps of the query plan that scan one of the large tables row by row.
+    Scans of an index are walks in the order of the index, so they are only accepted
+    in queries with a LIMIT that bounds them."""
+    has_limit = 'LIMIT' in query.upper().split()
+    full_scans = []
+    for entry in cursor.execute(f'EXPLAIN QUERY PLAN {query}', bindings):
+        words = entry[3].split()  # SCAN [TABLE] name [AS alias] [USING ... INDEX name]
+        if words[0] != 'SCAN' or ('USING' in words and has_limit):
+            continue
+        table = words[2] if words[1] == 'TABLE' else words[1]
+        if table in LARGE_TABLES:
+            full_scans.append(entry[3])
+
+    return full_scans
+
+
+def test_get_full_scans(database):
+    """Test that walks over a whole index of a large table count as full scans unless
+    a LIMIT bounds them"""
+    with database.conn.read_ctx() as cursor:
+        assert _get_full_scans(cursor, 'SELECT * FROM trades', []) == ['SCAN trades']
+        assert _get_full_scans(cursor, 'SELECT * FROM trades ORDER BY time', []) == ['SCAN trades USING INDEX trades_time']  # noqa: E501
+        assert _get_full_scans(cursor, 'SELECT * FROM trades ORDER BY time LIMIT ?', [10]) == []  # noqa: E501
+        assert _get_full_scans(cursor, 'SELECT * FROM trades WHERE time > ?', [1]) == []
+
+
+@pytest.mark.parametrize('query_prefix, prefix_bindings, filter_query_class, filter_args', [
+    (TRADES, [], TradesFilterQuery, TIME_RANGE),
+    (TRADES, [], TradesFilterQuery, {'location': Location.KRAKEN}),
+    (TRADES, [], TradesFilterQuery, {'location': Location.KRAKEN, **TIME_RANGE}),
+    (TRADES, [], TradesFilterQuery, {'base_assets': (A_ETH,), **TIME_RANGE}),
+    (FREE_TRADES, [250], TradesFilterQuery, {'location': Location.KRAKEN, **FROM_TS}),
+    ('SELECT COUNT(*) from trades ', [], TradesFilterQuery, {'location': Location.BINANCE}),
+    ('SELECT * from asset_movements ', [], AssetMovementsFilterQuery, TIME_RANGE),
+    ('SELECT * from asset_movements ', [], AssetMovementsFilterQuery, {'location': Location.KRAKEN}),  # noqa: E501
+    ('SELECT * from asset_movements ', [], AssetMovementsFilterQuery, {'assets': (A_BTC,), **FROM_TS}),  # noqa: E501
+    ('SELECT * FROM (SELECT * from asset_movements ORDER BY time DESC LIMIT ?) ', [100], AssetMovementsFilterQuery, FROM_TS),  # noqa: E501
+    ('SELECT COUNT(*) from asset_movements ', [], AssetMovementsFilterQuery, TIME_RANGE),
+    ('SELECT * from ledger_actions ', [], LedgerActionsFilterQuery, TIME_RANGE),
+    ('SELECT * from ledger_actions ', [], LedgerActionsFilterQuery, {'location': Location.EXTERNAL}),  # noqa: E501
+    ('SELECT COUNT(*) from ledger_actions ', [], LedgerActionsFilterQuery, FROM_TS),
+    ('SELECT * from history_events ', [], HistoryEventFilterQuery, TIME_RANGE),
+    ('SELECT * from history_events ', [], HistoryEventFilterQuery, {'location': Location.BLOCKCHAIN}),  # noqa: E501
+    ('SELECT * from history_events ', [], HistoryEventFilterQuery, {'location': Location.KRAKEN, **TIME_RANGE}),  # noqa: E501
+    ('SELECT * from history_events ', [], HistoryEventFilterQuery, {'assets': (A_ETH,)}),
+    ('SELECT * from history_events ', [], HistoryEventFilterQuery, {'assets': (A_ETH,), 'exclude_ignored_assets': True, **FROM_TS}),  # noqa: E501
+    ('SELECT * from history_events ', [], HistoryEventFilterQuery, {'event_types': [HistoryEventType.TRADE], **TIME_RANGE}),  # noqa: E501
+    ('SELECT * from history_events ', [], HistoryEventFilterQuery, {'event_identifier': b'\x01' * 32}),  # noqa: E501
+    ('SELECT COUNT(*) from history_events ', [], HistoryEventFilterQuery, {'location': Location.BLOCKCHAIN}),  # noqa: E501
+    ('SELECT identifier, amount, asset, timestamp FROM history_events ', [], HistoryEventFilterQuery, TIME_RANGE),  # noqa: E501
+    ('SELECT * from history_events ', [], HistoryEventFilterQuery, {'limit': 10, 'offset': 0, 'after': [1609459200000, 2, 1000]}),  # noqa: E501
+    (ETH_TRANSACTIONS, [], ETHTransactionsFilterQuery, TIME_RANGE),
+    (ETH_TRANSACTIONS, [], ETHTransactionsFilterQuery, {'addresses': [make_ethereum_address()], **FROM_TS}),  # noqa: E501
+    (ETH_TRANSACTIONS, [], ETHTransactionsFilterQuery, {'asset': A_ETH, **FROM_TS}),
+    (ETH_TRANSACTIONS, [], ETHTransactionsFilterQuery, {'tx_hash': make_evm_tx_hash(b'\x01' * 32)}),  # noqa: E501
+    ('SELECT * from eth2_daily_staking_details ', [], Eth2DailyStatsFilterQuery, TIME_RANGE),
+    ('SELECT * from eth2_daily_staking_details ', [], Eth2DailyStatsFilterQuery, {'validators': [1, 2], **FROM_TS}),  # noqa: E501
+])
+def test_filter_queries_use_indexes(
+        database,
+        query_prefix: str,
+        prefix_bindings: List[Any],
+        filter_query_class: Type[DBFilterQuery],
+        filter_args: Dict[str, Any],
+):
+    """Test that the queries built from each filter query variant don't scan the large
+    tables of the user DB. If this fails after a change an index is missing."""
+    filter_query = filter_query_class.make(**filter_args)  # type: ignore  # all have make
+    query, bindings = filter_query.prepare()
+    with database.conn.read_ctx() as cursor:
+        assert _get_full_scans(cursor, query_prefix + query, prefix_bindings + bindings) == []
+
+
+@pytest.mark.parametrize('query, bindings', [
+    ('SELECT timestamp, data FROM pnl_events ', ReportDataFilterQuery.make(report_id=1, **TIME_RANGE).prepare()),  # noqa: E501
+    ('SELECT COUNT(*) FROM pnl_events ', ReportDataFilterQuery.make(report_id=1).prepare()),
+])
+def test_report_data_queries_use_indexes(database, query: str, bindings: Tuple[str, List[Any]]):
+    """Test that the queries of the events of a PnL report don't scan all reports' events"""
+    filter_query, filter_bindings = bindings
+    cursor = database.conn_transient.cursor()
+    assert _get_full_scans(cursor, query + filter_query, filter_bindings) == []
+
+
+def test_price_history_queries_use_indexes(globaldb):
+    """Test that the price history queries by asset of the global DB don't scan it"""
+    with globaldb.conn.read_ctx() as cursor:
+        for query, bindings in (
+            ('SELECT source_type, timestamp, price FROM price_history WHERE from_asset=? AND to_asset=? ORDER BY timestamp ASC, source_type ASC', ['ETH', 'USD']),  # noqa: E501
+            ('DELETE FROM price_history WHERE from_asset=? OR to_asset=? ;', ['ETH', 'ETH']),
+            ('UPDATE assets SET identifier=? WHERE identifier=?', ['ETH2', 'ETH']),
+        ):
+            assert _get_full_scans(cursor, query, bindings) == []
@@ -1,7 +1,14 @@
-from rotkehlchen.accounting.pnl import PnlTotals
-from rotkehlchen.db.reports import DBAccountingReports
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.constants.misc import ONE, ZERO
+from rotkehlchen.db.filtering import ReportDataFilterQuery
+from rotkehlchen.db.reports import DBAccountingReports, DBReportEventsWriter
 from rotkehlchen.db.settings import DBSettings
+from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.constants import A_GBP
+from rotkehlchen.types import Location, Price, Timestamp
 
 
 def test_report_settings(database):
@@ -51,3 +58,50 @@ def test_report_settings(database):
     for x in ('account_for_assets_movements', 'calculate_past_cost_basis', 'include_crypto2crypto', 'include_gas_costs', 'profit_currency', 'taxfree_after_period'):  # noqa: E501
         setting_name = 'main_currency' if x == 'profit_currency' else x
         assert returned_settings[x] == getattr(settings, setting_name)
+
+
+def test_report_events_writer(database):
+    """Test that report events are buffered and written in batches"""
+    dbreport = DBAccountingReports(database)
+    report_id = dbreport.add_report(
+        first_processed_timestamp=Timestamp(1),
+        start_ts=Timestamp(0),
+        end_ts=Timestamp(10),
+        settings=DBSettings(),
+    )
+    writer = DBReportEventsWriter(
+        database=database,
+        report_id=report_id,
+        ts_converter=str,
+        batch_size=2,
+    )
+    events = [ProcessedAccountingEvent(
+        type=AccountingEventType.TRADE,
+        notes=f'event {idx}',
+        location=Location.EXTERNAL,
+        timestamp=Timestamp(idx),
+        asset=A_ETH,
+        free_amount=ONE,
+        taxable_amount=ZERO,
+        price=Price(FVal(1000 + idx)),
+        pnl=PNL(),
+        cost_basis=None,
+        index=idx,
+    ) for idx in range(1, 4)]
+
+    def get_saved_events():
+        return dbreport.get_report_data(
+            filter_=ReportDataFilterQuery.make(report_id=report_id),
+            with_limit=False,
+        )[0]
+
+    writer.add(events[0])
+    assert get_saved_events() == []
+    writer.add(events[1])  # fills the batch
+    assert [x.notes for x in get_saved_events()] == ['event 1', 'event 2']
+    writer.add(events[2])
+    assert len(get_saved_events()) == 2
+    writer.flush()
+    assert [x.notes for x in get_saved_events()] == ['event 1', 'event 2', 'event 3']
+    writer.flush()  # nothing pending
+    assert len(get_saved_events()) == 3
@@ -1,16 +1,26 @@
 from typing import Any, Tuple
+from unittest.mock import patch
 
 import pytest
 
 from rotkehlchen.accounting.structures.balance import BalanceType
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants import ONE
+from rotkehlchen.constants.assets import A_ETH, A_EUR
+from rotkehlchen.db.filtering import TradesFilterQuery
 from rotkehlchen.db.utils import (
+    DeserializationMemo,
     SingleDBAssetBalance,
     combine_asset_balances,
     form_query_to_filter_timestamps,
     need_cursor,
     need_writable_cursor,
 )
+from rotkehlchen.errors.asset import UnknownAsset
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.fval import FVal
+from rotkehlchen.types import AssetAmount, Fee, Location, Price, Timestamp, TradeType
 
 
 @pytest.mark.parametrize(
@@ -185,3 +195,94 @@ def test_need_cursor_and_need_writable_cursor(database):
         assert otherdb.get_setting('premium_should_sync') is False
         otherdb.set_setting(cursor, name='premium_should_sync', value=True)
         assert otherdb.get_setting('premium_should_sync') is True
+
+
+def test_iterate_trades_in_batches(database):
+    """Test that trades are read in batches with each asset resolved only once and
+    that trades that can't be deserialized are skipped and reported"""
+    trades = [Trade(
+        timestamp=Timestamp(1 + idx),
+        location=Location.EXTERNAL,
+        base_asset=A_ETH,
+        quote_asset=A_EUR,
+        trade_type=TradeType.BUY,
+        amount=AssetAmount(ONE),
+        rate=Price(FVal(idx + 1)),
+        fee=Fee(FVal('0.1')),
+        fee_currency=A_EUR,
+        link=str(idx),
+    ) for idx in range(5)]
+    with database.user_write() as cursor:
+        database.add_trades(cursor, trades)
+        cursor.execute('UPDATE trades SET amount=? WHERE link=?', ('foo', '3'))
+
+    batch_size_patch = patch('rotkehlchen.db.utils.DB_FETCH_BATCH_SIZE', new=2)
+    asset_patch = patch('rotkehlchen.db.utils.Asset', wraps=Asset)
+    with batch_size_patch, asset_patch as asset_mock, database.conn.read_ctx() as cursor:
+        result = list(database.iterate_trades(
+            cursor=cursor,
+            filter_query=TradesFilterQuery.make(),
+            has_premium=True,
+        ))
+        assert asset_mock.call_count == 2  # ETH and EUR
+
+    assert result == [x for x in trades if x.link != '3']
+    errors = database.msg_aggregator.consume_errors()
+    assert len(errors) == 1
+    assert 'Error deserializing trade from the DB. Skipping trade.' in errors[0]
+
+    memo = DeserializationMemo()
+    for _ in range(2):
+        with pytest.raises(UnknownAsset):
+            memo.asset('NOTANASSET')
+    assert memo.assets == {'NOTANASSET': None}
+    assert memo.amount('1.5') is memo.amount('1.5')
+    with pytest.raises(DeserializationError):
+        memo.amount('foo')
+    memo.clear_amounts()
+    memo.add_amounts(['1', '2.5'])
+    assert memo.amounts == {'1': ONE, '2.5': FVal('2.5')}
+    memo.add_amounts(['3', 'foo'])  # nothing converted, each is converted when used
+    assert '3' not in memo.amounts
+    assert memo.amount('3') == FVal(3)
+
+
+def test_entries_count_cache(database):
+    """Test that the counts of the listings are cached until the DB is written to and
+    that nothing is cached while there are uncommitted changes"""
+    trades = [Trade(
+        timestamp=Timestamp(1 + idx),
+        location=Location.EXTERNAL,
+        base_asset=A_ETH,
+        quote_asset=A_EUR,
+        trade_type=TradeType.BUY,
+        amount=AssetAmount(ONE),
+        rate=Price(FVal(idx + 1)),
+        fee=None,
+        fee_currency=None,
+        link=str(idx),
+    ) for idx in range(4)]
+    with database.user_write() as cursor:
+        database.add_trades(cursor, trades[:3])
+
+    filter_query = TradesFilterQuery.make(from_ts=Timestamp(2), limit=1, offset=0)
+    with database.conn.read_ctx() as cursor:
+        with patch.object(cursor, 'execute', wraps=cursor.execute) as execute_mock:
+            for _ in range(2):
+                _, total_found = database.get_trades_and_limit_info(cursor, filter_query, True)
+                assert total_found == 2
+        count_queries = [x for x in execute_mock.call_args_list if 'COUNT' in x.args[0]]
+        assert len(count_queries) == 1
+    assert len(database.entries_count_cache.counts) == 1
+
+    with database.user_write() as cursor:
+        database.add_trades(cursor, [trades[3]])
+        _, total_found = database.get_trades_and_limit_info(cursor, filter_query, True)
+        assert total_found == 3
+
+    assert list(database.entries_count_cache.counts.values()) == [2]  # not cached uncommitted
+    with database.conn.read_ctx() as cursor:
+        _, total_found = database.get_trades_and_limit_info(cursor, filter_query, True)
+        assert total_found == 3
+        assert database.get_entries_count(cursor, 'trades') == 4
+    assert sorted(database.entries_count_cache.counts.values()) == [3, 4]
@@ -7,6 +7,7 @@ from datetime import datetime
 from unittest.mock import call, patch
 from urllib.parse import urlencode
 
+import gevent
 import pytest
 import requests
 
@@ -21,6 +22,7 @@ from rotkehlchen.exchanges.binance import (
     BINANCE_LAUNCH_TS,
     RETRY_AFTER_LIMIT,
     Binance,
+    RequestWeightBudget,
     trade_from_binance,
 )
 from rotkehlchen.exchanges.data_structures import Location, Trade, TradeType
@@ -896,3 +898,76 @@ def test_binance_query_trade_history_custom_markets(function_scope_binance):
         binance.query_trade_history(start_ts=0, end_ts=1564301134, only_cache=False)
 
     assert count == len(markets)
+
+
+def test_binance_query_trade_history_continues_from_last_trade(function_scope_binance):
+    """Test that trades of a market are queried from the trade after the last one seen
+    and that markets with trades are queried first"""
+    binance = function_scope_binance
+    binance.selected_pairs = ['ETHBTC', 'BNBBTC']
+    p = re.compile(r'symbol=([A-Z]*)&fromId=([0-9]*)')
+    queried = []
+
+    def mock_my_trades(url, timeout):  # pylint: disable=unused-argument
+        text = '[]'
+        if 'myTrades' in url:
+            symbol, from_id = p.search(url).groups()
+            queried.append((symbol, int(from_id)))
+            if symbol == 'BNBBTC' and int(from_id) <= 28457:
+                text = BINANCE_MYTRADES_RESPONSE
+        return MockResponse(200, text, headers={'x-mbx-used-weight-1m': '10'})
+
+    with patch.object(binance.session, 'get', side_effect=mock_my_trades):
+        trades = binance.query_trade_history(start_ts=0, end_ts=1564301134, only_cache=False)
+    assert len(trades) == 1
+    assert sorted(queried) == [('BNBBTC', 0), ('ETHBTC', 0)]
+    with binance.db.conn.read_ctx() as cursor:
+        assert binance.db.get_binance_trade_cursors(cursor, binance.name, binance.location) == {  # noqa: E501
+            'BNBBTC': (28458, 1564301134),
+            'ETHBTC': (0, 1564301134),
+        }
+
+    queried = []
+    with patch.object(binance.session, 'get', side_effect=mock_my_trades):
+        trades = binance.query_trade_history(start_ts=0, end_ts=1638529919, only_cache=False)
+    assert len(trades) == 1
+    assert queried == [('BNBBTC', 28458), ('ETHBTC', 0)]
+
+    # a range before the last trades seen has to query all the trades again
+    queried = []
+    with patch.object(binance.session, 'get', side_effect=mock_my_trades):
+        trades, _ = binance.query_online_trade_history(start_ts=0, end_ts=1500000000)
+    assert len(trades) == 1
+    assert sorted(queried) == [('BNBBTC', 0), ('ETHBTC', 0)]
+    with binance.db.conn.read_ctx() as cursor:
+        assert binance.db.get_binance_trade_cursors(cursor, binance.name, binance.location)['BNBBTC'] == (28458, 1638529919)  # noqa: E501
+
+
+def test_request_weight_budget():
+    """Test that requests are made one at a time until binance reports the used
+    weight of the minute and that they then wait once the limit is reached"""
+    budget = RequestWeightBudget(limit=100)
+    spent = []
+
+    def spend(idx):
+        budget.spend(10)
+        spent.append(idx)
+
+    with patch('rotkehlchen.exchanges.binance.time.time', return_value=60.0):
+        greenlets = [gevent.spawn(spend, idx) for idx in range(3)]
+        gevent.sleep(0.1)
+        assert spent == [0]  # the others wait for the response of the first
+        budget.report(None)  # a response without the used weight
+        gevent.sleep(0.1)
+        assert spent == [0, 1]
+        budget.report('80')
+        gevent.sleep(0.1)
+        assert spent == [0, 1, 2]
+        assert budget.used_weight == 90
+        greenlets.append(gevent.spawn(spend, 3))
+        gevent.sleep(0.1)
+        assert budget.used_weight == 100
+        greenlets.append(gevent.spawn(spend, 4))
+        gevent.sleep(0.1)
+        assert spent == [0, 1, 2, 3]  # over the limit, waits for the next minute
+    gevent.killall(greenlets)
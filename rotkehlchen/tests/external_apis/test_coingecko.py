@@ -1,6 +1,7 @@
 import pytest
 
 from rotkehlchen.assets.asset import EthereumToken
+from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR, A_YFI
 from rotkehlchen.errors.asset import UnsupportedAsset
 from rotkehlchen.externalapis.coingecko import CoingeckoAssetData
@@ -51,3 +52,14 @@ def test_coingecko_historical_price(session_coingecko):
         timestamp=1483056100,
     )
     assert price == Price(FVal('7.7478028375650725'))
+
+
+def test_coingecko_multiple_current_prices(session_coingecko):
+    prl_token = EthereumToken('0x1844b21593262668B7248d0f57a220CaaBA46ab9')  # not in coingecko
+    prices = session_coingecko.query_multiple_current_prices(
+        from_assets=[A_BTC, A_ETH, A_YFI, prl_token],
+        to_asset=A_EUR,
+    )
+    assert set(prices) == {A_BTC, A_ETH, A_YFI, prl_token}
+    assert all(prices[x] > ZERO for x in (A_BTC, A_ETH, A_YFI))
+    assert prices[prl_token] == ZERO
@@ -6,6 +6,7 @@ from unittest.mock import patch
 import pytest
 
 from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import (
     A_BTC,
     A_CBAT,
@@ -320,3 +321,19 @@ def test_cryptocompare_query_with_api_key(cryptocompare):
     # call to endpoint with args
     price = cryptocompare.query_current_price(A_ETH, A_USD)
     assert price is not None
+
+
+def test_cryptocompare_multiple_current_prices(cryptocompare):
+    """Test that many current prices are queried with as few queries as the symbols
+    length limit of pricemulti allows and that special assets are left out"""
+    api_query = cryptocompare._api_query
+    with patch.object(cryptocompare, '_api_query', wraps=api_query) as mock_api_query:
+        with patch('rotkehlchen.externalapis.cryptocompare.CRYPTOCOMPARE_PRICEMULTI_MAX_FSYMS_LENGTH', 7):  # noqa: E501
+            prices = cryptocompare.query_multiple_current_prices(
+                from_assets=[A_BTC, A_ETH, A_XMR, A_CDAI],
+                to_asset=A_USD,
+            )
+
+    assert mock_api_query.call_count == 2  # BTC,ETH and XMR
+    assert set(prices) == {A_BTC, A_ETH, A_XMR}  # cDAI needs an intermediate asset
+    assert all(x > ZERO for x in prices.values())
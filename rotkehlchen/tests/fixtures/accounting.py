@@ -12,6 +12,7 @@ from rotkehlchen.chain.ethereum.oracles.saddle import SaddleOracle
 from rotkehlchen.chain.ethereum.oracles.uniswap import UniswapV2Oracle, UniswapV3Oracle
 from rotkehlchen.config import default_data_directory
 from rotkehlchen.constants import ONE
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.externalapis.coingecko import Coingecko
 from rotkehlchen.externalapis.cryptocompare import Cryptocompare
 from rotkehlchen.fval import FVal
@@ -240,6 +241,17 @@ def create_inquirer(
         inquirer.find_price = mock_some_prices  # type: ignore
         inquirer.find_usd_price = mock_some_usd_prices  # type: ignore
 
+    def mock_find_usd_prices(assets, ignore_cache: bool = False):
+        prices = {}
+        for asset in assets:
+            try:
+                prices[asset] = inquirer.find_usd_price(asset, ignore_cache=ignore_cache)
+            except RemoteError:
+                pass  # like the real one, failed queries are not in the result
+        return prices
+
+    inquirer.find_usd_prices = mock_find_usd_prices  # type: ignore
+
     def mock_query_fiat_pair(base, quote):  # pylint: disable=unused-argument
         return ONE
 
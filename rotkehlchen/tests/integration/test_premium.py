@@ -10,6 +10,7 @@ from rotkehlchen.errors.api import (
     PremiumAuthenticationError,
     RotkehlchenPermissionError,
 )
+from rotkehlchen.premium.chunks import DBChunksManifest, decrypt_chunk
 from rotkehlchen.premium.premium import PremiumCredentials
 from rotkehlchen.tests.utils.constants import A_GBP, DEFAULT_TESTS_MAIN_CURRENCY
 from rotkehlchen.tests.utils.mock import MockResponse
@@ -17,6 +18,7 @@ from rotkehlchen.tests.utils.premium import (
     REMOTE_DATA_OLDER_DB,
     VALID_PREMIUM_KEY,
     VALID_PREMIUM_SECRET,
+    MockPremiumSyncServer,
     assert_db_got_replaced,
     create_patched_requests_get_for_premium,
     get_different_hash,
@@ -159,6 +161,62 @@ def test_upload_data_to_server_smaller_db(rotkehlchen_instance, db_password):
         assert not put_mock.called
 
 
+@pytest.mark.parametrize('start_with_valid_premium', [True])
+def test_upload_and_pull_data_in_chunks(rotkehlchen_instance, db_password):
+    """Test that the DB is uploaded in chunks, that afterwards only the chunks that
+    changed are uploaded and that the DB can be restored from its chunks"""
+    server = MockPremiumSyncServer()
+    patched_get, patched_put, patched_delete = server.patch_session(rotkehlchen_instance.premium.session)  # noqa: E501
+    sync_manager = rotkehlchen_instance.premium_sync_manager
+    db = rotkehlchen_instance.data.db
+    # small chunks so that even a test DB is split in many of them
+    patched_min_pages = patch('rotkehlchen.premium.chunks.SYNC_CHUNK_MIN_PAGES', 1)
+    patched_max_pages = patch('rotkehlchen.premium.chunks.SYNC_CHUNK_MAX_PAGES', 4)
+    with patched_get, patched_put, patched_delete, patched_min_pages, patched_max_pages:
+        assert sync_manager.maybe_upload_data_to_server(force_upload=True) is True
+        first_upload_num = len(server.uploaded_chunk_ids)
+        assert first_upload_num == len(server.chunks) > 1
+        assert server.manifest is not None
+
+        with db.user_write() as cursor:
+            db.set_settings(cursor, ModifiableDBSettings(main_currency=A_GBP))
+        assert sync_manager.maybe_upload_data_to_server(force_upload=True) is True
+        second_upload_num = len(server.uploaded_chunk_ids) - first_upload_num
+        assert 0 < second_upload_num < first_upload_num
+        # the chunks only the previous upload used got deleted
+        manifest = DBChunksManifest.deserialize(decrypt_chunk(db_password, server.manifest))
+        assert set(server.chunks) == set(manifest.chunk_ids)
+        assert len(server.chunks) < len(set(server.uploaded_chunk_ids))
+
+        with db.user_write() as cursor:
+            db.set_settings(cursor, ModifiableDBSettings(main_currency=A_EUR))
+        assert sync_manager.sync_data('download') == (True, '')
+
+    with rotkehlchen_instance.data.db.conn.read_ctx() as cursor:
+        assert rotkehlchen_instance.data.db.get_setting(cursor, name='main_currency') == A_GBP
+
+
+@pytest.mark.parametrize('start_with_valid_premium', [True])
+@pytest.mark.parametrize('db_settings', [{'premium_should_sync': True}])
+def test_upload_data_in_chunks_size_check(rotkehlchen_instance):
+    """Test that the size of the DB is only compared with that of a remote DB saved
+    in chunks, since the size of a DB saved as a whole is its compressed size"""
+    with rotkehlchen_instance.data.db.user_write() as cursor:
+        rotkehlchen_instance.data.db.set_settings(cursor, ModifiableDBSettings(main_currency=A_EUR))  # noqa: E501
+    server = MockPremiumSyncServer()
+    server.data_hash = 'foo'
+    server.data_size = 9999999999
+    patched_get, patched_put, patched_delete = server.patch_session(rotkehlchen_instance.premium.session)  # noqa: E501
+    sync_manager = rotkehlchen_instance.premium_sync_manager
+    with patched_get, patched_put, patched_delete:
+        server.manifest = 'bar'  # a bigger DB saved in chunks
+        assert sync_manager.maybe_upload_data_to_server() is False
+        server.manifest = None  # a DB saved as a whole
+        assert sync_manager.maybe_upload_data_to_server() is True
+
+    assert server.manifest is not None
+
+
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
 @pytest.mark.parametrize('start_with_valid_premium', [True])
 def test_try_premium_at_start_new_account_can_pull_data(
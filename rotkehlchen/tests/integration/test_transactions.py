@@ -1,7 +1,11 @@
+from unittest.mock import patch
+
 import pytest
 from flaky import flaky
 
+from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.tests.utils.ethereum import (
     ETHERSCAN_AND_INFURA_PARAMS,
     setup_ethereum_transactions_test,
@@ -29,3 +33,74 @@ def test_get_transaction_receipt(
     results, _ = eth_transactions.query(ETHTransactionsFilterQuery.make(tx_hash=transactions[0].tx_hash), only_cache=True, has_premium=True)  # noqa: E501
     assert len(results) == 1
     assert results[0] == transactions[0]
+
+
+@flaky(max_runs=3, min_passes=1)  # failed in a flaky way sometimes in the CI due to etherscan
+@pytest.mark.parametrize(*ETHERSCAN_AND_INFURA_PARAMS)
+def test_get_receipts_for_transactions_missing_them(
+        database,
+        eth_transactions,
+        call_order,  # pylint: disable=unused-argument
+):
+    """Test that the receipts of all the transactions missing them are queried and saved"""
+    transactions, receipts = setup_ethereum_transactions_test(
+        database=database,
+        transaction_already_queried=True,
+        one_receipt_in_db=False,
+    )
+    dbethtx = DBEthTx(database)
+    assert len(dbethtx.get_transaction_hashes_no_receipt(tx_filter_query=None, limit=None)) == 2
+    with patch('rotkehlchen.chain.ethereum.transactions.RECEIPTS_WRITE_BATCH_SIZE', 1):
+        eth_transactions.get_receipts_for_transactions_missing_them()
+
+    assert dbethtx.get_transaction_hashes_no_receipt(tx_filter_query=None, limit=None) == []
+    with database.conn.read_ctx() as cursor:
+        for transaction, receipt in zip(transactions, receipts):
+            assert dbethtx.get_receipt(cursor, transaction.tx_hash) == receipt
+
+
+def test_get_receipts_for_transactions_missing_them_concurrent_changes(database, eth_transactions):  # noqa: E501
+    """Test that receipts saved and transactions deleted while the missing receipts are
+    queried are skipped, and that a query failure is not hidden by saving them"""
+    transactions, _ = setup_ethereum_transactions_test(
+        database=database,
+        transaction_already_queried=True,
+        one_receipt_in_db=False,
+    )
+    dbethtx = DBEthTx(database)
+    raw_receipts = [{
+        'transactionHash': transaction.tx_hash.hex(),
+        'contractAddress': None,
+        'status': 1,
+        'type': '0x0',
+        'logs': [],
+    } for transaction in transactions]
+    concurrent_receipt = {**raw_receipts[0], 'status': 0}
+    calls = 0
+
+    def mock_get_transaction_receipts(tx_hashes):  # pylint: disable=unused-argument
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RemoteError('node failure')
+        with database.user_write() as cursor:  # the decoder saves a receipt meanwhile
+            dbethtx.add_receipt_data(cursor, concurrent_receipt)
+            cursor.execute(  # and the other transaction is purged
+                'DELETE FROM ethereum_transactions WHERE tx_hash=?',
+                (transactions[1].tx_hash,),
+            )
+        return raw_receipts
+
+    receipts_patch = patch.object(
+        eth_transactions.ethereum,
+        'get_transaction_receipts',
+        side_effect=mock_get_transaction_receipts,
+    )
+    batch_size_patch = patch('rotkehlchen.chain.ethereum.transactions.RECEIPTS_QUERY_BATCH_SIZE', 1)  # noqa: E501
+    concurrency_patch = patch('rotkehlchen.chain.ethereum.transactions.RECEIPTS_QUERY_CONCURRENCY', 1)  # noqa: E501
+    with receipts_patch, batch_size_patch, concurrency_patch, pytest.raises(RemoteError):
+        eth_transactions.get_receipts_for_transactions_missing_them()
+
+    with database.conn.read_ctx() as cursor:
+        assert dbethtx.get_receipt(cursor, transactions[0].tx_hash).status is False
+        assert dbethtx.get_receipt(cursor, transactions[1].tx_hash) is None
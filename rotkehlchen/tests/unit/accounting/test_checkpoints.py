@@ -0,0 +1,78 @@
+import pytest
+
+from rotkehlchen.accounting.checkpoints import settings_fingerprint
+from rotkehlchen.db.filtering import ReportDataFilterQuery
+from rotkehlchen.db.reports import DBAccountingReports
+from rotkehlchen.exchanges.data_structures import Trade
+from rotkehlchen.fval import FVal
+from rotkehlchen.tests.utils.accounting import accounting_history_process, history1
+from rotkehlchen.tests.utils.history import prices
+from rotkehlchen.tests.utils.messages import no_message_errors
+
+
+def _serialize_events(accountant):
+    return [
+        x.serialize_to_dict(accountant.pots[0].timestamp_to_date)
+        for x in accountant.pots[0].processed_events
+    ]
+
+
+def _get_settings_hash(accountant):
+    with accountant.db.conn.read_ctx() as cursor:
+        return settings_fingerprint(
+            settings=accountant.db.get_settings(cursor),
+            ignored_assets=accountant.db.get_ignored_assets(cursor),
+            ignored_ids_mapping=accountant.db.get_ignored_action_ids(cursor, action_type=None),
+        )
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_resume_from_checkpoint(accountant):
+    """Test that a report after a checkpoint resumes from it and gets the same PnL"""
+    start_ts, end_ts = 1474000000, 1495751688
+    accounting_history_process(accountant, start_ts, end_ts, history1)
+    no_message_errors(accountant.msg_aggregator)
+    full_pnls = dict(accountant.pots[0].pnls.totals)
+    full_events = _serialize_events(accountant)
+
+    dbpnl = DBAccountingReports(accountant.db)
+    checkpoints = dbpnl.get_checkpoints(_get_settings_hash(accountant))
+    assert [x.events_processed for x in checkpoints] == [1, 3]
+    assert checkpoints[1].timestamp == 1473505138
+
+    report, _ = accounting_history_process(accountant, start_ts, end_ts, history1)
+    no_message_errors(accountant.msg_aggregator)
+    assert dict(accountant.pots[0].pnls.totals) == full_pnls
+    # the report events before the checkpoint are copied so the report is the same
+    assert _serialize_events(accountant) == full_events
+    report_events, _ = dbpnl.get_report_data(
+        filter_=ReportDataFilterQuery.make(report_id=report['identifier']),
+        with_limit=False,
+    )
+    assert len(report_events) == len(full_events)
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_changed_events_invalidate_checkpoints(accountant):
+    """Test that changing an event covered by a checkpoint makes processing start over"""
+    start_ts, end_ts = 1474000000, 1495751688
+    accounting_history_process(accountant, start_ts, end_ts, history1)
+    full_events_num = len(accountant.pots[0].processed_events)
+    full_pnls = dict(accountant.pots[0].pnls.totals)
+
+    eth_trade = history1[1]
+    history = [history1[0], Trade(
+        timestamp=eth_trade.timestamp,
+        location=eth_trade.location,
+        base_asset=eth_trade.base_asset,
+        quote_asset=eth_trade.quote_asset,
+        trade_type=eth_trade.trade_type,
+        amount=eth_trade.amount,
+        rate=FVal('0.3'),
+        fee=eth_trade.fee,
+        fee_currency=eth_trade.fee_currency,
+        link=eth_trade.link,
+    )] + history1[2:]
+    accounting_history_process(accountant, start_ts, end_ts, history)
+    assert len(accountant.pots[0].processed_events) == full_events_num
+    assert dict(accountant.pots[0].pnls.totals) != full_pnls
@@ -3,11 +3,16 @@ import pytest
 from rotkehlchen.accounting.ledger_actions import LedgerAction, LedgerActionType
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.structures.types import ActionType
 from rotkehlchen.constants import ONE, ZERO
-from rotkehlchen.constants.assets import A_ETH, A_EUR, A_KFEE, A_USDT
+from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR, A_KFEE, A_USDT
 from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.fval import FVal
-from rotkehlchen.tests.utils.accounting import accounting_history_process, check_pnls_and_csv
+from rotkehlchen.tests.utils.accounting import (
+    accounting_history_process,
+    check_pnls_and_csv,
+    history1,
+)
 from rotkehlchen.tests.utils.history import prices
 from rotkehlchen.tests.utils.messages import no_message_errors
 from rotkehlchen.types import Location, Timestamp, TradeType
@@ -180,3 +185,24 @@ def test_fees_in_received_asset(accountant, google_service):
         AccountingEventType.LEDGER_ACTION: PNL(taxable=FVal('178.615'), free=ZERO),
     })
     check_pnls_and_csv(accountant, expected_pnls, google_service)
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_prices_prefetched_before_processing(accountant, price_historian):
+    """Test that the prices needed by the events are requested in bulk per asset
+    before processing, skipping ignored events and events after the end of the report"""
+    prefetch_calls = []
+    price_historian.prefetch_historical_prices = lambda to_asset, queries: prefetch_calls.append((to_asset, dict(queries)))  # noqa: E501
+    with accountant.db.user_write() as cursor:
+        accountant.db.add_to_ignored_action_ids(
+            write_cursor=cursor,
+            action_type=ActionType.TRADE,
+            identifiers=[history1[1].identifier],
+        )
+
+    accounting_history_process(accountant, start_ts=1436979735, end_ts=1474000000, history_list=history1)  # noqa: E501
+    no_message_errors(accountant.msg_aggregator)
+    assert prefetch_calls == [(A_EUR, {
+        A_BTC: [Timestamp(1446979735), Timestamp(1473505138)],
+        A_ETH: [Timestamp(1473505138)],
+    })]
@@ -1,3 +1,27 @@
+from unittest.mock import patch
+
+import pytest
+
+from rotkehlchen.chain.ethereum.decoding.constants import (
+    ERC20_OR_ERC721_TRANSFER,
+    GOVERNORALPHA_PROPOSE,
+    GTC_CLAIM,
+)
+from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxReceiptLog
+from rotkehlchen.db.ethtx import DBEthTx
+from rotkehlchen.db.filtering import HistoryEventFilterQuery
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.tests.utils.ethereum import txreceipt_to_data
+from rotkehlchen.tests.utils.factories import (
+    make_ethereum_address,
+    make_ethereum_transaction,
+    make_random_bytes,
+)
+from rotkehlchen.types import Timestamp
+
+ADDY = '0xc931De6d845846E332a52D045072E3feF540Bd5d'
+
+
 def test_decoders_initialization(evm_transaction_decoder):
     """Make sure that all decoders we have created are detected and initialized"""
     assert set(evm_transaction_decoder.decoders.keys()) == {
@@ -49,3 +73,78 @@ def test_decoders_initialization(evm_transaction_decoder):
         'dxdaomesa',
         '1inch-v1',
     }
+
+
+def test_event_rules_index(evm_transaction_decoder):
+    """Make sure that logs are only given to the event rules that can decode them"""
+    def rules_for(topic, address=None):
+        return evm_transaction_decoder.get_event_rules(EthereumTxReceiptLog(
+            log_index=0,
+            data=b'',
+            address=address if address is not None else make_ethereum_address(),
+            removed=False,
+            topics=[topic],
+        ))
+
+    assert evm_transaction_decoder.generic_event_rules == []
+    assert rules_for(ERC20_OR_ERC721_TRANSFER) == [evm_transaction_decoder._maybe_decode_erc20_721_transfer]  # noqa: E501
+    assert rules_for(GOVERNORALPHA_PROPOSE) == [evm_transaction_decoder._maybe_decode_governance]
+    assert rules_for(GTC_CLAIM, address='0xDE3e5a990bCE7fC60a6f017e7c4a95fc4939299E') == [evm_transaction_decoder._maybe_enrich_transfers]  # noqa: E501
+    assert rules_for(GTC_CLAIM) == []  # only known for the GTC distributor
+    assert rules_for(make_random_bytes(32)) == []
+    # all rules end up in the index
+    indexed_rules = set()
+    for rules in evm_transaction_decoder.event_rules_by_topic.values():
+        indexed_rules.update(rules)
+    for rules in evm_transaction_decoder.event_rules_by_address_topic.values():
+        indexed_rules.update(rules)
+    assert indexed_rules == set(evm_transaction_decoder.event_rules)
+
+
+@pytest.mark.parametrize('ethereum_accounts', [[ADDY]])
+def test_decode_in_processes(database, evm_transaction_decoder):
+    """Test that transactions decoded by worker processes end up in the DB
+    exactly as if they had been decoded in place"""
+    dbethtx = DBEthTx(database)
+    transactions, receipts = [], []
+    for idx in range(5):
+        transaction = make_ethereum_transaction()._replace(
+            timestamp=Timestamp(1646375440 + idx),
+            from_address=ADDY,
+            to_address=make_ethereum_address(),
+            value=10 ** 18 + idx,
+            gas_price=10 ** 9,
+            gas_used=21000,
+        )
+        transactions.append(transaction)
+        receipts.append(EthereumTxReceipt(
+            tx_hash=transaction.tx_hash,
+            contract_address=None,
+            status=True,
+            type=0,
+            logs=[],
+        ))
+
+    with database.user_write() as cursor:
+        dbethtx.add_ethereum_transactions(cursor, transactions, relevant_address=ADDY)
+        for receipt in receipts:
+            dbethtx.add_receipt_data(cursor, txreceipt_to_data(receipt))
+
+    evm_transaction_decoder.decoding_processes = 2
+    with patch('rotkehlchen.chain.ethereum.decoding.decoder.PARALLEL_DECODING_MIN_TRANSACTIONS', 1):  # noqa: E501
+        with patch('rotkehlchen.chain.ethereum.decoding.parallel.PARALLEL_DECODING_CHUNK_SIZE', 2):  # noqa: E501
+            evm_transaction_decoder.get_and_decode_undecoded_transactions()
+
+    assert dbethtx.get_transaction_hashes_not_decoded(limit=None) == []
+    with database.conn.read_ctx() as cursor:
+        events = DBHistoryEvents(database).get_history_events(
+            cursor=cursor,
+            filter_query=HistoryEventFilterQuery.make(),
+            has_premium=True,
+        )
+    expected_events = []
+    for transaction, receipt in zip(transactions, receipts):
+        expected_events.extend(evm_transaction_decoder.decode_transaction_events(transaction, receipt))  # noqa: E501
+
+    assert len(events) == len(expected_events) == 2 * len(transactions)  # gas and send
+    assert sorted(x.serialize_for_db() for x in events) == sorted(x.serialize_for_db() for x in expected_events)  # noqa: E501
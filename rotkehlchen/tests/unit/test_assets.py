@@ -1,4 +1,5 @@
 import warnings as test_warnings
+from unittest.mock import patch
 
 import pytest
 from eth_utils import is_checksum_address
@@ -562,3 +563,89 @@ def test_spam_assets_are_valid():
         assert 'name' in info
         assert 'symbol' in info
         assert 'decimals' in info
+
+
+def test_assets_are_interned():
+    """Test that constructing an asset returns the same instance for the same identifier"""
+    btc = Asset('BTC')
+    assert btc is Asset('btc')
+    assert Asset('BCH').forked is btc
+    dai = EthereumToken('0x6B175474E89094C44Da98b954EedeAC495271d0F')
+    assert dai is EthereumToken('0x6B175474E89094C44Da98b954EedeAC495271d0F')
+    # the same identifier as a plain asset is a different instance of a different class
+    dai_asset = Asset(dai.identifier)
+    assert dai_asset is not dai and type(dai_asset) is Asset and dai_asset == dai
+    # assets initialized from fields are never interned
+    assert Asset.initialize('FOO', AssetType.OWN_CHAIN) is not Asset.initialize('FOO', AssetType.OWN_CHAIN)  # noqa: E501
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_edited_assets_are_not_reused(globaldb):
+    """Test that editing an asset in the global DB drops its interned instance and those
+    of the assets that are forked from it"""
+    btc, bch, eth = Asset('BTC'), Asset('BCH'), Asset('ETH')
+    globaldb.edit_custom_asset({
+        'identifier': 'BTC',
+        'asset_type': AssetType.OWN_CHAIN,
+        'name': 'Bitcoin edited',
+        'symbol': 'BTC',
+        'started': btc.started,
+        'coingecko': btc.coingecko,
+        'cryptocompare': btc.cryptocompare,
+    })
+    new_btc = Asset('BTC')
+    assert new_btc is not btc
+    assert new_btc.name == 'Bitcoin edited'
+    assert Asset('BCH') is not bch
+    assert Asset('BCH').forked is new_btc
+    assert Asset('ETH') is eth
+
+    dai = EthereumToken('0x6B175474E89094C44Da98b954EedeAC495271d0F')
+    globaldb.edit_ethereum_token(EthereumToken.initialize(
+        address=dai.ethereum_address,
+        decimals=dai.decimals,
+        name='Dai edited',
+        symbol=dai.symbol,
+        started=dai.started,
+        coingecko=dai.coingecko,
+        cryptocompare=dai.cryptocompare,
+    ))
+    assert EthereumToken(dai.ethereum_address).name == 'Dai edited'
+    assert Asset(dai.identifier).name == 'Dai edited'
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_load_all_asset_data(globaldb):
+    """Test that after loading all asset data at once assets are formed without querying"""
+    AssetResolver().clean_memory_cache()
+    AssetResolver().load_all_asset_data()
+    with globaldb.conn.read_ctx() as cursor:
+        assets_num = cursor.execute('SELECT COUNT(*) FROM assets').fetchone()[0]
+    assert len(AssetResolver().assets_cache) == assets_num
+
+    with patch.object(globaldb, 'get_asset_data', side_effect=AssertionError('DB was queried')):  # noqa: E501
+        assert Asset('ETH').name == 'Ethereum'
+        assert Asset('BCH').forked == 'BTC'
+        assert EthereumToken('0x6B175474E89094C44Da98b954EedeAC495271d0F').decimals == 18
+
+    # assets of an unknown type or without their details are skipped like single lookups
+    with globaldb.conn.write_ctx() as write_cursor:
+        write_cursor.execute('INSERT INTO asset_types(type, seq) VALUES("!", 99)')
+        write_cursor.executemany(
+            'INSERT INTO assets(identifier, type, name, symbol, details_reference) '
+            'VALUES(?, ?, ?, ?, ?)',
+            [('UNKNOWNTYPE', '!', 'foo', 'FOO', 'UNKNOWNTYPE'), ('NODETAILS', 'A', 'foo', 'FOO', 'NODETAILS')],  # noqa: E501
+        )
+    AssetResolver().clean_memory_cache()
+    AssetResolver().load_all_asset_data()
+    assert len(AssetResolver().assets_cache) == assets_num
+    for identifier in ('UNKNOWNTYPE', 'NODETAILS'):
+        assert globaldb.get_asset_data(identifier, form_with_incomplete_data=True) is None
+        with pytest.raises(UnknownAsset):
+            Asset(identifier)
+
+    # a deleted asset is not reused
+    assert Asset('ETH2').name == 'Staked ETH in Phase 0'
+    globaldb.delete_asset_by_identifer('ETH2', AssetType.OWN_CHAIN)
+    with pytest.raises(UnknownAsset):
+        Asset('ETH2')
@@ -14,8 +14,9 @@ from rotkehlchen.chain.bitcoin.utils import (
     scriptpubkey_to_p2pkh_address,
     scriptpubkey_to_p2sh_address,
 )
-from rotkehlchen.chain.bitcoin.xpub import XpubData
+from rotkehlchen.chain.bitcoin.xpub import XpubData, _derive_addresses_from_xpub_data
 from rotkehlchen.chain.constants import NON_BITCOIN_CHAINS, SupportedBlockchain
+from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.errors.misc import RemoteError, XPUBError
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.ens import ENS_BRUNO_BTC_ADDR, ENS_BRUNO_BTC_BYTES
@@ -181,6 +182,54 @@ def test_xpub_to_addresses():
         assert child.address() == expected_addresses[i]
 
 
+def test_derive_addresses_from_xpub_data():
+    """Test that both chains of an xpub are scanned until a batch without activity
+    and that re-scanning with the derived addresses cached does not derive any key"""
+    xpub = 'xpub68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk'  # noqa: E501
+    root = HDKey.from_xpub(xpub=xpub, path='m')
+    active = {
+        root.derive_path('m/0/1').address(),
+        root.derive_path('m/0/7').address(),
+        root.derive_path('m/1/0').address(),
+    }
+    queried = []
+
+    def mock_have_transactions(accounts):
+        queried.extend(accounts)
+        return {x: (x in active, FVal(1) if x in active else ZERO) for x in accounts}
+
+    with patch(
+        'rotkehlchen.chain.bitcoin.xpub.have_bitcoin_transactions',
+        side_effect=mock_have_transactions,
+    ):
+        addresses, derived_addresses = _derive_addresses_from_xpub_data(
+            xpub_data=XpubData(xpub=root),
+            start_receiving_index=0,
+            start_change_index=0,
+            gap_limit=5,
+            blockchain=SupportedBlockchain.BITCOIN,
+        )
+        active_addresses = {(x.account_index, x.derived_index) for x in addresses if x.balance != ZERO}  # noqa: E501
+        assert active_addresses == {(0, 1), (0, 7), (1, 0)}
+        for entry in addresses:
+            assert entry.address == root.derive_path(f'm/{entry.account_index}/{entry.derived_index}').address()  # noqa: E501
+        # all the checked addresses got derived and cached
+        assert {(0, x) for x in range(15)} | {(1, x) for x in range(10)} <= set(derived_addresses)  # noqa: E501
+        assert set(queried) >= {derived_addresses[(0, x)] for x in range(15)}
+
+        queried.clear()
+        cached_addresses, newly_derived_addresses = _derive_addresses_from_xpub_data(
+            xpub_data=XpubData(xpub=root),
+            start_receiving_index=0,
+            start_change_index=0,
+            gap_limit=5,
+            blockchain=SupportedBlockchain.BITCOIN,
+            cached_addresses=derived_addresses,
+        )
+    assert newly_derived_addresses == {}
+    assert sorted(x[:3] for x in cached_addresses) == sorted(x[:3] for x in addresses)
+
+
 def test_ypub_to_addresses():
     """Test vectors from here: https://iancoleman.io/bip39/"""
     xpub = 'ypub6WkRUvNhspMCJLiLgeP7oL1pzrJ6wA2tpwsKtXnbmpdAGmHHcC6FeZeF4VurGU14dSjGpF2xLavPhgvCQeXd6JxYgSfbaD1wSUi2XmEsx33'  # noqa: E501
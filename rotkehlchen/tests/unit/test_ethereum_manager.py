@@ -1,19 +1,40 @@
+import hashlib
+import json
 import os
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import patch
 
+import gevent
 import pytest
-
-from rotkehlchen.chain.ethereum.constants import ZERO_ADDRESS
+from gevent.pywsgi import WSGIServer
+from web3 import HTTPProvider, Web3
+
+from rotkehlchen.chain.ethereum.constants import ETHERSCAN_NODE, ZERO_ADDRESS
+from rotkehlchen.chain.ethereum.logs import (
+    AdaptiveBlockWindow,
+    LogsRangeTooBig,
+    scan_logs_block_range,
+)
+from rotkehlchen.chain.ethereum.manager import EthereumManager
 from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxReceiptLog
-from rotkehlchen.chain.ethereum.types import ETHERSCAN_NODE_NAME
+from rotkehlchen.chain.ethereum.types import (
+    ETHERSCAN_NODE_NAME,
+    ContractCall,
+    NodeName,
+    WeightedNode,
+)
+from rotkehlchen.constants import ONE
 from rotkehlchen.constants.ethereum import ATOKEN_ABI, ERC20TOKEN_ABI, YEARN_YCRV_VAULT
+from rotkehlchen.db.ethlogs import DBEthLogs
 from rotkehlchen.db.ethtx import DBEthTx
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.tests.utils.checks import assert_serialized_dicts_equal
 from rotkehlchen.tests.utils.ethereum import (
     ETHEREUM_FULL_TEST_PARAMETERS,
     ETHEREUM_TEST_PARAMETERS,
     wait_until_all_nodes_connected,
 )
-from rotkehlchen.tests.utils.factories import make_ethereum_address
+from rotkehlchen.tests.utils.factories import make_ethereum_address, make_random_bytes
 from rotkehlchen.types import (
     BlockchainAccountData,
     EthereumTransaction,
@@ -312,3 +333,402 @@ def test_get_blocknumber_by_time_subgraph(ethereum_manager):
 def test_get_blocknumber_by_time_etherscan(ethereum_manager):
     """Queries etherscan for known block times"""
     _test_get_blocknumber_by_time(ethereum_manager, True)
+
+
+STUB_NO_RESPONSE = object()
+
+
+class StubJsonRpcNode():
+    """A JSON-RPC node listening at a local port that answers the requests with the
+    results returned by handler. A None result is answered with an error and the
+    requests handled with STUB_NO_RESPONSE are left out of batch responses."""
+
+    def __init__(
+            self,
+            name: str,
+            handler: Callable[[str, List[Any]], Optional[Any]],
+            supports_batches: bool = True,
+    ) -> None:
+        self.handler = handler
+        self.supports_batches = supports_batches
+        self.posts: List[List[Dict[str, Any]]] = []  # the requests of each HTTP POST
+        self.server = WSGIServer(('127.0.0.1', 0), self._serve, log=None)
+        self.server.start()
+        self.node = WeightedNode(
+            node_info=NodeName(
+                name=name,
+                endpoint=f'http://127.0.0.1:{self.server.server_port}',
+                owned=False,
+            ),
+            active=True,
+            weight=ONE,
+        )
+
+    def _respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.handler(request['method'], request['params'])
+        if result is None:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32000, 'message': 'missing trie node'}}  # noqa: E501
+        return {'jsonrpc': '2.0', 'id': request['id'], 'result': result}
+
+    def _serve(self, environ, start_response):
+        body = json.loads(environ['wsgi.input'].read())
+        if isinstance(body, list):
+            self.posts.append(body)
+            if self.supports_batches:
+                # answer in reverse order since responses are matched by id
+                response = [
+                    self._respond(request) for request in reversed(body)
+                    if self.handler(request['method'], request['params']) is not STUB_NO_RESPONSE  # noqa: E501
+                ]
+            else:
+                response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'batch requests are not supported'}}  # noqa: E501
+        else:
+            self.posts.append([body])
+            response = self._respond(body)
+
+        data = json.dumps(response).encode()
+        start_response('200 OK', [('Content-Type', 'application/json'), ('Content-Length', str(len(data)))])  # noqa: E501
+        return [data]
+
+    def connect(self, ethereum_manager: EthereumManager) -> None:
+        ethereum_manager.web3_mapping[self.node.node_info] = Web3(HTTPProvider(self.node.node_info.endpoint))  # noqa: E501
+
+
+def _make_raw_receipt(tx_hash: str, block_number: int) -> Dict[str, Any]:
+    return {
+        'transactionHash': tx_hash,
+        'blockHash': '0x' + 'ab' * 32,
+        'blockNumber': hex(block_number),
+        'cumulativeGasUsed': '0x5208',
+        'gasUsed': '0x5208',
+        'status': '0x1',
+        'transactionIndex': '0x2',
+        'type': '0x2',
+        'contractAddress': None,
+        'logs': [{
+            'address': '0x6B175474E89094C44Da98b954EedeAC495271d0F',
+            'data': '0x' + '00' * 32,
+            'logIndex': '0x7',
+            'removed': False,
+            'topics': ['0x' + 'cd' * 32],
+        }],
+    }
+
+
+def test_batch_queries_fall_back_across_nodes(ethereum_manager):
+    """Test that batch requests are sent in one POST per node and that the requests
+    a node fails to answer, with an error or with no response at all, go to the next node"""
+    tx_hashes = [make_evm_tx_hash(make_random_bytes(32)) for _ in range(5)]
+    raw_receipts = {
+        tx_hash.hex(): _make_raw_receipt(tx_hash.hex(), block_number=100 + idx)
+        for idx, tx_hash in enumerate(tx_hashes)
+    }
+    pruned_tx_hashes = {tx_hashes[1].hex(), tx_hashes[3].hex()}
+
+    def pruned_node_handler(method, params):
+        assert method == 'eth_getTransactionReceipt'
+        if params[0] == tx_hashes[3].hex():
+            return STUB_NO_RESPONSE
+        if params[0] in pruned_tx_hashes:
+            return None
+        return raw_receipts[params[0]]
+
+    pruned_node = StubJsonRpcNode(name='pruned', handler=pruned_node_handler)
+    archive_node = StubJsonRpcNode(
+        name='archive',
+        handler=lambda method, params: raw_receipts[params[0]],
+    )
+    pruned_node.connect(ethereum_manager)
+    archive_node.connect(ethereum_manager)
+
+    receipts = ethereum_manager.get_transaction_receipts(
+        tx_hashes=tx_hashes,
+        call_order=[pruned_node.node, archive_node.node],
+    )
+    assert [x['transactionHash'] for x in receipts] == [x.hex() for x in tx_hashes]
+    for idx, receipt in enumerate(receipts):
+        assert receipt['blockNumber'] == 100 + idx
+        assert receipt['gasUsed'] == 21000
+        assert receipt['status'] == 1
+        assert receipt['transactionIndex'] == 2
+        assert receipt['logs'][0]['logIndex'] == 7
+        assert receipt['logs'][0]['blockNumber'] == 100 + idx
+
+    assert len(pruned_node.posts) == 1
+    assert len(pruned_node.posts[0]) == 5
+    assert len(archive_node.posts) == 1
+    assert {x['params'][0] for x in archive_node.posts[0]} == pruned_tx_hashes
+
+    archive_node.handler = lambda method, params: {
+        'number': params[0],
+        'timestamp': hex(int(params[0], 16) * 12),
+        'hash': '0x' + params[0][2:].zfill(64),
+    }
+    blocks = ethereum_manager.get_blocks_by_number(
+        nums=[1, 2, 3],
+        call_order=[archive_node.node],
+    )
+    assert [(x['number'], x['timestamp']) for x in blocks] == [(1, 12), (2, 24), (3, 36)]
+    assert archive_node.posts[-1] == [
+        {'jsonrpc': '2.0', 'id': idx, 'method': 'eth_getBlockByNumber', 'params': [hex(num), False]}  # noqa: E501
+        for idx, num in enumerate((1, 2, 3))
+    ]
+    pruned_node.server.stop()
+    archive_node.server.stop()
+
+
+def test_batch_queries_without_batch_support(ethereum_manager):
+    """Test that requests to a node that does not support batches are done one by one"""
+    accounts = [make_ethereum_address() for _ in range(3)]
+    token_address = make_ethereum_address()
+    balances = {account.lower(): idx * 10 ** 18 for idx, account in enumerate(accounts)}
+
+    def handler(method, params):
+        if method == 'eth_getCode':
+            return '0x6001' if params[0].lower() == accounts[0].lower() else '0x'
+        if method == 'eth_call':
+            assert params[0]['to'] == token_address
+            account = '0x' + params[0]['data'][-40:]
+            return '0x' + balances[account].to_bytes(32, byteorder='big').hex()
+        if method == 'eth_chainId':
+            return '0x1'
+        return None
+
+    batch_node = StubJsonRpcNode(name='batch', handler=handler)
+    single_node = StubJsonRpcNode(name='single', handler=handler, supports_batches=False)
+    batch_node.connect(ethereum_manager)
+    single_node.connect(ethereum_manager)
+    calls = [
+        ContractCall(
+            address=token_address,
+            abi=ERC20TOKEN_ABI,
+            method_name='balanceOf',
+            arguments=[account],
+        ) for account in accounts
+    ]
+    for stub_node in (batch_node, single_node):
+        codes = ethereum_manager.get_codes(accounts=accounts, call_order=[stub_node.node])
+        assert codes == ['0x6001', '0x', '0x']
+        results = ethereum_manager.call_contracts(calls=calls, call_order=[stub_node.node])
+        assert results == [0, 10 ** 18, 2 * 10 ** 18]
+
+    assert len(batch_node.posts) == 2
+    # a rejected batch for each method and then each request on its own
+    assert [len(x) for x in single_node.posts if x[0]['method'] == 'eth_getCode'] == [3, 1, 1, 1]
+    assert [len(x) for x in single_node.posts if x[0]['method'] == 'eth_call'] == [3, 1, 1, 1]
+    batch_node.server.stop()
+    single_node.server.stop()
+
+
+def test_scan_logs_block_range():
+    """Test that the scanner finds all logs while splitting the ranges that are too
+    big, continuing the ones whose results got capped and querying concurrently"""
+    # sparse blocks with a dense region in the middle
+    block_logs = {block: 1 for block in range(0, 100000, 97)}
+    block_logs.update({block: 30 for block in range(50000, 50500)})
+    running = []
+    max_running = 0
+    queried_sizes = []
+
+    def query_range(from_block, to_block):
+        nonlocal max_running
+        running.append(from_block)
+        max_running = max(max_running, len(running))
+        gevent.sleep(0.001)
+        running.remove(from_block)
+        events = [
+            {'transactionHash': f'0x{block:x}', 'logIndex': idx, 'blockNumber': block}
+            for block in range(from_block, to_block + 1)
+            for idx in range(block_logs.get(block, 0))
+        ]
+        if len(events) > 3000:
+            raise LogsRangeTooBig('query returned more than 3000 results')
+        queried_sizes.append(to_block - from_block + 1)
+        if len(events) > 1000:  # cap the results like etherscan does
+            return events[:1000], events[999]['blockNumber'] - 1
+        return events, to_block
+
+    window = AdaptiveBlockWindow(size=2000, min_size=10, max_size=50000, target_results=500)
+    events = scan_logs_block_range(
+        query_range=query_range,
+        from_block=0,
+        to_block=99999,
+        window=window,
+        concurrency=3,
+    )
+    expected_events = [
+        {'transactionHash': f'0x{block:x}', 'logIndex': idx, 'blockNumber': block}
+        for block in sorted(block_logs) for idx in range(block_logs[block])
+    ]
+    assert events == expected_events
+    assert max_running == 3
+    assert max(queried_sizes) > 2000  # the window grew over the sparse blocks
+    assert min(queried_sizes) < 100  # and shrank over the dense ones
+
+
+def test_get_logs_resumes_from_saved_range(ethereum_manager, database):
+    """Test that get_logs saves the logs of the confirmed blocks and later queries
+    only scan the blocks after them"""
+    token_address = make_ethereum_address()
+    transfer_topic = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+    logs_blocks = [300, 700, 1000, 1500, 1800, 1990, 2100]
+    queried_ranges = []
+
+    def mock_etherscan_get_logs(contract_address, topics, from_block, to_block):
+        assert contract_address == token_address
+        assert topics == [transfer_topic]
+        queried_ranges.append((from_block, to_block))
+        return [{
+            'address': token_address,
+            'topics': [transfer_topic],
+            'data': '0x',
+            'blockNumber': hex(block),
+            'timeStamp': hex(block * 10),
+            'gasPrice': '0x1',
+            'gasUsed': '0x1',
+            'logIndex': '0x0',
+            'transactionHash': f'0x{block:064x}',
+            'transactionIndex': '0x0',
+        } for block in logs_blocks if from_block <= block <= to_block]
+
+    latest_block = 2000
+    etherscan_patch = patch.object(
+        ethereum_manager.etherscan,
+        'get_logs',
+        side_effect=mock_etherscan_get_logs,
+    )
+    latest_block_patch = patch.object(
+        ethereum_manager,
+        'get_latest_block_number',
+        side_effect=lambda call_order: latest_block,
+    )
+    with etherscan_patch, latest_block_patch:
+        events = ethereum_manager.get_logs(
+            contract_address=token_address,
+            abi=ERC20TOKEN_ABI,
+            event_name='Transfer',
+            argument_filters={},
+            from_block=900,
+            call_order=[ETHERSCAN_NODE],
+        )
+        assert [x['blockNumber'] for x in events] == [1000, 1500, 1800, 1990]
+        assert queried_ranges == [(900, 2000)]
+        query_name = f'ethlogs_{token_address}_{hashlib.sha256(json.dumps([transfer_topic]).encode()).hexdigest()}'  # noqa: E501
+        with database.conn.read_ctx() as cursor:
+            # the last LOGS_CACHE_CONFIRMATIONS blocks are not saved
+            assert DBEthLogs(database).get_query_range(cursor, query_name) == (900, 1936)
+
+        latest_block = 2200
+        queried_ranges = []
+        events = ethereum_manager.get_logs(
+            contract_address=token_address,
+            abi=ERC20TOKEN_ABI,
+            event_name='Transfer',
+            argument_filters={},
+            from_block=900,
+            call_order=[ETHERSCAN_NODE],
+        )
+        assert [x['blockNumber'] for x in events] == logs_blocks[2:]
+        assert events[0]['timeStamp'] == 10000
+        assert queried_ranges == [(1937, 2200)]
+
+        queried_ranges = []
+        events = ethereum_manager.get_logs(
+            contract_address=token_address,
+            abi=ERC20TOKEN_ABI,
+            event_name='Transfer',
+            argument_filters={},
+            from_block=1200,
+            to_block=1900,
+            call_order=[ETHERSCAN_NODE],
+        )
+        assert [x['blockNumber'] for x in events] == [1500, 1800]
+        assert queried_ranges == []
+
+        # a range before the saved one is scanned up to it and all its logs are saved
+        events = ethereum_manager.get_logs(
+            contract_address=token_address,
+            abi=ERC20TOKEN_ABI,
+            event_name='Transfer',
+            argument_filters={},
+            from_block=100,
+            to_block=500,
+            call_order=[ETHERSCAN_NODE],
+        )
+        assert [x['blockNumber'] for x in events] == [300]
+        assert queried_ranges == [(100, 899)]
+
+        queried_ranges = []
+        events = ethereum_manager.get_logs(
+            contract_address=token_address,
+            abi=ERC20TOKEN_ABI,
+            event_name='Transfer',
+            argument_filters={},
+            from_block=100,
+            to_block=1200,
+            call_order=[ETHERSCAN_NODE],
+        )
+        assert [x['blockNumber'] for x in events] == [300, 700, 1000]
+        assert queried_ranges == []
+
+        with database.user_write() as write_cursor:
+            DBEthLogs(database).purge_logs(write_cursor)
+        with database.conn.read_ctx() as cursor:
+            assert DBEthLogs(database).get_query_range(cursor, query_name) is None
+            assert cursor.execute('SELECT COUNT(*) FROM ethereum_logs_cache').fetchone()[0] == 0
+
+
+def test_get_logs_etherscan_capped_block(ethereum_manager, database):
+    """Test that a block with more logs than etherscan returns at once is not saved
+    as scanned with only part of its logs but makes the etherscan query fail"""
+    token_address = make_ethereum_address()
+    transfer_topic = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+    dense_block = 1000
+
+    def mock_etherscan_get_logs(contract_address, topics, from_block, to_block):
+        if not from_block <= dense_block <= to_block:
+            return []
+        return [{
+            'address': token_address,
+            'topics': [transfer_topic],
+            'data': '0x',
+            'blockNumber': hex(dense_block),
+            'timeStamp': hex(dense_block * 10),
+            'gasPrice': '0x1',
+            'gasUsed': '0x1',
+            'logIndex': hex(idx),
+            'transactionHash': f'0x{idx:064x}',
+            'transactionIndex': '0x0',
+        } for idx in range(1000)]  # capped like etherscan does
+
+    etherscan_patch = patch.object(
+        ethereum_manager.etherscan,
+        'get_logs',
+        side_effect=mock_etherscan_get_logs,
+    )
+    latest_block_patch = patch.object(
+        ethereum_manager,
+        'get_latest_block_number',
+        side_effect=lambda call_order: 5000,
+    )
+    with etherscan_patch, latest_block_patch:
+        with pytest.raises(LogsRangeTooBig):
+            ethereum_manager._query_etherscan_logs_range(
+                filter_args={'address': token_address, 'topics': [transfer_topic]},
+                from_block=dense_block,
+                to_block=dense_block + 500,
+            )
+        with pytest.raises(RemoteError):
+            ethereum_manager.get_logs(
+                contract_address=token_address,
+                abi=ERC20TOKEN_ABI,
+                event_name='Transfer',
+                argument_filters={},
+                from_block=dense_block,
+                to_block=dense_block + 500,
+                call_order=[ETHERSCAN_NODE],
+            )
+
+    query_name = f'ethlogs_{token_address}_{hashlib.sha256(json.dumps([transfer_topic]).encode()).hexdigest()}'  # noqa: E501
+    with database.conn.read_ctx() as cursor:
+        assert DBEthLogs(database).get_query_range(cursor, query_name) is None
@@ -1,8 +1,10 @@
+from decimal import InvalidOperation
+
 import pytest
 
 from rotkehlchen.constants import ZERO
 from rotkehlchen.errors.serialization import ConversionError
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FVal, fval_sum, fvals_from_strings
 from rotkehlchen.utils.serialization import rlk_jsondumps
 
 
@@ -157,3 +159,31 @@ def test_initialize_with_bool_fails():
     with pytest.raises(ValueError):
         FVal(True)
         FVal(False)
+
+
+def test_batch_helpers():
+    values = [FVal('1.348938409'), FVal(2), FVal('-0.5'), FVal('1E+2')]
+    result = fval_sum(values)
+    assert isinstance(result, FVal)
+    assert result == sum(values, ZERO)
+    assert str(result) == str(sum(values, ZERO))
+    assert fval_sum([]) == ZERO
+    assert fval_sum(x for x in values) == FVal('102.848938409')
+
+    converted = fvals_from_strings(['1.5', '0', '-2.25', '1e-18'])
+    assert converted == [FVal('1.5'), ZERO, FVal('-2.25'), FVal('0.000000000000000001')]
+    assert all(isinstance(x, FVal) for x in converted)
+    with pytest.raises(ValueError):
+        fvals_from_strings(['1.5', 'foo'])
+
+
+def test_operation_results_are_fvals():
+    """Operations construct their results via a fast path. Make sure they are proper FVals"""
+    a, b = FVal('5.21'), FVal('2.12')
+    for result in (a + b, a - b, a * b, a / b, a // b, a % b, 2 + a, 2 - a, 2 * a, -a, abs(a)):
+        assert isinstance(result, FVal)
+        assert FVal(result) == result
+        assert result + ZERO == result
+
+    with pytest.raises(InvalidOperation):
+        _ = FVal('NaN') > a
@@ -263,6 +263,18 @@ def test_get_asset_with_symbol(globaldb):
     for x in itertools.product(('ReNbTc', 'renbtc', 'RENBTC', 'rEnBTc'), (None, AssetType.ETHEREUM_TOKEN)):  # noqa: E501
         assert globaldb.get_assets_with_symbol(*x) == expected_renbtc
 
+    # assets without their details are skipped
+    with globaldb.conn.write_ctx() as write_cursor:
+        write_cursor.executemany(
+            'INSERT INTO assets(identifier, type, name, symbol, details_reference) '
+            'VALUES(?, ?, ?, ?, ?)',
+            [
+                ('NODETAILS', 'A', 'foo', 'BIDR', 'NODETAILS'),
+                ('TOKENNODETAILS', 'C', 'foo', 'BIDR', make_ethereum_address()),
+            ],
+        )
+    assert globaldb.get_assets_with_symbol('BIDR') == [bidr_asset_data]
+
 
 @pytest.mark.parametrize('enum_class, table_name', [
     (AssetType, 'asset_types'),
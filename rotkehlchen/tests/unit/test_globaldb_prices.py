@@ -131,3 +131,76 @@ def test_get_historical_price(globaldb, historical_price_test_data):  # pylint:
         max_seconds_distance=3600,
     )
     assert price_entry is None
+
+
+def test_historical_price_index_invalidation(globaldb, historical_price_test_data):  # pylint: disable=unused-argument  # noqa: E501
+    """Test that writes to the price history are seen by subsequent lookups"""
+    def query(timestamp, source=None):
+        return globaldb.get_historical_price(
+            from_asset=A_ETH,
+            to_asset=A_EUR,
+            timestamp=timestamp,
+            max_seconds_distance=3600,
+            source=source,
+        )
+
+    assert query(1618481099).price == FVal('2049.76')
+    assert (A_ETH.identifier, A_EUR.identifier, None) in globaldb.price_index.pairs
+
+    globaldb.add_historical_prices([HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_EUR,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=Timestamp(1618481099),
+        price=Price(FVal('2048.5')),
+    )])
+    assert query(1618481099).price == FVal('2048.5')
+
+    manual_entry = HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_EUR,
+        source=HistoricalPriceOracle.MANUAL,
+        timestamp=Timestamp(1618491099),
+        price=Price(FVal('2100')),
+    )
+    assert query(1618491099, source=HistoricalPriceOracle.MANUAL) is None
+    assert globaldb.add_single_historical_price(manual_entry) is True
+    assert query(1618491099, source=HistoricalPriceOracle.MANUAL).price == FVal('2100')
+    assert globaldb.edit_manual_price(manual_entry._replace(price=Price(FVal('2200')))) is True
+    assert query(1618491099, source=HistoricalPriceOracle.MANUAL).price == FVal('2200')
+    assert globaldb.delete_manual_price(A_ETH, A_EUR, Timestamp(1618491099)) is True
+    assert query(1618491099, source=HistoricalPriceOracle.MANUAL) is None
+
+    globaldb.delete_historical_prices(A_ETH, A_EUR, source=HistoricalPriceOracle.CRYPTOCOMPARE)
+    assert query(1618481099).source == HistoricalPriceOracle.COINGECKO
+    assert query(1511626623).source == HistoricalPriceOracle.COINGECKO
+    globaldb.delete_historical_prices(A_ETH, A_EUR)
+    assert query(1618481099) is None
+
+
+def test_historical_price_index_eviction(globaldb, historical_price_test_data):  # pylint: disable=unused-argument  # noqa: E501
+    """Test that the price index stays within its rows limit by evicting whole pairs"""
+    globaldb.price_index.max_rows = 9  # ETH/EUR has 9 entries and BTC/EUR 3 entries
+    for from_asset in (A_ETH, A_BTC, A_ETH):
+        assert globaldb.get_historical_price(
+            from_asset=from_asset,
+            to_asset=A_EUR,
+            timestamp=1539713117,
+            max_seconds_distance=10,
+        ).timestamp == 1539713117
+
+    assert list(globaldb.price_index.pairs) == [(A_ETH.identifier, A_EUR.identifier, None)]
+    assert globaldb.price_index.rows == 9
+
+    # a lookup for a specific source is a different entry of the index
+    assert globaldb.get_historical_price(
+        from_asset=A_BTC,
+        to_asset=A_EUR,
+        timestamp=1618481102,
+        max_seconds_distance=0,
+        source=HistoricalPriceOracle.COINGECKO,
+    ).price == FVal('52342.5')
+    assert list(globaldb.price_index.pairs) == [
+        (A_BTC.identifier, A_EUR.identifier, HistoricalPriceOracle.COINGECKO.serialize_for_db()),
+    ]
+    assert globaldb.price_index.rows == 1
@@ -2,12 +2,13 @@ import os
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
+import gevent
 import pytest
 import requests
 
 from rotkehlchen.assets.asset import Asset, EthereumToken, UnderlyingToken
 from rotkehlchen.assets.types import AssetType
-from rotkehlchen.constants import ZERO
+from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import (
     A_1INCH,
     A_AAVE,
@@ -213,6 +214,33 @@ def test_find_usd_price_cache(inquirer, freezer):  # pylint: disable=unused-argu
         assert price == Price(FVal('2'))
 
 
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_find_usd_price_coalesces_queries(inquirer):
+    """Test that concurrent queries for the same price only query the oracles once"""
+    def mock_query_price(from_asset, to_asset):  # pylint: disable=unused-argument
+        gevent.sleep(0.1)
+        return Price(FVal('1500'))
+
+    cc_patch = patch.object(
+        inquirer._cryptocompare,
+        'query_current_price',
+        wraps=mock_query_price,
+    )
+    inquirer.set_oracles_order(oracles=[CurrentPriceOracle.CRYPTOCOMPARE])
+    with cc_patch as cc:
+        greenlets = [gevent.spawn(inquirer.find_usd_price, A_ETH) for _ in range(5)]
+        gevent.joinall(greenlets, raise_error=True)
+        assert [x.value for x in greenlets] == [Price(FVal('1500'))] * 5
+        assert cc.call_count == 1
+        assert inquirer.find_usd_price(A_ETH) == Price(FVal('1500'))
+        assert cc.call_count == 1
+
+    stats = inquirer.get_current_price_cache_stats()
+    assert stats['coalesced'] == 4
+    assert stats['size'] == 1
+    assert stats['hits'] == 1
+
+
 def test_set_oracles_order(inquirer):
     inquirer.set_oracles_order([CurrentPriceOracle.COINGECKO])
 
@@ -278,6 +306,52 @@ def test_find_usd_price_via_second_oracle(inquirer):
         assert oracle_instance.query_current_price.call_count == 1
 
 
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_find_usd_prices(inquirer):
+    """Test that multiple prices are queried in batches from the oracles in order and
+    that only the assets not found that way are queried one by one"""
+    inquirer.set_oracles_order(oracles=[CurrentPriceOracle.COINGECKO, CurrentPriceOracle.CRYPTOCOMPARE])  # noqa: E501
+    gecko_patch = patch.object(
+        inquirer._coingecko,
+        'query_multiple_current_prices',
+        return_value={A_ETH: Price(FVal('1500')), A_BTC: Price(ZERO)},  # no response for LINK
+    )
+    gecko_single_patch = patch.object(
+        inquirer._coingecko,
+        'query_current_price',
+        return_value=Price(FVal('10')),
+    )
+    cc_patch = patch.object(
+        inquirer._cryptocompare,
+        'query_multiple_current_prices',
+        return_value={A_BTC: Price(FVal('30000'))},
+    )
+    cc_single_patch = patch.object(inquirer._cryptocompare, 'query_current_price')
+    with gecko_patch as gecko, gecko_single_patch as gecko_single, cc_patch as cc, cc_single_patch as cc_single:  # noqa: E501
+        prices = inquirer.find_usd_prices([A_ETH, A_BTC, A_LINK, A_USD, A_ETH])
+        assert prices == {
+            A_ETH: Price(FVal('1500')),
+            A_BTC: Price(FVal('30000')),
+            A_LINK: Price(FVal('10')),
+            A_USD: Price(ONE),
+        }
+        assert gecko.call_args.kwargs['from_assets'] == [A_ETH, A_BTC, A_LINK]
+        assert cc.call_args.kwargs['from_assets'] == [A_BTC]
+        # LINK is queried on its own starting from the oracle that failed to answer
+        assert gecko_single.call_count == 1
+        assert cc_single.call_count == 0
+
+        # and the next time all prices come from the cache
+        assert inquirer.find_usd_prices([A_ETH, A_BTC, A_LINK]) == {
+            A_ETH: Price(FVal('1500')),
+            A_BTC: Price(FVal('30000')),
+            A_LINK: Price(FVal('10')),
+        }
+        assert gecko.call_count == 1
+        assert cc.call_count == 1
+        assert gecko_single.call_count == 1
+
+
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
 @pytest.mark.parametrize('should_mock_current_price_queries', [True])
 @pytest.mark.parametrize('mocked_current_prices', [UNDERLYING_ASSET_PRICES])
@@ -183,3 +183,37 @@ def test_manual_oracle_correctly_returns_price(globaldb, fake_price_historian):
             to_asset=A_USD,
             timestamp=Timestamp(1610595466),
         )
+
+
+def test_prefetch_follows_oracles_order(globaldb, fake_price_historian):
+    """Test that prices are prefetched only from the oracles of the configured order,
+    leaving to each oracle only the timestamps the previous ones have no price for"""
+    price_historian = fake_price_historian
+    globaldb.add_single_historical_price(
+        HistoricalPrice(
+            from_asset=A_BTC,
+            to_asset=A_USD,
+            price=30000,
+            timestamp=Timestamp(1611595470),
+            source=HistoricalPriceOracle.MANUAL,
+        ),
+    )
+    timestamps = [Timestamp(1611595466), Timestamp(1621595466)]
+    oracle_instances = price_historian._oracle_instances
+    oracle_instances[1].prefetch_historical_prices.return_value = []
+    price_historian.prefetch_historical_prices(to_asset=A_USD, queries={A_BTC: timestamps})
+    oracle_instances[1].prefetch_historical_prices.assert_called_once_with(
+        from_asset=A_BTC,
+        to_asset=A_USD,
+        timestamps=[Timestamp(1621595466)],
+    )
+    assert oracle_instances[2].prefetch_historical_prices.call_count == 0
+
+    price_historian.set_oracles_order([HistoricalPriceOracle.COINGECKO])
+    price_historian.prefetch_historical_prices(to_asset=A_USD, queries={A_BTC: timestamps})
+    assert oracle_instances[1].prefetch_historical_prices.call_count == 1
+    oracle_instances[2].prefetch_historical_prices.assert_called_once_with(
+        from_asset=A_BTC,
+        to_asset=A_USD,
+        timestamps=timestamps,
+    )
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.premium.chunks import SYNC_PAGE_SIZE, ChunkedDBFile, assemble_db_file
+
+
+def _write_pages(path, pages):
+    with open(path, 'wb') as f:
+        for page in pages:
+            f.write(page)
+
+
+def test_db_chunks_survive_page_insertion(tmp_path):
+    """Test that inserting a page only changes the chunks around it and that the
+    DB is assembled back from its chunks"""
+    rng = random.Random(42)  # fixed pages so that the chunk boundaries are deterministic
+    pages = [rng.randbytes(SYNC_PAGE_SIZE) for _ in range(2000)]
+    db_path = tmp_path / 'original.db'
+    _write_pages(db_path, pages)
+    original = ChunkedDBFile(path=db_path, password='123')
+    assert sum(x.size for x in original.chunks) == original.size == 2000 * SYNC_PAGE_SIZE
+
+    changed_path = tmp_path / 'changed.db'
+    _write_pages(changed_path, pages[:1000] + [rng.randbytes(SYNC_PAGE_SIZE)] + pages[1000:])
+    changed = ChunkedDBFile(path=changed_path, password='123')
+    original_ids = {x.chunk_id for x in original.chunks}
+    new_chunks = {
+        chunk_id: data.decode() for chunk_id, data in
+        changed.encrypted_chunks(skip_ids=original_ids)
+    }
+    assert 0 < len(new_chunks) <= 2, 'only the chunks around the new page should change'
+
+    server_chunks = {
+        chunk_id: data.decode() for chunk_id, data in
+        original.encrypted_chunks(skip_ids=set())
+    }
+    server_chunks.update(new_chunks)
+    assembled_path = tmp_path / 'assembled.db'
+    assemble_db_file(
+        path=assembled_path,
+        password='123',
+        encrypted_manifest=changed.encrypted_manifest().decode(),
+        get_chunk=server_chunks.__getitem__,
+    )
+    assert assembled_path.read_bytes() == changed_path.read_bytes()
+
+    # a chunk whose content does not match its id is rejected
+    chunk_ids = list(server_chunks)
+    server_chunks[chunk_ids[0]], server_chunks[chunk_ids[1]] = server_chunks[chunk_ids[1]], server_chunks[chunk_ids[0]]  # noqa: E501
+    with pytest.raises(RemoteError):
+        assemble_db_file(
+            path=assembled_path,
+            password='123',
+            encrypted_manifest=changed.encrypted_manifest().decode(),
+            get_chunk=server_chunks.__getitem__,
+        )
@@ -3,13 +3,20 @@ from unittest.mock import MagicMock, patch
 
 import gevent
 import pytest
+from gevent.event import Event
 
 from rotkehlchen.chain.bitcoin.hdkey import HDKey
 from rotkehlchen.chain.bitcoin.xpub import XpubData
 from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.premium.premium import Premium, PremiumCredentials, SubscriptionStatus
-from rotkehlchen.tasks.manager import PREMIUM_STATUS_CHECK, TaskManager
+from rotkehlchen.tasks.manager import (
+    PREMIUM_STATUS_CHECK,
+    TASK_BACKOFF_BASE_SECS,
+    TASK_SCHEDULING_OPTIONS,
+    TaskManager,
+    TaskSchedulingOptions,
+)
 from rotkehlchen.tests.utils.ethereum import setup_ethereum_transactions_test
 from rotkehlchen.tests.utils.premium import VALID_PREMIUM_KEY, VALID_PREMIUM_SECRET
 from rotkehlchen.types import Location, SupportedBlockchain
@@ -294,3 +301,93 @@ def test_update_snapshot_balances(task_manager):
                 )
     except gevent.Timeout as e:
         raise AssertionError(f'Update snapshot balances was not completed within {timeout} seconds') from e  # noqa: E501
+
+
+def _make_potential_task(task_manager, name, method, scheduled):
+    def potential_task():
+        scheduled.append(name)
+        task_manager.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name=f'{name} task',
+            exception_is_error=False,
+            method=method,
+        )
+
+    potential_task.__name__ = name
+    return potential_task
+
+
+def test_schedule_by_priority_and_concurrency(task_manager):
+    """Higher priority tasks get the greenlets budget first and no task type runs more
+    greenlets at once than its concurrency limit"""
+    gevent.joinall(task_manager.greenlet_manager.greenlets)  # cryptocompare preparation
+    release = Event()
+    scheduled: List[str] = []
+    task_manager.potential_tasks = [
+        _make_potential_task(task_manager, name, release.wait, scheduled)
+        for name in ('low', 'high', 'medium')
+    ]
+    options = {
+        'low': TaskSchedulingOptions(priority=5, max_concurrent=1),
+        'high': TaskSchedulingOptions(priority=0, max_concurrent=2),
+        'medium': TaskSchedulingOptions(priority=1, max_concurrent=1),
+    }
+    with patch.dict(TASK_SCHEDULING_OPTIONS, options):
+        task_manager.max_tasks_num = 2
+        task_manager.schedule()
+        assert scheduled == ['high', 'medium'], 'low priority should not fit in the budget'
+        task_manager.max_tasks_num = 5
+        task_manager.schedule()
+        assert scheduled == ['high', 'medium', 'high', 'low']
+        task_manager.schedule()
+        assert len(scheduled) == 4, 'all task types are at their concurrency limit'
+
+        status = task_manager.get_tasks_status()
+        assert [x['task_type'] for x in status['queue']] == ['high', 'medium', 'low']
+        assert [x['status'] for x in status['queue']] == ['at_limit'] * 3
+        assert [x['running'] for x in status['queue']] == [2, 1, 1]
+        assert {x['task_type'] for x in status['running']} == {'high', 'medium', 'low'}
+
+        release.set()
+        gevent.joinall(task_manager.greenlet_manager.greenlets)
+        gevent.sleep(0)  # let the link callbacks run
+        status = task_manager.get_tasks_status()
+        assert status['running'] == []
+        for entry in status['queue']:
+            assert entry['status'] == 'pending'
+            assert entry['last_duration_secs'] >= 0
+
+
+def test_schedule_backoff_on_remote_error(task_manager):
+    """A task type whose greenlet failed with a remote error is not scheduled again
+    until its backoff passes and a success resets the failures"""
+    gevent.joinall(task_manager.greenlet_manager.greenlets)  # cryptocompare preparation
+    should_fail = True
+
+    def query():
+        if should_fail:
+            raise RemoteError('remote is down')
+
+    scheduled: List[str] = []
+    task_manager.potential_tasks = [_make_potential_task(task_manager, 'remote', query, scheduled)]
+    task_manager.schedule()
+    gevent.joinall(task_manager.greenlet_manager.greenlets)
+    gevent.sleep(0)
+    task_manager.schedule()
+    assert scheduled == ['remote'], 'task should be backing off'
+    status = task_manager.get_tasks_status()['queue'][0]
+    assert status['status'] == 'backoff'
+    assert status['failures'] == 1
+    assert status['last_error'] == 'remote is down'
+    assert 0 < status['backoff_secs'] <= TASK_BACKOFF_BASE_SECS
+
+    should_fail = False
+    task_manager.task_states['remote'].backoff_until = 0
+    task_manager.schedule()
+    gevent.joinall(task_manager.greenlet_manager.greenlets)
+    gevent.sleep(0)
+    assert scheduled == ['remote', 'remote']
+    status = task_manager.get_tasks_status()['queue'][0]
+    assert status['status'] == 'pending'
+    assert status['failures'] == 0
+    assert status['runs'] == 2
@@ -4,13 +4,16 @@ import pytest
 import requests
 
 from rotkehlchen.chain.ethereum.constants import ZERO_ADDRESS
-from rotkehlchen.chain.ethereum.tokens import EthTokens
+from rotkehlchen.chain.ethereum.tokens import TOKEN_BALANCES_CACHE_TTL, EthTokens
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.constants.assets import A_BAT, A_MKR
+from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.blockchain import mock_etherscan_query
 from rotkehlchen.tests.utils.constants import A_GNO
-from rotkehlchen.tests.utils.factories import make_ethereum_address
+from rotkehlchen.tests.utils.factories import make_ethereum_address, make_random_bytes
+from rotkehlchen.types import EthereumTransaction, make_evm_tx_hash
+from rotkehlchen.utils.misc import ts_now
 
 
 @pytest.fixture(name='ethtokens')
@@ -69,15 +72,16 @@ def test_detected_tokens_cache(ethtokens, inquirer):  # pylint: disable=unused-a
         result1, _ = ethtokens.query_tokens_for_addresses([addr1, addr2], False)
         initial_call_count = etherscan_mock.call_count
 
-        # Then in second call autodetect queries should not have been made, and DB cache used
+        # Then in second call autodetect queries should not have been made, and since
+        # no transaction touched the tokens the cached balances are used too
         result2, _ = ethtokens.query_tokens_for_addresses([addr1, addr2], False)
         call_count = etherscan_mock.call_count
-        assert call_count == initial_call_count + 2
+        assert call_count == initial_call_count
 
         # In the third call force re-detection
         result3, _ = ethtokens.query_tokens_for_addresses([addr1, addr2], True)
         call_count = etherscan_mock.call_count
-        assert call_count == initial_call_count + 2 + initial_call_count
+        assert call_count == initial_call_count + initial_call_count
 
         assert result1 == result2 == result3
         assert len(result1) == len(eth_map)
@@ -111,3 +115,106 @@ def test_ignored_tokens_in_query(ethtokens, inquirer):  # pylint: disable=unused
         assert len(result[addr1]) == 1
         assert result[addr1][A_MKR] == FVal('4E-15')
         assert len(result[addr2]) == 1
+
+
+def _add_transaction(database, address, block_number, log_addresses):
+    """Adds a transaction of the address at the block. With a receipt containing a log
+    of each of log_addresses, unless log_addresses is None"""
+    dbethtx = DBEthTx(database)
+    tx_hash = make_evm_tx_hash(make_random_bytes(32))
+    with database.user_write() as cursor:
+        dbethtx.add_ethereum_transactions(
+            cursor,
+            [EthereumTransaction(
+                tx_hash=tx_hash,
+                timestamp=1,  # all other fields don't matter for this test
+                block_number=block_number,
+                from_address=address,
+                to_address=make_ethereum_address(),
+                value=0,
+                gas=1,
+                gas_price=1,
+                gas_used=1,
+                input_data=b'',
+                nonce=1,
+            )],
+            relevant_address=address,
+        )
+        if log_addresses is None:
+            return
+
+        dbethtx.add_receipt_data(cursor, {
+            'transactionHash': '0x' + tx_hash.hex(),
+            'contractAddress': None,
+            'logs': [{
+                'logIndex': idx,
+                'data': '0x',
+                'address': log_address,
+                'removed': False,
+                'topics': [],
+            } for idx, log_address in enumerate(log_addresses)],
+        })
+
+
+def test_token_balances_cache(ethtokens, database, inquirer):  # pylint: disable=unused-argument
+    """Test that cached token balances are queried again only if a transaction of the
+    address may have changed them since the block they were queried at or if they expired"""
+    address = make_ethereum_address()
+    balances = {A_GNO.identifier: FVal(5), A_MKR.identifier: FVal(4)}
+    queried_tokens = []
+    latest_block = [10]
+
+    def mock_multitoken_balance(tokens, account, call_order):  # pylint: disable=unused-argument
+        queried_tokens.extend(tokens)
+        return {x.identifier: balances[x.identifier] for x in tokens if x.identifier in balances}  # noqa: E501
+
+    def query_balances():
+        queried_tokens.clear()
+        result, _ = ethtokens.query_tokens_for_addresses([address], False)
+        return result[address]
+
+    balance_patch = patch.object(
+        ethtokens,
+        '_get_multitoken_account_balance',
+        side_effect=mock_multitoken_balance,
+    )
+    block_patch = patch.object(
+        ethtokens.ethereum,
+        'get_latest_block_number',
+        side_effect=lambda: latest_block[0],
+    )
+    with balance_patch, block_patch:
+        # detection queries all tokens and caches the balances
+        assert query_balances() == {A_GNO: FVal(5), A_MKR: FVal(4)}
+        assert len(queried_tokens) > 2
+        # nothing happened since, so the cache is used
+        assert query_balances() == {A_GNO: FVal(5), A_MKR: FVal(4)}
+        assert queried_tokens == []
+
+        # a transaction with a log of the MKR contract after the cached block
+        _add_transaction(database, address, block_number=11, log_addresses=[A_MKR.ethereum_address])  # noqa: E501
+        balances[A_MKR.identifier] = FVal(3)
+        latest_block[0] = 12
+        assert query_balances() == {A_GNO: FVal(5), A_MKR: FVal(3)}
+        assert queried_tokens == [A_MKR]
+        assert query_balances() == {A_GNO: FVal(5), A_MKR: FVal(3)}
+        assert queried_tokens == []
+
+        # a transaction whose receipt is not known yet may have changed any balance
+        _add_transaction(database, address, block_number=13, log_addresses=None)
+        balances[A_GNO.identifier] = FVal(0)
+        latest_block[0] = 14
+        assert query_balances() == {A_MKR: FVal(3)}
+        assert set(queried_tokens) == {A_GNO, A_MKR}
+        # zero balances are cached too
+        assert query_balances() == {A_MKR: FVal(3)}
+        assert queried_tokens == []
+
+        # and all balances are queried again once the cache expires
+        expired_patch = patch(
+            'rotkehlchen.chain.ethereum.tokens.ts_now',
+            return_value=ts_now() + TOKEN_BALANCES_CACHE_TTL + 1,
+        )
+        with expired_patch:
+            assert query_balances() == {A_MKR: FVal(3)}
+        assert set(queried_tokens) == {A_GNO, A_MKR}
@@ -1,8 +1,10 @@
 import json
 import time
+from datetime import datetime
 from json.decoder import JSONDecodeError
 from unittest.mock import patch
 
+import gevent
 import pytest
 from eth_typing import HexAddress, HexStr
 from eth_utils import to_checksum_address
@@ -14,6 +16,7 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.serialization.deserialize import deserialize_timestamp_from_date
 from rotkehlchen.serialization.serialize import process_result
 from rotkehlchen.tests.utils.mock import MockResponse
+from rotkehlchen.utils.cache import LRUTTLCache
 from rotkehlchen.utils.misc import (
     combine_dicts,
     combine_stat_dicts,
@@ -22,6 +25,7 @@ from rotkehlchen.utils.misc import (
     pairwise,
     pairwise_longest,
     timestamp_to_date,
+    ts_now,
 )
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
 from rotkehlchen.utils.serialization import jsonloads_dict, jsonloads_list
@@ -383,3 +387,61 @@ def test_pairwise():
     a = [1, 2, 3, 4, 5]
     assert [x + y for x, y in pairwise(a)] == [3, 7]
     assert list(pairwise_longest(a)) == [(1, 2), (3, 4), (5, None)]
+
+
+def test_lru_ttl_cache(freezer):
+    cache = LRUTTLCache(max_size=2)
+    cache.set('a', 1, ttl=10)
+    cache.set('b', 2, ttl=100)
+    assert cache.get('a') == 1
+    cache.set('c', 3, ttl=100)  # evicts b since a was used more recently
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+    freezer.move_to(datetime.fromtimestamp(ts_now() + 11))
+    assert cache.get('a') is None
+    assert cache.get('c') == 3
+    assert cache.get_stats() == {
+        'size': 1,
+        'max_size': 2,
+        'hits': 3,
+        'misses': 2,
+        'evictions': 1,
+        'expirations': 1,
+        'coalesced': 0,
+        'in_flight': 0,
+    }
+
+
+def test_lru_ttl_cache_coalesces_queries():
+    cache = LRUTTLCache(max_size=10)
+    calls = []
+
+    def query():
+        calls.append(1)
+        gevent.sleep(0.1)
+        return 42
+
+    greenlets = [gevent.spawn(cache.get_or_query, 'a', query) for _ in range(5)]
+    gevent.joinall(greenlets, raise_error=True)
+    assert [x.value for x in greenlets] == [42] * 5
+    assert len(calls) == 1
+    assert cache.coalesced == 4
+    assert cache.in_flight == {}
+
+    def failing_query():
+        gevent.sleep(0.1)
+        raise ValueError('boom')
+
+    greenlets = [gevent.spawn(cache.get_or_query, 'b', failing_query) for _ in range(2)]
+    gevent.joinall(greenlets)
+    assert all(isinstance(x.exception, ValueError) for x in greenlets)
+
+    # killing the greenlet running the query makes a waiting one run it instead
+    owner = gevent.spawn(cache.get_or_query, 'c', query)
+    gevent.sleep(0)
+    waiter = gevent.spawn(cache.get_or_query, 'c', query)
+    gevent.sleep(0)
+    owner.kill()
+    assert waiter.get() == 42
+    assert len(calls) == 3
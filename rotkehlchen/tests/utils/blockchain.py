@@ -251,6 +251,10 @@ def mock_etherscan_query(
                 return original_requests_get(url, *args, **kwargs)
             # By default when mocking don't query blocknobytime
             response = '{"status":"1","message":"OK","result":"1"}'
+        elif 'api.etherscan.io/api?module=proxy&action=eth_blockNumber' in url:
+            if 'blocknumber' in original_queries:
+                return original_requests_get(url, *args, **kwargs)
+            response = '{"jsonrpc":"2.0","id":1,"result":"0xe4e1c0"}'
         elif f'api.etherscan.io/api?module=proxy&action=eth_call&to={ZERION_ADAPTER_ADDRESS}' in url:  # noqa: E501
             if 'zerion' in original_queries:
                 return original_requests_get(url, *args, **kwargs)
@@ -1237,7 +1237,17 @@ def maybe_mock_historical_price_queries(
 
         return price
 
+    original_prefetch_function = historian.prefetch_historical_prices
+
+    def mock_prefetch_historical_prices(to_asset, queries):
+        # only the assets whose prices are not mocked may need to be prefetched
+        original_prefetch_function(
+            to_asset=to_asset,
+            queries={k: v for k, v in queries.items() if k in dont_mock_price_for},
+        )
+
     historian.query_historical_price = mock_historical_price_query
+    historian.prefetch_historical_prices = mock_prefetch_historical_prices
 
 
 def assert_pnl_debug_import(filepath: Path, database: DBHandler) -> None:
@@ -2,7 +2,7 @@ import base64
 import json
 import os
 from http import HTTPStatus
-from typing import Literal, Optional
+from typing import Dict, List, Literal, Optional, Tuple
 from unittest.mock import patch
 
 from rotkehlchen.constants import ROTKEHLCHEN_SERVER_TIMEOUT
@@ -81,6 +81,9 @@ def create_patched_requests_get_for_premium(
             )
         elif 'get_saved_data' in url:
             implementation = mock_get_saved_data(saved_data=saved_data)
+        elif any(x in url for x in ('data_chunks', 'get_data_manifest', 'get_data_chunk')):
+            # Emulate a server that can't save the DB in chunks
+            return MockResponse(HTTPStatus.NOT_FOUND, '{"error": "Not found"}')
         else:
             raise ValueError('Unmocked url in session get for premium')
 
@@ -122,6 +125,66 @@ def create_patched_premium(
     return patched_premium_at_start, patched_premium_at_set, patched_get
 
 
+class MockPremiumSyncServer():
+    """Stand-in for the rotki server endpoints that save the DB in chunks"""
+
+    def __init__(self) -> None:
+        self.chunks: Dict[str, str] = {}
+        self.uploaded_chunk_ids: List[str] = []
+        self.manifest: Optional[str] = None
+        self.last_modify_ts = 0
+        self.data_hash = ''
+        self.data_size = 0
+
+    def mocked_get(self, url, data, timeout):  # pylint: disable=unused-argument
+        if 'last_data_metadata' in url:
+            payload = {
+                'upload_ts': 1337,
+                'last_modify_ts': self.last_modify_ts,
+                'data_hash': self.data_hash,
+                'data_size': self.data_size,
+            }
+        elif 'data_chunks' in url:
+            payload = {'chunks': list(self.chunks)}
+        elif 'get_data_manifest' in url:
+            payload = {'data': self.manifest}
+        elif 'get_data_chunk' in url:
+            payload = {'data': self.chunks.get(data['chunk_id'])}
+        else:
+            raise ValueError(f'Unmocked url {url} in session get for premium sync server')
+
+        return MockResponse(HTTPStatus.OK, json.dumps(payload))
+
+    def mocked_put(self, url, data, timeout):  # pylint: disable=unused-argument
+        if 'save_data_chunk' in url:
+            self.chunks[data['chunk_id']] = data['data_blob'].decode()
+            self.uploaded_chunk_ids.append(data['chunk_id'])
+        elif 'save_data_manifest' in url:
+            self.manifest = data['manifest_blob'].decode()
+            self.last_modify_ts = data['last_modify_ts']
+            self.data_hash = data['original_hash']
+            self.data_size = data['length']
+        else:
+            raise ValueError(f'Unmocked url {url} in session put for premium sync server')
+
+        return MockResponse(HTTPStatus.OK, '{"success": true}')
+
+    def mocked_delete(self, url, data, timeout):  # pylint: disable=unused-argument
+        if 'delete_data_chunks' not in url:
+            raise ValueError(f'Unmocked url {url} in session delete for premium sync server')
+
+        for chunk_id in data['chunk_ids'].split(','):
+            self.chunks.pop(chunk_id)
+        return MockResponse(HTTPStatus.OK, '{"success": true}')
+
+    def patch_session(self, session) -> Tuple:
+        return (
+            patch.object(session, 'get', side_effect=self.mocked_get),
+            patch.object(session, 'put', side_effect=self.mocked_put),
+            patch.object(session, 'delete', side_effect=self.mocked_delete),
+        )
+
+
 def get_different_hash(given_hash: str) -> str:
     """Given the string hash get one that's different but has same length"""
     new_hash = ''
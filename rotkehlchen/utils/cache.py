@@ -0,0 +1,122 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, NamedTuple, Optional, Tuple, TypeVar
+
+import gevent
+from gevent.event import AsyncResult
+from gevent.greenlet import Greenlet
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.utils.misc import ts_now
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+# Given to the greenlets waiting for a query whose greenlet got killed before finishing
+_QUERY_ABORTED = object()
+
+
+class InFlightQuery(NamedTuple):
+    greenlet: Greenlet
+    result: AsyncResult
+
+
+class LRUTTLCache(Generic[K, V]):
+    """A cache of at most max_size entries, evicted in least recently used order,
+    where each entry expires after the time to live it was added with.
+
+    Misses can be coalesced with get_or_query() so that when many greenlets need the
+    same missing key at once only the first one runs the query and the others wait
+    for its result.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.entries: 'OrderedDict[K, Tuple[V, int]]' = OrderedDict()  # value, expiry ts
+        self.in_flight: Dict[K, InFlightQuery] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def get(self, key: K) -> Optional[V]:
+        """Returns the cached value of the key or None if missing or expired"""
+        entry = self.entries.get(key)
+        if entry is not None and ts_now() > entry[1]:
+            del self.entries[key]
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: K, value: V, ttl: int) -> None:
+        self.entries[key] = (value, ts_now() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            evicted_key, _ = self.entries.popitem(last=False)
+            self.evictions += 1
+            log.debug(f'Evicted {evicted_key} from the cache')
+
+    def get_or_query(self, key: K, query: Callable[[], V]) -> V:
+        """Runs the query for the key unless another greenlet is already running it,
+        in which case its result is returned once ready. The query itself is
+        responsible for setting the cache entries it wants to keep.
+
+        May raise:
+        - Anything the query raises. Greenlets waiting for it get the same error.
+        """
+        current = gevent.getcurrent()
+        while True:
+            in_flight = self.in_flight.get(key)
+            if in_flight is None:
+                break
+            if in_flight.greenlet is current:  # recursive query for the same key
+                return query()
+
+            self.coalesced += 1
+            value = in_flight.result.get()
+            if value is not _QUERY_ABORTED:
+                return value
+            # else the greenlet running the query was killed. Try again.
+
+        result = AsyncResult()
+        self.in_flight[key] = InFlightQuery(greenlet=current, result=result)
+        try:
+            value = query()
+        except Exception as e:
+            result.set_exception(e)
+            raise
+        else:
+            result.set(value)
+        finally:
+            if not result.ready():
+                result.set(_QUERY_ABORTED)
+            self.in_flight.pop(key, None)
+
+        return value
+
+    def clear(self) -> None:
+        """Drops all entries. Queries in flight are not affected."""
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'coalesced': self.coalesced,
+            'in_flight': len(self.in_flight),
+        }
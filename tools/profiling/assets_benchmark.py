@@ -0,0 +1,116 @@
+"""Benchmark of reading the assets of the global DB and constructing Asset objects
+
+Resolves the data of all assets of the global DB once with a query per asset, as was
+done before, and once with the single bulk query done at startup. Then constructs
+asset objects for a sample of identifiers, as deserializing a long history does,
+once creating a new object per construction, as was done before, and once with the
+interned assets. Prints the time and the memory taken by the constructed objects
+for both.
+
+Run with: python -m tools.profiling.assets_benchmark --constructions 1000000
+"""
+from gevent import monkey  # isort:skip # noqa
+monkey.patch_all()  # isort:skip # noqa
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Iterator, List, Tuple
+
+from rotkehlchen.assets.asset import Asset, InternedAssetMeta
+from rotkehlchen.assets.resolver import AssetResolver
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+
+
+@contextmanager
+def not_interned() -> Iterator[None]:
+    """What was done before interning. Each construction creates a new object"""
+    interned_call = InternedAssetMeta.__call__
+    InternedAssetMeta.__call__ = type.__call__  # type: ignore
+    try:
+        yield
+    finally:
+        InternedAssetMeta.__call__ = interned_call  # type: ignore
+
+
+def load_per_asset(identifiers: List[str]) -> None:
+    """What was done before the bulk load. A query per asset the first time it's used"""
+    for identifier in identifiers:
+        AssetResolver().get_asset_data(identifier, form_with_incomplete_data=True)
+
+
+def reset_assets() -> None:
+    """Start from the data of all assets loaded and no asset constructed"""
+    AssetResolver().clean_memory_cache()
+    AssetResolver().load_all_asset_data()
+
+
+def construct(identifiers: List[str]) -> Tuple[float, int]:
+    """Constructs the assets and returns the time it took and the memory they take"""
+    reset_assets()
+    gc.collect()
+    start = time.perf_counter()
+    assets = [Asset(identifier) for identifier in identifiers]
+    duration = time.perf_counter() - start
+    del assets
+
+    reset_assets()
+    gc.collect()
+    tracemalloc.start()
+    assets = [Asset(identifier) for identifier in identifiers]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(assets) == len(identifiers)
+    return duration, memory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of reading and constructing assets')
+    parser.add_argument('--constructions', type=int, default=1000000)
+    parser.add_argument('--distinct', type=int, default=500, help='Distinct assets used')
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmpdirname:
+        globaldb = GlobalDBHandler(data_dir=Path(tmpdirname))
+        with globaldb.conn.read_ctx() as cursor:
+            all_identifiers = [x[0] for x in cursor.execute('SELECT identifier FROM assets')]
+
+        AssetResolver().clean_memory_cache()
+        start = time.perf_counter()
+        load_per_asset(all_identifiers)
+        per_asset_load = time.perf_counter() - start
+        AssetResolver().clean_memory_cache()
+        start = time.perf_counter()
+        AssetResolver().load_all_asset_data()
+        bulk_load = time.perf_counter() - start
+
+        # a history uses few assets, some of them much more often than the rest
+        used_identifiers = random.sample(all_identifiers, min(args.distinct, len(all_identifiers)))  # noqa: E501
+        weights = [1 / (rank + 1) for rank in range(len(used_identifiers))]
+        sample = random.choices(used_identifiers, weights=weights, k=args.constructions)
+        with not_interned():
+            new_objects_time, new_objects_memory = construct(sample)
+        interned_time, interned_memory = construct(sample)
+
+    print(
+        f'Loaded the data of {len(all_identifiers)} assets\n'
+        f'per asset: {per_asset_load * 1000:.1f} ms\n'
+        f'bulk:      {bulk_load * 1000:.1f} ms\n'
+        f'speedup: {per_asset_load / bulk_load:.2f}x\n'
+        f'Constructed {args.constructions} assets of {len(used_identifiers)} identifiers\n'
+        f'new objects: {new_objects_time * 1e6 / args.constructions:.3f} us per asset, '
+        f'{new_objects_memory / 2**20:.1f} MiB\n'
+        f'interned:    {interned_time * 1e6 / args.constructions:.3f} us per asset, '
+        f'{interned_memory / 2**20:.1f} MiB\n'
+        f'speedup: {new_objects_time / interned_time:.2f}x, '
+        f'memory reduction: {new_objects_memory / interned_memory:.2f}x',
+    )
+
+
+if __name__ == '__main__':
+    main()
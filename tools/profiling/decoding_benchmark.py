@@ -0,0 +1,173 @@
+"""Benchmark of the ethereum transaction decoder on a synthetic corpus
+
+Decodes the same transactions once with the event rules index, so that each log only
+goes to the rules declared for it, and once trying every rule for every log, as was
+done before the index existed. Prints the decode time per transaction for both.
+
+Run with: python -m tools.profiling.decoding_benchmark --transactions 2000
+"""
+from gevent import monkey  # isort:skip # noqa
+monkey.patch_all()  # isort:skip # noqa
+
+import argparse
+import random
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, Tuple
+
+from rotkehlchen.chain.ethereum.decoding.constants import ERC20_APPROVE, ERC20_OR_ERC721_TRANSFER
+from rotkehlchen.chain.ethereum.decoding.decoder import EVMTransactionDecoder
+from rotkehlchen.chain.ethereum.manager import EthereumManager
+from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxReceiptLog
+from rotkehlchen.chain.ethereum.transactions import EthTransactions
+from rotkehlchen.constants.assets import A_DAI, A_USDC
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.externalapis.etherscan import Etherscan
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.greenlets import GreenletManager
+from rotkehlchen.tests.utils.factories import make_ethereum_address, make_random_bytes
+from rotkehlchen.types import (
+    BlockchainAccountData,
+    ChecksumEthAddress,
+    EthereumTransaction,
+    SupportedBlockchain,
+    Timestamp,
+    make_evm_tx_hash,
+)
+from rotkehlchen.user_messages import MessagesAggregator
+
+TRACKED_ADDRESS = make_ethereum_address()
+# Events emitted all the time by contracts for which there is no decoder, such as
+# uniswap v2 Sync and Swap, WETH Deposit and Withdrawal
+UNDECODED_TOPICS = [
+    bytes.fromhex('1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1'),
+    bytes.fromhex('d78ad95fa46c994b6551d0da85fc275fe613ce37657fb8d5e3d130840159d822'),
+    bytes.fromhex('e1fffcc4923d04b559f4d29a8bfc6cda04eb5b0d3c460751c2402c5c5cc9109c'),
+    bytes.fromhex('7fcf532c15f0a6db0bd6d0e038bea71d30d808c7d98cb3bf7268a95bf5081b65'),
+]
+
+
+def _address_topic(address: ChecksumEthAddress) -> bytes:
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+def make_corpus(
+        num_transactions: int,
+        logs_per_transaction: int,
+) -> List[Tuple[EthereumTransaction, EthereumTxReceipt]]:
+    """Transactions of the tracked address where about a third of the logs are token
+    transfers and approvals of the tracked address and the rest are not decodable"""
+    corpus = []
+    for idx in range(num_transactions):
+        tx_hash = make_evm_tx_hash(make_random_bytes(32))
+        logs = []
+        for log_index in range(logs_per_transaction):
+            choice = random.random()
+            if choice < 0.25:
+                address = random.choice((A_DAI, A_USDC)).ethereum_address
+                topics = [ERC20_OR_ERC721_TRANSFER, _address_topic(TRACKED_ADDRESS), _address_topic(make_ethereum_address())]  # noqa: E501
+            elif choice < 0.35:
+                address = A_USDC.ethereum_address
+                topics = [ERC20_APPROVE, _address_topic(TRACKED_ADDRESS), _address_topic(make_ethereum_address())]  # noqa: E501
+            else:
+                address = make_ethereum_address()
+                topics = [random.choice(UNDECODED_TOPICS)]
+            logs.append(EthereumTxReceiptLog(
+                log_index=log_index,
+                data=(10 ** 18).to_bytes(32, byteorder='big'),
+                address=address,
+                removed=False,
+                topics=topics,
+            ))
+
+        corpus.append((
+            EthereumTransaction(
+                tx_hash=tx_hash,
+                timestamp=Timestamp(1640995200 + idx),
+                block_number=13916166 + idx,
+                from_address=TRACKED_ADDRESS,
+                to_address=make_ethereum_address(),
+                value=0,
+                gas=300000,
+                gas_price=50 * 10 ** 9,
+                gas_used=150000,
+                input_data=b'',
+                nonce=idx,
+            ),
+            EthereumTxReceipt(tx_hash=tx_hash, contract_address=None, status=True, type=2, logs=logs),  # noqa: E501
+        ))
+
+    return corpus
+
+
+def time_decoding(
+        decoder: EVMTransactionDecoder,
+        corpus: List[Tuple[EthereumTransaction, EthereumTxReceipt]],
+) -> float:
+    """Returns the mean decode time per transaction in seconds"""
+    start = time.perf_counter()
+    for transaction, tx_receipt in corpus:
+        decoder.decode_transaction_events(transaction, tx_receipt)
+    return (time.perf_counter() - start) / len(corpus)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of the transaction decoder')
+    parser.add_argument('--transactions', type=int, default=2000)
+    parser.add_argument('--logs-per-transaction', type=int, default=12)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmpdirname:
+        data_dir = Path(tmpdirname)
+        msg_aggregator = MessagesAggregator()
+        GlobalDBHandler(data_dir=data_dir)
+        user_data_dir = data_dir / 'benchmark'
+        user_data_dir.mkdir()
+        database = DBHandler(
+            user_data_dir=user_data_dir,
+            password='benchmark',
+            msg_aggregator=msg_aggregator,
+            initial_settings=None,
+        )
+        with database.user_write() as cursor:
+            database.add_blockchain_accounts(
+                write_cursor=cursor,
+                blockchain=SupportedBlockchain.ETHEREUM,
+                account_data=[BlockchainAccountData(address=TRACKED_ADDRESS)],
+            )
+        ethereum_manager = EthereumManager(
+            etherscan=Etherscan(database=database, msg_aggregator=msg_aggregator),
+            msg_aggregator=msg_aggregator,
+            greenlet_manager=GreenletManager(msg_aggregator=msg_aggregator),
+            connect_at_start=[],
+            database=database,
+        )
+        decoder = EVMTransactionDecoder(
+            database=database,
+            ethereum_manager=ethereum_manager,
+            eth_transactions=EthTransactions(ethereum=ethereum_manager, database=database),
+            msg_aggregator=msg_aggregator,
+        )
+        corpus = make_corpus(args.transactions, args.logs_per_transaction)
+        time_decoding(decoder, corpus[:100])  # warm up the caches
+
+        indexed = time_decoding(decoder, corpus)
+        # try every rule for every log, like before the index
+        decoder.event_rules_by_topic = {}
+        decoder.event_rules_by_address_topic = {}
+        decoder.generic_event_rules = list(decoder.event_rules)
+        all_rules = time_decoding(decoder, corpus)
+        database.logout()
+
+    print(
+        f'Decoded {args.transactions} transactions with '
+        f'{args.logs_per_transaction} logs each\n'
+        f'all rules for every log: {all_rules * 1000:.3f} ms per transaction\n'
+        f'event rules index:       {indexed * 1000:.3f} ms per transaction\n'
+        f'speedup: {all_rules / indexed:.2f}x',
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Benchmark of loading transactions and their receipts from the user DB
+
+Fills a user DB with synthetic transactions and receipts and then loads a sample of
+them once hash by hash, with a query for the transaction, one for the receipt, one
+for its logs and one for the topics of each log, as was done before, and once in
+bulk with a constant number of queries per chunk of transactions. Prints the load
+time per transaction for both.
+
+Run with: python -m tools.profiling.receipts_benchmark --receipts 100000
+"""
+from gevent import monkey  # isort:skip # noqa
+monkey.patch_all()  # isort:skip # noqa
+
+import argparse
+import random
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, Tuple
+
+from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxReceiptLog
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.drivers.gevent import DBCursor
+from rotkehlchen.db.ethtx import DBEthTx
+from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.tests.utils.factories import make_ethereum_address, make_random_bytes
+from rotkehlchen.types import (
+    BlockchainAccountData,
+    EthereumTransaction,
+    EVMTxHash,
+    SupportedBlockchain,
+    make_evm_tx_hash,
+)
+from rotkehlchen.user_messages import MessagesAggregator
+
+TRACKED_ADDRESS = make_ethereum_address()
+INSERT_BATCH_SIZE = 10000
+
+
+def fill_db(database: DBHandler, num_receipts: int, logs_per_receipt: int) -> List[EVMTxHash]:
+    """Adds transactions of the tracked address with receipts of logs_per_receipt logs
+    of up to 4 topics each. Returns the hashes of the transactions."""
+    tx_hashes = []
+    addresses = [make_ethereum_address() for _ in range(100)]
+    for batch_start in range(0, num_receipts, INSERT_BATCH_SIZE):
+        txs, receipts, logs, topics, mappings = [], [], [], [], []
+        for idx in range(batch_start, min(batch_start + INSERT_BATCH_SIZE, num_receipts)):
+            tx_hash = make_random_bytes(32)
+            tx_hashes.append(make_evm_tx_hash(tx_hash))
+            txs.append((tx_hash, 1640995200 + idx, 13916166 + idx, TRACKED_ADDRESS, random.choice(addresses), '0', '300000', '50000000000', '150000', b'', idx))  # noqa: E501
+            mappings.append((TRACKED_ADDRESS, tx_hash, 'ETH'))
+            receipts.append((tx_hash, None, 1, 2))
+            for log_index in range(logs_per_receipt):
+                logs.append((tx_hash, log_index, make_random_bytes(32), random.choice(addresses), 0))  # noqa: E501
+                for topic_index in range(random.randint(1, 4)):
+                    topics.append((tx_hash, log_index, make_random_bytes(32), topic_index))
+
+        with database.user_write() as cursor:
+            cursor.executemany('INSERT INTO ethereum_transactions(tx_hash, timestamp, block_number, from_address, to_address, value, gas, gas_price, gas_used, input_data, nonce) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', txs)  # noqa: E501
+            cursor.executemany('INSERT INTO ethtx_address_mappings(address, tx_hash, blockchain) VALUES (?, ?, ?)', mappings)  # noqa: E501
+            cursor.executemany('INSERT INTO ethtx_receipts(tx_hash, contract_address, status, type) VALUES (?, ?, ?, ?)', receipts)  # noqa: E501
+            cursor.executemany('INSERT INTO ethtx_receipt_logs(tx_hash, log_index, data, address, removed) VALUES (?, ?, ?, ?, ?)', logs)  # noqa: E501
+            cursor.executemany('INSERT INTO ethtx_receipt_log_topics(tx_hash, log_index, topic, topic_index) VALUES (?, ?, ?, ?)', topics)  # noqa: E501
+
+    return tx_hashes
+
+
+def load_per_hash(
+        database: DBHandler,
+        cursor: DBCursor,
+        tx_hashes: List[EVMTxHash],
+) -> List[Tuple[EthereumTransaction, EthereumTxReceipt]]:
+    """What was done before the bulk loader"""
+    dbethtx = DBEthTx(database)
+    result = []
+    for tx_hash in tx_hashes:
+        transaction = dbethtx.get_ethereum_transactions(
+            cursor=cursor,
+            filter_=ETHTransactionsFilterQuery.make(tx_hash=tx_hash),
+            has_premium=True,
+        )[0]
+        cursor.execute('SELECT * from ethtx_receipts WHERE tx_hash=?', (tx_hash,))
+        entry = cursor.fetchone()
+        tx_receipt = EthereumTxReceipt(
+            tx_hash=tx_hash,
+            contract_address=entry[1],
+            status=bool(entry[2]),
+            type=entry[3],
+        )
+        cursor.execute('SELECT * from ethtx_receipt_logs WHERE tx_hash=?', (tx_hash,))
+        with database.conn.read_ctx() as other_cursor:
+            for entry in cursor:
+                tx_log = EthereumTxReceiptLog(
+                    log_index=entry[1],
+                    data=entry[2],
+                    address=entry[3],
+                    removed=bool(entry[4]),
+                )
+                other_cursor.execute(
+                    'SELECT topic from ethtx_receipt_log_topics WHERE tx_hash=? AND log_index=? '
+                    'ORDER BY topic_index ASC',
+                    (tx_hash, entry[1]),
+                )
+                tx_log.topics.extend(x[0] for x in other_cursor)
+                tx_receipt.logs.append(tx_log)
+
+        result.append((transaction, tx_receipt))
+
+    return result
+
+
+def load_in_bulk(
+        database: DBHandler,
+        cursor: DBCursor,
+        tx_hashes: List[EVMTxHash],
+) -> List[Tuple[EthereumTransaction, EthereumTxReceipt]]:
+    return DBEthTx(database).get_transactions_and_receipts(cursor, tx_hashes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of loading transaction receipts')
+    parser.add_argument('--receipts', type=int, default=100000)
+    parser.add_argument('--logs-per-receipt', type=int, default=8)
+    parser.add_argument('--sample', type=int, default=5000, help='Transactions to load')
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmpdirname:
+        data_dir = Path(tmpdirname)
+        GlobalDBHandler(data_dir=data_dir)
+        user_data_dir = data_dir / 'benchmark'
+        user_data_dir.mkdir()
+        database = DBHandler(
+            user_data_dir=user_data_dir,
+            password='benchmark',
+            msg_aggregator=MessagesAggregator(),
+            initial_settings=None,
+        )
+        with database.user_write() as cursor:
+            database.add_blockchain_accounts(
+                write_cursor=cursor,
+                blockchain=SupportedBlockchain.ETHEREUM,
+                account_data=[BlockchainAccountData(address=TRACKED_ADDRESS)],
+            )
+        tx_hashes = fill_db(database, args.receipts, args.logs_per_receipt)
+        sample = random.sample(tx_hashes, min(args.sample, len(tx_hashes)))
+
+        timings = {}
+        results = []
+        for name, method in (('per hash', load_per_hash), ('bulk', load_in_bulk)):
+            with database.conn.read_ctx() as cursor:
+                start = time.perf_counter()
+                results.append(method(database, cursor, sample))
+                timings[name] = (time.perf_counter() - start) / len(sample)
+        database.logout()
+
+    assert results[0] == results[1], 'bulk loader returned different data'
+    print(
+        f'Loaded {len(sample)} out of {args.receipts} transactions with '
+        f'{args.logs_per_receipt} logs each\n'
+        f'per hash: {timings["per hash"] * 1000:.3f} ms per transaction\n'
+        f'bulk:     {timings["bulk"] * 1000:.3f} ms per transaction\n'
+        f'speedup: {timings["per hash"] / timings["bulk"]:.2f}x',
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark of the compression and encryption of the DB synced with the rotki server
+
+Creates plaintext sqlite DBs of different sizes and for each one compresses and
+encrypts it and then decrypts and decompresses it back, once holding every
+intermediate step in memory, as was done before, and once streaming it block by
+block. Each run happens in its own process so that its peak RSS can be measured.
+Prints the wall time and peak RSS of every run.
+
+Run with: python -m tools.profiling.sync_benchmark --sizes-mb 10 50 200
+"""
+import argparse
+import multiprocessing
+import random
+import resource
+import sqlite3
+import sys
+import time
+import zlib
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable, Dict, Tuple
+
+from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.data_handler import compress_and_encrypt_file, decrypt_and_decompress_to_file
+
+PASSWORD = 'benchmark'
+
+
+def make_db(path: Path, size_mb: int) -> None:
+    """A DB with rows that look a bit like history events, so that it compresses
+    somewhat like a real user DB"""
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE events(identifier INTEGER PRIMARY KEY, ts INTEGER, asset TEXT, amount TEXT, notes TEXT)')  # noqa: E501
+    assets = ['ETH', 'BTC', 'eip155:1/erc20:0x6B175474E89094C44Da98b954EedeAC495271d0F', 'USD']
+    idx = 0
+    while path.stat().st_size < size_mb * 1024 * 1024:
+        conn.executemany(
+            'INSERT INTO events(ts, asset, amount, notes) VALUES(?, ?, ?, ?)',
+            [(
+                1500000000 + idx + x,
+                random.choice(assets),
+                str(random.random() * 1000),
+                f'Receive {random.randint(1, 10 ** 6)} from 0x{random.getrandbits(160):040x}',
+            ) for x in range(10000)],
+        )
+        conn.commit()
+        idx += 10000
+    conn.close()
+
+
+def in_memory_roundtrip(db_path: Path, out_path: Path) -> None:
+    """What was done before the streaming pipeline"""
+    with open(db_path, 'rb') as f:
+        source_data = f.read()
+    compressed_data = zlib.compress(source_data, level=9)
+    encrypted_data = encrypt(PASSWORD.encode(), compressed_data)
+    decrypted_data = decrypt(PASSWORD.encode(), encrypted_data)
+    with open(out_path, 'wb') as f:
+        f.write(zlib.decompress(decrypted_data))
+
+
+def streaming_roundtrip(db_path: Path, out_path: Path) -> None:
+    encrypted_data, _ = compress_and_encrypt_file(path=db_path, password=PASSWORD)
+    decrypt_and_decompress_to_file(
+        password=PASSWORD,
+        encrypted_data=encrypted_data.decode(),
+        path=out_path,
+    )
+
+
+METHODS: Dict[str, Callable[[Path, Path], None]] = {
+    'in memory': in_memory_roundtrip,
+    'streaming': streaming_roundtrip,
+}
+
+
+def _run(method: str, db_path: Path, out_path: Path, queue: multiprocessing.Queue) -> None:
+    start = time.perf_counter()
+    METHODS[method](db_path, out_path)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def measure(method: str, db_path: Path, out_path: Path) -> Tuple[float, float]:
+    """Returns the wall time in seconds and the peak RSS in MB of the roundtrip"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run, args=(method, db_path, out_path, queue))
+    process.start()
+    elapsed, maxrss = queue.get()
+    process.join()
+    assert out_path.read_bytes() == db_path.read_bytes(), 'roundtrip changed the DB'
+    # ru_maxrss is in bytes in macOS and in kilobytes everywhere else
+    return elapsed, maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of the DB sync pipeline')
+    parser.add_argument('--sizes-mb', type=int, nargs='+', default=[10, 50, 200])
+    args = parser.parse_args()
+
+    print(f'{"DB size":>8} {"method":>10} {"wall time":>10} {"peak RSS":>10}')
+    with TemporaryDirectory() as tmpdirname:
+        for size_mb in args.sizes_mb:
+            db_path = Path(tmpdirname) / f'{size_mb}.db'
+            make_db(db_path, size_mb)
+            for method in METHODS:
+                elapsed, maxrss = measure(method, db_path, Path(tmpdirname) / 'out.db')
+                print(f'{size_mb:>5} MB {method:>10} {elapsed:>9.2f}s {maxrss:>7.1f} MB')
+
+
+if __name__ == '__main__':
+    main()